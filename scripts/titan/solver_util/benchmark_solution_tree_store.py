@@ -0,0 +1,121 @@
+from __future__ import annotations
+import typing
+import pathlib
+import logging
+import argparse
+import json
+import sys
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStoreBenchmarkResult,
+    SolutionTreeStoreBenchmark
+)
+# the migration script sits next to this one
+from migrate_solution_tree_store import (
+    MigrationScript
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class ArgValidator:
+
+    @classmethod
+    def ensure_valid_store_sizes(cls, store_sizes: typing.Sequence[int]):
+        assert len(store_sizes) > 0, f"at least one store size is needed"
+        assert all(store_size > 0 for store_size in store_sizes), f"store sizes must be positive"
+
+    @classmethod
+    def ensure_valid_baseline_file(cls, baseline_file: typing.Optional[str]):
+        if baseline_file is not None:
+            assert pathlib.Path(baseline_file).is_file(), f"baseline file `{baseline_file}` does not exist"
+
+    @classmethod
+    def ensure_valid_tolerance(cls, tolerance: float):
+        assert 0 <= tolerance < 1, f"tolerance must be in [0, 1)"
+
+
+class BenchmarkScript:
+
+    @classmethod
+    def migrate(cls, store_path: pathlib.Path, output_path: pathlib.Path):
+        MigrationScript.migrate(store_dir=str(store_path), output_dir=str(output_path))
+
+    @classmethod
+    def load_results(cls, results_file: str) -> typing.List[SolutionTreeStoreBenchmarkResult]:
+        with open(results_file, 'r') as f:
+            return [SolutionTreeStoreBenchmarkResult.create_from_dict(result_dict) for result_dict in json.load(f)['results']]
+
+    @classmethod
+    def save_results(cls, results_file: str, results: typing.Sequence[SolutionTreeStoreBenchmarkResult], parameters: dict):
+        with open(results_file, 'w') as f:
+            json.dump({ 'parameters': parameters,
+                        'results': [result.serialize_to_dict() for result in results]  }, f, indent=2)
+
+    @classmethod
+    def benchmark(cls, store_sizes: typing.Sequence[int], tree_height: int, range_size: int, num_bet_sizes: int,
+                                                                                                num_repeats: int,
+                                                                                                output_file: typing.Optional[str],
+                                                                                                baseline_file: typing.Optional[str],
+                                                                                                tolerance: float) -> bool:
+        """Returns False if there were regressions against the baseline"""
+        parameters = {
+            'store_sizes': list(store_sizes),
+            'tree_height': tree_height,
+            'range_size': range_size,
+            'num_bet_sizes': num_bet_sizes,
+            'num_repeats': num_repeats
+        }
+        results = SolutionTreeStoreBenchmark.run(**parameters, migrate_fn=cls.migrate)
+        for result in results:
+            logger.info(f"{result.name()}: {result.ops_per_second():.1f} ops/s, latency {json.dumps(result.latency_seconds())}")
+        if output_file is not None:
+            cls.save_results(output_file, results, parameters)
+            logger.info(f"Saved the results to `{output_file}`")
+        if baseline_file is None:
+            return True
+        regressions = SolutionTreeStoreBenchmark.compare(   baseline_results=cls.load_results(baseline_file),
+                                                            results=results,
+                                                            tolerance=tolerance  )
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        return len(regressions) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the operations of a Solution Tree Store")
+    parser.add_argument("-n", "--store-sizes", type=int, nargs='+', default=list(SolutionTreeStoreBenchmark.DEFAULT_STORE_SIZES), required=False, help="Number of trees in each benchmarked store")
+    parser.add_argument("--tree-height", type=int, default=SolutionTreeStoreBenchmark.DEFAULT_TREE_HEIGHT, required=False, help="Height of the random trees")
+    parser.add_argument("--range-size", type=int, default=SolutionTreeStoreBenchmark.DEFAULT_RANGE_SIZE, required=False, help="Range size of the random trees")
+    parser.add_argument("--num-bet-sizes", type=int, default=SolutionTreeStoreBenchmark.DEFAULT_NUM_BET_SIZES, required=False, help="Number of bet sizes of the random trees")
+    parser.add_argument("-r", "--num-repeats", type=int, default=SolutionTreeStoreBenchmark.DEFAULT_NUM_REPEATS, required=False, help="Number of times whole-store operations are repeated")
+    parser.add_argument("-o", "--output-file", type=str, default=None, required=False, help="Where to save the results as json")
+    parser.add_argument("-b", "--baseline-file", type=str, default=None, required=False, help="Results of a previous run to compare with")
+    parser.add_argument("-t", "--tolerance", type=float, default=SolutionTreeStoreBenchmark.DEFAULT_TOLERANCE, required=False, help="Drop in throughput against the baseline that is flagged as a regression")
+    args = parser.parse_args()
+
+    # configure the logger
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        ArgValidator.ensure_valid_store_sizes(args.store_sizes)
+        ArgValidator.ensure_valid_baseline_file(args.baseline_file)
+        ArgValidator.ensure_valid_tolerance(args.tolerance)
+        is_ok = BenchmarkScript.benchmark(  store_sizes=args.store_sizes,
+                                            tree_height=args.tree_height,
+                                            range_size=args.range_size,
+                                            num_bet_sizes=args.num_bet_sizes,
+                                            num_repeats=args.num_repeats,
+                                            output_file=args.output_file,
+                                            baseline_file=args.baseline_file,
+                                            tolerance=args.tolerance  )
+    except Exception as e:
+        print(f"Failed due to exception: {e}")
+        raise
+    if not is_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__"   :
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import typing
+import pathlib
+import logging
+import argparse
+import json
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreGc
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class ArgValidator:
+
+    @classmethod
+    def ensure_valid_store_dir_path(cls, store_dir: str):
+        store_path = pathlib.Path(store_dir)
+        SolutionTreeStore.ensure_valid_store_path(store_path)
+
+    @classmethod
+    def ensure_valid_min_age_seconds(cls, min_age_seconds: float):
+        assert min_age_seconds >= 0, f"min-age-seconds cannot be negative"
+
+
+class GcScript:
+
+    @classmethod
+    def collect(cls, store_dir: str, dry_run: bool, min_age_seconds: float, max_workers: int):
+        report = SolutionTreeStoreGc.collect(   store_path=pathlib.Path(store_dir),
+                                                dry_run=dry_run,
+                                                min_age_seconds=min_age_seconds,
+                                                max_workers=max_workers  )
+        logger.info(f"GC completed: {json.dumps(report.serialize_to_dict())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage collect a Solution Tree Store")
+    parser.add_argument("-s", "--store-dir", type=str, required=True, help="Path to solution tree store")
+    parser.add_argument("-n", "--dry-run", action='store_true', default=False, required=False, help="Only report what would be deleted")
+    parser.add_argument("-a", "--min-age-seconds", type=float, default=SolutionTreeStoreGc.DEFAULT_MIN_AGE_SECONDS, required=False, help="Never delete blobs written more recently than this")
+    parser.add_argument("-j", "--max-workers", type=int, default=SolutionTreeStoreGc.DEFAULT_MAX_WORKERS, required=False, help="Number of blobs to delete in parallel")
+    args = parser.parse_args()
+
+    # configure the logger
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        ArgValidator.ensure_valid_store_dir_path(args.store_dir)
+        ArgValidator.ensure_valid_min_age_seconds(args.min_age_seconds)
+        GcScript.collect(   store_dir=args.store_dir,
+                            dry_run=args.dry_run,
+                            min_age_seconds=args.min_age_seconds,
+                            max_workers=args.max_workers  )
+    except Exception as e:
+        print(f"Failed due to exception: {e}")
+        raise
+
+
+if __name__ == "__main__"   :
+    main()
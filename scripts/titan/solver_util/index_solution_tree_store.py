@@ -24,14 +24,15 @@ class ArgValidator:
 class IndexScript:
 
     @classmethod
-    def rebuild_index(cls, store_dir: str):
+    def rebuild_index(cls, store_dir: str, with_fingerprint_keys: bool):
         store_path = pathlib.Path(store_dir)
-        store = SolutionTreeStore.create_from_directory_and_rebuild_index(store_path=store_path)
+        store = SolutionTreeStore.create_from_directory_and_rebuild_index(store_path=store_path, with_fingerprint_keys=with_fingerprint_keys)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Index Solution Tree Store")
     parser.add_argument("-s", "--store-dir", type=str, default=None, required=False, help="Path to solution tree store")
+    parser.add_argument("-f", "--fingerprint-keys", action='store_true', default=False, required=False, help="Also index each solve under the fingerprint of its solver config")
     args = parser.parse_args()
 
     # configure the logger
@@ -39,7 +40,7 @@ def main():
 
     try:
         ArgValidator.ensure_valid_store_dir_path(args.store_dir)
-        IndexScript.rebuild_index(store_dir=args.store_dir)
+        IndexScript.rebuild_index(store_dir=args.store_dir, with_fingerprint_keys=args.fingerprint_keys)
     except Exception as e:
         print(f"Failed due to exception: {e}")
         raise
@@ -1,22 +1,24 @@
 from __future__ import annotations
 import typing
 import pathlib
-import tempfile
-import gzip
 import shutil
 import json
 import logging
 import os
 import argparse
+import concurrent.futures
 from titan.solver_util.spot_models import (
     ActionSequence,
 )
-from titan.solver_util.solution_tree import (
-    SolutionTree,
-)
 from titan.solver_util.solution_tree_store import (
     SolutionTreeStore
 )
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreIndexEntry
+)
 
 
 logger = logging.getLogger(__name__)
@@ -34,16 +36,64 @@ class ArgValidator:
         assert not is_empty, f"store_dir `{store_dir}` is empty !"
 
     @classmethod
-    def ensure_valid_output_dir(cls, output_dir: str, force_overwrite: bool):
+    def ensure_valid_output_dir(cls, output_dir: str, force_overwrite: bool, resume: bool):
         output_path = pathlib.Path(output_dir)
         assert not output_path.is_file(), f"{output_dir} is a path to a file not a directory !"
         assert output_path.is_dir(), f"{output_dir} is not a valid directory"
         is_empty = not any(output_path.iterdir())
-        assert is_empty or force_overwrite, f"{output_dir} is not empty. User the -f flag to overwrite"
+        assert is_empty or force_overwrite or resume, f"{output_dir} is not empty. User the -f flag to overwrite or the -r flag to resume"
+        assert not (force_overwrite and resume), f"Cannot both overwrite and resume a migration"
+
+
+class MigrationResumeFile:
+    """Records each migrated file with its index entry, so an interrupted migration can carry on where it stopped"""
+
+    RESUME_DIR_NAME = '.migration'
+    RESUME_FILE_NAME = 'migrated.jsonl'
+
+    @classmethod
+    def resume_file_path(cls, output_path: pathlib.Path) -> pathlib.Path:
+        # hidden directory, since only blob prefix directories are expected in the root of a store
+        return output_path / cls.RESUME_DIR_NAME / cls.RESUME_FILE_NAME
+
+    @classmethod
+    def load(cls, output_path: pathlib.Path) -> typing.Dict[str, SolutionTreeStoreIndexEntry]:
+        result = {}
+        resume_file_path = cls.resume_file_path(output_path)
+        if not resume_file_path.is_file():
+            return result
+        with open(resume_file_path, 'r') as f:
+            for line in f:
+                # ignore a trailing record that was cut short by the interruption
+                if not line.endswith('\n'):
+                    break
+                record = json.loads(line)
+                result[record['gz_file']] = SolutionTreeStoreIndexEntry.create_from_dict(record['index_key'], record)
+        return result
+
+    @classmethod
+    def discard_partial_record(cls, output_path: pathlib.Path):
+        """Cut off a trailing record left by the interruption, so the next record does not get appended to it"""
+        resume_file_path = cls.resume_file_path(output_path)
+        if not resume_file_path.is_file():
+            return
+        with open(resume_file_path, 'rb+') as f:
+            contents = f.read()
+            if contents and (not contents.endswith(b'\n')):
+                f.truncate(contents.rfind(b'\n') + 1)
+
+    @classmethod
+    def append(cls, f, gz_file: str, index_entry: SolutionTreeStoreIndexEntry):
+        f.write(json.dumps({'gz_file': gz_file,
+                            'index_key': index_entry.index_key(),
+                            **index_entry.serialize_to_dict()}) + '\n')
+        f.flush()
 
 
 class MigrationScript:
 
+    DEFAULT_MAX_WORKERS = os.cpu_count()
+
     @classmethod
     def clear_output_dir(cls, output_dir):
         for p in pathlib.Path(output_dir).iterdir():
@@ -52,49 +102,65 @@ class MigrationScript:
                 shutil.rmtree(p, ignore_errors=True)
             else:
                 os.remove(p)
-                
 
     @classmethod
-    def migrate(cls, store_dir: str, output_dir: str):
+    def migrate_file(cls, gz_file_path: pathlib.Path, new_store_path: pathlib.Path) -> SolutionTreeStoreIndexEntry:
+        """Add one old-store solution tree to the new store. Runs in a worker process"""
+        key_file_path = gz_file_path.parent / 'key.json'
+        # load the key json
+        key_dict = None
+        with open(key_file_path, 'r') as f:
+            key_dict = json.loads(f.read())
+        if (not key_dict):
+            raise ValueError(f"Invalid key.json at path `{key_file_path}`")
+        # the old store is gzip compressed too, so its bytes are copied as-is
+        if key_dict['solver_type'] == 'PREFLOP':
+            return SolutionTreeStoreImpl.add_preflop_solution_tree_from_compressed_path(store_path=new_store_path,
+                                                                                        solver_config_dict=key_dict['solver_config'],
+                                                                                        action_sequence=ActionSequence.create_from_string(key_dict['action_sequence']),
+                                                                                        is_path_solve=(key_dict['solve_mode'] == 'PATH_SOLVE'),
+                                                                                        compressed_solution_tree_path=gz_file_path )
+        elif key_dict['solver_type'] == 'POSTFLOP':
+            return SolutionTreeStoreImpl.add_postflop_solution_tree_from_compressed_path(   store_path=new_store_path,
+                                                                                            solver_config_dict=key_dict['solver_config'],
+                                                                                            action_sequence=ActionSequence.create_from_string(key_dict['action_sequence']),
+                                                                                            is_path_solve=(key_dict['solve_mode'] == 'PATH_SOLVE'),
+                                                                                            compressed_solution_tree_path=gz_file_path  )
+        else:
+            raise ValueError(f"Invalid solver_type `{key_dict['solver_type']}`")
+
+    @classmethod
+    def migrate(cls, store_dir: str, output_dir: str, max_workers: int = DEFAULT_MAX_WORKERS, resume: bool = False):
         old_store_path = pathlib.Path(store_dir)
         new_store_path = pathlib.Path(output_dir)
 
-        store = SolutionTreeStore.create_empty(store_path=new_store_path)
-
-        for gz_file_path in old_store_path.rglob('*.gz'):
-            logger.info(f"Extracting `{gz_file_path}` ...")
-            #
-            key_file_path = gz_file_path.parent / 'key.json'
-            # extract compressed solution tree
-            tmp_file = tempfile.NamedTemporaryFile(delete=False)
-            tmp_file_path = pathlib.Path(tmp_file.name)
-            with gzip.open(gz_file_path, 'rb') as f_in:
-                with open(tmp_file_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            tmp_file.close()
-            logger.info(f"Extracted `{gz_file_path}` to `{tmp_file_path}`")
-            # load the key json
-            key_dict = None
-            with open(key_file_path, 'r') as f:
-                key_dict = json.loads(f.read())
-            if (not key_dict):
-                raise ValueError(f"Invalid key.json at path `{key_file_path}`")
-            # add to new store
-            if key_dict['solver_type'] == 'PREFLOP':
-                store.add_preflop_solution_tree_from_path(  solver_config_dict=key_dict['solver_config'],
-                                                            action_sequence=ActionSequence.create_from_string(key_dict['action_sequence']),
-                                                            is_path_solve=(key_dict['solve_mode'] == 'PATH_SOLVE'),
-                                                            solution_tree_path=tmp_file_path )
-            elif key_dict['solver_type'] == 'POSTFLOP':
-                store.add_postflop_solution_tree_from_path( solver_config_dict=key_dict['solver_config'],
-                                                            action_sequence=ActionSequence.create_from_string(key_dict['action_sequence']),
-                                                            is_path_solve=(key_dict['solve_mode'] == 'PATH_SOLVE'),
-                                                            solution_tree_path=tmp_file_path  )
-            else:
-                raise ValueError(f"Invalid solver_type `{key_dict['solver_type']}`")
-            # clean up
-            tmp_file_path.unlink()
-        # save index to file
+        if resume:
+            store = SolutionTreeStore.create_for_writer(store_path=new_store_path)
+            MigrationResumeFile.discard_partial_record(new_store_path)
+            migrated_entries = MigrationResumeFile.load(new_store_path)
+            logger.info(f"Resuming migration, {len(migrated_entries)} files were already migrated")
+        else:
+            store = SolutionTreeStore.create_empty(store_path=new_store_path)
+            migrated_entries = {}
+
+        gz_files = sorted(str(p.relative_to(old_store_path)) for p in old_store_path.rglob('*.gz'))
+        pending_gz_files = [gz_file for gz_file in gz_files if gz_file not in migrated_entries]
+        logger.info(f"Migrating {len(pending_gz_files)} of {len(gz_files)} files with {max_workers} workers ...")
+
+        resume_file_path = MigrationResumeFile.resume_file_path(new_store_path)
+        resume_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(resume_file_path, 'a') as resume_file:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = { executor.submit(cls.migrate_file, old_store_path / gz_file, new_store_path): gz_file
+                                for gz_file in pending_gz_files }
+                for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                    gz_file = futures[future]
+                    index_entry = future.result()
+                    MigrationResumeFile.append(resume_file, gz_file, index_entry)
+                    migrated_entries[gz_file] = index_entry
+                    logger.info(f"Migrated #{i} `{gz_file}`")
+        # save index to file, once
+        store.add_index_entries(migrated_entries.values())
         store.save_index()
 
 
@@ -104,6 +170,8 @@ def main():
     parser.add_argument("-s", "--store-dir", type=str, default=None, required=False, help="Path to previous version solution tree store")
     parser.add_argument("-o", "--output-dir", type=str, required=True, help="Path to output directory")
     parser.add_argument("-f", "--force-overwrite", action='store_true', default=False, required=False, help="Force overwrite of output dir")
+    parser.add_argument("-r", "--resume", action='store_true', default=False, required=False, help="Resume an interrupted migration into output dir")
+    parser.add_argument("-j", "--max-workers", type=int, default=MigrationScript.DEFAULT_MAX_WORKERS, required=False, help="Number of worker processes")
     args = parser.parse_args()
 
     # configure the logger
@@ -112,12 +180,14 @@ def main():
     try:
         if args.output_dir == args.store_dir:
             raise ValueError(f"The output-dir should not be the same as the store-dir !")
-        ArgValidator.ensure_valid_output_dir(args.output_dir, args.force_overwrite)
+        ArgValidator.ensure_valid_output_dir(args.output_dir, args.force_overwrite, args.resume)
         ArgValidator.ensure_valid_store_dir_path(args.store_dir)
         if args.force_overwrite:
             MigrationScript.clear_output_dir(args.output_dir)
         MigrationScript.migrate(store_dir=args.store_dir,
-                                output_dir=args.output_dir)
+                                output_dir=args.output_dir,
+                                max_workers=args.max_workers,
+                                resume=args.resume)
     except Exception as e:
         print(f"Failed due to exception: {e}")
         raise
@@ -0,0 +1,68 @@
+from __future__ import annotations
+import typing
+import pathlib
+import logging
+import argparse
+import json
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreSync
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class ArgValidator:
+
+    @classmethod
+    def ensure_valid_src_store_dir_path(cls, store_dir: str):
+        store_path = pathlib.Path(store_dir)
+        SolutionTreeStore.ensure_valid_store_path(store_path)
+
+    @classmethod
+    def ensure_valid_dest_store_dir_path(cls, store_dir: str):
+        store_path = pathlib.Path(store_dir)
+        assert not store_path.is_file(), f"dest_dir `{store_dir}` is a path to a file not a directory !"
+        assert store_path.is_dir(), f"dest_dir `{store_dir}` is not a valid directory"
+        SolutionTreeStore.ensure_valid_store_path(store_path)
+
+
+class SyncScript:
+
+    @classmethod
+    def sync(cls, store_dirs: typing.Tuple[str, ...], dest_dir: str, max_workers: int):
+        report = SolutionTreeStoreSync.sync_many(   src_store_paths=(pathlib.Path(store_dir) for store_dir in store_dirs),
+                                                    dest_store_path=pathlib.Path(dest_dir),
+                                                    max_workers=max_workers  )
+        logger.info(f"Sync completed: {json.dumps(report.serialize_to_dict())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync Solution Tree Stores")
+    parser.add_argument("-s", "--store-dir", type=str, action='append', required=True, help="Path to a solution tree store to copy from (can be repeated)")
+    parser.add_argument("-o", "--dest-dir", type=str, required=True, help="Path to the solution tree store to copy into")
+    parser.add_argument("-j", "--max-workers", type=int, default=SolutionTreeStoreSync.DEFAULT_MAX_WORKERS, required=False, help="Number of blobs to copy in parallel")
+    args = parser.parse_args()
+
+    # configure the logger
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        # compare resolved paths, so `store`, `./store/` and symlinks to it all match
+        if pathlib.Path(args.dest_dir).resolve() in {pathlib.Path(store_dir).resolve() for store_dir in args.store_dir}:
+            raise ValueError(f"The dest-dir should not be one of the store-dirs !")
+        ArgValidator.ensure_valid_dest_store_dir_path(args.dest_dir)
+        for store_dir in args.store_dir:
+            ArgValidator.ensure_valid_src_store_dir_path(store_dir)
+        SyncScript.sync(store_dirs=tuple(args.store_dir),
+                        dest_dir=args.dest_dir,
+                        max_workers=args.max_workers)
+    except Exception as e:
+        print(f"Failed due to exception: {e}")
+        raise
+
+
+if __name__ == "__main__"   :
+    main()
@@ -15,7 +15,10 @@ setup(
     entry_points={
         'console_scripts': [
             'migrate_solution_tree_store=scripts.titan.solver_util.migrate_solution_tree_store:main',
-            'index_solution_tree_store=scripts.titan.solver_util.index_solution_tree_store:main'
+            'index_solution_tree_store=scripts.titan.solver_util.index_solution_tree_store:main',
+            'sync_solution_tree_store=scripts.titan.solver_util.sync_solution_tree_store:main',
+            'gc_solution_tree_store=scripts.titan.solver_util.gc_solution_tree_store:main',
+            'benchmark_solution_tree_store=scripts.titan.solver_util.benchmark_solution_tree_store:main'
         ]
     }
 )
@@ -1113,3 +1113,31 @@ def test_postflop_config_serialization():
     cloned_config = PostflopSolverConfig.create_from_dict(json.loads(config_str))
     assert cloned_config == config
     assert json.dumps(cloned_config.serialize_to_dict()) == config_str
+
+
+def test_postflop_config_fingerprint():
+    config = create_mock_config()
+    fingerprint = config.fingerprint()
+    # the same for an equal config, however it was made
+    assert PostflopSolverConfig.create_from_dict(json.loads(json.dumps(config.serialize_to_dict()))).fingerprint() == fingerprint
+    assert pickle.loads(pickle.dumps(config)).fingerprint() == fingerprint
+    # solving_time does not change which solve it is
+    config_dict = {**config.serialize_to_dict(), 'solving_time': 42}
+    assert PostflopSolverConfig.create_from_dict(config_dict).fingerprint() == fingerprint
+    # but the ranges do
+    other_range = PlayerRange.create_uniform()
+    other_range.values()[0] = PlayerRange.MIN_VALUE
+    other_config_dict = {**config.serialize_to_dict(), 'player_ranges': (other_range.serialize_to_string(), PlayerRange.create_uniform().serialize_to_string())}
+    assert PostflopSolverConfig.create_from_dict(other_config_dict).fingerprint() != fingerprint
+    other_config_dict = {**config.serialize_to_dict(), 'community_cards': ('2s', '5d', 'Jd')}
+    assert PostflopSolverConfig.create_from_dict(other_config_dict).fingerprint() != fingerprint
+
+
+def test_postflop_config_registration_key():
+    config = create_mock_config()
+    other_config = PostflopSolverConfig.create_from_dict({**config.serialize_to_dict(), 'solving_time': 42})
+    # same fingerprint, but the solver process must not solve one with the other
+    assert other_config != config
+    assert other_config.fingerprint() == config.fingerprint()
+    assert other_config.registration_key() != config.registration_key()
+    assert pickle.loads(pickle.dumps(config)).registration_key() == config.registration_key()
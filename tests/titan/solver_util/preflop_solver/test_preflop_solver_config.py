@@ -208,3 +208,11 @@ def test_preflop_config_serialization():
   assert cloned_config == config
   assert json.dumps(cloned_config.serialize_to_dict()) == config_str
 
+
+
+def test_preflop_config_fingerprint():
+  config = create_mock_config()
+  fingerprint = config.fingerprint()
+  assert PreflopSolverConfig.create_from_dict(json.loads(json.dumps(config.serialize_to_dict()))).fingerprint() == fingerprint
+  other_config_dict = {**config.serialize_to_dict(), 'ante_amount': 0}
+  assert PreflopSolverConfig.create_from_dict(other_config_dict).fingerprint() != fingerprint
@@ -0,0 +1,28 @@
+import pathlib
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree import (
+    RandomValueFactory
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore
+)
+
+
+
+def create_small_solution_tree():
+    return RandomValueFactory.create_solution_tree( tree_height=2,
+                                                    range_size=10,
+                                                    num_bet_sizes=2 )
+
+def create_store_with_trees(store_path: pathlib.Path, trees, configs):
+    store_path.mkdir()
+    store = SolutionTreeStore.create_empty(store_path=store_path)
+    for tree, config in zip(trees, configs):
+        store.add_postflop_solution_tree(   solver_config_dict=config.serialize_to_dict(),
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=tree  )
+    store.save_index()
+    return store
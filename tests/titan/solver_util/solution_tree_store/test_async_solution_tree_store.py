@@ -0,0 +1,83 @@
+import logging
+import pytest
+import tempfile
+import pathlib
+import asyncio
+import threading
+import time
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    AsyncSolutionTreeStore
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+@pytest.mark.asyncio
+async def test_async_solution_tree_store():
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(6)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(6)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        async with AsyncSolutionTreeStore(store, max_workers=3) as async_store:
+            entries = await asyncio.gather(*(async_store.add_postflop_solution_tree(solver_config_dict=config.serialize_to_dict(),
+                                                                                    action_sequence=ActionSequence.create_empty(),
+                                                                                    is_path_solve=False,
+                                                                                    solution_tree=tree  ) for tree, config in zip(SAMPLE_TREES, SAMPLE_CONFIGS)))
+            assert store.index().size() == len(SAMPLE_TREES)
+            await async_store.save_index()
+
+            # bulk reads come back in the order of the keys
+            trees = await async_store.get_solution_trees([entry.solution_tree_key() for entry in entries])
+            assert list(trees) == SAMPLE_TREES
+            assert await async_store.get_postflop_solver_config_dict(entries[0].solver_config_key()) == store.get_postflop_solver_config_dict(entries[0].solver_config_key())
+
+        assert SolutionTreeStore.create_from_directory(pathlib.Path(working_dir)).index().size() == len(SAMPLE_TREES)
+
+
+@pytest.mark.asyncio
+async def test_async_solution_tree_store_concurrency_limit():
+    MAX_CONCURRENCY = 2
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        async with AsyncSolutionTreeStore(store, max_workers=4, max_concurrency=MAX_CONCURRENCY) as async_store:
+            lock = threading.Lock()
+            num_running = 0
+            max_running = 0
+            num_finished = 0
+
+            def slow_operation():
+                nonlocal num_running, max_running, num_finished
+                with lock:
+                    num_running += 1
+                    max_running = max(max_running, num_running)
+                time.sleep(0.05)
+                with lock:
+                    num_running -= 1
+                    num_finished += 1
+
+            await asyncio.gather(*(async_store.run_in_thread(slow_operation) for _ in range(6)))
+            assert max_running == MAX_CONCURRENCY
+
+            # cancelled callers: the running operations keep their slot, the waiting ones never run
+            num_finished = 0
+            tasks = [asyncio.create_task(async_store.run_in_thread(slow_operation)) for _ in range(6)]
+            await asyncio.sleep(0.01)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await async_store.run_in_thread(slow_operation)
+            assert num_finished == MAX_CONCURRENCY + 1
+            assert max_running == MAX_CONCURRENCY
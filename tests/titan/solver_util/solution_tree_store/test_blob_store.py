@@ -0,0 +1,63 @@
+import logging
+import tempfile
+import pathlib
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.blob_manifest import (
+    BlobManifest
+)
+
+logger = logging.getLogger(__name__)
+
+
+BLOB_PREFIX = 'some-prefix'
+
+
+
+def add_sample_blobs(store_path: pathlib.Path, num_blobs: int):
+    result = []
+    for i in range(num_blobs):
+        blob_bytes = f"blob #{i}".encode('ascii')
+        blob_key = BlobStore.create_blob_key_from_bytes(blob_bytes)
+        if i % 2:
+            BlobStore.add_compressed_blob_from_bytes(store_path, BLOB_PREFIX, blob_key, blob_bytes)
+        else:
+            BlobStore.add_blob_from_bytes(store_path, BLOB_PREFIX, blob_key, blob_bytes)
+        result.append(blob_key)
+    return result
+
+
+def test_blob_store_manifest():
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        blob_keys = add_sample_blobs(store_path, 10)
+        assert BlobManifest.exists(store_path, BLOB_PREFIX)
+        assert set(BlobStore.gen_blob_keys(store_path, BLOB_PREFIX)) == set(blob_keys)
+        assert set(BlobStore.scan_blob_keys(store_path, BLOB_PREFIX)) == set(blob_keys)
+        assert all(BlobStore.does_blob_exist(store_path, BLOB_PREFIX, blob_key) for blob_key in blob_keys)
+
+        # deleted blobs are dropped from the manifest
+        for blob_key in blob_keys[:3]:
+            BlobStore.delete_blob(store_path, BLOB_PREFIX, blob_key)
+        assert set(BlobStore.gen_blob_keys(store_path, BLOB_PREFIX)) == set(blob_keys[3:])
+        assert not BlobStore.does_blob_exist(store_path, BLOB_PREFIX, blob_keys[0])
+
+        # records appended by another writer are picked up
+        BlobManifest._append_record(store_path, BLOB_PREFIX, f"{BlobManifest.DELETE_RECORD}{blob_keys[3]}")
+        assert blob_keys[3] not in set(BlobStore.gen_blob_keys(store_path, BLOB_PREFIX))
+
+        # a rebuilt manifest matches the blobs on disk
+        BlobStore.rebuild_manifest(store_path, BLOB_PREFIX)
+        assert set(BlobStore.gen_blob_keys(store_path, BLOB_PREFIX)) == set(blob_keys[3:])
+
+
+def test_blob_store_without_manifest():
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        blob_keys = add_sample_blobs(store_path, 5)
+        # a store written before manifests existed
+        BlobManifest.manifest_path(store_path, BLOB_PREFIX).unlink()
+        assert set(BlobStore.gen_blob_keys(store_path, BLOB_PREFIX)) == set(blob_keys)
+        assert BlobManifest.exists(store_path, BLOB_PREFIX)
+        assert set(BlobStore.gen_blob_keys(store_path, 'missing-prefix')) == set()
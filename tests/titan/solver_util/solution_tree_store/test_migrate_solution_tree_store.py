@@ -0,0 +1,121 @@
+import logging
+import pytest
+import tempfile
+import pathlib
+import json
+import sys
+import importlib.util
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreIndex,
+    SolutionTreeWriter
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def load_migration_script():
+    script_path = pathlib.Path(__file__).parents[4] / 'scripts' / 'titan' / 'solver_util' / 'migrate_solution_tree_store.py'
+    spec = importlib.util.spec_from_file_location('migrate_solution_tree_store', script_path)
+    module = importlib.util.module_from_spec(spec)
+    # the worker processes unpickle the migration tasks by module name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_old_store(old_store_path: pathlib.Path, trees, configs):
+    """The previous layout: a directory per solve, with the compressed tree next to a key.json"""
+    for i, (tree, config) in enumerate(zip(trees, configs)):
+        solve_path = old_store_path / f'solve-{i}'
+        solve_path.mkdir(parents=True)
+        SolutionTreeWriter.write_compressed(solve_path / 'solution_tree.gz', tree)
+        (solve_path / 'key.json').write_text(json.dumps({   'solver_type': 'POSTFLOP',
+                                                            'solve_mode': 'SUBTREE_SOLVE',
+                                                            'action_sequence': '',
+                                                            'solver_config': config.serialize_to_dict()  }))
+
+
+def expected_index_keys(configs):
+    return {SolutionTreeStoreIndex.create_postflop_index_key(   is_path_solve=False,
+                                                                action_sequence=ActionSequence.create_empty(),
+                                                                solver_config_dict=config.serialize_to_dict()  ) for config in configs}
+
+
+def test_migrate_solution_tree_store():
+    migration = load_migration_script()
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(4)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(4)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        old_store_path = pathlib.Path(working_dir) / 'old'
+        new_store_path = pathlib.Path(working_dir) / 'new'
+        new_store_path.mkdir()
+        create_old_store(old_store_path, SAMPLE_TREES, SAMPLE_CONFIGS)
+        migration.MigrationScript.migrate(store_dir=str(old_store_path), output_dir=str(new_store_path), max_workers=2)
+
+        store = SolutionTreeStore.create_from_directory(new_store_path)
+        entries = list(store.index().gen_entries())
+        assert len(entries) == len(SAMPLE_TREES)
+        assert {entry.index_key() for entry in entries} == expected_index_keys(SAMPLE_CONFIGS)
+        for tree, config in zip(SAMPLE_TREES, SAMPLE_CONFIGS):
+            assert store.resolve_postflop_solution_tree(solver_config_dict=config.serialize_to_dict(),
+                                                        action_sequence=ActionSequence.create_empty(),
+                                                        is_path_solve=False  ) == tree
+        # the index matches the one rebuilt from the blobs
+        rebuilt_store = SolutionTreeStore.create_from_directory(new_store_path)
+        rebuilt_store.rebuild_index()
+        assert rebuilt_store.index().serialize_to_dict() == store.index().serialize_to_dict()
+
+
+def test_migrate_solution_tree_store_resume():
+    migration = load_migration_script()
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(6)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(6)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        old_store_path = pathlib.Path(working_dir) / 'old'
+        new_store_path = pathlib.Path(working_dir) / 'new'
+        new_store_path.mkdir()
+        create_old_store(old_store_path, SAMPLE_TREES, SAMPLE_CONFIGS)
+        # a file that cannot be migrated interrupts the run part-way
+        broken_key_path = old_store_path / 'solve-3' / 'key.json'
+        key_json = broken_key_path.read_text()
+        broken_key_path.write_text('{}')
+        with pytest.raises(ValueError):
+            migration.MigrationScript.migrate(store_dir=str(old_store_path), output_dir=str(new_store_path), max_workers=2)
+        resume_file_path = migration.MigrationResumeFile.resume_file_path(new_store_path)
+        migrated_before = migration.MigrationResumeFile.load(new_store_path)
+        assert 'solve-3/solution_tree.gz' not in migrated_before
+        assert len(migrated_before) < len(SAMPLE_TREES)
+        # and the last record was cut short
+        with open(resume_file_path, 'a') as f:
+            f.write('{"gz_file": "solve-')
+
+        broken_key_path.write_text(key_json)
+        migration.MigrationScript.migrate(store_dir=str(old_store_path), output_dir=str(new_store_path), max_workers=2, resume=True)
+
+        # every file is recorded once, and what was migrated before was not migrated again
+        gz_files = [json.loads(line)['gz_file'] for line in resume_file_path.read_text().splitlines()]
+        assert sorted(gz_files) == sorted(f'solve-{i}/solution_tree.gz' for i in range(len(SAMPLE_TREES)))
+        migrated_after = migration.MigrationResumeFile.load(new_store_path)
+        assert all(migrated_after[gz_file] == index_entry for gz_file, index_entry in migrated_before.items())
+
+        store = SolutionTreeStore.create_from_directory(new_store_path)
+        entries = list(store.index().gen_entries())
+        assert len(entries) == len(SAMPLE_TREES)
+        assert {entry.index_key() for entry in entries} == expected_index_keys(SAMPLE_CONFIGS)
+        for tree, config in zip(SAMPLE_TREES, SAMPLE_CONFIGS):
+            assert store.resolve_postflop_solution_tree(solver_config_dict=config.serialize_to_dict(),
+                                                        action_sequence=ActionSequence.create_empty(),
+                                                        is_path_solve=False  ) == tree
@@ -0,0 +1,66 @@
+import logging
+import tempfile
+import pathlib
+import operator
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeMapReduce
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree,
+    create_store_with_trees
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def count_nodes(solution_tree_meta, solver_config_dict, solution_tree):
+    return solution_tree.node_count()
+
+def collect_stack_sizes(solution_tree_meta, solver_config_dict, solution_tree):
+    return frozenset([tuple(solver_config_dict['deal_order_stack_sizes'])])
+
+def has_short_first_stack(solution_tree_meta, fields):
+    return (fields is not None) and (fields.deal_order_stack_sizes()[0] < 3000)
+
+
+def test_solution_tree_map_reduce():
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(7)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(7)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = create_store_with_trees(pathlib.Path(working_dir) / 'store', SAMPLE_TREES, SAMPLE_CONFIGS)
+        progress_updates = []
+        num_nodes = SolutionTreeMapReduce.run(  store,
+                                                map_fn=count_nodes,
+                                                reduce_fn=operator.add,
+                                                initial_value=0,
+                                                max_workers=2,
+                                                chunk_size=2,
+                                                max_chunks_in_flight=2,
+                                                progress_fn=progress_updates.append  )
+        assert num_nodes == sum(tree.node_count() for tree in SAMPLE_TREES)
+        assert progress_updates[-1].num_chunks_done() == progress_updates[-1].num_chunks_submitted()
+        assert progress_updates[-1].num_chunks_done() == 4
+        assert progress_updates[-1].num_trees_mapped() == len(SAMPLE_TREES)
+
+        # a config without the indexed fields, like the benchmark's, does not fail the filter
+        store.add_postflop_solution_tree(   solver_config_dict={'benchmark_tree_id': 0, 'solving_time': 1},
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=create_small_solution_tree()  )
+        # only the solves accepted by the filter are mapped
+        stack_sizes = SolutionTreeMapReduce.run(store,
+                                                map_fn=collect_stack_sizes,
+                                                reduce_fn=operator.or_,
+                                                initial_value=frozenset(),
+                                                filter_fn=has_short_first_stack,
+                                                max_workers=2,
+                                                chunk_size=3  )
+        assert stack_sizes == frozenset(config.deal_order_stack_sizes() for config in SAMPLE_CONFIGS if config.deal_order_stack_sizes()[0] < 3000)
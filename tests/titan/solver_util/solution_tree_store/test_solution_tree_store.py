@@ -3,7 +3,9 @@ import pytest
 import tempfile
 import pathlib
 import json
+import gzip
 import random
+import multiprocessing
 from titan.solver_util.spot_models import (
     ActionSequence,
     BlindBetSequence
@@ -20,7 +22,16 @@ from titan.solver_util.solution_tree import (
     SolutionTreeException
 )
 from titan.solver_util.solution_tree_store import (
-    SolutionTreeStore
+    SolutionTreeStore,
+    SolutionTreeHotTier,
+    SolutionTreeReader,
+    SolutionTreeWriter
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
 )
 
 logger = logging.getLogger(__name__)
@@ -440,3 +451,361 @@ def test_solution_tree_store():
         store.rebuild_index()
         assert json.dumps(store.index().serialize_to_dict(), sort_keys=True) == old_index_json
 
+
+def add_trees_as_writer(store_dir: str, writer_id: str, num_trees: int, seed: int):
+    random.seed(seed)
+    store = SolutionTreeStore.create_for_writer(store_path=pathlib.Path(store_dir), writer_id=writer_id)
+    for i in range(num_trees):
+        store.add_postflop_solution_tree(   solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=RandomValueFactory.create_solution_tree(  tree_height=2,
+                                                                                                    range_size=10,
+                                                                                                    num_bet_sizes=2 ) )
+
+
+def test_solution_tree_store_concurrent_writers():
+    NUM_WRITERS = 4
+    NUM_TREES_PER_WRITER = 3
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        ctx = multiprocessing.get_context('fork')
+        processes = [ctx.Process(target=add_trees_as_writer, args=(working_dir, f"writer-{i}", NUM_TREES_PER_WRITER, i)) for i in range(NUM_WRITERS)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+            assert p.exitcode == 0
+
+        # no writer saved an index, the entries come from their journals
+        store = SolutionTreeStore.create_from_directory(store_path)
+        assert store.index().size() == NUM_WRITERS * NUM_TREES_PER_WRITER
+        for entry in store.index().gen_entries():
+            store.get_solution_tree(key=entry.solution_tree_key())
+
+        # compacting the journals into an index keeps every entry
+        writer_store = SolutionTreeStore.create_for_writer(store_path=store_path, writer_id='writer-0')
+        writer_store.save_index()
+        writer_store.clean_up_indexes()
+        assert SolutionTreeStore.create_from_directory(store_path).index().size() == NUM_WRITERS * NUM_TREES_PER_WRITER
+        assert sum(1 for _ in (store_path / 'index').rglob('*.gz')) == 1
+        assert not any((store_path / '.tmp').iterdir())
+
+
+def test_solution_tree_store_resolve_path_from_subtree():
+    config_dict = create_mock_postflop_config().serialize_to_dict()
+    solution_tree = RandomValueFactory.create_solution_tree(tree_height=3,
+                                                            range_size=10,
+                                                            num_bet_sizes=2 )
+    deepest_node = list(solution_tree.get_node(ActionSequence.create_empty()).gen_nodes_in_bfs_traversal())[-1]
+    path = deepest_node.action_sequence()
+    assert len(path) > 0
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        store.add_postflop_solution_tree(   solver_config_dict=config_dict,
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=solution_tree  )
+        path_tree = store.resolve_postflop_solution_tree(   solver_config_dict=config_dict,
+                                                            action_sequence=path,
+                                                            is_path_solve=True  )
+        # only the nodes of the path were read
+        assert path_tree.node_count() == len(path) + 1
+        for action_sequence in path.gen_prefixes():
+            assert path_tree.get_node(action_sequence).solved_spot() == solution_tree.get_node(action_sequence).solved_spot()
+        # the subtree solve does not cover a different config, or a path leaving the tree
+        assert store.resolve_postflop_solution_tree(solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                                    action_sequence=path,
+                                                    is_path_solve=True  ) is None
+        assert store.resolve_postflop_solution_tree(solver_config_dict=config_dict,
+                                                    action_sequence=path + ActionSequence.create_from_string('r999999'),
+                                                    is_path_solve=True  ) is None
+        # subtree requests need an exact match
+        assert store.resolve_postflop_solution_tree(solver_config_dict=config_dict,
+                                                    action_sequence=ActionSequence.create_empty(),
+                                                    is_path_solve=False  ) == solution_tree
+
+
+def test_solution_tree_store_resolve_path_from_deeper_subtree():
+    config_dict = create_mock_postflop_config().serialize_to_dict()
+    solution_tree = RandomValueFactory.create_solution_tree(tree_height=3,
+                                                            range_size=10,
+                                                            num_bet_sizes=2 )
+    # a subtree solve rooted at the first child, whose own root node is still the empty action sequence
+    subtree_root = list(solution_tree.get_node(ActionSequence.create_empty()).gen_nodes_in_bfs_traversal())[1].action_sequence()
+    deepest_node = list(solution_tree.get_node(ActionSequence.create_empty()).gen_nodes_in_bfs_traversal())[-1]
+    path = subtree_root + deepest_node.action_sequence()
+    assert len(subtree_root) > 0
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        store.add_postflop_solution_tree(   solver_config_dict=config_dict,
+                                            action_sequence=subtree_root,
+                                            is_path_solve=False,
+                                            solution_tree=solution_tree  )
+        # it lacks the nodes above its root, so it does not answer a path through it
+        assert store.resolve_postflop_solution_tree(solver_config_dict=config_dict,
+                                                    action_sequence=path,
+                                                    is_path_solve=True  ) is None
+        assert store.resolve_postflop_solution_tree(solver_config_dict=config_dict,
+                                                    action_sequence=subtree_root,
+                                                    is_path_solve=True  ) is None
+        assert store.resolve_postflop_solution_tree(solver_config_dict=config_dict,
+                                                    action_sequence=subtree_root,
+                                                    is_path_solve=False  ) == solution_tree
+
+
+def test_solution_tree_store_hot_tier():
+    SAMPLE_TREES = [RandomValueFactory.create_solution_tree(tree_height=2, range_size=10, num_bet_sizes=2) for _ in range(3)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        for tree in SAMPLE_TREES:
+            store.add_postflop_solution_tree(   solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                                action_sequence=ActionSequence.create_empty(),
+                                                is_path_solve=False,
+                                                solution_tree=tree  )
+        entries = sorted(store.index().gen_entries(), key=lambda entry: entry.serialize_to_tuple())
+        trees_by_key = {entry.solution_tree_key(): store.get_solution_tree(entry.solution_tree_key()) for entry in entries}
+        hot_file_size = 0
+        for tree in SAMPLE_TREES:
+            with tempfile.NamedTemporaryFile() as tree_file:
+                SolutionTreeWriter.write(tree_file.name, tree)
+                hot_file_size = max(hot_file_size, pathlib.Path(tree_file.name).stat().st_size)
+        # room for two trees only
+        store.enable_hot_tier(budget_bytes=(2 * hot_file_size), promotion_threshold=2)
+        hot_tier = store.hot_tier()
+
+        key_a, key_b, key_c = (entry.solution_tree_key() for entry in entries)
+        assert store.get_solution_tree(key_a) == trees_by_key[key_a]
+        assert not hot_tier.is_hot(key_a)
+        # promoted on the second read, and still the same tree
+        assert store.get_solution_tree(key_a) == trees_by_key[key_a]
+        assert hot_tier.is_hot(key_a)
+        assert store.get_solution_tree(key_a) == trees_by_key[key_a]
+        for _ in range(2):
+            assert store.get_solution_tree(key_b) == trees_by_key[key_b]
+        assert hot_tier.is_hot(key_b)
+        # the least read tree makes room for the new one
+        for _ in range(2):
+            assert store.get_solution_tree(key_c) == trees_by_key[key_c]
+        assert hot_tier.is_hot(key_c)
+        assert hot_tier.is_hot(key_a)
+        assert not hot_tier.is_hot(key_b)
+        assert hot_tier.size_bytes() <= hot_tier.budget_bytes()
+
+
+def test_solution_tree_store_hot_tier_over_budget(monkeypatch):
+    solution_tree = RandomValueFactory.create_solution_tree(tree_height=2, range_size=10, num_bet_sizes=2)
+    open_blob = BlobStore.open_blob
+    opened_keys = []
+
+    def counting_open_blob(store_path, blob_prefix, blob_key):
+        opened_keys.append(blob_key)
+        return open_blob(store_path, blob_prefix, blob_key)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        store.add_postflop_solution_tree(   solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=solution_tree  )
+        entry, = store.index().gen_entries()
+        key = entry.solution_tree_key()
+        monkeypatch.setattr(BlobStore, 'open_blob', counting_open_blob)
+        # the stats tell that the tree is too big, so it is never decompressed into the hot tier
+        store.enable_hot_tier(budget_bytes=(store.get_solution_tree_stats(key).raw_size_bytes() - 1), promotion_threshold=1)
+        for _ in range(3):
+            assert store.get_solution_tree(key) == solution_tree
+        assert store.hot_tier().is_rejected(key)
+        assert not store.hot_tier().is_hot(key)
+        assert opened_keys == []
+        # without stats, it is decompressed once to find out
+        hot_tier = SolutionTreeHotTier( store_path=store.store_path(),
+                                        blob_prefix=SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX,
+                                        budget_bytes=store.hot_tier().budget_bytes(),
+                                        promotion_threshold=1  )
+        for _ in range(3):
+            assert hot_tier.get_solution_tree(key) == solution_tree
+        assert hot_tier.is_rejected(key)
+        assert opened_keys == [key]
+
+
+def test_solution_tree_store_prefetch():
+    SAMPLE_TREES = [RandomValueFactory.create_solution_tree(tree_height=2, range_size=10, num_bet_sizes=2) for _ in range(3)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        for tree in SAMPLE_TREES:
+            store.add_postflop_solution_tree(   solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                                action_sequence=ActionSequence.create_empty(),
+                                                is_path_solve=False,
+                                                solution_tree=tree  )
+        trees_by_key = {entry.solution_tree_key(): store.get_solution_tree(entry.solution_tree_key()) for entry in store.index().gen_entries()}
+        key_a, key_b, key_c = sorted(trees_by_key)
+        store.enable_prefetch(cache_size=2)
+        prefetcher = store.prefetcher()
+        try:
+            # nothing is known yet
+            assert store.get_solution_tree(key_a) == trees_by_key[key_a]
+            assert store.get_solution_tree(key_b) == trees_by_key[key_b]
+            assert prefetcher.num_misses() == 2
+            assert prefetcher.transition_model().transition_count(key_a, key_b) == 1
+            # reading `a` again warms `b` in the background
+            assert store.get_solution_tree(key_a) == trees_by_key[key_a]
+            assert prefetcher.wait_until_idle(timeout=30)
+            assert prefetcher.is_cached(key_b)
+            assert not prefetcher.is_cached(key_c)
+            assert store.get_solution_tree(key_b) == trees_by_key[key_b]
+            assert prefetcher.num_hits() == 1
+        finally:
+            store.disable_prefetch()
+        assert store.prefetcher() is None
+
+
+def test_solution_tree_store_prefetch_hot_tier_access():
+    SAMPLE_TREES = [RandomValueFactory.create_solution_tree(tree_height=2, range_size=10, num_bet_sizes=2) for _ in range(2)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        for tree in SAMPLE_TREES:
+            store.add_postflop_solution_tree(   solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                                action_sequence=ActionSequence.create_empty(),
+                                                is_path_solve=False,
+                                                solution_tree=tree  )
+        key_a, key_b = sorted(entry.solution_tree_key() for entry in store.index().gen_entries())
+        store.enable_hot_tier(promotion_threshold=3)
+        store.enable_prefetch()
+        access_stats = store.hot_tier().access_stats()
+        try:
+            store.get_solution_tree(key_a)
+            store.get_solution_tree(key_b)
+            # reading `a` again prefetches `b`, which is not an access
+            store.get_solution_tree(key_a)
+            assert store.prefetcher().wait_until_idle(timeout=30)
+            assert store.prefetcher().is_cached(key_b)
+            assert access_stats.access_count(key_b) == 1
+            # but reading it from the prefetch cache is
+            store.get_solution_tree(key_b)
+            assert store.prefetcher().num_hits() == 1
+            assert access_stats.access_count(key_b) == 2
+            assert not store.hot_tier().is_hot(key_b)
+        finally:
+            store.disable_prefetch()
+
+
+def test_solution_tree_store_stats(monkeypatch):
+    config_dict = create_mock_postflop_config().serialize_to_dict()
+    solution_tree = RandomValueFactory.create_solution_tree(tree_height=3,
+                                                            range_size=10,
+                                                            num_bet_sizes=2 )
+    nodes = list(solution_tree.get_node(ActionSequence.create_empty()).gen_nodes_in_bfs_traversal())
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        store = SolutionTreeStore.create_empty(store_path=store_path)
+        store.add_postflop_solution_tree(   solver_config_dict=config_dict,
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=solution_tree  )
+        entry, = store.index().gen_entries()
+        stats = store.get_solution_tree_stats(entry.solution_tree_key())
+        assert stats.node_count() == solution_tree.node_count()
+        assert stats.max_depth() == max(node.depth() for node in nodes)
+        assert stats.leaf_count() == sum(1 for node in nodes if not node.has_children())
+        assert set(stats.matrix_shapes()) == {tuple(m.shape()) for node in nodes for m in (node.strategy_matrix(), node.ev_matrix())}
+        with tempfile.NamedTemporaryFile() as tree_file:
+            SolutionTreeWriter.write(tree_file.name, solution_tree)
+            assert stats.raw_size_bytes() == pathlib.Path(tree_file.name).stat().st_size
+        assert 0 < stats.compressed_size_bytes() < stats.raw_size_bytes()
+        blob_path = store_path / 'solution-tree'
+        assert stats.digest() == SolutionTreeStoreImpl.compute_file_hash_from_path(next(blob_path.rglob(f"{entry.solution_tree_key()}*")))
+
+        # stats are saved with the meta and the index, but do not change the meta key
+        meta, = store.gen_solution_tree_metas()
+        assert meta.stats() == stats
+        assert len(list((store_path / 'solution-tree-meta').rglob(f"{meta.hash()}*"))) == 1
+        store.save_index()
+        reloaded_store = SolutionTreeStore.create_from_directory(store_path)
+        assert reloaded_store.get_solution_tree_stats(entry.solution_tree_key()) == stats
+        assert list(reloaded_store.index().gen_entries_within_budget(stats.raw_size_bytes())) == [entry]
+        assert list(reloaded_store.index().gen_entries_within_budget(stats.raw_size_bytes() - 1)) == []
+        # and a rebuilt index has them too
+        reloaded_store.rebuild_index()
+        assert reloaded_store.get_solution_tree_stats(entry.solution_tree_key()) == stats
+
+    # a compressed tree is decompressed once, to hash it and collect its stats
+    gzip_open = gzip.open
+    num_gzip_opens = []
+
+    def counting_gzip_open(*args, **kwargs):
+        if args[0] == compressed_tree_path:
+            num_gzip_opens.append(args)
+        return gzip_open(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        working_path = pathlib.Path(working_dir)
+        compressed_tree_path = working_path / 'tree.gz'
+        SolutionTreeWriter.write_compressed(compressed_tree_path, solution_tree)
+        (working_path / 'store').mkdir()
+        store = SolutionTreeStore.create_empty(store_path=(working_path / 'store'))
+        monkeypatch.setattr(gzip, 'open', counting_gzip_open)
+        monkeypatch.setattr(SolutionTreeReader, 'gen_blob_tree_nodes_from_gzip_file', None)
+        store.add_postflop_solution_tree_from_compressed_path(  solver_config_dict=config_dict,
+                                                                action_sequence=ActionSequence.create_empty(),
+                                                                is_path_solve=False,
+                                                                compressed_solution_tree_path=compressed_tree_path  )
+        monkeypatch.undo()
+        assert len(num_gzip_opens) == 1
+        compressed_entry, = store.index().gen_entries()
+        compressed_stats = store.get_solution_tree_stats(compressed_entry.solution_tree_key())
+        assert compressed_entry.solution_tree_key() == entry.solution_tree_key()
+        assert (compressed_stats.node_count(), compressed_stats.raw_size_bytes()) == (stats.node_count(), stats.raw_size_bytes())
+        assert compressed_stats.digest() == SolutionTreeStoreImpl.compute_file_hash_from_path(compressed_tree_path)
+
+
+def test_solution_tree_store_fingerprint_index_keys():
+    configs = [create_mock_postflop_config() for _ in range(2)]
+    solution_trees = [RandomValueFactory.create_solution_tree(  tree_height=2,
+                                                                range_size=10,
+                                                                num_bet_sizes=2 ) for _ in range(2)]
+    path = list(solution_trees[0].get_node(ActionSequence.create_empty()).gen_nodes_in_bfs_traversal())[-1].action_sequence()
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        store = SolutionTreeStore.create_empty(store_path=store_path)
+        # only the first solve is added with its fingerprint, like a store written before fingerprints
+        store.add_postflop_solution_tree(   solver_config_dict=configs[0].serialize_to_dict(),
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=solution_trees[0],
+                                            solver_config_fingerprint=configs[0].fingerprint()  )
+        store.add_postflop_solution_tree(   solver_config_dict=configs[1].serialize_to_dict(),
+                                            action_sequence=ActionSequence.create_empty(),
+                                            is_path_solve=False,
+                                            solution_tree=solution_trees[1]  )
+        # both keys find the first solve
+        assert store.resolve_postflop_solution_tree(solver_config_dict=configs[0].serialize_to_dict(),
+                                                    action_sequence=ActionSequence.create_empty(),
+                                                    is_path_solve=False  ) == solution_trees[0]
+        assert store.resolve_postflop_solution_tree_from_fingerprint(   solver_config_fingerprint=configs[0].fingerprint(),
+                                                                        action_sequence=ActionSequence.create_empty(),
+                                                                        is_path_solve=False  ) == solution_trees[0]
+        assert store.resolve_postflop_solution_tree_from_fingerprint(   solver_config_fingerprint=configs[0].fingerprint(),
+                                                                        action_sequence=path,
+                                                                        is_path_solve=True  ).node_count() == len(path) + 1
+        assert store.resolve_postflop_solution_tree_from_fingerprint(   solver_config_fingerprint=configs[1].fingerprint(),
+                                                                        action_sequence=ActionSequence.create_empty(),
+                                                                        is_path_solve=False  ) is None
+
+        # migrate: rebuild the index with the fingerprint keys of every solve
+        store.rebuild_index(with_fingerprint_keys=True)
+        for config, solution_tree in zip(configs, solution_trees):
+            assert store.resolve_postflop_solution_tree_from_fingerprint(   solver_config_fingerprint=config.fingerprint(),
+                                                                            action_sequence=ActionSequence.create_empty(),
+                                                                            is_path_solve=False  ) == solution_tree
+            assert store.resolve_postflop_solution_tree(solver_config_dict=config.serialize_to_dict(),
+                                                        action_sequence=ActionSequence.create_empty(),
+                                                        is_path_solve=False  ) == solution_tree
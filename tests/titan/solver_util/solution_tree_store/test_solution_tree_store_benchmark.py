@@ -0,0 +1,45 @@
+import logging
+import pytest
+import json
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStoreBenchmarkResult,
+    SolutionTreeStoreBenchmark
+)
+from tests.titan.solver_util.solution_tree_store.test_migrate_solution_tree_store import (
+    load_migration_script
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def test_solution_tree_store_benchmark():
+    migration = load_migration_script()
+    migrate_fn = lambda store_path, output_path: migration.MigrationScript.migrate(store_dir=str(store_path), output_dir=str(output_path), max_workers=2)
+    results = SolutionTreeStoreBenchmark.run(store_sizes=(2, 4), tree_height=1, range_size=10, num_bet_sizes=1, num_repeats=2, migrate_fn=migrate_fn)
+    assert {result.name() for result in results} == {f"{operation}@{store_size}" for operation in SolutionTreeStoreBenchmark.OPERATIONS
+                                                                                    for store_size in (2, 4)}
+    for result in results:
+        assert result.num_ops() == (result.store_size() if result.operation() in ('add', 'get') else 2)
+        assert result.latency_seconds()['p50'] <= result.latency_seconds()['p95'] <= result.latency_seconds()['max']
+
+    # results round trip through json
+    baseline_results = [SolutionTreeStoreBenchmarkResult.create_from_dict(json.loads(json.dumps(result.serialize_to_dict()))) for result in results]
+    assert [result.serialize_to_dict() for result in baseline_results] == [result.serialize_to_dict() for result in results]
+    assert SolutionTreeStoreBenchmark.compare(baseline_results, results) == []
+
+    # a result twice as slow as its baseline is a regression, one missing from the baseline is not
+    slower_result = SolutionTreeStoreBenchmarkResult(   operation=results[0].operation(),
+                                                        store_size=results[0].store_size(),
+                                                        num_ops=results[0].num_ops(),
+                                                        total_seconds=(2 * results[0].total_seconds()),
+                                                        latency_seconds=results[0].latency_seconds()  )
+    regressions = SolutionTreeStoreBenchmark.compare(baseline_results, [slower_result] + results[1:])
+    assert [regression.name() for regression in regressions] == [results[0].name()]
+    assert regressions[0].slowdown() == pytest.approx(0.5)
+    assert SolutionTreeStoreBenchmark.compare(baseline_results[1:], [slower_result]) == []
+
+
+def test_solution_tree_store_benchmark_without_migration():
+    results = SolutionTreeStoreBenchmark.run(store_sizes=(2,), tree_height=1, range_size=10, num_bet_sizes=1, num_repeats=1)
+    assert {result.operation() for result in results} == set(SolutionTreeStoreBenchmark.OPERATIONS) - {'migrate'}
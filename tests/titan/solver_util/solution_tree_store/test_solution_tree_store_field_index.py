@@ -0,0 +1,83 @@
+import logging
+import tempfile
+import pathlib
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreFields,
+    SolutionTreeStoreFieldDistance,
+    SolutionTreeStoreFieldIndex
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree,
+    create_store_with_trees
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def test_solution_tree_store_field_index(monkeypatch):
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(5)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = create_store_with_trees(pathlib.Path(working_dir) / 'store',
+                                        [create_small_solution_tree() for _ in SAMPLE_CONFIGS],
+                                        SAMPLE_CONFIGS)
+        field_index = store.field_index()
+        assert isinstance(field_index, SolutionTreeStoreFieldIndex)
+        assert field_index.size() == 5
+        assert field_index.find(board=frozenset(('Jh', '2s', '5d'))) == frozenset(store.index().gen_entries())
+        assert len(field_index.find(board=frozenset(('Jh', '2s', '6d')))) == 0
+        assert len(field_index.find(deal_order_stack_sizes=SAMPLE_CONFIGS[0].deal_order_stack_sizes())) >= 1
+
+        for config in SAMPLE_CONFIGS:
+            query_fields = SolutionTreeStoreFields.create_for_postflop( is_path_solve=False,
+                                                                        action_sequence=ActionSequence.create_empty(),
+                                                                        solver_config_dict=config.serialize_to_dict()  )
+            index_key = store.index().create_postflop_index_key(is_path_solve=False,
+                                                                action_sequence=ActionSequence.create_empty(),
+                                                                solver_config_dict=config.serialize_to_dict())
+            # an exact match comes first, with zero distance
+            nearest = field_index.find_nearest(query_fields, max_results=3)
+            assert len(nearest) == 3
+            assert nearest[0].distance() == 0.0
+            assert nearest[0].index_entry() in set(store.index().gen_entries_for_key(index_key))
+            assert [match.distance() for match in nearest] == sorted(match.distance() for match in nearest)
+
+        # a different spot is only returned when the board is allowed to differ
+        other_config_dict = {**SAMPLE_CONFIGS[0].serialize_to_dict(), **{'community_cards': ('2s', '5d', 'Qh')}}
+        other_fields = SolutionTreeStoreFields.create_for_postflop( is_path_solve=False,
+                                                                    action_sequence=ActionSequence.create_empty(),
+                                                                    solver_config_dict=other_config_dict  )
+        assert len(field_index.find_nearest(other_fields)) == 0
+        nearest = field_index.find_nearest(other_fields, same_board_only=False, distance=SolutionTreeStoreFieldDistance(community_card_weight=1.0))
+        assert len(nearest) == 5
+        assert nearest[0].distance() == 2.0
+
+        def fail_to_read_config_dict(*args, **kwargs):
+            raise AssertionError("the field index must not read solver config blobs")
+
+        # the fields are saved with the index, so loading the store does not scan the config blobs
+        monkeypatch.setattr(SolutionTreeStoreImpl, 'get_postflop_solver_config_dict', fail_to_read_config_dict)
+        loaded_store = SolutionTreeStore.create_from_directory(store.store_path())
+        loaded_field_index = loaded_store.field_index()
+        assert loaded_field_index.size() == 5
+        for index_entry in store.index().gen_entries():
+            assert loaded_field_index.fields_for_entry(index_entry) == field_index.fields_for_entry(index_entry)
+        # and adding a solve updates it
+        other_config = create_mock_postflop_config()
+        loaded_store.add_postflop_solution_tree(solver_config_dict=other_config.serialize_to_dict(),
+                                                action_sequence=ActionSequence.create_empty(),
+                                                is_path_solve=False,
+                                                solution_tree=create_small_solution_tree()  )
+        assert loaded_field_index.size() == 6
+        assert len(loaded_field_index.find(deal_order_stack_sizes=other_config.deal_order_stack_sizes())) >= 1
@@ -0,0 +1,98 @@
+import logging
+import pytest
+import tempfile
+import pathlib
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreGc
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def test_solution_tree_store_gc():
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(4)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(4)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        store = SolutionTreeStore.create_empty(store_path=store_path)
+        # one index blob per tree, the last one has every entry
+        for tree, config in zip(SAMPLE_TREES[:3], SAMPLE_CONFIGS[:3]):
+            store.add_postflop_solution_tree(   solver_config_dict=config.serialize_to_dict(),
+                                                action_sequence=ActionSequence.create_empty(),
+                                                is_path_solve=False,
+                                                solution_tree=tree  )
+            store.save_index()
+        # blobs that no index entry refers to
+        orphan_entry = SolutionTreeStoreImpl.add_postflop_solution_tree(   store_path=store_path,
+                                                                            solver_config_dict=SAMPLE_CONFIGS[3].serialize_to_dict(),
+                                                                            action_sequence=ActionSequence.create_empty(),
+                                                                            is_path_solve=False,
+                                                                            solution_tree=SAMPLE_TREES[3]  )
+        store.enable_hot_tier(promotion_threshold=1)
+        store.get_solution_tree(orphan_entry.solution_tree_key())
+        assert store.hot_tier().is_hot(orphan_entry.solution_tree_key())
+
+        # recent blobs are never swept
+        report = SolutionTreeStoreGc.collect(store_path, dry_run=True)
+        assert sum(report.num_unreachable_blobs().values()) == 0
+
+        report = SolutionTreeStoreGc.collect(store_path, dry_run=True, min_age_seconds=0)
+        assert report.num_unreachable_blobs() == {  'solution-tree-meta': 1,
+                                                    'solution-tree': 1,
+                                                    'postflop-solver-config': 1  }
+        assert report.num_index_blobs_compacted() == 2
+        assert sum(report.num_blobs_deleted().values()) == 0
+        assert BlobStore.does_blob_exist(store_path, 'solution-tree', orphan_entry.solution_tree_key())
+
+        report = SolutionTreeStoreGc.collect(store_path, min_age_seconds=0, max_workers=2)
+        assert report.num_blobs_deleted() == report.num_unreachable_blobs()
+        assert report.num_index_blobs_compacted() == 2
+        assert not BlobStore.does_blob_exist(store_path, 'solution-tree', orphan_entry.solution_tree_key())
+        assert not BlobStore.does_blob_exist(store_path, 'postflop-solver-config', orphan_entry.solver_config_key())
+        assert not store.hot_tier().is_hot(orphan_entry.solution_tree_key())
+        assert sum(1 for _ in BlobStore.gen_blob_keys(store_path, 'index')) == 1
+        assert sum(1 for _ in store_path.glob('solution-tree-meta/*/*/*/*')) == 3
+        # the emptied fan-out directories are gone
+        for blob_prefix in SolutionTreeStoreGc.SWEPT_BLOB_PREFIXES + ('index', ):
+            assert all(any(p.iterdir()) for p in (store_path / blob_prefix).rglob('*') if p.is_dir())
+
+        # everything that is indexed is still there
+        reloaded_store = SolutionTreeStore.create_from_directory(store_path)
+        assert reloaded_store.index().size() == 3
+        for entry in reloaded_store.index().gen_entries():
+            reloaded_store.get_solution_tree(entry.solution_tree_key())
+        # a second run has nothing left to do
+        report = SolutionTreeStoreGc.collect(store_path, min_age_seconds=0)
+        assert sum(report.num_blobs_deleted().values()) == 0
+        assert report.num_index_blobs_compacted() == 0
+
+
+def test_solution_tree_store_gc_without_index():
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        SolutionTreeStoreImpl.add_postflop_solution_tree(   store_path=store_path,
+                                                            solver_config_dict=create_mock_postflop_config().serialize_to_dict(),
+                                                            action_sequence=ActionSequence.create_empty(),
+                                                            is_path_solve=False,
+                                                            solution_tree=create_small_solution_tree()  )
+        with pytest.raises(ValueError):
+            SolutionTreeStoreGc.collect(store_path, min_age_seconds=0)
+        assert SolutionTreeStoreGc.collect(store_path, dry_run=True, min_age_seconds=0).num_unreachable_blobs()['solution-tree'] == 1
@@ -0,0 +1,67 @@
+import logging
+import pytest
+import tempfile
+import pathlib
+import json
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeStoreSync
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree,
+    create_store_with_trees
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def test_solution_tree_store_sync():
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(6)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(6)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        working_path = pathlib.Path(working_dir)
+        # two workers, with one overlapping solve
+        store_a = create_store_with_trees(working_path / 'a', SAMPLE_TREES[:4], SAMPLE_CONFIGS[:4])
+        store_b = create_store_with_trees(working_path / 'b', SAMPLE_TREES[3:], SAMPLE_CONFIGS[3:])
+        dest_path = working_path / 'dest'
+        dest_path.mkdir()
+
+        report = SolutionTreeStoreSync.sync_many(   src_store_paths=(store_a.store_path(), store_b.store_path()),
+                                                    dest_store_path=dest_path,
+                                                    max_workers=4  )
+        assert report.num_blobs_copied()['solution-tree'] == 6
+        assert report.num_index_entries_merged() == 6
+
+        dest_store = SolutionTreeStore.create_from_directory(dest_path)
+        assert dest_store.index().size() == 6
+        for tree, config in zip(SAMPLE_TREES, SAMPLE_CONFIGS):
+            index_key = dest_store.index().create_postflop_index_key(   is_path_solve=False,
+                                                                        action_sequence=ActionSequence.create_empty(),
+                                                                        solver_config_dict=config.serialize_to_dict()  )
+            entries = list(dest_store.index().gen_entries_for_key(index_key))
+            assert len(entries) == 1
+            assert dest_store.get_solution_tree(key=entries[0].solution_tree_key()) == tree
+
+        # syncing again has nothing to do
+        report = SolutionTreeStoreSync.sync(src_store_path=store_a.store_path(), dest_store_path=dest_path)
+        assert report.is_empty()
+
+        # a rebuilt index matches the merged one
+        merged_index_json = json.dumps(dest_store.index().serialize_to_dict(), sort_keys=True)
+        dest_store.rebuild_index()
+        assert json.dumps(dest_store.index().serialize_to_dict(), sort_keys=True) == merged_index_json
+
+
+def test_solution_tree_store_sync_with_itself():
+    with tempfile.TemporaryDirectory() as working_dir:
+        store_path = pathlib.Path(working_dir)
+        with pytest.raises(ValueError):
+            SolutionTreeStoreSync.sync(src_store_path=store_path, dest_store_path=store_path)
@@ -0,0 +1,143 @@
+import logging
+import pytest
+import tempfile
+import pathlib
+import threading
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree.types import (
+    SolutionTreeNodeIndex
+)
+from titan.solver_util.solution_tree_store import (
+    SolutionTreeStore,
+    SolutionTreeWriter,
+    SolutionTreeWriteBehindQueue
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from tests.titan.solver_util.solution_tree_store.test_solution_tree_store import (
+    create_mock_postflop_config
+)
+from tests.titan.solver_util.solution_tree_store.sample_solution_tree_store import (
+    create_small_solution_tree
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class ReleasableSolutionTree(SolutionTree):
+    """Empties itself on release(), like a PinnedSolutionTree"""
+
+    def release(self):
+        self._solution_tree_node_index = SolutionTreeNodeIndex()
+
+
+def test_solution_tree_write_behind_queue():
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(6)]
+    SAMPLE_CONFIGS = [create_mock_postflop_config() for _ in range(6)]
+    tree_size = max(len(SolutionTreeWriter.write_to_bytes(tree)) for tree in SAMPLE_TREES)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        working_path = pathlib.Path(working_dir)
+        store_path = working_path / 'store'
+        store_path.mkdir()
+        store = SolutionTreeStore.create_empty(store_path=store_path)
+        # room for two trees at a time
+        with SolutionTreeWriteBehindQueue(store, max_workers=2, budget_bytes=(2 * tree_size)) as queue:
+            futures = []
+            for tree, config in zip(SAMPLE_TREES[:3], SAMPLE_CONFIGS[:3]):
+                futures.append(queue.enqueue_postflop_solution_tree(solver_config_dict=config.serialize_to_dict(),
+                                                                    action_sequence=ActionSequence.create_empty(),
+                                                                    is_path_solve=False,
+                                                                    solution_tree=tree  ))
+                assert queue.queued_bytes() <= queue.budget_bytes()
+            # the buffers of a solve are enqueued as is, like the ipc messages of a solver
+            for tree, config in zip(SAMPLE_TREES[3:], SAMPLE_CONFIGS[3:]):
+                tree_path = working_path / 'tree'
+                SolutionTreeWriter.write(tree_path, tree)
+                tree_bytes = tree_path.read_bytes()
+                futures.append(queue.enqueue_postflop_solution_tree_buffers(solver_config_dict=config.serialize_to_dict(),
+                                                                            action_sequence=ActionSequence.create_empty(),
+                                                                            is_path_solve=False,
+                                                                            solution_tree_buffers=(memoryview(tree_bytes)[:10], memoryview(tree_bytes)[10:])  ))
+            assert queue.flush(timeout=30)
+            assert queue.num_pending() == 0
+            assert queue.queued_bytes() == 0
+            for future, tree in zip(futures, SAMPLE_TREES):
+                assert store.get_solution_tree(future.result().solution_tree_key()) == tree
+
+        # closing saved the index
+        assert SolutionTreeStore.create_from_directory(store_path).index().size() == len(SAMPLE_TREES)
+        with pytest.raises(ValueError):
+            queue.enqueue_postflop_solution_tree(   solver_config_dict=SAMPLE_CONFIGS[0].serialize_to_dict(),
+                                                    action_sequence=ActionSequence.create_empty(),
+                                                    is_path_solve=False,
+                                                    solution_tree=SAMPLE_TREES[0]  )
+
+
+def test_solution_tree_write_behind_queue_backpressure(monkeypatch):
+    SAMPLE_TREES = [create_small_solution_tree() for _ in range(2)]
+    config_dict = create_mock_postflop_config().serialize_to_dict()
+    can_write = threading.Event()
+    add_postflop_solution_tree_from_buffers = SolutionTreeStoreImpl.add_postflop_solution_tree_from_buffers
+
+    def blocked_add_postflop_solution_tree_from_buffers(**kwargs):
+        can_write.wait()
+        return add_postflop_solution_tree_from_buffers(**kwargs)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        monkeypatch.setattr(SolutionTreeStoreImpl, 'add_postflop_solution_tree_from_buffers', blocked_add_postflop_solution_tree_from_buffers)
+        with SolutionTreeWriteBehindQueue(store, budget_bytes=1) as queue:
+            # a tree over budget is still accepted by an empty queue, but the next one has to wait for it
+            first_future = queue.enqueue_postflop_solution_tree(solver_config_dict=config_dict,
+                                                                action_sequence=ActionSequence.create_empty(),
+                                                                is_path_solve=False,
+                                                                solution_tree=SAMPLE_TREES[0]  )
+            with pytest.raises(TimeoutError):
+                queue.enqueue_postflop_solution_tree(   solver_config_dict=config_dict,
+                                                        action_sequence=ActionSequence.create_empty(),
+                                                        is_path_solve=False,
+                                                        solution_tree=SAMPLE_TREES[1],
+                                                        timeout=0.1  )
+            assert not queue.flush(timeout=0.1)
+            can_write.set()
+            second_future = queue.enqueue_postflop_solution_tree(   solver_config_dict=config_dict,
+                                                                    action_sequence=ActionSequence.create_empty(),
+                                                                    is_path_solve=False,
+                                                                    solution_tree=SAMPLE_TREES[1],
+                                                                    timeout=30  )
+            assert first_future.result().solution_tree_key() != second_future.result().solution_tree_key()
+        assert store.index().size() == 2
+
+
+def test_solution_tree_write_behind_queue_released_tree(monkeypatch):
+    solution_tree = create_small_solution_tree()
+    config_dict = create_mock_postflop_config().serialize_to_dict()
+    can_write = threading.Event()
+    add_postflop_solution_tree_from_buffers = SolutionTreeStoreImpl.add_postflop_solution_tree_from_buffers
+
+    def blocked_add_postflop_solution_tree_from_buffers(**kwargs):
+        can_write.wait()
+        return add_postflop_solution_tree_from_buffers(**kwargs)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        store = SolutionTreeStore.create_empty(store_path=pathlib.Path(working_dir))
+        monkeypatch.setattr(SolutionTreeStoreImpl, 'add_postflop_solution_tree_from_buffers', blocked_add_postflop_solution_tree_from_buffers)
+        with SolutionTreeWriteBehindQueue(store) as queue:
+            releasable_solution_tree = ReleasableSolutionTree(solution_tree._solution_tree_node_index)
+            future = queue.enqueue_postflop_solution_tree(  solver_config_dict=config_dict,
+                                                            action_sequence=ActionSequence.create_empty(),
+                                                            is_path_solve=False,
+                                                            solution_tree=releasable_solution_tree  )
+            # the tree was serialized when it was enqueued, so releasing it before the write does not matter
+            releasable_solution_tree.release()
+            assert releasable_solution_tree.node_count() == 0
+            can_write.set()
+            assert store.get_solution_tree(future.result(timeout=30).solution_tree_key()) == solution_tree
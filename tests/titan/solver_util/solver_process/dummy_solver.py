@@ -8,6 +8,15 @@ import random
 from titan.solver_util.spot_models import (
     ActionSequence
 )
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree_store.solution_tree_writer import (
+    SolutionTreeWriter
+)
+from titan.solver_util.blob_tree.wire_protocol import (
+    Serializer as BlobTreeSerializer
+)
 from titan.solver_util.solver_process import (
     IpcMessage,
     IpcMessageStore,
@@ -43,6 +52,20 @@ class DummyIpcMessageFactory:
             int_tuple = tuple(rng.randint(0, 0xffffffff) for _ in range(cls.NUM_INTS_IN_RESULT))
             yield cls.create(ipc_message_store, int_tuple)
 
+class DummySolutionTreeMessageFactory:
+
+    @classmethod
+    def create(cls, ipc_message_store: IpcMessageStore, solution_tree: SolutionTree):
+        blob_tree_nodes = list(SolutionTreeWriter.gen_blob_tree_nodes(solution_tree))
+        node_sizes = [BlobTreeSerializer.serialized_size_of_blob_tree_node(node) for node in blob_tree_nodes]
+        ipc_message = ipc_message_store.create_empty_message(sum(node_sizes))
+        offset = 0
+        for node, node_size in zip(blob_tree_nodes, node_sizes):
+            BlobTreeSerializer.serialize_blob_tree_node(ipc_message.message_buf()[offset:offset+node_size], node)
+            offset += node_size
+        ipc_message_store.save_message(ipc_message)
+        return ipc_message
+
 class DummySolveResultFactory:
 
     NUM_INTS_IN_RESULT = 100
@@ -112,6 +135,9 @@ class DummySolver(SolverImplementation):
         yield from self.simulate_solve(num_solve_results=config.num_solve_results())
 
 
+class FastDummySolver(DummySolver):
+    SPEEDUP = 10
+
 
 class SegFaultDummySolver(DummySolver):
 
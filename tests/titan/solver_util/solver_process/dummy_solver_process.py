@@ -15,7 +15,9 @@ from titan.solver_util.solver_process import (
     SolverImplementation
 )
 from tests.titan.solver_util.solver_process.dummy_solver import (
-    DummyConfig
+    DummyConfig,
+    DummySolver,
+    FastDummySolver
 )
 
 logger = SolverProcessLogging.get_logger(__name__)
@@ -41,8 +43,28 @@ class DummySolverProcessClient(SolverProcessClient):
 
     def create_process(self, parent_connection: Connection, child_connection: Connection, log_directory: str) -> Process:        
         daemon = DummySolverProcessDaemonFactory.create(self._solver_implementation)
-        return Process( target=daemon.run,
-                        args=(parent_connection, child_connection, log_directory) )
+        return self.create_daemon_process(  target=daemon.run,
+                                            args=(parent_connection, child_connection, log_directory) )
+
+
+def create_dummy_solver_process_client(solver_implementation: typing.Optional[SolverImplementation] = None) -> DummySolverProcessClient:
+    """Client factory for a SolverProcessPool or a SolverProcessStandby, with a FastDummySolver by default"""
+    return DummySolverProcessClient(solver_implementation=(solver_implementation if solver_implementation else FastDummySolver()))
+
+
+def run_dummy_solver_process_daemon(parent_connection: Connection, child_connection: Connection, log_directory: str):
+    SolverProcessDaemon.run(DummySolver(), parent_connection, child_connection, log_directory)
+
+
+class ForkServerDummySolverProcessClient(SolverProcessClient):
+    """The daemon is started by a fork server that has already imported the dummy solver"""
+
+    START_METHOD = 'forkserver'
+    PRELOAD_MODULES = ('tests.titan.solver_util.solver_process.dummy_solver',)
+
+    def create_process(self, parent_connection: Connection, child_connection: Connection, log_directory: str) -> Process:
+        return self.create_daemon_process(  target=run_dummy_solver_process_daemon,
+                                            args=(parent_connection, child_connection, log_directory) )
 
 
 
@@ -0,0 +1,183 @@
+import logging
+import os
+import pytest
+import multiprocessing.shared_memory
+from titan.solver_util.solver_process import (
+    IpcException,
+    FileBackedIpcMessageStore,
+    SharedMemoryArenaIpcMessageStore
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig,
+    DummySolver
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    DummySolverProcessClient
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def create_message(ipc_message_store, payload: bytes):
+    ipc_message = ipc_message_store.create_empty_message(len(payload))
+    ipc_message.message_buf()[:] = payload
+    ipc_message_store.save_message(ipc_message)
+    message_id = ipc_message.message_id()
+    ipc_message_store.release_message(ipc_message)
+    return message_id
+
+
+def test_shared_memory_arena_ipc_message_store():
+    if not SharedMemoryArenaIpcMessageStore.is_supported():
+        pytest.skip("shared memory is not supported")
+    SEGMENT_SIZE = 4096
+    producer_store = SharedMemoryArenaIpcMessageStore(segment_size=SEGMENT_SIZE)
+    consumer_store = SharedMemoryArenaIpcMessageStore()
+    try:
+        # messages share a segment
+        message_ids = [create_message(producer_store, bytes([i]) * 1000) for i in range(3)]
+        assert producer_store.num_segments() == 1
+        assert len({SharedMemoryArenaIpcMessageStore.parse_message_id(message_id)[1] for message_id in message_ids}) == 3
+        for i, message_id in enumerate(message_ids):
+            ipc_message = consumer_store.load_message(message_id)
+            assert ipc_message.size() == 1000
+            assert bytes(ipc_message.message_buf()) == bytes([i]) * 1000
+        # the consumer attached to the segment once
+        assert consumer_store.num_segments() == 1
+        assert consumer_store.memory_usage() == 3000
+        # a full segment makes the producer create another one
+        extra_message_id = create_message(producer_store, b'x' * 2000)
+        assert producer_store.num_segments() == 2
+        # regions come back once the consumer is done with them, and are merged
+        assert producer_store.num_unacknowledged_regions() == 4
+        consumer_store.destroy_all_messages()
+        assert consumer_store.memory_usage() == 0
+        big_message_id = create_message(producer_store, b'y' * 3000)
+        assert SharedMemoryArenaIpcMessageStore.parse_message_id(big_message_id)[:2] == SharedMemoryArenaIpcMessageStore.parse_message_id(message_ids[0])[:2]
+        assert producer_store.num_segments() == 2
+        assert producer_store.num_unacknowledged_regions() == 2
+        # messages bigger than a segment get a segment of their own
+        huge_message_id = create_message(producer_store, b'z' * (2 * SEGMENT_SIZE))
+        assert producer_store.num_segments() == 3
+        assert bytes(consumer_store.load_message(huge_message_id).message_buf()) == b'z' * (2 * SEGMENT_SIZE)
+        with pytest.raises(IpcException):
+            consumer_store.load_message('not-a-message-id')
+    finally:
+        segment_names = producer_store.segment_names()
+        consumer_store.close()
+        producer_store.close()
+    # nothing is left behind in /dev/shm
+    for segment_name in segment_names:
+        with pytest.raises(FileNotFoundError):
+            multiprocessing.shared_memory.SharedMemory(name=segment_name)
+
+
+def test_shared_memory_arena_ipc_message_store_live_view():
+    if not SharedMemoryArenaIpcMessageStore.is_supported():
+        pytest.skip("shared memory is not supported")
+    producer_store = SharedMemoryArenaIpcMessageStore(segment_size=4096)
+    consumer_store = SharedMemoryArenaIpcMessageStore()
+    try:
+        message_id = create_message(producer_store, bytes([1]) * 8)
+        ipc_message = consumer_store.load_message(message_id)
+        view = ipc_message.message_buf()[:8]
+        # the region is not handed back while a view of it is alive
+        with pytest.raises(BufferError):
+            consumer_store.destroy_message(ipc_message)
+        other_message_id = create_message(producer_store, bytes([255]) * 8)
+        assert other_message_id != message_id
+        assert bytes(view) == bytes([1]) * 8
+        # and once the view is gone, it is
+        view.release()
+        consumer_store.destroy_message(ipc_message)
+        assert create_message(producer_store, bytes([2]) * 8) == message_id
+    finally:
+        consumer_store.close()
+        producer_store.close()
+
+
+def test_file_backed_ipc_message_store():
+    producer_store = FileBackedIpcMessageStore()
+    consumer_store = FileBackedIpcMessageStore()
+    message_id = create_message(producer_store, b'abc' * 1000)
+    empty_message_id = create_message(producer_store, b'')
+    try:
+        ipc_message = consumer_store.load_message(message_id)
+        assert bytes(ipc_message.message_buf()) == b'abc' * 1000
+        assert consumer_store.load_message(empty_message_id).size() == 0
+        assert consumer_store.memory_usage() == 3000
+        # both sides map the same file, so there is nothing to copy
+        producer_message = producer_store.load_message(message_id)
+        producer_message.message_buf()[:3] = b'xyz'
+        assert bytes(ipc_message.message_buf()[:6]) == b'xyzabc'
+        producer_store.release_message(producer_message)
+        consumer_store.destroy_all_messages()
+        assert consumer_store.memory_usage() == 0
+        assert not os.path.exists(message_id)
+        with pytest.raises(IpcException):
+            consumer_store.load_message(message_id)
+    finally:
+        for path in (message_id, empty_message_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class FileBackedDummySolver(DummySolver):
+    SPEEDUP = 10
+
+    def __init__(self):
+        super().__init__()
+        self._ipc_message_store = FileBackedIpcMessageStore()
+
+
+class FileBackedDummySolverProcessClient(DummySolverProcessClient):
+    IPC_MESSAGE_STORE_CLASS = FileBackedIpcMessageStore
+
+
+@pytest.mark.asyncio
+async def test_solver_process_with_file_backed_ipc():
+    TIMEOUT = 5.0
+    async with FileBackedDummySolverProcessClient(solver_implementation=FileBackedDummySolver()) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        solver.configure(DummyConfig(num_solve_results=5))
+        ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+        assert len(ipc_messages) == 5
+        assert all(ipc_message.size() == 400000 for ipc_message in ipc_messages)
+        message_ids = [ipc_message.message_id() for ipc_message in ipc_messages]
+        del ipc_messages
+        solver.release_shared_memory()
+        assert not any(os.path.exists(message_id) for message_id in message_ids)
+
+
+class ArenaDummySolver(DummySolver):
+    SPEEDUP = 10
+
+    def __init__(self):
+        super().__init__()
+        self._ipc_message_store = SharedMemoryArenaIpcMessageStore()
+
+    def close(self):
+        super().close()
+        self._ipc_message_store.close()
+
+
+class ArenaDummySolverProcessClient(DummySolverProcessClient):
+    IPC_MESSAGE_STORE_CLASS = SharedMemoryArenaIpcMessageStore
+
+
+@pytest.mark.asyncio
+async def test_solver_process_with_shared_memory_arena():
+    if not SharedMemoryArenaIpcMessageStore.is_supported():
+        pytest.skip("shared memory is not supported")
+    TIMEOUT = 5.0
+    async with ArenaDummySolverProcessClient(solver_implementation=ArenaDummySolver()) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        for _ in range(3):
+            solver.configure(DummyConfig(num_solve_results=5))
+            ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+            assert len(ipc_messages) == 5
+            assert all(ipc_message.size() == 400000 for ipc_message in ipc_messages)
+            solver.release_shared_memory()
+        # the regions were recycled, rather than a segment being created per message
+        assert solver.ipc_message_store().num_segments() == 1
@@ -0,0 +1,110 @@
+import logging
+import gc
+import asyncio
+import threading
+import pytest
+from titan.solver_util.solution_tree import (
+    RandomValueFactory
+)
+from titan.solver_util.solver_process import (
+    IpcMessageStore,
+    IpcMessageLeaseTracker,
+    SolverProcessClient,
+    PinnedSolutionTree
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummySolutionTreeMessageFactory
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def create_solution_tree_message(ipc_message_store, solution_tree):
+    ipc_message = DummySolutionTreeMessageFactory.create(ipc_message_store, solution_tree)
+    message_id = ipc_message.message_id()
+    ipc_message_store.release_message(ipc_message)
+    return message_id
+
+
+def has_same_nodes(solution_tree, other_solution_tree):
+    return (    (solution_tree.node_count() == other_solution_tree.node_count()) and
+                all((   node.solved_spot() == other_node.solved_spot()
+                            for node, other_node in zip(solution_tree.gen_nodes_in_bfs_traversal(), other_solution_tree.gen_nodes_in_bfs_traversal())  ))  )
+
+
+@pytest.mark.asyncio
+async def test_pinned_solution_tree():
+    producer_store = IpcMessageStore()
+    solver = SolverProcessClient()
+    solution_tree = RandomValueFactory.create_solution_tree(2, 10, 2)
+
+    async def gen_ipc_messages(message_id: str):
+        yield solver.ipc_message_store().load_message(message_id)
+
+    try:
+        pinned_solution_tree = await solver.build_pinned_solution_tree(gen_ipc_messages(create_solution_tree_message(producer_store, solution_tree)))
+        assert isinstance(pinned_solution_tree, PinnedSolutionTree)
+        assert pinned_solution_tree.is_pinned()
+        assert has_same_nodes(pinned_solution_tree, solution_tree)
+        # the tree keeps its messages, while the rest is released
+        unpinned_message_id = create_solution_tree_message(producer_store, solution_tree)
+        solver.ipc_message_store().load_message(unpinned_message_id)
+        message_size = solver.shared_memory_usage() // 2
+        solver.release_shared_memory()
+        assert solver.shared_memory_usage() == message_size
+        assert has_same_nodes(pinned_solution_tree, solution_tree)
+        # once the tree is gone, so are its messages
+        del pinned_solution_tree
+        gc.collect()
+        solver.release_shared_memory()
+        assert solver.shared_memory_usage() == 0
+
+        # a detached tree no longer needs its messages
+        pinned_solution_tree = await solver.build_pinned_solution_tree(gen_ipc_messages(create_solution_tree_message(producer_store, solution_tree)))
+        assert solver.shared_memory_usage() > 0
+        assert pinned_solution_tree.detach() is pinned_solution_tree
+        assert not pinned_solution_tree.is_pinned()
+        assert solver.shared_memory_usage() == 0
+        assert has_same_nodes(pinned_solution_tree, solution_tree)
+    finally:
+        solver.release_shared_memory()
+        producer_store.destroy_all_messages()
+
+
+class ThreadRecordingIpcMessageStore(IpcMessageStore):
+
+    __slots__ = ('_destroying_thread_ids', )
+
+    def __init__(self):
+        super().__init__()
+        self._destroying_thread_ids = set()
+
+    def destroying_thread_ids(self):
+        return self._destroying_thread_ids
+
+    def destroy_message(self, ipc_message):
+        self._destroying_thread_ids.add(threading.get_ident())
+        super().destroy_message(ipc_message)
+
+
+@pytest.mark.asyncio
+async def test_ipc_message_lease_released_from_another_thread():
+    producer_store = IpcMessageStore()
+    consumer_store = ThreadRecordingIpcMessageStore()
+    lease_tracker = IpcMessageLeaseTracker(consumer_store)
+    solution_tree = RandomValueFactory.create_solution_tree(2, 10, 2)
+    try:
+        ipc_message = consumer_store.load_message(create_solution_tree_message(producer_store, solution_tree))
+        ipc_message_lease = lease_tracker.acquire((ipc_message, ))
+        del ipc_message
+        # like a finalizer run by the garbage collector on a worker thread
+        await asyncio.to_thread(ipc_message_lease.release)
+        await asyncio.sleep(0)
+        assert lease_tracker.num_leased_messages() == 0
+        assert len(consumer_store.messages()) == 0
+        # the message was destroyed on the loop that leased it
+        assert consumer_store.destroying_thread_ids() == {threading.get_ident()}
+    finally:
+        consumer_store.release_all_messages()
+        producer_store.destroy_all_messages()
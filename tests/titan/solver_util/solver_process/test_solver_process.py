@@ -5,6 +5,9 @@ import random
 import time
 import asyncio
 import sys
+from multiprocessing import (
+    Process
+)
 from titan.solver_util import solver_process
 from titan.solver_util.solver_process import (
     SolverProcessException,
@@ -379,3 +382,57 @@ async def test_solver_dummy_process():
                     ipc_message_count += 1
     finally:
         ipc_message_store.destroy_all_messages()
+
+
+
+def send_timestamped_notifications(parent_connection, child_connection, num_notifications: int, interval: float, exit_delay: float):
+    parent_connection.close()
+    for _ in range(num_notifications):
+        time.sleep(interval)
+        child_connection.send((solver_process.SolverState.READY, time.time()))
+    time.sleep(exit_delay)
+
+
+class NotifyingSolverProcessClient(solver_process.SolverProcessClient):
+
+    def __init__(self, num_notifications: int, interval: float, exit_delay: float):
+        solver_process.SolverProcessClient.__init__(self)
+        self._process_args = (num_notifications, interval, exit_delay)
+
+    def create_process(self, parent_connection, child_connection, log_directory):
+        return Process( target=send_timestamped_notifications,
+                        args=(parent_connection, child_connection, *self._process_args) )
+
+
+@pytest.mark.asyncio
+async def test_solver_process_notification_latency():
+    NUM_NOTIFICATIONS = 20
+    solver_process_client = NotifyingSolverProcessClient(num_notifications=NUM_NOTIFICATIONS, interval=0.01, exit_delay=0.5)
+    solver_process_client.spawn_process()
+    try:
+        latencies = []
+        for _ in range(NUM_NOTIFICATIONS):
+            _, sent_timestamp = await solver_process_client.recv_notification(solver_process_client._parent_connection, notification_timeout=5)
+            latencies.append(time.time() - sent_timestamp)
+        # notifications are delivered as they arrive, rather than on the next poll
+        assert sum(latencies) / len(latencies) < 0.01
+        # a process that exits is noticed straight away, well before the timeout
+        start_time = time.time()
+        with pytest.raises(SolverProcessException):
+            await solver_process_client.recv_notification(solver_process_client._parent_connection, notification_timeout=30)
+        assert time.time() - start_time < 5
+    finally:
+        solver_process_client.ensure_process_is_closed()
+
+
+@pytest.mark.asyncio
+async def test_solver_process_notification_timeout():
+    solver_process_client = NotifyingSolverProcessClient(num_notifications=0, interval=0, exit_delay=30)
+    solver_process_client.spawn_process()
+    try:
+        start_time = time.time()
+        with pytest.raises(SolverProcessException):
+            await solver_process_client.recv_notification(solver_process_client._parent_connection, notification_timeout=0.2)
+        assert 0.2 <= time.time() - start_time < 2
+    finally:
+        solver_process_client.ensure_process_is_closed()
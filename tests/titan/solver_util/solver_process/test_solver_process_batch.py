@@ -0,0 +1,74 @@
+import logging
+import pytest
+from titan.solver_util.solution_tree import (
+    RandomValueFactory,
+    SolutionTreeBuilder
+)
+from titan.solver_util.solver_process import (
+    SolveRequest
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig,
+    DummySolver,
+    DummySolutionTreeMessageFactory
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    DummySolverProcessClient
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeDummySolver(DummySolver):
+    """Solves with the nodes of a fixed SolutionTree"""
+
+    SPEEDUP = 100
+
+    def __init__(self, solution_tree):
+        super().__init__()
+        self._solution_tree = solution_tree
+
+    def gen_solution_tree_result(self, solution_tree):
+        self.simulate_processing(self.SIMULATE_COMPUTE_TIME, "Simulating solving ...")
+        ipc_message = DummySolutionTreeMessageFactory.create(self._ipc_message_store, solution_tree)
+        yield ipc_message.message_id()
+        self._ipc_message_store.release_message(ipc_message)
+
+    def solve_path(self, config, action_sequence):
+        builder = SolutionTreeBuilder()
+        for node_id, node in enumerate(self._solution_tree.gen_nodes_on_path(action_sequence)):
+            if node_id == 0:
+                builder.create_root_node(node_id=node_id, solved_spot=node.solved_spot())
+            else:
+                builder.create_child_node(  node_id=node_id,
+                                            parent_node_id=(node_id - 1),
+                                            action_string=str(node.action_sequence()[-1]),
+                                            solved_spot=node.solved_spot()  )
+        yield from self.gen_solution_tree_result(builder.build_solution_tree())
+
+    def solve_subtree(self, config, action_sequence, solve_depth: int):
+        yield from self.gen_solution_tree_result(self._solution_tree)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_solve_batch():
+    TIMEOUT = 5.0
+    solution_tree = RandomValueFactory.create_solution_tree(2, 10, 2)
+    leaf_action_sequences = [node.action_sequence() for node in solution_tree.gen_leaf_nodes()]
+    async with DummySolverProcessClient(solver_implementation=SolutionTreeDummySolver(solution_tree)) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        solver.configure(DummyConfig(num_solve_results=1))
+        solve_requests = [SolveRequest.create_path_request(f'path-{i}', action_sequence) for i, action_sequence in enumerate(leaf_action_sequences)]
+        solve_requests.append(SolveRequest.create_subtree_request('subtree', solution_tree.root_node().action_sequence(), solve_depth=2))
+        solution_trees = await solver.solve_batch_as_solution_trees(solve_requests, timeout=TIMEOUT)
+        assert solver.is_ready()
+        # the results were demultiplexed by request id
+        assert set(solution_trees.keys()) == {solve_request.request_id() for solve_request in solve_requests}
+        for i, action_sequence in enumerate(leaf_action_sequences):
+            path_tree = solution_trees[f'path-{i}']
+            assert path_tree.get_node(action_sequence).solved_spot() == solution_tree.get_node(action_sequence).solved_spot()
+        assert solution_trees['subtree'] == solution_tree
+        del solution_trees
+        solver.release_shared_memory()
+
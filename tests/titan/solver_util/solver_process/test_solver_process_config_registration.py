@@ -0,0 +1,104 @@
+import logging
+import pytest
+from titan.solver_util.solver_process import (
+    SolverConfigCache,
+    SolverConfigFingerprint,
+    SolverProcessDaemon,
+    SolverProcessException
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig,
+    FastDummySolver
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    DummySolverProcessClient
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class FingerprintedDummyConfig(DummyConfig):
+    """Counts how many times it was pickled onto the pipe
+
+    Like the solving_time of a PostflopSolverConfig, num_solve_results is left out of the fingerprint but
+    still changes the solve.
+    """
+
+    def __init__(self, num_solve_results: int, name: str):
+        super().__init__(num_solve_results)
+        self._name = name
+        self._num_pickles = 0
+
+    def num_pickles(self) -> int:
+        return self._num_pickles
+
+    def fingerprint(self) -> str:
+        return SolverConfigFingerprint('dummy').add_str(self._name).hexdigest()
+
+    def registration_key(self) -> str:
+        return f'{self.fingerprint()}:{self.num_solve_results()}'
+
+    def __getstate__(self):
+        self._num_pickles += 1
+        return self.__dict__
+
+
+def test_solver_config_cache():
+    config_cache = SolverConfigCache(max_configs=2)
+    configs = [DummyConfig(num_solve_results=i) for i in range(3)]
+    config_cache.add('a', configs[0])
+    config_cache.add('b', configs[1])
+    assert config_cache.get('a') is configs[0]
+    # `b` was used least recently
+    config_cache.add('c', configs[2])
+    assert not config_cache.has_config('b')
+    assert config_cache.has_config('a') and config_cache.has_config('c')
+    assert config_cache.num_evictions() == 1
+    with pytest.raises(SolverProcessException):
+        config_cache.get('b')
+
+
+@pytest.mark.asyncio
+async def test_solver_process_registered_configs():
+    TIMEOUT = 5.0
+    async with DummySolverProcessClient(solver_implementation=FastDummySolver()) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        config = FingerprintedDummyConfig(num_solve_results=2, name='config')
+        solver.configure(config)
+        for _ in range(3):
+            ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+            assert len(ipc_messages) == 2
+        # the config was sent once, the other solves referenced it by its registration key
+        assert config.num_pickles() == 1
+        # enough other configs push it out of the cache
+        for i in range(SolverProcessDaemon.CONFIG_CACHE_SIZE):
+            solver.configure(FingerprintedDummyConfig(num_solve_results=1, name=f'other-{i}'))
+            ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+            assert len(ipc_messages) == 1
+        assert not solver.config_cache().has_config(config.registration_key())
+        # so it is registered again, and the daemon evicted it too, or resolving the handle would have failed
+        solver.configure(config)
+        ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+        assert len(ipc_messages) == 2
+        assert config.num_pickles() == 2
+        del ipc_messages
+        solver.release_shared_memory()
+
+
+@pytest.mark.asyncio
+async def test_solver_process_configs_with_the_same_fingerprint():
+    TIMEOUT = 5.0
+    async with DummySolverProcessClient(solver_implementation=FastDummySolver()) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        config = FingerprintedDummyConfig(num_solve_results=1, name='config')
+        other_config = FingerprintedDummyConfig(num_solve_results=3, name='config')
+        assert config.fingerprint() == other_config.fingerprint()
+        for expected_config in (config, other_config, config):
+            solver.configure(expected_config)
+            ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+            # the daemon solved with the config it was given, not the one registered under the same fingerprint
+            assert len(ipc_messages) == expected_config.num_solve_results()
+        assert (config.num_pickles(), other_config.num_pickles()) == (1, 1)
+        del ipc_messages
+        solver.release_shared_memory()
@@ -0,0 +1,56 @@
+import logging
+import pytest
+import asyncio
+from titan.solver_util.solver_process import (
+    SolverProcessPool,
+    SolverProcessPoolException
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    create_dummy_solver_process_client
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool():
+    TIMEOUT = 5.0
+    async with SolverProcessPool(create_dummy_solver_process_client, num_processes=2, initialize_timeout=TIMEOUT) as pool:
+        acquired_order = []
+
+        async def solve(caller_id: int):
+            async with pool.acquire() as solver:
+                acquired_order.append(caller_id)
+                solver.configure(DummyConfig(num_solve_results=1))
+                ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+                assert len(ipc_messages) == 1
+
+        # more callers than processes, the extra ones wait their turn in order
+        await asyncio.gather(*(solve(caller_id) for caller_id in range(5)))
+        assert sorted(acquired_order[:2]) == [0, 1]
+        assert acquired_order[2:] == [2, 3, 4]
+        stats = pool.stats()
+        assert stats.num_acquisitions() == 5
+        assert stats.num_releases() == 5
+        assert stats.num_restarts() == 0
+        assert stats.num_available() == 2
+        assert stats.max_wait_seconds() > 0
+        assert 0 < stats.utilization() <= 1
+        assert stats.throughput() > 0
+
+        # a solver that crashed is replaced in the background
+        async with pool.acquire() as solver:
+            solver._solver_process.kill()
+            solver._solver_process.join()
+        assert pool.stats().num_restarts() == 1
+        async with pool.acquire() as first_solver, pool.acquire() as second_solver:
+            assert first_solver is not solver
+            assert second_solver is not solver
+            assert first_solver.has_running_process() and second_solver.has_running_process()
+
+    with pytest.raises(SolverProcessPoolException):
+        await pool.reserve()
@@ -0,0 +1,155 @@
+import logging
+import pytest
+import asyncio
+import functools
+from titan.solver_util.solver_process import (
+    SolverProcessPool,
+    SolverProcessScheduler,
+    SolverPriority,
+    SolverSchedulerException
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig,
+    FastDummySolver
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    DummySolverProcessClient,
+    create_dummy_solver_process_client
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class LongSubtreeDummySolver(FastDummySolver):
+
+    def solve_subtree(self, config, action_sequence, solve_depth: int):
+        while True:
+            yield from self.simulate_solve(num_solve_results=config.num_solve_results())
+
+
+create_long_subtree_solver_process_client = functools.partial(create_dummy_solver_process_client, LongSubtreeDummySolver())
+
+
+class SlowNotificationDummySolverProcessClient(DummySolverProcessClient):
+    """Reads the first notification after a command late, so the solver state stays unknown for a while"""
+
+    NOTIFICATION_DELAY = 0.5
+
+    async def recv_notification(self, daemon_connection, notification_timeout: float):
+        if not self.has_known_state():
+            await asyncio.sleep(self.NOTIFICATION_DELAY)
+        return await super().recv_notification(daemon_connection, notification_timeout)
+
+
+def create_slow_notification_solver_process_client():
+    return SlowNotificationDummySolverProcessClient(solver_implementation=LongSubtreeDummySolver())
+
+
+@pytest.mark.asyncio
+async def test_solver_process_scheduler_order():
+    TIMEOUT = 5.0
+    async with SolverProcessPool(create_long_subtree_solver_process_client, num_processes=1, initialize_timeout=TIMEOUT) as pool:
+        async with SolverProcessScheduler(pool) as scheduler:
+            is_blocking = asyncio.Event()
+            is_blocked = asyncio.Event()
+            served_order = []
+
+            async def block(solver):
+                is_blocking.set()
+                await is_blocked.wait()
+
+            async def record(solver, name: str):
+                served_order.append(name)
+                return name
+
+            blocking_task = asyncio.create_task(scheduler.run_solve(block, priority=SolverPriority.BATCH))
+            await asyncio.wait_for(is_blocking.wait(), timeout=TIMEOUT)
+            # tenant `a` submits its whole batch before tenant `b` shows up
+            solve_tasks = [asyncio.create_task(scheduler.run_solve(lambda solver, name=name: record(solver, name), priority=SolverPriority.BATCH, tenant=tenant))
+                                for tenant, name in (('a', 'a0'), ('a', 'a1'), ('a', 'a2'), ('b', 'b0'))]
+            solve_tasks.append(asyncio.create_task(scheduler.run_solve(lambda solver: record(solver, 'i0'), priority=SolverPriority.INTERACTIVE)))
+            await asyncio.sleep(0.1)
+            assert scheduler.stats().num_pending() == 5
+            is_blocked.set()
+            assert await asyncio.gather(*solve_tasks) == ['a0', 'a1', 'a2', 'b0', 'i0']
+            await blocking_task
+            # higher priority first, then round robin across tenants
+            assert served_order == ['i0', 'a0', 'b0', 'a1', 'a2']
+            stats = scheduler.stats()
+            assert stats.num_submitted() == 6
+            assert stats.num_completed() == 6
+            assert stats.num_preemptions() == 0
+            assert stats.max_wait_seconds(SolverPriority.BATCH) >= stats.max_wait_seconds(SolverPriority.INTERACTIVE) > 0
+
+    with pytest.raises(SolverSchedulerException):
+        await scheduler.run_solve(block)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_scheduler_preemption():
+    TIMEOUT = 5.0
+    async with SolverProcessPool(create_long_subtree_solver_process_client, num_processes=1, initialize_timeout=TIMEOUT) as pool:
+        async with SolverProcessScheduler(pool, preemption_delay=0.2, cancel_timeout=TIMEOUT) as scheduler:
+            batch_attempts = []
+            batch_started = asyncio.Event()
+
+            async def batch_solve(solver):
+                batch_attempts.append(len(batch_attempts))
+                if len(batch_attempts) > 1:
+                    return 'batch'
+                solver.configure(DummyConfig(num_solve_results=1))
+                async for _ in solver.solve_subtree_as_ipc_messages(action_sequence=None, solve_depth=1, timeout=60):
+                    batch_started.set()
+
+            async def interactive_solve(solver):
+                solver.configure(DummyConfig(num_solve_results=1))
+                return [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+
+            batch_task = asyncio.create_task(scheduler.run_solve(batch_solve, priority=SolverPriority.BATCH, tenant='offline'))
+            await asyncio.wait_for(batch_started.wait(), timeout=TIMEOUT)
+            # the long batch solve is cancelled so the interactive solve does not wait for it
+            ipc_messages = await asyncio.wait_for(scheduler.run_solve(interactive_solve, priority=SolverPriority.INTERACTIVE, tenant='live'), timeout=TIMEOUT)
+            assert len(ipc_messages) == 1
+            # and the batch solve runs again afterwards
+            assert await asyncio.wait_for(batch_task, timeout=TIMEOUT) == 'batch'
+            assert batch_attempts == [0, 1]
+            stats = scheduler.stats()
+            assert stats.num_preemptions() == 1
+            assert stats.num_completed() == 2
+            assert stats.max_wait_seconds(SolverPriority.INTERACTIVE) < 2
+            # the solver was cancelled cleanly, rather than being replaced
+            assert pool.stats().num_restarts() == 0
+
+
+@pytest.mark.asyncio
+async def test_solver_process_scheduler_preemption_right_after_start():
+    TIMEOUT = 5.0
+    async with SolverProcessPool(create_slow_notification_solver_process_client, num_processes=1, initialize_timeout=TIMEOUT) as pool:
+        async with SolverProcessScheduler(pool, preemption_delay=0, cancel_timeout=TIMEOUT) as scheduler:
+            batch_attempts = []
+            batch_sending = asyncio.Event()
+
+            async def batch_solve(solver):
+                batch_attempts.append(len(batch_attempts))
+                if len(batch_attempts) > 1:
+                    return 'batch'
+                solver.configure(DummyConfig(num_solve_results=1))
+                batch_sending.set()
+                async for _ in solver.solve_subtree_as_ipc_messages(action_sequence=None, solve_depth=1, timeout=60):
+                    pass
+
+            async def interactive_solve(solver):
+                solver.configure(DummyConfig(num_solve_results=1))
+                return [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+
+            batch_task = asyncio.create_task(scheduler.run_solve(batch_solve, priority=SolverPriority.BATCH, tenant='offline'))
+            await asyncio.wait_for(batch_sending.wait(), timeout=TIMEOUT)
+            # the interactive solve is overdue while the batch solve has not read its first notification
+            ipc_messages = await asyncio.wait_for(scheduler.run_solve(interactive_solve, priority=SolverPriority.INTERACTIVE, tenant='live'), timeout=TIMEOUT)
+            assert len(ipc_messages) == 1
+            assert await asyncio.wait_for(batch_task, timeout=TIMEOUT) == 'batch'
+            assert batch_attempts == [0, 1]
+            assert scheduler.stats().num_preemptions() == 1
+            # the batch solve was only preempted once it could be cancelled
+            assert pool.stats().num_restarts() == 0
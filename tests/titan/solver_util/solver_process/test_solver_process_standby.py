@@ -0,0 +1,77 @@
+import logging
+import pytest
+import asyncio
+from titan.solver_util.solver_process import (
+    SolverProcessStandby,
+    SolverProcessPool
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    ForkServerDummySolverProcessClient,
+    create_dummy_solver_process_client
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+async def wait_until_warm(standby: SolverProcessStandby, num_warm: int, timeout: float):
+    async def poll():
+        while standby.num_warm() < num_warm:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout=timeout)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_standby():
+    TIMEOUT = 5.0
+    async with SolverProcessStandby(create_dummy_solver_process_client, num_standby=2, initialize_timeout=TIMEOUT) as standby:
+        await wait_until_warm(standby, num_warm=2, timeout=TIMEOUT)
+        # a warm process is handed over straight away
+        async with (await standby.take()) as solver:
+            assert solver.is_ready()
+            solver.configure(DummyConfig(num_solve_results=1))
+            ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+            assert len(ipc_messages) == 1
+        stats = standby.stats()
+        assert stats.num_warm_takes() == 1
+        assert stats.num_cold_takes() == 0
+        assert stats.max_take_seconds() < stats.mean_startup_seconds()
+        # and replaced in the background
+        await wait_until_warm(standby, num_warm=2, timeout=TIMEOUT)
+        # a standby process that died is not handed out
+        standby._warm_clients[0]._solver_process.kill()
+        standby._warm_clients[0]._solver_process.join()
+        async with (await standby.take()) as solver:
+            assert solver.has_running_process() and solver.is_ready()
+        assert standby.stats().num_warm_takes() == 2
+    assert standby.num_warm() == 0
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_with_standby():
+    TIMEOUT = 5.0
+    async with SolverProcessPool(create_dummy_solver_process_client, num_processes=1, initialize_timeout=TIMEOUT, num_standby=1) as pool:
+        await wait_until_warm(pool._solver_process_standby, num_warm=1, timeout=TIMEOUT)
+        async with pool.acquire() as solver:
+            solver._solver_process.kill()
+            solver._solver_process.join()
+        # the replacement was already running
+        async with pool.acquire() as replacement_solver:
+            assert replacement_solver is not solver
+            assert replacement_solver.is_ready()
+        assert pool.standby_stats().num_warm_takes() == 1
+
+
+@pytest.mark.asyncio
+async def test_solver_process_forkserver_start_method():
+    TIMEOUT = 10.0
+    async with ForkServerDummySolverProcessClient() as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        assert solver._solver_process._popen.method == 'forkserver'
+        assert 0 < solver.spawn_seconds() <= solver.startup_seconds()
+        solver.configure(DummyConfig(num_solve_results=2))
+        ipc_messages = [ipc_message async for ipc_message in solver.solve_path_as_ipc_messages(action_sequence=None, timeout=TIMEOUT)]
+        assert len(ipc_messages) == 2
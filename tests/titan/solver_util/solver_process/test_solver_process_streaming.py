@@ -0,0 +1,74 @@
+import logging
+import pytest
+from titan.solver_util.solution_tree import (
+    RandomValueFactory
+)
+from titan.solver_util.solution_tree_store.solution_tree_writer import (
+    SolutionTreeWriter
+)
+from titan.solver_util.blob_tree.wire_protocol import (
+    Serializer as BlobTreeSerializer
+)
+from titan.solver_util.solver_process import (
+    SolveProgress
+)
+from tests.titan.solver_util.solver_process.dummy_solver import (
+    DummyConfig,
+    DummySolver
+)
+from tests.titan.solver_util.solver_process.dummy_solver_process import (
+    DummySolverProcessClient
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class StreamingDummySolver(DummySolver):
+    """Writes the nodes of a subtree into one message, reporting a watermark every NODES_PER_PROGRESS nodes"""
+
+    SPEEDUP = 10
+    NODES_PER_PROGRESS = 5
+
+    def __init__(self, solution_tree):
+        super().__init__()
+        self._solution_tree = solution_tree
+
+    def solve_subtree(self, config, action_sequence, solve_depth: int):
+        blob_tree_nodes = list(SolutionTreeWriter.gen_blob_tree_nodes(self._solution_tree))
+        node_sizes = [BlobTreeSerializer.serialized_size_of_blob_tree_node(node) for node in blob_tree_nodes]
+        ipc_message = self._ipc_message_store.create_empty_message(sum(node_sizes))
+        offset = 0
+        for i, (node, node_size) in enumerate(zip(blob_tree_nodes, node_sizes)):
+            BlobTreeSerializer.serialize_blob_tree_node(ipc_message.message_buf()[offset:offset+node_size], node)
+            offset += node_size
+            if (i + 1) % self.NODES_PER_PROGRESS == 0:
+                yield SolveProgress(ipc_message.message_id(), offset)
+        self._ipc_message_store.save_message(ipc_message)
+        yield ipc_message.message_id()
+        self._ipc_message_store.release_message(ipc_message)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_streamed_solution_tree():
+    TIMEOUT = 5.0
+    solution_tree = RandomValueFactory.create_solution_tree(3, 10, 2)
+    async with DummySolverProcessClient(solver_implementation=StreamingDummySolver(solution_tree)) as solver:
+        await solver.initialize(timeout=TIMEOUT)
+        solver.configure(DummyConfig(num_solve_results=1))
+        # the watermarks arrive before the complete message
+        watermarks = [watermark async for _, watermark in solver.solve_subtree_as_ipc_message_progress(action_sequence=None, solve_depth=3, timeout=TIMEOUT)]
+        assert len(watermarks) == (solution_tree.node_count() // StreamingDummySolver.NODES_PER_PROGRESS) + 1
+        assert watermarks == sorted(watermarks)
+        solver.release_shared_memory()
+        # only the complete message is yielded by the non streaming solve
+        ipc_messages = [ipc_message async for ipc_message in solver.solve_subtree_as_ipc_messages(action_sequence=None, solve_depth=3, timeout=TIMEOUT)]
+        assert len(ipc_messages) == 1
+        assert ipc_messages[0].size() == watermarks[-1]
+        del ipc_messages
+        solver.release_shared_memory()
+        streamed_solution_tree = await solver.solve_subtree_as_streamed_solution_tree(action_sequence=None, solve_depth=3, timeout=TIMEOUT)
+        assert streamed_solution_tree.node_count() == solution_tree.node_count()
+        assert streamed_solution_tree == solution_tree
+        del streamed_solution_tree
+        solver.release_shared_memory()
@@ -6,7 +6,8 @@ from numpy import typing as npt
 from titan.solver_util.solver_process.types import (
     SolverProcessException,
     SolverState,
-    SolverConfig
+    SolverConfig,
+    SolverConfigFingerprint
 )
 from titan.solver_util.spot_models import (
     BlindBetSequence,
@@ -245,7 +246,10 @@ class SolveTreeSpec:
 
 class PostflopSolverConfig(SolverConfig):
     
+    FINGERPRINT_TAG = 'PostflopSolverConfig/1'
+
     __slots__ = (   '_serialize_to_dict_cache',
+                    '_fingerprint_cache',
                     '_solve_tree_spec',
                     '_num_threads',
                     '_solving_time',
@@ -363,6 +367,35 @@ class PostflopSolverConfig(SolverConfig):
             }
             return self._serialize_to_dict_cache
 
+    def fingerprint(self) -> str:
+        """A hash that identifies the solve, it ignores solving_time like the index keys of the store do
+
+        Unlike hashing serialize_to_dict(), the player ranges are hashed as raw bytes rather than turned into hand range strings.
+        """
+        if hasattr(self, '_fingerprint_cache'):
+            return self._fingerprint_cache
+        fingerprint = SolverConfigFingerprint(self.FINGERPRINT_TAG)
+        fingerprint.add_dict(self.solve_tree_spec().serialize_to_dict() if self.solve_tree_spec() else None)
+        fingerprint.add_int(self.num_threads())
+        fingerprint.add_ints(self.deal_order_stack_sizes())
+        fingerprint.add_int(self.big_blind_amount())
+        fingerprint.add_strs((  str(self.blind_bet_sequence()),
+                                str(self.preflop_action_sequence()),
+                                str(self.flop_action_sequence()),
+                                str(self.turn_action_sequence()),
+                                str(self.force_action_sequence()),
+                                self.solve_algorithm().value  ))
+        fingerprint.add_strs(self.community_cards())
+        fingerprint.add_int(len(self.player_ranges()))
+        for player_range in self.player_ranges():
+            fingerprint.add_bytes(np.ascontiguousarray(player_range.values(), dtype='<i4').tobytes())
+        self._fingerprint_cache = fingerprint.hexdigest()
+        return self._fingerprint_cache
+
+    def registration_key(self) -> str:
+        """The fingerprint leaves out solving_time, but the solver process must not reuse a config with another one"""
+        return f'{self.fingerprint()}:{self.solving_time()}'
+
     @classmethod
     def create_from_dict(cls, some_dict: dict) -> PostflopSolverConfig:
         try:
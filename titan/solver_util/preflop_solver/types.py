@@ -4,7 +4,8 @@ import enum
 from titan.solver_util.solver_process.types import (
     SolverProcessException,
     SolverState,
-    SolverConfig
+    SolverConfig,
+    SolverConfigFingerprint
 )
 from titan.solver_util.spot_models import (
     ActionSequence,
@@ -407,8 +408,11 @@ class PreflopBetSizingMap:
 
 
 class PreflopSolverConfig(SolverConfig):
-    
-    __slots__ = (   '_open_limp_mode',
+
+    FINGERPRINT_TAG = 'PreflopSolverConfig/1'
+
+    __slots__ = (   '_fingerprint_cache',
+                    '_open_limp_mode',
                     '_rake_config',
                     '_bet_sizing_map',
                     '_small_blind_amount',
@@ -484,7 +488,21 @@ class PreflopSolverConfig(SolverConfig):
             }
             return self._serialize_to_dict_cache
 
-
+    def fingerprint(self) -> str:
+        """A hash that identifies the solve, cheaper to compute than hashing serialize_to_dict()"""
+        if hasattr(self, '_fingerprint_cache'):
+            return self._fingerprint_cache
+        fingerprint = SolverConfigFingerprint(self.FINGERPRINT_TAG)
+        fingerprint.add_str(self.open_limp_mode().value)
+        fingerprint.add_dict(self.rake_config().serialize_to_dict())
+        fingerprint.add_dict(self.bet_sizing_map().serialize_to_dict())
+        fingerprint.add_ints((  self.small_blind_amount(),
+                                self.big_blind_amount(),
+                                self.ante_amount()  ))
+        fingerprint.add_ints(self.deal_order_stack_sizes())
+        fingerprint.add_str(str(self.blind_bet_sequence()))
+        self._fingerprint_cache = fingerprint.hexdigest()
+        return self._fingerprint_cache
 
     @classmethod
     def create_from_dict(cls, some_dict: dict) -> PreflopSolverConfig:
@@ -94,6 +94,10 @@ class RangeMatrix:
     def __eq__(self, other):
         return np.array_equal(self.values(), other.values())
 
+    def copy(self) -> RangeMatrix:
+        """Return a RangeMatrix with its own copy of the values, e.g. when they are a view on a shared buffer"""
+        return RangeMatrix(self._values.copy())
+
     @classmethod
     def create_empty(cls):
         return cls(np.zeros(shape=(0,)))
@@ -124,6 +128,11 @@ class SolvedSpot:
     def ev_matrix(self):
         return self._ev_matrix
 
+    def copy(self) -> SolvedSpot:
+        return SolvedSpot(  strategy_options=self._strategy_options,
+                            strategy_matrix=self._strategy_matrix.copy(),
+                            ev_matrix=self._ev_matrix.copy()  )
+
     def is_leaf_spot(self):
         """A leaf spot is any spot where further actions are not possible, because
         the street has been satisfied or the hand has finished. Any such leaf spot will not 
@@ -185,6 +194,10 @@ class SolutionTreeNode:
     def is_leaf_spot(self):
         return self._solved_spot.is_leaf_spot()
 
+    def detach_solved_spot(self):
+        """Replace the solved spot with a copy that does not reference any shared buffer"""
+        self._solved_spot = self._solved_spot.copy()
+
     def children(self):
         return self._children.values()
 
@@ -393,6 +406,17 @@ class SolutionTree:
     def gen_leaf_nodes(self) -> typing.Iterable[SolutionTreeNode]:
         yield from self._solution_tree_node_index.gen_leaf_nodes()
 
+    def detach(self) -> SolutionTree:
+        """Copy the matrices of every node into private memory, so the tree no longer depends on the buffer
+        it was deserialized from
+
+        Returns:
+            This SolutionTree
+        """
+        for node in self.gen_nodes_in_bfs_traversal():
+            node.detach_solved_spot()
+        return self
+
     def __eq__(self, other):
         if type(self) != type(other):
             return False
@@ -4,7 +4,9 @@ from titan.solver_util.solution_tree_store.solution_tree_store import (
 from titan.solver_util.solution_tree_store.types import (
     SolverType,
     SolveMode,
+    SolutionTreeStats,
     SolutionTreeMeta,
+    SolutionTreeStoreFields,
     SolutionTreeStoreIndex
 )
 from titan.solver_util.solution_tree_store.solution_tree_reader import (
@@ -12,4 +14,47 @@ from titan.solver_util.solution_tree_store.solution_tree_reader import (
 )
 from titan.solver_util.solution_tree_store.solution_tree_writer import (
     SolutionTreeWriter
-)
\ No newline at end of file
+)
+from titan.solver_util.solution_tree_store.solution_tree_hot_tier import (
+    SolutionTreeAccessStats,
+    SolutionTreeHotTier
+)
+from titan.solver_util.solution_tree_store.solution_tree_prefetcher import (
+    SolutionTreeTransitionModel,
+    SolutionTreePrefetcher
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_journal import (
+    SolutionTreeStoreJournal
+)
+from titan.solver_util.solution_tree_store.store_lock import (
+    StoreLock
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_sync import (
+    BlobKeyManifest,
+    SolutionTreeStoreSync,
+    SolutionTreeStoreSyncReport
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_field_index import (
+    SolutionTreeStoreFieldDistance,
+    SolutionTreeStoreNearestMatch,
+    SolutionTreeStoreFieldIndex
+)
+from titan.solver_util.solution_tree_store.async_solution_tree_store import (
+    AsyncSolutionTreeStore
+)
+from titan.solver_util.solution_tree_store.solution_tree_write_behind_queue import (
+    SolutionTreeWriteBehindQueue
+)
+from titan.solver_util.solution_tree_store.solution_tree_map_reduce import (
+    SolutionTreeMapReduceProgress,
+    SolutionTreeMapReduce
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_gc import (
+    SolutionTreeStoreGcReport,
+    SolutionTreeStoreGc
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_benchmark import (
+    SolutionTreeStoreBenchmarkResult,
+    SolutionTreeStoreBenchmarkRegression,
+    SolutionTreeStoreBenchmark
+)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import typing
+import pathlib
+import asyncio
+import concurrent.futures
+import functools
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeMeta,
+    SolutionTreeStoreIndex,
+    SolutionTreeStoreIndexEntry
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl,
+    SolutionTreeStore
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class AsyncSolutionTreeStore:
+    """Coroutine versions of the SolutionTreeStore operations, run in a bounded thread pool
+
+    The blocking work (filesystem, gzip and hashing, which mostly release the GIL) happens in worker threads
+    so the event loop never stalls. At most max_concurrency operations are in flight, and that limit still
+    holds when callers are cancelled: an operation that was already running keeps its slot until its thread
+    finishes, one that had not started yet is dropped.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+
+    __slots__ = (   '_store',
+                    '_executor',
+                    '_max_concurrency',
+                    '_semaphore'  )
+
+    def __init__(self, store: SolutionTreeStore, max_workers: int = DEFAULT_MAX_WORKERS,
+                                                    max_concurrency: typing.Optional[int] = None):
+        self._store = store
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=type(self).__name__)
+        self._max_concurrency = (max_concurrency if max_concurrency else max_workers)
+        self._semaphore = None
+
+    def store(self) -> SolutionTreeStore:
+        return self._store
+
+    def store_path(self) -> pathlib.Path:
+        return self._store.store_path()
+
+    def index(self) -> SolutionTreeStoreIndex:
+        return self._store.index()
+
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    async def run_in_thread(self, fn: typing.Callable, *args, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        def release_semaphore(_):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                # the loop was closed in the meantime
+                pass
+
+        # released when the thread is done, rather than when the caller stops waiting
+        future.add_done_callback(release_semaphore)
+        # cancelling the caller also cancels the future, if it has not started running yet
+        return await asyncio.wrap_future(future)
+
+    async def get_solution_tree(self, key: str) -> SolutionTree:
+        return await self.run_in_thread(self._store.get_solution_tree, key)
+
+    async def get_solution_trees(self, keys: typing.Iterable[str]) -> typing.Tuple[SolutionTree, ...]:
+        """Read (and decompress) several trees in parallel, in the order of keys"""
+        tasks = [asyncio.create_task(self.get_solution_tree(key)) for key in keys]
+        try:
+            return tuple(await asyncio.gather(*tasks))
+        finally:
+            # on failure or cancellation, do not leave the other reads behind
+            for task in tasks:
+                task.cancel()
+
+    async def get_solution_tree_path(self, key: str, action_sequence: ActionSequence) -> SolutionTree:
+        return await self.run_in_thread(self._store.get_solution_tree_path, key, action_sequence)
+
+    async def get_solution_tree_meta(self, key: str) -> SolutionTreeMeta:
+        return await self.run_in_thread(self._store.get_solution_tree_meta, key)
+
+    async def get_preflop_solver_config_dict(self, key: str) -> dict:
+        return await self.run_in_thread(self._store.get_preflop_solver_config_dict, key)
+
+    async def get_postflop_solver_config_dict(self, key: str) -> dict:
+        return await self.run_in_thread(self._store.get_postflop_solver_config_dict, key)
+
+    async def resolve_preflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                            is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        return await self.run_in_thread(self._store.resolve_preflop_solution_tree,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve)
+
+    async def resolve_postflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                            is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        return await self.run_in_thread(self._store.resolve_postflop_solution_tree,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve)
+
+    def _add_solution_tree(self, add_fn: typing.Callable[..., SolutionTreeStoreIndexEntry], **kwargs) -> SolutionTreeStoreIndexEntry:
+        # the blobs are written without holding the index lock of the store, so that adds run in parallel
+        index_entry = add_fn(store_path=self.store_path(), **kwargs)
+        self._store.add_index_entries((index_entry, ))
+        return index_entry
+
+    async def add_preflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                            is_path_solve: bool,
+                                                                            solution_tree: SolutionTree) -> SolutionTreeStoreIndexEntry:
+        return await self.run_in_thread(self._add_solution_tree,
+                                        SolutionTreeStoreImpl.add_preflop_solution_tree,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve,
+                                        solution_tree=solution_tree)
+
+    async def add_postflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                            is_path_solve: bool,
+                                                                            solution_tree: SolutionTree) -> SolutionTreeStoreIndexEntry:
+        return await self.run_in_thread(self._add_solution_tree,
+                                        SolutionTreeStoreImpl.add_postflop_solution_tree,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve,
+                                        solution_tree=solution_tree)
+
+    async def add_preflop_solution_tree_from_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        solution_tree_path: pathlib.Path) -> SolutionTreeStoreIndexEntry:
+        return await self.run_in_thread(self._add_solution_tree,
+                                        SolutionTreeStoreImpl.add_preflop_solution_tree_from_path,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve,
+                                        solution_tree_path=solution_tree_path)
+
+    async def add_postflop_solution_tree_from_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        solution_tree_path: pathlib.Path) -> SolutionTreeStoreIndexEntry:
+        return await self.run_in_thread(self._add_solution_tree,
+                                        SolutionTreeStoreImpl.add_postflop_solution_tree_from_path,
+                                        solver_config_dict=solver_config_dict,
+                                        action_sequence=action_sequence,
+                                        is_path_solve=is_path_solve,
+                                        solution_tree_path=solution_tree_path)
+
+    async def save_index(self):
+        await self.run_in_thread(self._store.save_index)
+
+    async def reload_index(self):
+        await self.run_in_thread(self._store.reload_index)
+
+    async def close(self):
+        """Wait for the operations in flight, then stop the worker threads"""
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
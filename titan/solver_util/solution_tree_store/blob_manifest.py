@@ -0,0 +1,172 @@
+from __future__ import annotations
+import typing
+import pathlib
+import os
+import threading
+import logging
+from titan.solver_util.solution_tree_store.store_lock import (
+    StoreLock
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class _BlobManifestState:
+
+    __slots__ = (   'blob_keys',
+                    'file_id',
+                    'offset'  )
+
+    def __init__(self):
+        self.blob_keys = set()
+        self.file_id = None
+        self.offset = 0
+
+
+
+class BlobManifest:
+    """Append-only log of the blob keys that were added to and deleted from one prefix of a store
+
+    Each line of the manifest file is a record `+<blob_key>` or `-<blob_key>`. Writers only ever append
+    a whole record with a single write, so several processes can share a manifest. Readers keep the
+    replayed key set in memory and only read the bytes appended since their last read.
+
+    Appends and rewrites of the whole manifest both hold an exclusive StoreLock. O_APPEND is not atomic
+    across hosts on NFS, so concurrent appends could otherwise overwrite each other, and a rebuild never
+    drops a record that another process appended while it was scanning.
+    """
+
+    MANIFEST_DIR_NAME = '.manifest'
+    MANIFEST_SUFFIX = '.manifest'
+    ADD_RECORD = '+'
+    DELETE_RECORD = '-'
+
+    _states = {}
+    _states_lock = threading.Lock()
+
+    @classmethod
+    def manifest_path(cls, store_path: pathlib.Path, blob_prefix: str) -> pathlib.Path:
+        return store_path / cls.MANIFEST_DIR_NAME / f"{blob_prefix}{cls.MANIFEST_SUFFIX}"
+
+    @classmethod
+    def lock_name(cls, blob_prefix: str) -> str:
+        return f"{blob_prefix}{cls.MANIFEST_SUFFIX}"
+
+    @classmethod
+    def exists(cls, store_path: pathlib.Path, blob_prefix: str) -> bool:
+        return cls.manifest_path(store_path, blob_prefix).is_file()
+
+    @classmethod
+    def _append_record(cls, store_path: pathlib.Path, blob_prefix: str, record: str):
+        manifest_path = cls.manifest_path(store_path, blob_prefix)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with StoreLock.acquire_exclusive(store_path, cls.lock_name(blob_prefix)):
+            fd = os.open(manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, f"{record}\n".encode('ascii'))
+            finally:
+                os.close(fd)
+
+    @classmethod
+    def record_add(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str,
+                                                    scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]):
+        # make sure that blobs from before the manifest existed are not forgotten
+        cls.ensure_exists(store_path, blob_prefix, scan_blob_keys)
+        cls._append_record(store_path, blob_prefix, f"{cls.ADD_RECORD}{blob_key}")
+
+    @classmethod
+    def record_delete(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str,
+                                                    scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]):
+        cls.ensure_exists(store_path, blob_prefix, scan_blob_keys)
+        cls._append_record(store_path, blob_prefix, f"{cls.DELETE_RECORD}{blob_key}")
+
+    @classmethod
+    def write(cls, store_path: pathlib.Path, blob_prefix: str, blob_keys: typing.Iterable[str]):
+        """Replace the manifest with one that lists exactly blob_keys"""
+        with StoreLock.acquire_exclusive(store_path, cls.lock_name(blob_prefix)):
+            cls._write_unlocked(store_path, blob_prefix, blob_keys)
+
+    @classmethod
+    def _write_unlocked(cls, store_path: pathlib.Path, blob_prefix: str, blob_keys: typing.Iterable[str]):
+        manifest_path = cls.manifest_path(store_path, blob_prefix)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_manifest_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_manifest_path, 'w') as f:
+            for blob_key in sorted(blob_keys):
+                f.write(f"{cls.ADD_RECORD}{blob_key}\n")
+        os.replace(tmp_manifest_path, manifest_path)
+
+    @classmethod
+    def _replay(cls, state: _BlobManifestState, records: bytes):
+        for record in records.decode('ascii').splitlines():
+            if record[0] == cls.ADD_RECORD:
+                state.blob_keys.add(record[1:])
+            elif record[0] == cls.DELETE_RECORD:
+                state.blob_keys.discard(record[1:])
+            else:
+                raise ValueError(f"{cls.__name__} Invalid manifest record `{record}` !")
+
+    @classmethod
+    def _refresh(cls, state: _BlobManifestState, manifest_path: pathlib.Path):
+        try:
+            stat_result = os.stat(manifest_path)
+        except FileNotFoundError:
+            state.blob_keys = set()
+            state.file_id = None
+            state.offset = 0
+            return
+        file_id = (stat_result.st_dev, stat_result.st_ino)
+        if (file_id != state.file_id) or (stat_result.st_size < state.offset):
+            # the manifest was replaced, so replay it from the start
+            state.blob_keys = set()
+            state.file_id = file_id
+            state.offset = 0
+        elif stat_result.st_size <= state.offset:
+            # nothing new was appended
+            return
+        with open(manifest_path, 'rb') as f:
+            f.seek(state.offset)
+            new_bytes = f.read()
+        # ignore a trailing record that is still being written
+        num_complete_bytes = new_bytes.rfind(b'\n') + 1
+        cls._replay(state, new_bytes[:num_complete_bytes])
+        state.offset += num_complete_bytes
+
+    @classmethod
+    def _get_refreshed_state(cls, store_path: pathlib.Path, blob_prefix: str,
+                                                            scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]) -> _BlobManifestState:
+        manifest_path = cls.manifest_path(store_path, blob_prefix)
+        state = cls._states.setdefault(os.path.abspath(manifest_path), _BlobManifestState())
+        cls._refresh(state, manifest_path)
+        if (state.file_id is None) and (store_path / blob_prefix).is_dir():
+            # blobs without a manifest (e.g. a store written before manifests existed)
+            with StoreLock.acquire_exclusive(store_path, cls.lock_name(blob_prefix)):
+                # another process may have built it while we were waiting for the lock
+                if not manifest_path.is_file():
+                    logger.info(f"Building missing manifest for `{blob_prefix}` in `{store_path}` ...")
+                    cls._write_unlocked(store_path, blob_prefix, scan_blob_keys(store_path, blob_prefix))
+            cls._refresh(state, manifest_path)
+        return state
+
+    @classmethod
+    def ensure_exists(cls, store_path: pathlib.Path, blob_prefix: str,
+                                                    scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]):
+        with cls._states_lock:
+            cls._get_refreshed_state(store_path, blob_prefix, scan_blob_keys)
+
+    @classmethod
+    def load_blob_keys(cls, store_path: pathlib.Path, blob_prefix: str,
+                                                    scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]) -> typing.FrozenSet[str]:
+        """Return the blob keys currently listed in the manifest, reading only what was appended since the last call
+
+        If there is no manifest yet, it is built from the keys returned by scan_blob_keys
+        """
+        with cls._states_lock:
+            return frozenset(cls._get_refreshed_state(store_path, blob_prefix, scan_blob_keys).blob_keys)
+
+    @classmethod
+    def has_blob_key(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str,
+                                                    scan_blob_keys: typing.Callable[[pathlib.Path, str], typing.Iterable[str]]) -> bool:
+        with cls._states_lock:
+            return blob_key in cls._get_refreshed_state(store_path, blob_prefix, scan_blob_keys).blob_keys
@@ -3,14 +3,43 @@ import typing
 import pathlib
 import shutil
 import gzip
+import hashlib
+import os
+import tempfile
+import concurrent.futures
 import logging
+from titan.solver_util.solution_tree_store.blob_manifest import (
+    BlobManifest
+)
 
 logger = logging.getLogger(__name__)
 
 
+class _HashingFileWriter:
+    """Hashes the bytes on their way to the file object it wraps"""
+
+    __slots__ = (   '_fileobj',
+                    '_hash'  )
+
+    def __init__(self, fileobj: typing.BinaryIO):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def write(self, some_bytes) -> int:
+        self._hash.update(some_bytes)
+        return self._fileobj.write(some_bytes)
+
+    def flush(self):
+        self._fileobj.flush()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
 class BlobStore:
-    
+
     COMPRESS_LEVEL = 1
+    TMP_DIR_NAME = '.tmp'
 
     @classmethod
     def ensure_directories_are_created(cls, path: pathlib.Path):
@@ -28,6 +57,26 @@ class BlobStore:
             if path.parent != limit_path:
                 cls.remove_empty_dirs_on_path(path=path.parent, limit_path=limit_path)
 
+    @classmethod
+    def prune_empty_dirs(cls, store_path: pathlib.Path, blob_prefix: str) -> int:
+        """Remove every empty fan-out directory of a blob prefix in a single bottom-up walk
+
+        Returns:
+            The number of directories removed
+        """
+        num_removed = 0
+        prefix_path = store_path / blob_prefix
+        for dir_name, sub_dir_names, file_names in os.walk(prefix_path, topdown=False):
+            if (dir_name == str(prefix_path)) or file_names:
+                continue
+            try:
+                os.rmdir(dir_name)
+                num_removed += 1
+            except OSError:
+                # not empty, e.g. a blob was added in the meantime
+                pass
+        return num_removed
+
     @classmethod
     def _path_to_blob(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str) -> pathlib.Path:
         return store_path / blob_prefix / blob_key[0:4] / blob_key[4:6] / blob_key[6:8] / blob_key
@@ -47,22 +96,35 @@ class BlobStore:
 
     @classmethod
     def does_blob_exist(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str) -> bool:
-        try:
-            blob_path = cls.get_blob_path(store_path, blob_prefix, blob_key)
-            return True
-        except ValueError:
-            return False
+        return BlobManifest.has_blob_key(store_path, blob_prefix, blob_key, scan_blob_keys=cls.scan_blob_keys)
 
     @classmethod
-    def gen_blob_keys(cls, store_path: pathlib.Path, blob_prefix: str) -> typing.Iterator[str]:
+    def scan_blob_keys(cls, store_path: pathlib.Path, blob_prefix: str) -> typing.Iterator[str]:
+        """Walk the blob files on disk. This is slow, so it is only used to (re)build the manifest"""
         root_path = (store_path / blob_prefix)
         for p in root_path.rglob('*'):
             if p.is_dir():
                 continue
             file_name = p.stem
-            if cls.get_blob_path(store_path, blob_prefix, file_name) == p:
+            if (p == cls._path_to_compressed_blob(store_path, blob_prefix, file_name)) or (p == cls._path_to_blob(store_path, blob_prefix, file_name)):
                 yield file_name
 
+    @classmethod
+    def gen_blob_keys(cls, store_path: pathlib.Path, blob_prefix: str) -> typing.Iterator[str]:
+        yield from BlobManifest.load_blob_keys(store_path, blob_prefix, scan_blob_keys=cls.scan_blob_keys)
+
+    @classmethod
+    def rebuild_manifest(cls, store_path: pathlib.Path, blob_prefix: str):
+        BlobManifest.write(store_path, blob_prefix, cls.scan_blob_keys(store_path, blob_prefix))
+
+    @classmethod
+    def _record_blob_added(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str):
+        BlobManifest.record_add(store_path, blob_prefix, blob_key, scan_blob_keys=cls.scan_blob_keys)
+
+    @classmethod
+    def _record_blob_deleted(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str):
+        BlobManifest.record_delete(store_path, blob_prefix, blob_key, scan_blob_keys=cls.scan_blob_keys)
+
     @classmethod
     def open_blob(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str) -> typing.BinaryIO:
         blob_path = cls.get_blob_path(store_path, blob_prefix, blob_key)
@@ -90,6 +152,55 @@ class BlobStore:
         except IOError:
             raise ValueError(f"{cls.__name__}.copy_blob(...) Failed when copying blob `{blob_path}` to `{dest_file_path}`")
 
+    @classmethod
+    def _write_blob_atomically(cls, store_path: pathlib.Path, dest_blob_path: pathlib.Path,
+                                                                write_fn: typing.Callable[[pathlib.Path], None]):
+        """Let write_fn write a temporary file that is then renamed to dest_blob_path
+
+        The rename is atomic, so concurrent readers and writers never see a partially written blob.
+        """
+        cls.ensure_directories_are_created(dest_blob_path.parent)
+        tmp_dir_path = store_path / cls.TMP_DIR_NAME
+        cls.ensure_directories_are_created(tmp_dir_path)
+        fd, tmp_file_name = tempfile.mkstemp(dir=tmp_dir_path, prefix=f"{dest_blob_path.name}.")
+        os.close(fd)
+        tmp_blob_path = pathlib.Path(tmp_file_name)
+        try:
+            write_fn(tmp_blob_path)
+            try:
+                os.replace(tmp_blob_path, dest_blob_path)
+            except FileNotFoundError:
+                # a concurrent delete_blob pruned the (then empty) parent directory
+                cls.ensure_directories_are_created(dest_blob_path.parent)
+                os.replace(tmp_blob_path, dest_blob_path)
+        except BaseException:
+            tmp_blob_path.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def copy_blob_to_store(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, dest_store_path: pathlib.Path) -> bool:
+        """Copy the stored file of a blob as-is (without recompressing) into the same location of another store
+
+        Returns:
+            True if the blob was copied, False if it already existed in dest_store_path
+        """
+        if cls.does_blob_exist( store_path=dest_store_path,
+                                blob_prefix=blob_prefix,
+                                blob_key=blob_key  ):
+            logger.info(f"Skipping copy_blob_to_store `{blob_key}` since it already exists !")
+            return False
+        # otherwise
+        try:
+            src_blob_path = cls.get_blob_path(store_path, blob_prefix, blob_key)
+            dest_blob_path = dest_store_path / src_blob_path.relative_to(store_path)
+            cls._write_blob_atomically( store_path=dest_store_path,
+                                        dest_blob_path=dest_blob_path,
+                                        write_fn=lambda tmp_blob_path: shutil.copyfile(src_blob_path, tmp_blob_path) )
+        except IOError:
+            raise ValueError(f"{cls.__name__}.copy_blob_to_store(...) Failed when copying blob `{blob_key}` to `{dest_store_path}`")
+        cls._record_blob_added(dest_store_path, blob_prefix, blob_key)
+        return True
+
     @classmethod
     def add_blob_from_bytes(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, blob_bytes: bytes):
         if BlobStore.does_blob_exist(   store_path=store_path,
@@ -99,56 +210,98 @@ class BlobStore:
             return
         # otherwise
         try:
-            cls.ensure_directories_are_created(cls._path_to_blob(store_path, blob_prefix, blob_key).parent)
-            with open(cls._path_to_blob(store_path, blob_prefix, blob_key), 'wb') as f:
-                f.write(blob_bytes)
+            cls._write_blob_atomically( store_path=store_path,
+                                        dest_blob_path=cls._path_to_blob(store_path, blob_prefix, blob_key),
+                                        write_fn=lambda tmp_blob_path: tmp_blob_path.write_bytes(blob_bytes) )
         except IOError:
             raise ValueError(f"{cls.__name__}.add_blob(...) Failed when adding blob bytes to `{cls._path_to_blob(store_path, blob_prefix, blob_key)}`")
+        cls._record_blob_added(store_path, blob_prefix, blob_key)
 
     @classmethod
     def add_compressed_blob_from_bytes(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, blob_bytes: bytes):
+        def write_compressed(tmp_blob_path: pathlib.Path):
+            with gzip.open(tmp_blob_path, 'wb', compresslevel=cls.COMPRESS_LEVEL) as f:
+                f.write(blob_bytes)
+
         try:
             blob_path = cls._path_to_compressed_blob(store_path, blob_prefix, blob_key)
-            if blob_path.is_file():
+            if cls.does_blob_exist(store_path, blob_prefix, blob_key):
                 logger.info(f"Skipping add_compressed_blob_from_bytes `{blob_key}` since it already exists !")
                 return
-            cls.ensure_directories_are_created(blob_path.parent)
-            with gzip.open(blob_path, 'wb', compresslevel=cls.COMPRESS_LEVEL) as f:
-                f.write(blob_bytes)
+            cls._write_blob_atomically(store_path=store_path, dest_blob_path=blob_path, write_fn=write_compressed)
         except IOError:
             raise ValueError(f"{cls.__name__}.add_compressed_blob_from_bytes(...) Failed when adding blob bytes to `{blob_path}`")
+        cls._record_blob_added(store_path, blob_prefix, blob_key)
 
     @classmethod
     def add_blob_from_path(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, src_blob_path: pathlib.Path):
         try:
             dest_blob_path = cls._path_to_blob(store_path, blob_prefix, blob_key)
-            if dest_blob_path.is_file():
+            if cls.does_blob_exist(store_path, blob_prefix, blob_key):
                 logger.info(f"Skipping add_blob_from_path `{blob_key}` since it already exists !")
                 return
-            cls.ensure_directories_are_created(dest_blob_path.parent)
-            shutil.copyfile(src_blob_path, dest_blob_path)
+            cls._write_blob_atomically( store_path=store_path,
+                                        dest_blob_path=dest_blob_path,
+                                        write_fn=lambda tmp_blob_path: shutil.copyfile(src_blob_path, tmp_blob_path) )
         except IOError:
             raise ValueError(f"{cls.__name__}.add_blob_from_path(...) Failed when adding blob `{src_blob_path}` to `{dest_blob_path}`")
+        cls._record_blob_added(store_path, blob_prefix, blob_key)
 
     @classmethod
-    def add_compressed_blob_from_path(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, src_blob_path: pathlib.Path):
+    def add_compressed_blob_from_path(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str, src_blob_path: pathlib.Path) -> typing.Optional[str]:
+        """Returns:
+            The sha256 of the compressed blob, hashed as it was written, or None if the blob already existed
+        """
+        hashing_writers = []
+        def write_compressed(tmp_blob_path: pathlib.Path):
+            with open(src_blob_path, 'rb') as f_in, open(tmp_blob_path, 'wb') as f_tmp:
+                hashing_writers.append(_HashingFileWriter(f_tmp))
+                with gzip.GzipFile(fileobj=hashing_writers[-1], mode='wb', compresslevel=cls.COMPRESS_LEVEL) as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+
         try:
             dest_blob_path = cls._path_to_compressed_blob(store_path, blob_prefix, blob_key)
-            if dest_blob_path.is_file():
+            if cls.does_blob_exist(store_path, blob_prefix, blob_key):
                 logger.info(f"Skipping add_compressed_blob_from_path `{blob_key}` since it already exists !")
-                return
-            cls.ensure_directories_are_created(dest_blob_path.parent)
-            with open(src_blob_path, 'rb') as f_in:
-                with gzip.open(dest_blob_path, 'wb', compresslevel=cls.COMPRESS_LEVEL) as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                return None
+            cls._write_blob_atomically(store_path=store_path, dest_blob_path=dest_blob_path, write_fn=write_compressed)
         except IOError:
             raise ValueError(f"{cls.__name__}.add_compressed_blob_from_path(...) Failed when adding blob `{src_blob_path}` to `{dest_blob_path}`")
+        cls._record_blob_added(store_path, blob_prefix, blob_key)
+        return hashing_writers[-1].hexdigest()
+
+    @classmethod
+    def add_compressed_blob_from_compressed_path(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str,
+                                                                                        src_compressed_blob_path: pathlib.Path) -> typing.Optional[str]:
+        """Add a blob from a file that is already gzip compressed, copying its bytes as-is instead of recompressing
+
+        Returns:
+            The sha256 of the compressed blob, hashed as it was copied, or None if the blob already existed
+        """
+        hashing_writers = []
+        def copy_compressed(tmp_blob_path: pathlib.Path):
+            with open(src_compressed_blob_path, 'rb') as f_in, open(tmp_blob_path, 'wb') as f_tmp:
+                hashing_writers.append(_HashingFileWriter(f_tmp))
+                shutil.copyfileobj(f_in, hashing_writers[-1])
+
+        try:
+            dest_blob_path = cls._path_to_compressed_blob(store_path, blob_prefix, blob_key)
+            if cls.does_blob_exist(store_path, blob_prefix, blob_key):
+                logger.info(f"Skipping add_compressed_blob_from_compressed_path `{blob_key}` since it already exists !")
+                return None
+            cls._write_blob_atomically(store_path=store_path, dest_blob_path=dest_blob_path, write_fn=copy_compressed)
+        except IOError:
+            raise ValueError(f"{cls.__name__}.add_compressed_blob_from_compressed_path(...) Failed when adding blob `{src_compressed_blob_path}` to `{dest_blob_path}`")
+        cls._record_blob_added(store_path, blob_prefix, blob_key)
+        return hashing_writers[-1].hexdigest()
 
 
     @classmethod
     def delete_blob(cls, store_path: pathlib.Path, blob_prefix: str, blob_key: str):
         p_compressed = cls._path_to_compressed_blob(store_path, blob_prefix, blob_key)
         p = cls._path_to_blob(store_path, blob_prefix, blob_key)
+        # drop the key from the manifest first, so that it is never listed without a file behind it
+        cls._record_blob_deleted(store_path, blob_prefix, blob_key)
         if p_compressed.is_file():
             p_compressed.unlink()
         if p.is_file():
@@ -156,6 +309,28 @@ class BlobStore:
         cls.remove_empty_dirs_on_path(path=p.parent, limit_path=(store_path / blob_prefix))
 
 
+    @classmethod
+    def delete_blobs(cls, store_path: pathlib.Path, blob_prefix: str, blob_keys: typing.Iterable[str],
+                                                                        executor: concurrent.futures.Executor) -> int:
+        """Delete many blobs in parallel, then prune the emptied directories once rather than after each blob
+
+        Returns:
+            The number of blobs deleted
+        """
+        def delete_blob_files(blob_key: str) -> bool:
+            cls._record_blob_deleted(store_path, blob_prefix, blob_key)
+            was_deleted = False
+            for p in (cls._path_to_compressed_blob(store_path, blob_prefix, blob_key), cls._path_to_blob(store_path, blob_prefix, blob_key)):
+                try:
+                    p.unlink()
+                    was_deleted = True
+                except FileNotFoundError:
+                    pass
+            return was_deleted
+        num_deleted = sum(1 for was_deleted in executor.map(delete_blob_files, blob_keys) if was_deleted)
+        cls.prune_empty_dirs(store_path, blob_prefix)
+        return num_deleted
+
     @classmethod
     def ensure_valid_store_path(cls, store_path: pathlib.Path):
         try:
@@ -0,0 +1,196 @@
+from __future__ import annotations
+import typing
+import pathlib
+import shutil
+import tempfile
+import threading
+import os
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.solution_tree_reader import (
+    SolutionTreeReader
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeAccessStats:
+    """Number of reads of each solution tree, as seen by this process"""
+
+    __slots__ = (   '_access_counts',
+                    '_lock'  )
+
+    def __init__(self):
+        self._access_counts = {}
+        self._lock = threading.Lock()
+
+    def record_access(self, key: str) -> int:
+        with self._lock:
+            count = self._access_counts.get(key, 0) + 1
+            self._access_counts[key] = count
+            return count
+
+    def access_count(self, key: str) -> int:
+        return self._access_counts.get(key, 0)
+
+    def serialize_to_dict(self) -> dict:
+        with self._lock:
+            return dict(self._access_counts)
+
+
+
+class SolutionTreeHotTier:
+    """Bounded set of frequently read solution trees, kept uncompressed next to their compressed (cold) blob
+
+    A tree is promoted once it was read promotion_threshold times. Hot trees are read with mmap, so there is
+    no decompression or copy. When the hot tier grows over budget_bytes, the least frequently read trees are
+    demoted, which only deletes their uncompressed copy since the cold blob is always kept.
+
+    raw_size_fn returns the uncompressed size of a tree (e.g. from its stats), or None if it is not known. Trees
+    that are over budget on their own are rejected without decompressing them, and never tried again.
+    """
+
+    HOT_DIR_NAME = '.hot'
+    TMP_DIR_NAME = '.tmp'
+    DEFAULT_BUDGET_BYTES = 1024 * 1024 * 1024
+    DEFAULT_PROMOTION_THRESHOLD = 3
+
+    __slots__ = (   '_store_path',
+                    '_blob_prefix',
+                    '_budget_bytes',
+                    '_promotion_threshold',
+                    '_access_stats',
+                    '_raw_size_fn',
+                    '_rejected_keys',
+                    '_lock'  )
+
+    def __init__(self, store_path: pathlib.Path, blob_prefix: str,
+                                                    budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                                                    promotion_threshold: int = DEFAULT_PROMOTION_THRESHOLD,
+                                                    raw_size_fn: typing.Optional[typing.Callable[[str], typing.Optional[int]]] = None):
+        if budget_bytes < 0:
+            raise ValueError(f"{type(self).__name__} budget_bytes cannot be negative !")
+        if promotion_threshold < 1:
+            raise ValueError(f"{type(self).__name__} promotion_threshold must be at least 1 !")
+        self._store_path = store_path
+        self._blob_prefix = blob_prefix
+        self._budget_bytes = budget_bytes
+        self._promotion_threshold = promotion_threshold
+        self._access_stats = SolutionTreeAccessStats()
+        self._raw_size_fn = raw_size_fn
+        self._rejected_keys = set()
+        self._lock = threading.Lock()
+
+    def budget_bytes(self) -> int:
+        return self._budget_bytes
+
+    def promotion_threshold(self) -> int:
+        return self._promotion_threshold
+
+    def access_stats(self) -> SolutionTreeAccessStats:
+        return self._access_stats
+
+    def hot_dir_path(self) -> pathlib.Path:
+        return self._store_path / self.HOT_DIR_NAME
+
+    def hot_path(self, key: str) -> pathlib.Path:
+        return self.hot_dir_path() / self._blob_prefix / key[0:4] / key
+
+    def is_hot(self, key: str) -> bool:
+        return self.hot_path(key).is_file()
+
+    def is_rejected(self, key: str) -> bool:
+        """True if the tree is too big for the hot tier, so it is not promoted"""
+        return key in self._rejected_keys
+
+    def gen_hot_paths(self) -> typing.Iterator[pathlib.Path]:
+        prefix_path = self.hot_dir_path() / self._blob_prefix
+        if prefix_path.is_dir():
+            yield from (p for p in prefix_path.glob('*/*') if p.is_file())
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.gen_hot_paths())
+
+    def promote(self, key: str) -> bool:
+        """Store an uncompressed copy of a tree in the hot tier, demoting others if it goes over budget
+
+        Returns:
+            True if the tree is hot after the call
+        """
+        with self._lock:
+            hot_path = self.hot_path(key)
+            if hot_path.is_file():
+                return True
+            if key in self._rejected_keys:
+                return False
+            raw_size_bytes = (self._raw_size_fn(key) if (self._raw_size_fn is not None) else None)
+            if (raw_size_bytes is not None) and (raw_size_bytes > self._budget_bytes):
+                logger.info(f"Not promoting `{key}` since its {raw_size_bytes} bytes are over the hot tier budget")
+                self._rejected_keys.add(key)
+                return False
+            tmp_dir_path = self.hot_dir_path() / self.TMP_DIR_NAME
+            tmp_dir_path.mkdir(parents=True, exist_ok=True)
+            fd, tmp_file_name = tempfile.mkstemp(dir=tmp_dir_path, prefix=f"{key}.")
+            tmp_path = pathlib.Path(tmp_file_name)
+            try:
+                with open(fd, 'wb') as f_out:
+                    with BlobStore.open_blob(self._store_path, self._blob_prefix, key) as f_in:
+                        shutil.copyfileobj(f_in, f_out)
+                num_bytes = tmp_path.stat().st_size
+                if num_bytes > self._budget_bytes:
+                    # its size was not known up front
+                    logger.info(f"Not promoting `{key}` since its {num_bytes} bytes are over the hot tier budget")
+                    self._rejected_keys.add(key)
+                    return False
+                hot_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, hot_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            self._enforce_budget(keep_key=key)
+            return True
+
+    def demote(self, key: str):
+        self.hot_path(key).unlink(missing_ok=True)
+
+    def _enforce_budget(self, keep_key: str):
+        hot_files = [(p.name, p.stat().st_size) for p in self.gen_hot_paths()]
+        total_bytes = sum(num_bytes for _, num_bytes in hot_files)
+        # least frequently used first
+        hot_files.sort(key=lambda hot_file: self._access_stats.access_count(hot_file[0]))
+        for key, num_bytes in hot_files:
+            if total_bytes <= self._budget_bytes:
+                break
+            if key == keep_key:
+                continue
+            logger.info(f"Demoting `{key}` from the hot tier")
+            self.demote(key)
+            total_bytes -= num_bytes
+
+    def record_access(self, key: str) -> int:
+        return self._access_stats.record_access(key)
+
+    def get_solution_tree(self, key: str, record_access: bool = True) -> SolutionTree:
+        """Read a tree, from the hot tier if it is there
+
+        A read that was not asked for by a caller, e.g. a prefetch, passes record_access=False so it does not
+        count towards promotion.
+        """
+        access_count = (self.record_access(key) if record_access else self._access_stats.access_count(key))
+        try:
+            return SolutionTreeReader.read_mmap(self.hot_path(key))
+        except ValueError:
+            # not hot (or demoted in the meantime)
+            pass
+        if (access_count >= self._promotion_threshold) and (not self.is_rejected(key)):
+            try:
+                if self.promote(key):
+                    return SolutionTreeReader.read_mmap(self.hot_path(key))
+            except ValueError as e:
+                logger.warning(f"Failed to read `{key}` from the hot tier: {e}")
+        return SolutionTreeReader.read_compressed(BlobStore.get_blob_path(self._store_path, self._blob_prefix, key))
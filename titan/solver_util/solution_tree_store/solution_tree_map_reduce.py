@@ -0,0 +1,173 @@
+from __future__ import annotations
+import typing
+import pathlib
+import itertools
+import concurrent.futures
+import time
+import os
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolverType,
+    SolutionTreeMeta,
+    SolutionTreeStoreFields
+)
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl,
+    SolutionTreeStore
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeMapReduceProgress:
+
+    __slots__ = (   '_num_chunks_done',
+                    '_num_chunks_submitted',
+                    '_num_trees_mapped',
+                    '_num_trees_skipped',
+                    '_elapsed_seconds'  )
+
+    def __init__(self, num_chunks_done: int, num_chunks_submitted: int, num_trees_mapped: int,
+                                                                        num_trees_skipped: int,
+                                                                        elapsed_seconds: float):
+        self._num_chunks_done = num_chunks_done
+        self._num_chunks_submitted = num_chunks_submitted
+        self._num_trees_mapped = num_trees_mapped
+        self._num_trees_skipped = num_trees_skipped
+        self._elapsed_seconds = elapsed_seconds
+
+    def num_chunks_done(self) -> int:
+        return self._num_chunks_done
+
+    def num_chunks_submitted(self) -> int:
+        return self._num_chunks_submitted
+
+    def num_trees_mapped(self) -> int:
+        return self._num_trees_mapped
+
+    def num_trees_skipped(self) -> int:
+        return self._num_trees_skipped
+
+    def elapsed_seconds(self) -> float:
+        return self._elapsed_seconds
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(num_chunks_done={self._num_chunks_done}, num_chunks_submitted={self._num_chunks_submitted}, " +
+                f"num_trees_mapped={self._num_trees_mapped}, num_trees_skipped={self._num_trees_skipped}, elapsed_seconds={self._elapsed_seconds:.1f})")
+
+
+
+class SolutionTreeMapReduce:
+    """Run a computation over every solve of a store, in a pool of worker processes
+
+    The meta keys are split into chunks. A worker reads the metas of its chunk, keeps those accepted by
+    filter_fn(meta, fields), where fields is None for a config that lacks them, loads their config and tree, applies map_fn(meta, solver_config_dict, tree)
+    and folds the values with reduce_fn. The chunk results are then folded in the parent as they arrive.
+    reduce_fn(a, b) must be associative and return a value of the same type as a and b. Only a bounded
+    number of chunks is in flight, so memory stays flat however big the store is.
+
+    filter_fn, map_fn and reduce_fn must be picklable, i.e. defined at the top level of a module.
+    """
+
+    DEFAULT_CHUNK_SIZE = 32
+
+    @classmethod
+    def _load_solver_config_dict(cls, store_path: pathlib.Path, solution_tree_meta: SolutionTreeMeta) -> dict:
+        if solution_tree_meta.solver_type() == SolverType.PREFLOP:
+            return SolutionTreeStoreImpl.get_preflop_solver_config_dict(store_path, solution_tree_meta.solver_config_key())
+        elif solution_tree_meta.solver_type() == SolverType.POSTFLOP:
+            return SolutionTreeStoreImpl.get_postflop_solver_config_dict(store_path, solution_tree_meta.solver_config_key())
+        raise ValueError(f"{cls.__name__} unexpected value for solver_type `{solution_tree_meta.solver_type()}` !")
+
+    @classmethod
+    def map_chunk(cls, store_path: pathlib.Path, solution_tree_meta_keys: typing.Sequence[str],
+                                                    map_fn: typing.Callable[[SolutionTreeMeta, dict, SolutionTree], typing.Any],
+                                                    reduce_fn: typing.Callable[[typing.Any, typing.Any], typing.Any],
+                                                    filter_fn: typing.Optional[typing.Callable[[SolutionTreeMeta, typing.Optional[SolutionTreeStoreFields]], bool]]) -> tuple:
+        """Runs in a worker process
+
+        Returns:
+            (has_value, value, num_trees_mapped, num_trees_skipped)
+        """
+        has_value, value = False, None
+        num_trees_mapped, num_trees_skipped = 0, 0
+        solver_config_dicts = {}
+        for solution_tree_meta_key in solution_tree_meta_keys:
+            solution_tree_meta = SolutionTreeStoreImpl.get_solution_tree_meta(store_path, solution_tree_meta_key)
+            solver_config_key = solution_tree_meta.solver_config_key()
+            if solver_config_key not in solver_config_dicts:
+                solver_config_dicts[solver_config_key] = cls._load_solver_config_dict(store_path, solution_tree_meta)
+            solver_config_dict = solver_config_dicts[solver_config_key]
+            if filter_fn is not None:
+                # the store also accepts configs without the indexed fields, e.g. those of the benchmark
+                fields = SolutionTreeStoreFields.create_optional(   solver_type=solution_tree_meta.solver_type(),
+                                                                    is_path_solve=solution_tree_meta.is_path_solve(),
+                                                                    action_sequence=solution_tree_meta.action_sequence(),
+                                                                    solver_config_dict=solver_config_dict  )
+                if not filter_fn(solution_tree_meta, fields):
+                    num_trees_skipped += 1
+                    continue
+            solution_tree = SolutionTreeStoreImpl.get_solution_tree(store_path, solution_tree_meta.solution_tree_key())
+            mapped_value = map_fn(solution_tree_meta, solver_config_dict, solution_tree)
+            has_value, value = True, (reduce_fn(value, mapped_value) if has_value else mapped_value)
+            num_trees_mapped += 1
+        return (has_value, value, num_trees_mapped, num_trees_skipped)
+
+    @classmethod
+    def gen_chunks(cls, store_path: pathlib.Path, chunk_size: int) -> typing.Iterator[typing.Tuple[str, ...]]:
+        solution_tree_meta_keys = BlobStore.gen_blob_keys(store_path, SolutionTreeStoreImpl.SOLUTION_TREE_META_PREFIX)
+        while chunk := tuple(itertools.islice(solution_tree_meta_keys, chunk_size)):
+            yield chunk
+
+    @classmethod
+    def run(cls, store: SolutionTreeStore, map_fn: typing.Callable[[SolutionTreeMeta, dict, SolutionTree], typing.Any],
+                                            reduce_fn: typing.Callable[[typing.Any, typing.Any], typing.Any],
+                                            initial_value: typing.Any = None,
+                                            filter_fn: typing.Optional[typing.Callable[[SolutionTreeMeta, typing.Optional[SolutionTreeStoreFields]], bool]] = None,
+                                            max_workers: typing.Optional[int] = None,
+                                            chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                            max_chunks_in_flight: typing.Optional[int] = None,
+                                            progress_fn: typing.Optional[typing.Callable[[SolutionTreeMapReduceProgress], None]] = None):
+        """Returns the folded value, or initial_value if no tree was mapped"""
+        if chunk_size < 1:
+            raise ValueError(f"{cls.__name__} chunk_size must be at least 1 !")
+        store_path = store.store_path()
+        start_time = time.monotonic()
+        has_value, value = (initial_value is not None), initial_value
+        num_chunks_done, num_chunks_submitted, num_trees_mapped, num_trees_skipped = 0, 0, 0, 0
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        if max_chunks_in_flight is None:
+            max_chunks_in_flight = 2 * max_workers
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = cls.gen_chunks(store_path, chunk_size)
+            pending_futures = set()
+            while True:
+                for chunk in itertools.islice(chunks, max_chunks_in_flight - len(pending_futures)):
+                    pending_futures.add(executor.submit(cls.map_chunk, store_path, chunk, map_fn, reduce_fn, filter_fn))
+                    num_chunks_submitted += 1
+                if not pending_futures:
+                    break
+                done_futures, pending_futures = concurrent.futures.wait(pending_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done_futures:
+                    chunk_has_value, chunk_value, chunk_num_trees_mapped, chunk_num_trees_skipped = future.result()
+                    if chunk_has_value:
+                        has_value, value = True, (reduce_fn(value, chunk_value) if has_value else chunk_value)
+                    num_chunks_done += 1
+                    num_trees_mapped += chunk_num_trees_mapped
+                    num_trees_skipped += chunk_num_trees_skipped
+                if progress_fn is not None:
+                    progress_fn(SolutionTreeMapReduceProgress(  num_chunks_done=num_chunks_done,
+                                                                num_chunks_submitted=num_chunks_submitted,
+                                                                num_trees_mapped=num_trees_mapped,
+                                                                num_trees_skipped=num_trees_skipped,
+                                                                elapsed_seconds=(time.monotonic() - start_time)  ))
+        logger.info(f"{cls.__name__} mapped {num_trees_mapped} trees and skipped {num_trees_skipped} in {time.monotonic() - start_time:.1f}s")
+        return value
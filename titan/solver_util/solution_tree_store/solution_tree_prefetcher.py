@@ -0,0 +1,205 @@
+from __future__ import annotations
+import typing
+import collections
+import threading
+import queue
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeTransitionModel:
+    """Counts of which solution tree was read right after which, as seen by this process
+
+    Memory is bounded: only the max_keys most recently read trees keep their successors, and each keeps
+    its max_successors most frequent ones.
+    """
+
+    DEFAULT_MAX_KEYS = 100000
+    DEFAULT_MAX_SUCCESSORS = 8
+
+    __slots__ = (   '_max_keys',
+                    '_max_successors',
+                    '_transition_counts',
+                    '_lock'  )
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS, max_successors: int = DEFAULT_MAX_SUCCESSORS):
+        self._max_keys = max_keys
+        self._max_successors = max_successors
+        self._transition_counts = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def num_keys(self) -> int:
+        return len(self._transition_counts)
+
+    def record_transition(self, from_key: str, to_key: str):
+        if from_key == to_key:
+            return
+        with self._lock:
+            successor_counts = self._transition_counts.pop(from_key, {})
+            successor_counts[to_key] = successor_counts.get(to_key, 0) + 1
+            if len(successor_counts) > self._max_successors:
+                least_frequent_key = min((k for k in successor_counts if k != to_key), key=successor_counts.get)
+                del successor_counts[least_frequent_key]
+            self._transition_counts[from_key] = successor_counts
+            while len(self._transition_counts) > self._max_keys:
+                self._transition_counts.popitem(last=False)
+
+    def transition_count(self, from_key: str, to_key: str) -> int:
+        return self._transition_counts.get(from_key, {}).get(to_key, 0)
+
+    def predict(self, from_key: str, max_predictions: int, min_count: int = 1) -> typing.Tuple[str, ...]:
+        """The keys most often read after from_key, most frequent first"""
+        with self._lock:
+            successor_counts = dict(self._transition_counts.get(from_key, {}))
+        ranked_keys = sorted((k for k, count in successor_counts.items() if count >= min_count), key=lambda k: -successor_counts[k])
+        return tuple(ranked_keys[:max_predictions])
+
+
+
+class SolutionTreePrefetcher:
+    """Read the solution trees that are likely to be requested next in a background thread
+
+    Access patterns are sequential (e.g. the flop trees of a spot are read right after its preflop tree),
+    so after each read the trees that most often followed it are loaded into a bounded LRU cache, and the
+    next get_solution_tree() is served from memory.
+
+    Misses are read with load_fn and prefetches with prefetch_load_fn, which defaults to load_fn. A read served
+    from the cache is reported to hit_fn, so that the reads a caller asked for can still be counted, e.g. by a
+    SolutionTreeHotTier, while the predictions are not.
+    """
+
+    DEFAULT_CACHE_SIZE = 32
+    DEFAULT_MAX_PREDICTIONS = 4
+    DEFAULT_MIN_TRANSITION_COUNT = 1
+
+    __slots__ = (   '_load_fn',
+                    '_prefetch_load_fn',
+                    '_hit_fn',
+                    '_cache_size',
+                    '_max_predictions',
+                    '_min_transition_count',
+                    '_transition_model',
+                    '_cache',
+                    '_last_key',
+                    '_num_hits',
+                    '_num_misses',
+                    '_pending_keys',
+                    '_requests',
+                    '_thread',
+                    '_lock'  )
+
+    def __init__(self, load_fn: typing.Callable[[str], SolutionTree],
+                                                    cache_size: int = DEFAULT_CACHE_SIZE,
+                                                    max_predictions: int = DEFAULT_MAX_PREDICTIONS,
+                                                    min_transition_count: int = DEFAULT_MIN_TRANSITION_COUNT,
+                                                    transition_model: typing.Optional[SolutionTreeTransitionModel] = None,
+                                                    prefetch_load_fn: typing.Optional[typing.Callable[[str], SolutionTree]] = None,
+                                                    hit_fn: typing.Optional[typing.Callable[[str], typing.Any]] = None):
+        if cache_size < 1:
+            raise ValueError(f"{type(self).__name__} cache_size must be at least 1 !")
+        self._load_fn = load_fn
+        self._prefetch_load_fn = (prefetch_load_fn if (prefetch_load_fn is not None) else load_fn)
+        self._hit_fn = hit_fn
+        self._cache_size = cache_size
+        self._max_predictions = max_predictions
+        self._min_transition_count = min_transition_count
+        self._transition_model = (transition_model if (transition_model is not None) else SolutionTreeTransitionModel())
+        self._cache = collections.OrderedDict()
+        self._last_key = None
+        self._num_hits = 0
+        self._num_misses = 0
+        self._pending_keys = set()
+        self._requests = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def transition_model(self) -> SolutionTreeTransitionModel:
+        return self._transition_model
+
+    def num_hits(self) -> int:
+        return self._num_hits
+
+    def num_misses(self) -> int:
+        return self._num_misses
+
+    def is_cached(self, key: str) -> bool:
+        return key in self._cache
+
+    def _cache_solution_tree(self, key: str, solution_tree: SolutionTree):
+        with self._lock:
+            self._cache[key] = solution_tree
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _pop_cached_solution_tree(self, key: str) -> typing.Optional[SolutionTree]:
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def get_solution_tree(self, key: str) -> SolutionTree:
+        # a tree is served from the cache once, after that it is only prefetched again if predicted again
+        solution_tree = self._pop_cached_solution_tree(key)
+        if solution_tree is not None:
+            self._num_hits += 1
+            if self._hit_fn is not None:
+                self._hit_fn(key)
+        else:
+            self._num_misses += 1
+            solution_tree = self._load_fn(key)
+        self.record_access(key)
+        return solution_tree
+
+    def record_access(self, key: str):
+        with self._lock:
+            last_key, self._last_key = self._last_key, key
+        if last_key is not None:
+            self._transition_model.record_transition(last_key, key)
+        for predicted_key in self._transition_model.predict(key, self._max_predictions, self._min_transition_count):
+            self.prefetch(predicted_key)
+
+    def prefetch(self, key: str):
+        with self._lock:
+            if (key in self._cache) or (key in self._pending_keys):
+                return
+            self._pending_keys.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+                self._thread.start()
+        self._requests.put(key)
+
+    def _run(self):
+        while (key := self._requests.get()) is not None:
+            if isinstance(key, threading.Event):
+                # see wait_until_idle()
+                key.set()
+                continue
+            try:
+                self._cache_solution_tree(key, self._prefetch_load_fn(key))
+            except Exception as e:
+                logger.warning(f"{type(self).__name__} failed to prefetch `{key}`: {e}")
+            finally:
+                with self._lock:
+                    self._pending_keys.discard(key)
+
+    def wait_until_idle(self, timeout: typing.Optional[float] = None) -> bool:
+        """Wait for the prefetches that were requested so far, mostly useful for tests"""
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return True
+        done = threading.Event()
+        self._requests.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._cache.clear()
+        if thread is not None:
+            self._requests.put(None)
+            thread.join()
@@ -1,16 +1,21 @@
 from __future__ import annotations
 import gzip
+import mmap
 import typing
 import pathlib
 from titan.solver_util.blob_tree import (
     BlobTreeNode
 )
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
 from titan.solver_util.solution_tree import (
     SolutionTree,
     SolutionTreeBuilder
 )
 from titan.solver_util.blob_tree.wire_protocol import (
-    Deserializer as BlobTreeDeserializer
+    Deserializer as BlobTreeDeserializer,
+    WireProtocolConst as BlobTreeWireProtocolConst
 )
 from titan.solver_util.solution_tree.wire_protocol import (
     Deserializer as SolutionTreeDeserializer
@@ -23,14 +28,34 @@ class SolutionTreeReader:
     ROOT_NODE_ID = 0
     
     @classmethod
-    def gen_blob_tree_nodes_from_file_obj(cls, fileobj: typing.BinaryIO):
-        src_buffer = memoryview(fileobj.read())
+    def gen_blob_tree_nodes_from_buffer(cls, src_buffer: memoryview):
         offset = 0
         while offset < len(src_buffer):
             node, bytes_read = BlobTreeDeserializer.deserialize_blob_tree_node(src_buffer[offset:])
             offset += bytes_read
             yield node
 
+    @classmethod
+    def gen_blob_tree_nodes_from_file_obj(cls, fileobj: typing.BinaryIO):
+        yield from cls.gen_blob_tree_nodes_from_buffer(memoryview(fileobj.read()))
+
+    @classmethod
+    def gen_blob_tree_nodes_from_stream(cls, fileobj: typing.BinaryIO) -> typing.Iterator[BlobTreeNode]:
+        """Like gen_blob_tree_nodes_from_file_obj, reading one node at a time instead of the whole file"""
+        while True:
+            node_id_bytes = fileobj.read(BlobTreeWireProtocolConst.INT32_SIZE)
+            if not node_id_bytes:
+                return
+            elif len(node_id_bytes) != BlobTreeWireProtocolConst.INT32_SIZE:
+                raise ValueError(f"{cls.__name__} Unexpected end of file in the header of a node")
+            node_id, _ = BlobTreeDeserializer.deserialize_int(node_id_bytes)
+            parent_node_id = cls._read_int(fileobj)
+            child_id = cls._read_exactly(fileobj, cls._read_int(fileobj)).decode('ascii')
+            yield BlobTreeNode( node_id=node_id,
+                                parent_node_id=parent_node_id,
+                                child_id=child_id,
+                                blob_bytes=memoryview(cls._read_exactly(fileobj, cls._read_int(fileobj)))  )
+
     @classmethod
     def gen_blob_tree_nodes_from_gzip_file(cls, path_to_gzip_file: str):
         with gzip.open(path_to_gzip_file, 'rb') as fileobj:
@@ -41,6 +66,59 @@ class SolutionTreeReader:
         with open(path, 'rb') as f:
             yield from cls.gen_blob_tree_nodes_from_file_obj(f)
 
+    @classmethod
+    def _read_exactly(cls, fileobj: typing.BinaryIO, num_bytes: int) -> bytes:
+        result = fileobj.read(num_bytes)
+        if len(result) != num_bytes:
+            raise ValueError(f"{cls.__name__} Unexpected end of file, expected {num_bytes} bytes but only {len(result)} were left")
+        return result
+
+    @classmethod
+    def _read_int(cls, fileobj: typing.BinaryIO) -> int:
+        value, _ = BlobTreeDeserializer.deserialize_int(cls._read_exactly(fileobj, BlobTreeWireProtocolConst.INT32_SIZE))
+        return value
+
+    @classmethod
+    def gen_blob_tree_nodes_on_path_from_file_obj(cls, fileobj: typing.BinaryIO, action_sequence: ActionSequence) -> typing.Iterator[BlobTreeNode]:
+        """Stream the nodes from the root to action_sequence, without loading or deserializing any other node
+
+        Only the small node headers are parsed, the blob bytes of nodes off the path are skipped over. Nodes are
+        stored in BFS order, so reading stops as soon as the last node of the path was found.
+        """
+        action_strings = tuple(str(action) for action in action_sequence)
+        # node_id => depth, for the nodes that were found on the path
+        path_depth_by_node_id = {}
+        while True:
+            node_id_bytes = fileobj.read(BlobTreeWireProtocolConst.INT32_SIZE)
+            if not node_id_bytes:
+                # end of file, the path is not complete in this tree
+                return
+            elif len(node_id_bytes) != BlobTreeWireProtocolConst.INT32_SIZE:
+                raise ValueError(f"{cls.__name__} Unexpected end of file in the header of a node")
+            node_id, _ = BlobTreeDeserializer.deserialize_int(node_id_bytes)
+            parent_node_id = cls._read_int(fileobj)
+            child_id = cls._read_exactly(fileobj, cls._read_int(fileobj)).decode('ascii')
+            num_blob_bytes = cls._read_int(fileobj)
+            if node_id == cls.ROOT_NODE_ID:
+                depth = 0
+            else:
+                parent_depth = path_depth_by_node_id.get(parent_node_id)
+                is_on_path = (  (parent_depth is not None) and
+                                (parent_depth < len(action_strings)) and
+                                (action_strings[parent_depth] == child_id)  )
+                depth = ((parent_depth + 1) if is_on_path else None)
+            if depth is None:
+                fileobj.seek(num_blob_bytes, 1)
+                continue
+            # otherwise
+            path_depth_by_node_id[node_id] = depth
+            yield BlobTreeNode( node_id=node_id,
+                                parent_node_id=parent_node_id,
+                                child_id=child_id,
+                                blob_bytes=memoryview(cls._read_exactly(fileobj, num_blob_bytes))  )
+            if depth == len(action_strings):
+                return
+
     @classmethod
     def gen_solution_tree_nodes(cls, blob_tree_nodes: typing.Iterator[BlobTreeNode], builder: SolutionTreeBuilder):
         for blob_node in blob_tree_nodes:
@@ -55,6 +133,33 @@ class SolutionTreeReader:
                                                 action_string=blob_node.child_id(),
                                                 solved_spot=solved_spot)
 
+    @classmethod
+    def read_path_from_file_obj(cls, fileobj: typing.BinaryIO, action_sequence: ActionSequence) -> SolutionTree:
+        """Read a SolutionTree holding only the nodes from the root to action_sequence, like the result of a path solve
+
+        Raises:
+            ValueError: If the stored tree does not have a node for every action in action_sequence
+        """
+        try:
+            builder = SolutionTreeBuilder()
+            num_nodes = sum(1 for _ in cls.gen_solution_tree_nodes( blob_tree_nodes=cls.gen_blob_tree_nodes_on_path_from_file_obj(fileobj, action_sequence),
+                                                                    builder=builder ))
+        except IOError as e:
+            raise ValueError(f"IO Failure in {cls.__name__}.read_path_from_file_obj(): {e}")
+        if num_nodes != (len(action_sequence) + 1):
+            raise ValueError(f"{cls.__name__} Only {num_nodes} nodes of the path `{action_sequence}` were found in the tree !")
+        return builder.build_solution_tree()
+
+    @classmethod
+    def read_path(cls, path: str, action_sequence: ActionSequence) -> SolutionTree:
+        with open(path, 'rb') as f:
+            return cls.read_path_from_file_obj(f, action_sequence)
+
+    @classmethod
+    def read_compressed_path(cls, path: str, action_sequence: ActionSequence) -> SolutionTree:
+        with gzip.open(path, 'rb') as f:
+            return cls.read_path_from_file_obj(f, action_sequence)
+
     @classmethod
     def read(cls, path: str) -> SolutionTree:
         try:
@@ -76,3 +181,20 @@ class SolutionTreeReader:
             return builder.build_solution_tree()
         except IOError as e:
             raise ValueError(f"IO Failure in {cls.__name__}.load() for path `{path}`: {e}")
+
+    @classmethod
+    def read_mmap(cls, path: str) -> SolutionTree:
+        """Read an uncompressed tree without copying it: the matrices of the tree are views of the mapped file
+
+        The mapping stays open for as long as the tree (or any of its matrices) is referenced.
+        """
+        try:
+            with open(path, 'rb') as f:
+                mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            builder = SolutionTreeBuilder()
+            for solution_tree_node in cls.gen_solution_tree_nodes(  blob_tree_nodes=cls.gen_blob_tree_nodes_from_buffer(memoryview(mapped_file)),
+                                                                    builder=builder ):
+                pass
+            return builder.build_solution_tree()
+        except (IOError, ValueError) as e:
+            raise ValueError(f"IO Failure in {cls.__name__}.read_mmap() for path `{path}`: {e}")
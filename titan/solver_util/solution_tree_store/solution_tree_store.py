@@ -7,12 +7,34 @@ import hashlib
 import tempfile
 import logging
 import time
+import functools
+import threading
+from titan.solver_util.blob_tree import (
+    BlobTreeNode
+)
+from titan.solver_util.blob_tree.wire_protocol import (
+    Serializer as BlobTreeSerializer
+)
+from titan.solver_util.solution_tree.wire_protocol import (
+    Deserializer as SolutionTreeDeserializer
+)
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.preflop_solver.types import (
+    PreflopSolverConfig
+)
+from titan.solver_util.postflop_solver.types import (
+    PostflopSolverConfig
+)
 from titan.solver_util.solution_tree_store.blob_store import (
     BlobStore
 )
 from titan.solver_util.solution_tree_store.types import (
     SolverType,
+    SolutionTreeStats,
     SolutionTreeMeta,
+    SolutionTreeStoreFields,
     SolutionTreeStoreIndexEntry,
     SolutionTreeStoreIndex
 )
@@ -22,10 +44,87 @@ from titan.solver_util.solution_tree_store.solution_tree_reader import (
 from titan.solver_util.solution_tree_store.solution_tree_writer import (
     SolutionTreeWriter
 )
+from titan.solver_util.solution_tree_store.solution_tree_store_journal import (
+    SolutionTreeStoreJournal
+)
+from titan.solver_util.solution_tree_store.store_lock import (
+    StoreLock
+)
+from titan.solver_util.solution_tree_store.solution_tree_hot_tier import (
+    SolutionTreeHotTier
+)
+from titan.solver_util.solution_tree_store.solution_tree_prefetcher import (
+    SolutionTreePrefetcher
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_field_index import (
+    SolutionTreeStoreFieldIndex
+)
 
 logger = logging.getLogger(__name__)
 
 
+class _HashingFileReader:
+    """Hashes the bytes read from the file object it wraps"""
+
+    __slots__ = (   '_fileobj',
+                    '_hash'  )
+
+    def __init__(self, fileobj: typing.BinaryIO):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def read(self, num_bytes: int) -> bytes:
+        result = self._fileobj.read(num_bytes)
+        self._hash.update(result)
+        return result
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class SolutionTreeStatsBuilder:
+    """Collects the stats of a tree from its blob tree nodes, as they stream by while the tree is hashed"""
+
+    __slots__ = (   '_node_depths',
+                    '_parent_node_ids',
+                    '_matrix_shapes',
+                    '_raw_size_bytes'  )
+
+    def __init__(self):
+        self._node_depths = {}
+        self._parent_node_ids = set()
+        self._matrix_shapes = set()
+        self._raw_size_bytes = 0
+
+    def add_blob_tree_node(self, blob_tree_node: BlobTreeNode):
+        if blob_tree_node.node_id() == SolutionTreeReader.ROOT_NODE_ID:
+            self._node_depths[blob_tree_node.node_id()] = 0
+        else:
+            self._node_depths[blob_tree_node.node_id()] = self._node_depths[blob_tree_node.parent_node_id()] + 1
+            self._parent_node_ids.add(blob_tree_node.parent_node_id())
+        # the matrices are views on the blob bytes, nothing is copied
+        solved_spot, _ = SolutionTreeDeserializer.deserialize_solved_spot(blob_tree_node.blob_bytes())
+        self._matrix_shapes.add(tuple(solved_spot.strategy_matrix().shape()))
+        self._matrix_shapes.add(tuple(solved_spot.ev_matrix().shape()))
+        self._raw_size_bytes += BlobTreeSerializer.serialized_size_of_blob_tree_node(blob_tree_node)
+
+    def build(self, compressed_size_bytes: int, digest: str) -> SolutionTreeStats:
+        return SolutionTreeStats(   node_count=len(self._node_depths),
+                                    max_depth=max(self._node_depths.values(), default=0),
+                                    leaf_count=(len(self._node_depths) - len(self._parent_node_ids)),
+                                    matrix_shapes=tuple(sorted(self._matrix_shapes)),
+                                    raw_size_bytes=self._raw_size_bytes,
+                                    compressed_size_bytes=compressed_size_bytes,
+                                    digest=digest  )
+
+    @classmethod
+    def create_from_blob_tree_nodes(cls, blob_tree_nodes: typing.Iterable[BlobTreeNode]) -> SolutionTreeStatsBuilder:
+        result = cls()
+        for blob_tree_node in blob_tree_nodes:
+            result.add_blob_tree_node(blob_tree_node)
+        return result
+
+
 class SolutionTreeStoreIndexFactory:
 
     @classmethod
@@ -35,7 +134,12 @@ class SolutionTreeStoreIndexFactory:
                                                                     solver_config_dict=solver_config_dict)
         return SolutionTreeStoreIndexEntry( index_key=index_key,
                                             solution_tree_key=solution_tree_meta.solution_tree_key(),
-                                            solver_config_key=solution_tree_meta.solver_config_key() )
+                                            solver_config_key=solution_tree_meta.solver_config_key(),
+                                            stats=solution_tree_meta.stats(),
+                                            fields=SolutionTreeStoreFields.create_optional( solver_type=SolverType.PREFLOP,
+                                                                                            is_path_solve=solution_tree_meta.is_path_solve(),
+                                                                                            action_sequence=solution_tree_meta.action_sequence(),
+                                                                                            solver_config_dict=solver_config_dict  ) )
 
     @classmethod
     def create_postflop_entry(cls, solution_tree_meta: SolutionTreeMeta, solver_config_dict: dict) -> SolutionTreeStoreIndexEntry:
@@ -44,11 +148,41 @@ class SolutionTreeStoreIndexFactory:
                                                                     solver_config_dict=solver_config_dict)
         return SolutionTreeStoreIndexEntry( index_key=index_key,
                                             solution_tree_key=solution_tree_meta.solution_tree_key(),
-                                            solver_config_key=solution_tree_meta.solver_config_key() )
+                                            solver_config_key=solution_tree_meta.solver_config_key(),
+                                            stats=solution_tree_meta.stats(),
+                                            fields=SolutionTreeStoreFields.create_optional( solver_type=SolverType.POSTFLOP,
+                                                                                            is_path_solve=solution_tree_meta.is_path_solve(),
+                                                                                            action_sequence=solution_tree_meta.action_sequence(),
+                                                                                            solver_config_dict=solver_config_dict  ) )
 
     @classmethod
-    def create(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
+    def create_fingerprint_entry(cls, index_entry: SolutionTreeStoreIndexEntry, solver_type: SolverType,
+                                                                                action_sequence: ActionSequence,
+                                                                                is_path_solve: bool,
+                                                                                solver_config_fingerprint: str) -> SolutionTreeStoreIndexEntry:
+        """The same solve as index_entry, under the index key made from the fingerprint of its config"""
+        index_key = SolutionTreeStoreIndex.create_fingerprint_index_key(solver_type=solver_type,
+                                                                        is_path_solve=is_path_solve,
+                                                                        action_sequence=action_sequence,
+                                                                        solver_config_fingerprint=solver_config_fingerprint)
+        return SolutionTreeStoreIndexEntry( index_key=index_key,
+                                            solution_tree_key=index_entry.solution_tree_key(),
+                                            solver_config_key=index_entry.solver_config_key(),
+                                            stats=index_entry.stats() )
+
+    @classmethod
+    def compute_solver_config_fingerprint(cls, solver_type: SolverType, solver_config_dict: dict) -> str:
+        if solver_type == SolverType.PREFLOP:
+            return PreflopSolverConfig.create_from_dict(solver_config_dict).fingerprint()
+        elif solver_type == SolverType.POSTFLOP:
+            return PostflopSolverConfig.create_from_dict(solver_config_dict).fingerprint()
+        raise ValueError(f"{cls.__name__} unexpected value for solver_type `{solver_type}` !")
+
+    @classmethod
+    def create(cls, store_path: pathlib.Path, with_fingerprint_keys: bool = False) -> SolutionTreeStoreIndex:
+        """Index every meta of the store, under the keys of its config dict and, optionally, of its config fingerprint"""
         result = SolutionTreeStoreIndex.create_empty()
+        solver_config_fingerprints = {}
         for i, solution_tree_meta in enumerate(SolutionTreeStoreImpl.gen_solution_tree_metas(store_path)):
             logger.info(f"Indexing solution_tree_meta #{i}")
             if solution_tree_meta.solver_type() == SolverType.PREFLOP:
@@ -63,9 +197,20 @@ class SolutionTreeStoreIndexFactory:
             else:
                 raise ValueError(f"{cls.__name__}.create failed due to unexpected value for solver_type `{solution_tree_meta.solver_type()}` !")
             result.add_entry(entry)
+            if with_fingerprint_keys:
+                # many solves share a config, and parsing one back from its dict is the slow part
+                if solution_tree_meta.solver_config_key() not in solver_config_fingerprints:
+                    solver_config_fingerprints[solution_tree_meta.solver_config_key()] = cls.compute_solver_config_fingerprint(solution_tree_meta.solver_type(),
+                                                                                                                               solver_config_dict)
+                result.add_entry(cls.create_fingerprint_entry(  index_entry=entry,
+                                                                solver_type=solution_tree_meta.solver_type(),
+                                                                action_sequence=solution_tree_meta.action_sequence(),
+                                                                is_path_solve=solution_tree_meta.is_path_solve(),
+                                                                solver_config_fingerprint=solver_config_fingerprints[solution_tree_meta.solver_config_key()]  ))
         return result
 
 
+
 class SolutionTreeStoreImpl:
     
     INDEX_COMPRESS_LEVEL = 1
@@ -74,6 +219,12 @@ class SolutionTreeStoreImpl:
     SOLUTION_TREE_META_PREFIX = 'solution-tree-meta'
     PREFLOP_SOLVER_CONFIG_PREFIX = 'preflop-solver-config'
     POSTFLOP_SOLVER_CONFIG_PREFIX = 'postflop-solver-config'
+    INDEX_LOCK_NAME = 'index'
+    ALL_BLOB_PREFIXES = (   INDEX_PREFIX,
+                            SOLUTION_TREE_PREFIX,
+                            SOLUTION_TREE_META_PREFIX,
+                            PREFLOP_SOLVER_CONFIG_PREFIX,
+                            POSTFLOP_SOLVER_CONFIG_PREFIX  )
 
     @classmethod
     def ensure_valid_store_path(cls, store_path: pathlib.Path):
@@ -89,13 +240,25 @@ class SolutionTreeStoreImpl:
         return BlobStore.is_empty(store_path)
 
     @classmethod
-    def create_index(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
-        return SolutionTreeStoreIndexFactory.create(store_path)
+    def create_index(cls, store_path: pathlib.Path, with_fingerprint_keys: bool = False) -> SolutionTreeStoreIndex:
+        return SolutionTreeStoreIndexFactory.create(store_path, with_fingerprint_keys=with_fingerprint_keys)
+
+    @classmethod
+    def rebuild_manifests(cls, store_path: pathlib.Path):
+        for blob_prefix in cls.ALL_BLOB_PREFIXES:
+            if (store_path / blob_prefix).is_dir():
+                logger.info(f"Rebuilding the `{blob_prefix}` manifest")
+                BlobStore.rebuild_manifest(store_path, blob_prefix)
 
     @classmethod
     def get_solution_tree(cls, store_path: pathlib.Path, key: str) -> SolutionTree:
         return SolutionTreeReader.read_compressed(BlobStore.get_blob_path(store_path, cls.SOLUTION_TREE_PREFIX, key))
 
+    @classmethod
+    def get_solution_tree_path(cls, store_path: pathlib.Path, key: str, action_sequence: ActionSequence) -> SolutionTree:
+        with BlobStore.open_blob(store_path, cls.SOLUTION_TREE_PREFIX, key) as f:
+            return SolutionTreeReader.read_path_from_file_obj(f, action_sequence)
+
     @classmethod
     def get_solution_tree_meta(cls, store_path: pathlib.Path, key: str) -> SolutionTreeMeta:
         return SolutionTreeMeta.create_from_dict(json.loads(BlobStore.get_blob_bytes(store_path, cls.SOLUTION_TREE_META_PREFIX, key)))
@@ -137,6 +300,30 @@ class SolutionTreeStoreImpl:
             return cls.compute_file_hash(f)
 
 
+    @classmethod
+    def compute_file_hash_and_stats(cls, file_obj: typing.BinaryIO) -> typing.Tuple[str, SolutionTreeStatsBuilder]:
+        """Hash a tree file and collect its stats in the same pass, so it is only read (or decompressed) once"""
+        hashing_file_obj = _HashingFileReader(file_obj)
+        stats_builder = SolutionTreeStatsBuilder.create_from_blob_tree_nodes(SolutionTreeReader.gen_blob_tree_nodes_from_stream(hashing_file_obj))
+        return (hashing_file_obj.hexdigest(), stats_builder)
+
+    @classmethod
+    def compute_compressed_file_hash_and_stats_from_path(cls, some_compressed_file_path: pathlib.Path,
+                                                                    solution_tree_key: typing.Optional[str] = None) -> typing.Tuple[str, SolutionTreeStatsBuilder]:
+        """Hash the decompressed contents of a gzip file unless solution_tree_key is known, streaming so the contents are never written out"""
+        with gzip.open(some_compressed_file_path, 'rb') as f:
+            if solution_tree_key is None:
+                return cls.compute_file_hash_and_stats(f)
+            return (solution_tree_key, SolutionTreeStatsBuilder.create_from_blob_tree_nodes(SolutionTreeReader.gen_blob_tree_nodes_from_stream(f)))
+
+    @classmethod
+    def build_solution_tree_stats(cls, store_path: pathlib.Path, solution_tree_key: str, stats_builder: SolutionTreeStatsBuilder,
+                                                                                        compressed_digest: typing.Optional[str]) -> SolutionTreeStats:
+        """compressed_digest is None when the blob was already in the store, only then is the stored blob hashed"""
+        compressed_blob_path = BlobStore.get_blob_path(store_path, cls.SOLUTION_TREE_PREFIX, solution_tree_key)
+        return stats_builder.build( compressed_size_bytes=compressed_blob_path.stat().st_size,
+                                    digest=(compressed_digest if (compressed_digest is not None) else cls.compute_file_hash_from_path(compressed_blob_path))  )
+
     @classmethod
     def compute_dict_hash(cls, some_dict: dict) -> str:
         m = hashlib.sha256()
@@ -149,15 +336,21 @@ class SolutionTreeStoreImpl:
                                                                     is_path_solve: bool,
                                                                     solution_tree_path: pathlib.Path) -> SolutionTreeStoreIndexEntry:
         config_key = cls.compute_dict_hash(solver_config_dict)
-        solution_tree_key = cls.compute_file_hash_from_path(solution_tree_path)       
+        with open(solution_tree_path, 'rb') as f:
+            solution_tree_key, stats_builder = cls.compute_file_hash_and_stats(f)
+        compressed_digest = BlobStore.add_compressed_blob_from_path(store_path=store_path,
+                                                                    blob_prefix=cls.SOLUTION_TREE_PREFIX,
+                                                                    blob_key=solution_tree_key,
+                                                                    src_blob_path=solution_tree_path)
+        stats = cls.build_solution_tree_stats(  store_path=store_path,
+                                                solution_tree_key=solution_tree_key,
+                                                stats_builder=stats_builder,
+                                                compressed_digest=compressed_digest  )
         solution_tree_meta = SolutionTreeMeta.create_for_preflop(   is_path_solve=is_path_solve,
                                                                     action_sequence=action_sequence,
                                                                     solver_config_key=config_key,
-                                                                    solution_tree_key=solution_tree_key  )
-        BlobStore.add_compressed_blob_from_path(store_path=store_path,
-                                                blob_prefix=cls.SOLUTION_TREE_PREFIX,
-                                                blob_key=solution_tree_key,
-                                                src_blob_path=solution_tree_path)
+                                                                    solution_tree_key=solution_tree_key,
+                                                                    stats=stats  )
         BlobStore.add_compressed_blob_from_bytes(store_path=store_path,
                                                 blob_prefix=cls.PREFLOP_SOLVER_CONFIG_PREFIX,
                                                 blob_key=config_key,
@@ -167,12 +360,7 @@ class SolutionTreeStoreImpl:
                                         blob_key=solution_tree_meta.hash(),
                                         blob_bytes=json.dumps(solution_tree_meta.serialize_to_dict()).encode('ascii')  )
         # return info useful for indexes
-        index_key = SolutionTreeStoreIndex.create_preflop_index_key(is_path_solve=is_path_solve,
-                                                                    action_sequence=action_sequence,
-                                                                    solver_config_dict=solver_config_dict)
-        return SolutionTreeStoreIndexEntry( index_key=index_key,
-                                            solution_tree_key=solution_tree_key,
-                                            solver_config_key=config_key )
+        return SolutionTreeStoreIndexFactory.create_preflop_entry(solution_tree_meta, solver_config_dict)
 
 
     @classmethod
@@ -181,15 +369,21 @@ class SolutionTreeStoreImpl:
                                                                     is_path_solve: bool,
                                                                     solution_tree_path: pathlib.Path):
         config_key = cls.compute_dict_hash(solver_config_dict)
-        solution_tree_key = cls.compute_file_hash_from_path(solution_tree_path)       
+        with open(solution_tree_path, 'rb') as f:
+            solution_tree_key, stats_builder = cls.compute_file_hash_and_stats(f)
+        compressed_digest = BlobStore.add_compressed_blob_from_path(store_path=store_path,
+                                                                    blob_prefix=cls.SOLUTION_TREE_PREFIX,
+                                                                    blob_key=solution_tree_key,
+                                                                    src_blob_path=solution_tree_path)
+        stats = cls.build_solution_tree_stats(  store_path=store_path,
+                                                solution_tree_key=solution_tree_key,
+                                                stats_builder=stats_builder,
+                                                compressed_digest=compressed_digest  )
         solution_tree_meta = SolutionTreeMeta.create_for_postflop(  is_path_solve=is_path_solve,
                                                                     action_sequence=action_sequence,
                                                                     solver_config_key=config_key,
-                                                                    solution_tree_key=solution_tree_key  )
-        BlobStore.add_compressed_blob_from_path(store_path=store_path,
-                                                blob_prefix=cls.SOLUTION_TREE_PREFIX,
-                                                blob_key=solution_tree_key,
-                                                src_blob_path=solution_tree_path)
+                                                                    solution_tree_key=solution_tree_key,
+                                                                    stats=stats  )
         BlobStore.add_compressed_blob_from_bytes(store_path=store_path,
                                                 blob_prefix=cls.POSTFLOP_SOLVER_CONFIG_PREFIX,
                                                 blob_key=config_key,
@@ -199,12 +393,71 @@ class SolutionTreeStoreImpl:
                                         blob_key=solution_tree_meta.hash(),
                                         blob_bytes=json.dumps(solution_tree_meta.serialize_to_dict()).encode('ascii')  )
         # return info useful for indexes
-        index_key = SolutionTreeStoreIndex.create_postflop_index_key(is_path_solve=is_path_solve,
+        return SolutionTreeStoreIndexFactory.create_postflop_entry(solution_tree_meta, solver_config_dict)
+
+    @classmethod
+    def add_preflop_solution_tree_from_compressed_path(cls, store_path: pathlib.Path, solver_config_dict: dict,
+                                                                    action_sequence: ActionSequence,
+                                                                    is_path_solve: bool,
+                                                                    compressed_solution_tree_path: pathlib.Path,
+                                                                    solution_tree_key: typing.Optional[str] = None) -> SolutionTreeStoreIndexEntry:
+        config_key = cls.compute_dict_hash(solver_config_dict)
+        solution_tree_key, stats_builder = cls.compute_compressed_file_hash_and_stats_from_path(compressed_solution_tree_path, solution_tree_key)
+        compressed_digest = BlobStore.add_compressed_blob_from_compressed_path( store_path=store_path,
+                                                                                blob_prefix=cls.SOLUTION_TREE_PREFIX,
+                                                                                blob_key=solution_tree_key,
+                                                                                src_compressed_blob_path=compressed_solution_tree_path  )
+        stats = cls.build_solution_tree_stats(  store_path=store_path,
+                                                solution_tree_key=solution_tree_key,
+                                                stats_builder=stats_builder,
+                                                compressed_digest=compressed_digest  )
+        solution_tree_meta = SolutionTreeMeta.create_for_preflop(   is_path_solve=is_path_solve,
                                                                     action_sequence=action_sequence,
-                                                                    solver_config_dict=solver_config_dict)
-        return SolutionTreeStoreIndexEntry( index_key=index_key,
-                                            solution_tree_key=solution_tree_key,
-                                            solver_config_key=config_key )
+                                                                    solver_config_key=config_key,
+                                                                    solution_tree_key=solution_tree_key,
+                                                                    stats=stats  )
+        BlobStore.add_compressed_blob_from_bytes(store_path=store_path,
+                                                blob_prefix=cls.PREFLOP_SOLVER_CONFIG_PREFIX,
+                                                blob_key=config_key,
+                                                blob_bytes=json.dumps(solver_config_dict).encode('ascii'))
+        BlobStore.add_blob_from_bytes(  store_path=store_path,
+                                        blob_prefix=cls.SOLUTION_TREE_META_PREFIX,
+                                        blob_key=solution_tree_meta.hash(),
+                                        blob_bytes=json.dumps(solution_tree_meta.serialize_to_dict()).encode('ascii')  )
+        # return info useful for indexes
+        return SolutionTreeStoreIndexFactory.create_preflop_entry(solution_tree_meta, solver_config_dict)
+
+    @classmethod
+    def add_postflop_solution_tree_from_compressed_path(cls, store_path: pathlib.Path, solver_config_dict: dict,
+                                                                    action_sequence: ActionSequence,
+                                                                    is_path_solve: bool,
+                                                                    compressed_solution_tree_path: pathlib.Path,
+                                                                    solution_tree_key: typing.Optional[str] = None) -> SolutionTreeStoreIndexEntry:
+        config_key = cls.compute_dict_hash(solver_config_dict)
+        solution_tree_key, stats_builder = cls.compute_compressed_file_hash_and_stats_from_path(compressed_solution_tree_path, solution_tree_key)
+        compressed_digest = BlobStore.add_compressed_blob_from_compressed_path( store_path=store_path,
+                                                                                blob_prefix=cls.SOLUTION_TREE_PREFIX,
+                                                                                blob_key=solution_tree_key,
+                                                                                src_compressed_blob_path=compressed_solution_tree_path  )
+        stats = cls.build_solution_tree_stats(  store_path=store_path,
+                                                solution_tree_key=solution_tree_key,
+                                                stats_builder=stats_builder,
+                                                compressed_digest=compressed_digest  )
+        solution_tree_meta = SolutionTreeMeta.create_for_postflop(  is_path_solve=is_path_solve,
+                                                                    action_sequence=action_sequence,
+                                                                    solver_config_key=config_key,
+                                                                    solution_tree_key=solution_tree_key,
+                                                                    stats=stats  )
+        BlobStore.add_compressed_blob_from_bytes(store_path=store_path,
+                                                blob_prefix=cls.POSTFLOP_SOLVER_CONFIG_PREFIX,
+                                                blob_key=config_key,
+                                                blob_bytes=json.dumps(solver_config_dict).encode('ascii'))
+        BlobStore.add_blob_from_bytes(  store_path=store_path,
+                                        blob_prefix=cls.SOLUTION_TREE_META_PREFIX,
+                                        blob_key=solution_tree_meta.hash(),
+                                        blob_bytes=json.dumps(solution_tree_meta.serialize_to_dict()).encode('ascii')  )
+        # return info useful for indexes
+        return SolutionTreeStoreIndexFactory.create_postflop_entry(solution_tree_meta, solver_config_dict)
 
     @classmethod
     def add_preflop_solution_tree(cls, store_path: pathlib.Path, solver_config_dict: dict,
@@ -242,16 +495,64 @@ class SolutionTreeStoreImpl:
         finally:
             tmp_file_path.unlink()
 
+    @classmethod
+    def write_solution_tree_buffers(cls, path: pathlib.Path, solution_tree_buffers: typing.Iterable[memoryview]):
+        """The buffers of a solve (e.g. its ipc messages) are serialized blob tree nodes, so they make up a tree file as is"""
+        try:
+            with open(path, 'wb') as f:
+                for solution_tree_buffer in solution_tree_buffers:
+                    f.write(solution_tree_buffer)
+        except IOError as e:
+            raise ValueError(f"IO Failure in {cls.__name__}.write_solution_tree_buffers() for path `{path}`: {e}")
+
+    @classmethod
+    def add_preflop_solution_tree_from_buffers(cls, store_path: pathlib.Path, solver_config_dict: dict,
+                                                                    action_sequence: ActionSequence,
+                                                                    is_path_solve: bool,
+                                                                    solution_tree_buffers: typing.Iterable[memoryview]) -> SolutionTreeStoreIndexEntry:
+        tmp_file = tempfile.NamedTemporaryFile(delete=False)
+        tmp_file.close()
+        tmp_file_path = pathlib.Path(tmp_file.name)
+        try:
+            cls.write_solution_tree_buffers(tmp_file_path, solution_tree_buffers)
+            return cls.add_preflop_solution_tree_from_path( store_path=store_path,
+                                                            solver_config_dict=solver_config_dict,
+                                                            action_sequence=action_sequence,
+                                                            is_path_solve=is_path_solve,
+                                                            solution_tree_path=tmp_file_path )
+        finally:
+            tmp_file_path.unlink()
+
+    @classmethod
+    def add_postflop_solution_tree_from_buffers(cls, store_path: pathlib.Path, solver_config_dict: dict,
+                                                                    action_sequence: ActionSequence,
+                                                                    is_path_solve: bool,
+                                                                    solution_tree_buffers: typing.Iterable[memoryview]) -> SolutionTreeStoreIndexEntry:
+        tmp_file = tempfile.NamedTemporaryFile(delete=False)
+        tmp_file.close()
+        tmp_file_path = pathlib.Path(tmp_file.name)
+        try:
+            cls.write_solution_tree_buffers(tmp_file_path, solution_tree_buffers)
+            return cls.add_postflop_solution_tree_from_path(store_path=store_path,
+                                                            solver_config_dict=solver_config_dict,
+                                                            action_sequence=action_sequence,
+                                                            is_path_solve=is_path_solve,
+                                                            solution_tree_path=tmp_file_path)
+        finally:
+            tmp_file_path.unlink()
+
 
 
     @classmethod
     def add_solution_tree_store_index(cls, store_path: pathlib.Path, solution_tree_store_index: SolutionTreeStoreIndex):
         index_dict = solution_tree_store_index.serialize_to_dict()
         index_key = cls.compute_dict_hash(index_dict)
-        BlobStore.add_compressed_blob_from_bytes(store_path=store_path,
-                                                blob_prefix=cls.INDEX_PREFIX,
-                                                blob_key=index_key,
-                                                blob_bytes=json.dumps(index_dict).encode('ascii'))
+        # shared, so that writers can save concurrently while clean-ups wait for them
+        with StoreLock.acquire_shared(store_path, cls.INDEX_LOCK_NAME):
+            BlobStore.add_compressed_blob_from_bytes(   store_path=store_path,
+                                                        blob_prefix=cls.INDEX_PREFIX,
+                                                        blob_key=index_key,
+                                                        blob_bytes=json.dumps(index_dict).encode('ascii'))
 
     @classmethod
     def delete_solution_tree_store_index(cls, store_path: pathlib.Path, solution_tree_store_index: SolutionTreeStoreIndex):
@@ -264,15 +565,30 @@ class SolutionTreeStoreImpl:
     @classmethod
     def load_and_merge_indexes(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
         all_indexes = tuple(cls.gen_solution_tree_store_indexes(store_path))
-        if not all_indexes:
+        # entries that writers have not saved in an index blob yet
+        journal_index = SolutionTreeStoreJournal.load_index(store_path)
+        if (not all_indexes) and (journal_index.size() == 0):
             raise ValueError(f"Failed to load_and_merge_indexes(), none were found !")
-        return SolutionTreeStoreIndex.merge(*all_indexes)
+        return SolutionTreeStoreIndex.merge(*all_indexes, journal_index)
 
     @classmethod
     def remove_small_indexes(cls, store_path: pathlib.Path, size_threshold: int):
-        for index in tuple(cls.gen_solution_tree_store_indexes(store_path)):
-            if index.size() < size_threshold:
-                cls.delete_solution_tree_store_index(store_path=store_path, solution_tree_store_index=index)
+        with StoreLock.acquire_exclusive(store_path, cls.INDEX_LOCK_NAME):
+            for index in tuple(cls.gen_solution_tree_store_indexes(store_path)):
+                if index.size() < size_threshold:
+                    cls.delete_solution_tree_store_index(store_path=store_path, solution_tree_store_index=index)
+
+    @classmethod
+    def remove_indexes_covered_by(cls, store_path: pathlib.Path, solution_tree_store_index: SolutionTreeStoreIndex):
+        """Delete the index blobs that are smaller than solution_tree_store_index and whose entries it all has
+
+        Unlike remove_small_indexes, this never loses the entries that other writers saved in the meantime.
+        """
+        with StoreLock.acquire_exclusive(store_path, cls.INDEX_LOCK_NAME):
+            for index in tuple(cls.gen_solution_tree_store_indexes(store_path)):
+                is_covered = (SolutionTreeStoreIndex.difference(index, solution_tree_store_index).size() == 0)
+                if is_covered and (index.size() < solution_tree_store_index.size()):
+                    cls.delete_solution_tree_store_index(store_path=store_path, solution_tree_store_index=index)
 
 
 
@@ -280,11 +596,23 @@ class SolutionTreeStoreImpl:
 class SolutionTreeStore:
 
     __slots__ = (   '_store_path',
-                    '_index'  )
-
-    def __init__(self, store_path: pathlib.Path, index: SolutionTreeStoreIndex):
+                    '_index',
+                    '_writer_id',
+                    '_hot_tier',
+                    '_prefetcher',
+                    '_field_index',
+                    '_index_lock'  )
+
+    def __init__(self, store_path: pathlib.Path, index: SolutionTreeStoreIndex, writer_id: typing.Optional[str] = None):
         self._store_path = store_path
         self._index = index
+        self._writer_id = writer_id
+        self._hot_tier = None
+        self._prefetcher = None
+        self._field_index = None
+        # guards the index, the field index and the journal, which wrappers like AsyncSolutionTreeStore
+        # and SolutionTreeWriteBehindQueue update from their worker threads
+        self._index_lock = threading.RLock()
 
     def store_path(self) -> str:
         return self._store_path
@@ -292,68 +620,323 @@ class SolutionTreeStore:
     def index(self) -> SolutionTreeStoreIndex:
         return self._index
 
+    def writer_id(self) -> typing.Optional[str]:
+        return self._writer_id
+
+    def field_index(self) -> SolutionTreeStoreFieldIndex:
+        """Secondary indexes on the fields of the solves, built from the index and kept up to date by add_*()"""
+        with self._index_lock:
+            if self._field_index is None:
+                self._field_index = SolutionTreeStoreFieldIndex.create_from_index(self._index)
+            return self._field_index
+
+    def hot_tier(self) -> typing.Optional[SolutionTreeHotTier]:
+        return self._hot_tier
+
+    def enable_hot_tier(self, budget_bytes: int = SolutionTreeHotTier.DEFAULT_BUDGET_BYTES,
+                                promotion_threshold: int = SolutionTreeHotTier.DEFAULT_PROMOTION_THRESHOLD):
+        """Keep frequently read solution trees uncompressed, see SolutionTreeHotTier"""
+        self._hot_tier = SolutionTreeHotTier(   store_path=self.store_path(),
+                                                blob_prefix=SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX,
+                                                budget_bytes=budget_bytes,
+                                                promotion_threshold=promotion_threshold,
+                                                raw_size_fn=self._get_raw_size_bytes  )
+
+    def _get_raw_size_bytes(self, key: str) -> typing.Optional[int]:
+        stats = self.get_solution_tree_stats(key)
+        return (stats.raw_size_bytes() if (stats is not None) else None)
+
+    def prefetcher(self) -> typing.Optional[SolutionTreePrefetcher]:
+        return self._prefetcher
+
+    def enable_prefetch(self, cache_size: int = SolutionTreePrefetcher.DEFAULT_CACHE_SIZE,
+                                max_predictions: int = SolutionTreePrefetcher.DEFAULT_MAX_PREDICTIONS,
+                                min_transition_count: int = SolutionTreePrefetcher.DEFAULT_MIN_TRANSITION_COUNT):
+        """Load the trees that usually follow each read in the background, see SolutionTreePrefetcher"""
+        self.disable_prefetch()
+        self._prefetcher = SolutionTreePrefetcher(  load_fn=self._load_solution_tree,
+                                                    prefetch_load_fn=self._prefetch_solution_tree,
+                                                    hit_fn=self._record_solution_tree_access,
+                                                    cache_size=cache_size,
+                                                    max_predictions=max_predictions,
+                                                    min_transition_count=min_transition_count  )
+
+    def disable_prefetch(self):
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def _add_index_entry(self, index_entry: SolutionTreeStoreIndexEntry):
+        with self._index_lock:
+            self._index.add_entry(index_entry)
+            if (self._field_index is not None) and (index_entry.fields() is not None):
+                self._field_index.add_entry(index_entry=index_entry, fields=index_entry.fields())
+            # the blobs are already written, so readers that merge the journal can find them straight away
+            if self._writer_id is not None:
+                SolutionTreeStoreJournal.append_entry(  store_path=self.store_path(),
+                                                        writer_id=self._writer_id,
+                                                        entry=index_entry  )
+
+    def _add_index_entries_for_solve(self, index_entry: SolutionTreeStoreIndexEntry, solver_type: SolverType,
+                                                                                        action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        solver_config_fingerprint: typing.Optional[str]):
+        self._add_index_entry(index_entry)
+        if solver_config_fingerprint is not None:
+            self._add_index_entry(SolutionTreeStoreIndexFactory.create_fingerprint_entry(   index_entry=index_entry,
+                                                                                            solver_type=solver_type,
+                                                                                            action_sequence=action_sequence,
+                                                                                            is_path_solve=is_path_solve,
+                                                                                            solver_config_fingerprint=solver_config_fingerprint  ))
+
     def add_preflop_solution_tree_from_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
                                                                                         is_path_solve: bool,
-                                                                                        solution_tree_path: pathlib.Path):
+                                                                                        solution_tree_path: pathlib.Path,
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
         index_entry = SolutionTreeStoreImpl.add_preflop_solution_tree_from_path(store_path=self.store_path(),
                                                                                 solver_config_dict=solver_config_dict,
                                                                                 action_sequence=action_sequence,
                                                                                 is_path_solve=is_path_solve,
                                                                                 solution_tree_path=solution_tree_path)
         # save in index
-        self._index.add_entry(index_entry)
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.PREFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
 
     def add_postflop_solution_tree_from_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
                                                                                         is_path_solve: bool,
-                                                                                        solution_tree_path: pathlib.Path):
+                                                                                        solution_tree_path: pathlib.Path,
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
         index_entry = SolutionTreeStoreImpl.add_postflop_solution_tree_from_path(   store_path=self.store_path(),
                                                                                     solver_config_dict=solver_config_dict,
                                                                                     action_sequence=action_sequence,
                                                                                     is_path_solve=is_path_solve,
                                                                                     solution_tree_path=solution_tree_path  )
         # save in index
-        self._index.add_entry(index_entry)
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.POSTFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
 
 
 
+    def add_preflop_solution_tree_from_compressed_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        compressed_solution_tree_path: pathlib.Path,
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
+        index_entry = SolutionTreeStoreImpl.add_preflop_solution_tree_from_compressed_path( store_path=self.store_path(),
+                                                                                            solver_config_dict=solver_config_dict,
+                                                                                            action_sequence=action_sequence,
+                                                                                            is_path_solve=is_path_solve,
+                                                                                            compressed_solution_tree_path=compressed_solution_tree_path  )
+        # save in index
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.PREFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
+
+    def add_postflop_solution_tree_from_compressed_path(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        compressed_solution_tree_path: pathlib.Path,
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
+        index_entry = SolutionTreeStoreImpl.add_postflop_solution_tree_from_compressed_path(store_path=self.store_path(),
+                                                                                            solver_config_dict=solver_config_dict,
+                                                                                            action_sequence=action_sequence,
+                                                                                            is_path_solve=is_path_solve,
+                                                                                            compressed_solution_tree_path=compressed_solution_tree_path  )
+        # save in index
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.POSTFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
+
+    def add_preflop_solution_tree_from_buffers(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        solution_tree_buffers: typing.Iterable[memoryview],
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
+        index_entry = SolutionTreeStoreImpl.add_preflop_solution_tree_from_buffers( store_path=self.store_path(),
+                                                                                    solver_config_dict=solver_config_dict,
+                                                                                    action_sequence=action_sequence,
+                                                                                    is_path_solve=is_path_solve,
+                                                                                    solution_tree_buffers=solution_tree_buffers  )
+        # save in index
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.PREFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
+
+    def add_postflop_solution_tree_from_buffers(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                        is_path_solve: bool,
+                                                                                        solution_tree_buffers: typing.Iterable[memoryview],
+                                                                                        solver_config_fingerprint: typing.Optional[str] = None):
+        index_entry = SolutionTreeStoreImpl.add_postflop_solution_tree_from_buffers(store_path=self.store_path(),
+                                                                                    solver_config_dict=solver_config_dict,
+                                                                                    action_sequence=action_sequence,
+                                                                                    is_path_solve=is_path_solve,
+                                                                                    solution_tree_buffers=solution_tree_buffers  )
+        # save in index
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.POSTFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
+
+    def add_index_entries(self, index_entries: typing.Iterable[SolutionTreeStoreIndexEntry]):
+        """Bulk add entries for blobs that were already written to this store, e.g. by worker processes"""
+        for index_entry in index_entries:
+            self._add_index_entry(index_entry)
+
     def add_preflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
                                                                             is_path_solve: bool,
-                                                                            solution_tree: SolutionTree):
-        index_entry = SolutionTreeStoreImpl.add_preflop_solution_tree_from_path(store_path=self.store_path(),
-                                                                                solver_config_dict=solver_config_dict,
-                                                                                action_sequence=action_sequence,
-                                                                                is_path_solve=is_path_solve,
-                                                                                solution_tree=solution_tree)
+                                                                            solution_tree: SolutionTree,
+                                                                            solver_config_fingerprint: typing.Optional[str] = None):
+        index_entry = SolutionTreeStoreImpl.add_preflop_solution_tree(  store_path=self.store_path(),
+                                                                        solver_config_dict=solver_config_dict,
+                                                                        action_sequence=action_sequence,
+                                                                        is_path_solve=is_path_solve,
+                                                                        solution_tree=solution_tree )
         # save in index
-        self._index.add_entry(index_entry)
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.PREFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
 
     def add_postflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
                                                                             is_path_solve: bool,
-                                                                            solution_tree: SolutionTree):
+                                                                            solution_tree: SolutionTree,
+                                                                            solver_config_fingerprint: typing.Optional[str] = None):
         index_entry = SolutionTreeStoreImpl.add_postflop_solution_tree( store_path=self.store_path(),
                                                                         solver_config_dict=solver_config_dict,
                                                                         action_sequence=action_sequence,
                                                                         is_path_solve=is_path_solve,
                                                                         solution_tree=solution_tree )
         # save in index
-        self._index.add_entry(index_entry)
+        self._add_index_entries_for_solve(  index_entry=index_entry,
+                                            solver_type=SolverType.POSTFLOP,
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve,
+                                            solver_config_fingerprint=solver_config_fingerprint  )
 
 
     def save_index(self):
-        SolutionTreeStoreImpl.add_solution_tree_store_index(store_path=self.store_path(), solution_tree_store_index=self.index())
-
-    def rebuild_index(self):
-        self._index = SolutionTreeStoreImpl.create_index(store_path=self.store_path())
+        with self._index_lock:
+            SolutionTreeStoreImpl.add_solution_tree_store_index(store_path=self.store_path(), solution_tree_store_index=self.index())
+            # everything in our journal is in the saved index now
+            if self._writer_id is not None:
+                SolutionTreeStoreJournal.clear(store_path=self.store_path(), writer_id=self._writer_id)
+
+    def reload_index(self):
+        """Pick up the entries that other writers have added since this store was loaded"""
+        with self._index_lock:
+            self._index = SolutionTreeStoreIndex.merge( self._index,
+                                                        SolutionTreeStoreImpl.load_and_merge_indexes(self.store_path()) )
+            self._field_index = None
+
+    def rebuild_index(self, with_fingerprint_keys: bool = False):
+        with self._index_lock:
+            # the blobs on disk are the source of truth, so bring the manifests back in line with them first
+            SolutionTreeStoreImpl.rebuild_manifests(store_path=self.store_path())
+            self._index = SolutionTreeStoreImpl.create_index(store_path=self.store_path(), with_fingerprint_keys=with_fingerprint_keys)
+            self._field_index = None
 
     def clean_up_indexes(self):
-        SolutionTreeStoreImpl.remove_small_indexes(store_path=self.store_path(), size_threshold=self.index().size())
+        SolutionTreeStoreImpl.remove_indexes_covered_by(store_path=self.store_path(), solution_tree_store_index=self.index())
 
     def get_solution_tree(self, key: str) -> SolutionTree:
+        if self._prefetcher is not None:
+            return self._prefetcher.get_solution_tree(key)
+        return self._load_solution_tree(key)
+
+    def _load_solution_tree(self, key: str, record_access: bool = True) -> SolutionTree:
+        if self._hot_tier is not None:
+            return self._hot_tier.get_solution_tree(key, record_access=record_access)
         return SolutionTreeStoreImpl.get_solution_tree(store_path=self.store_path(), key=key)
 
+    def _prefetch_solution_tree(self, key: str) -> SolutionTree:
+        # a prediction, which may well be wrong, does not count towards promotion to the hot tier
+        return self._load_solution_tree(key, record_access=False)
+
+    def _record_solution_tree_access(self, key: str):
+        # a read served by the prefetcher still counts
+        if self._hot_tier is not None:
+            self._hot_tier.record_access(key)
+
+    def get_solution_tree_path(self, key: str, action_sequence: ActionSequence) -> SolutionTree:
+        return SolutionTreeStoreImpl.get_solution_tree_path(store_path=self.store_path(), key=key, action_sequence=action_sequence)
+
+    def _gen_entries_for_index_key(self, index_key: str) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
+        try:
+            yield from self.index().gen_entries_for_key(index_key)
+        except ValueError:
+            # no entries for this key
+            return
+
+    def _resolve_solution_tree(self, create_index_key: typing.Callable[..., str],
+                                                                                    action_sequence: ActionSequence,
+                                                                                    is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        # an exact match
+        for entry in self._gen_entries_for_index_key(create_index_key(is_path_solve=is_path_solve, action_sequence=action_sequence)):
+            return self.get_solution_tree(key=entry.solution_tree_key())
+        if not is_path_solve:
+            return None
+        # otherwise a subtree solve from the root of the game holds every node of the path. A subtree solve rooted further
+        # down the path cannot answer it, it lacks the nodes above its root and its node action sequences start at its root
+        for entry in self._gen_entries_for_index_key(create_index_key(is_path_solve=False, action_sequence=ActionSequence.create_empty())):
+            try:
+                return self.get_solution_tree_path(key=entry.solution_tree_key(), action_sequence=action_sequence)
+            except ValueError:
+                # the subtree does not reach deep enough along this path
+                logger.info(f"Subtree solve `{entry.solution_tree_key()}` does not cover the path `{action_sequence}`")
+        return None
+
+    def resolve_preflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                        is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        """Find a stored solve that answers the request, or None if it still has to be solved
+
+        A path request is also answered from a subtree solve with the same config, rooted at the start of the game.
+        """
+        return self._resolve_solution_tree(create_index_key=functools.partial(SolutionTreeStoreIndex.create_preflop_index_key, solver_config_dict=solver_config_dict),
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve)
+
+    def resolve_postflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                        is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        """Find a stored solve that answers the request, or None if it still has to be solved
+
+        A path request is also answered from a subtree solve with the same config, rooted at the start of the game.
+        """
+        return self._resolve_solution_tree(create_index_key=functools.partial(SolutionTreeStoreIndex.create_postflop_index_key, solver_config_dict=solver_config_dict),
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve)
+
+    def resolve_preflop_solution_tree_from_fingerprint(self, solver_config_fingerprint: str, action_sequence: ActionSequence,
+                                                                                                is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        """Like resolve_preflop_solution_tree(), for solves that were indexed with the fingerprint() of their config"""
+        return self._resolve_solution_tree(create_index_key=functools.partial(SolutionTreeStoreIndex.create_preflop_fingerprint_index_key, solver_config_fingerprint=solver_config_fingerprint),
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve)
+
+    def resolve_postflop_solution_tree_from_fingerprint(self, solver_config_fingerprint: str, action_sequence: ActionSequence,
+                                                                                                is_path_solve: bool) -> typing.Optional[SolutionTree]:
+        """Like resolve_postflop_solution_tree(), for solves that were indexed with the fingerprint() of their config"""
+        return self._resolve_solution_tree(create_index_key=functools.partial(SolutionTreeStoreIndex.create_postflop_fingerprint_index_key, solver_config_fingerprint=solver_config_fingerprint),
+                                            action_sequence=action_sequence,
+                                            is_path_solve=is_path_solve)
+
     def get_solution_tree_meta(self, key: str) -> SolutionTreeMeta:
         return SolutionTreeStoreImpl.get_solution_tree_meta(store_path=self.store_path(), key=key)
 
+    def get_solution_tree_stats(self, key: str) -> typing.Optional[SolutionTreeStats]:
+        """Size and shape of a tree from the index, so budgets can be checked before reading it"""
+        return self.index().get_stats(key)
+
     def get_preflop_solver_config_dict(self, key: str) -> dict:
         return SolutionTreeStoreImpl.get_preflop_solver_config_dict(store_path=self.store_path(), key=key)
 
@@ -373,9 +956,27 @@ class SolutionTreeStore:
 
 
     @classmethod
-    def create_from_directory(cls, store_path: pathlib.Path) -> SolutionTreeStore:
+    def create_from_directory(cls, store_path: pathlib.Path, writer_id: typing.Optional[str] = None) -> SolutionTreeStore:
+        return cls( store_path=store_path,
+                    index=SolutionTreeStoreImpl.load_and_merge_indexes(store_path),
+                    writer_id=writer_id )
+
+    @classmethod
+    def create_for_writer(cls, store_path: pathlib.Path, writer_id: typing.Optional[str] = None) -> SolutionTreeStore:
+        """Open a store that other processes may be writing to at the same time, creating it if it is empty
+
+        Each added entry is appended to this writer's own journal, see SolutionTreeStoreJournal.
+        """
+        if not store_path.is_dir():
+            raise ValueError(f"Cannot open {cls.__name__} in non-directory `{store_path}` !")
+        SolutionTreeStoreImpl.ensure_valid_store_path(store_path)
+        try:
+            index = SolutionTreeStoreImpl.load_and_merge_indexes(store_path)
+        except ValueError:
+            index = SolutionTreeStoreIndex.create_empty()
         return cls( store_path=store_path,
-                    index=SolutionTreeStoreImpl.load_and_merge_indexes(store_path) )
+                    index=index,
+                    writer_id=(writer_id if (writer_id is not None) else SolutionTreeStoreJournal.create_writer_id()) )
 
     @classmethod
     def create_empty(cls, store_path: pathlib.Path) -> SolutionTreeStore:
@@ -395,9 +996,9 @@ class SolutionTreeStore:
 
 
     @classmethod
-    def create_from_directory_and_rebuild_index(cls, store_path: pathlib.Path) -> SolutionTreeStore:
+    def create_from_directory_and_rebuild_index(cls, store_path: pathlib.Path, with_fingerprint_keys: bool = False) -> SolutionTreeStore:
         result = cls(   store_path=store_path,
                         index=SolutionTreeStoreIndex.create_empty()  )
-        result.rebuild_index()
+        result.rebuild_index(with_fingerprint_keys=with_fingerprint_keys)
         result.save_index()
         return result
\ No newline at end of file
@@ -0,0 +1,256 @@
+from __future__ import annotations
+import typing
+import pathlib
+import tempfile
+import random
+import time
+import json
+import logging
+from titan.solver_util.spot_models import (
+    ActionSequence
+)
+from titan.solver_util.solution_tree import (
+    SolutionTree,
+    RandomValueFactory
+)
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.solution_tree_writer import (
+    SolutionTreeWriter
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl,
+    SolutionTreeStore
+)
+from titan.solver_util.solution_tree_store.solution_tree_store_sync import (
+    SolutionTreeStoreSync
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeStoreBenchmarkResult:
+    """Throughput and latency of one operation, at one store size"""
+
+    __slots__ = (   '_operation',
+                    '_store_size',
+                    '_num_ops',
+                    '_total_seconds',
+                    '_latency_seconds'  )
+
+    def __init__(self, operation: str, store_size: int, num_ops: int, total_seconds: float, latency_seconds: typing.Dict[str, float]):
+        self._operation = operation
+        self._store_size = store_size
+        self._num_ops = num_ops
+        self._total_seconds = total_seconds
+        self._latency_seconds = latency_seconds
+
+    def operation(self) -> str:
+        return self._operation
+
+    def store_size(self) -> int:
+        return self._store_size
+
+    def num_ops(self) -> int:
+        return self._num_ops
+
+    def total_seconds(self) -> float:
+        return self._total_seconds
+
+    def ops_per_second(self) -> float:
+        return (self._num_ops / self._total_seconds) if (self._total_seconds > 0) else float('inf')
+
+    def latency_seconds(self) -> typing.Dict[str, float]:
+        """The p50, p95 and max latency of a single op"""
+        return self._latency_seconds
+
+    def name(self) -> str:
+        return f"{self._operation}@{self._store_size}"
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'operation': self.operation(),
+            'store_size': self.store_size(),
+            'num_ops': self.num_ops(),
+            'total_seconds': self.total_seconds(),
+            'ops_per_second': self.ops_per_second(),
+            'latency_seconds': dict(self.latency_seconds())
+        }
+
+    @classmethod
+    def create_from_dict(cls, some_dict: dict) -> SolutionTreeStoreBenchmarkResult:
+        return SolutionTreeStoreBenchmarkResult(operation=some_dict['operation'],
+                                                store_size=some_dict['store_size'],
+                                                num_ops=some_dict['num_ops'],
+                                                total_seconds=some_dict['total_seconds'],
+                                                latency_seconds=dict(some_dict['latency_seconds'])  )
+
+    @classmethod
+    def create_from_latencies(cls, operation: str, store_size: int, latencies: typing.Sequence[float]) -> SolutionTreeStoreBenchmarkResult:
+        if not latencies:
+            raise ValueError(f"{cls.__name__} cannot create a result for `{operation}` without any latencies !")
+        sorted_latencies = sorted(latencies)
+        percentile = lambda p: sorted_latencies[min(len(sorted_latencies) - 1, int(p * len(sorted_latencies)))]
+        return SolutionTreeStoreBenchmarkResult(operation=operation,
+                                                store_size=store_size,
+                                                num_ops=len(latencies),
+                                                total_seconds=sum(latencies),
+                                                latency_seconds={   'p50': percentile(0.50),
+                                                                    'p95': percentile(0.95),
+                                                                    'max': sorted_latencies[-1]  }  )
+
+
+class SolutionTreeStoreBenchmarkRegression:
+
+    __slots__ = (   '_name',
+                    '_baseline_ops_per_second',
+                    '_ops_per_second'  )
+
+    def __init__(self, name: str, baseline_ops_per_second: float, ops_per_second: float):
+        self._name = name
+        self._baseline_ops_per_second = baseline_ops_per_second
+        self._ops_per_second = ops_per_second
+
+    def name(self) -> str:
+        return self._name
+
+    def baseline_ops_per_second(self) -> float:
+        return self._baseline_ops_per_second
+
+    def ops_per_second(self) -> float:
+        return self._ops_per_second
+
+    def slowdown(self) -> float:
+        """How much slower than the baseline, e.g. 0.25 for 25% fewer ops per second"""
+        return 1.0 - (self._ops_per_second / self._baseline_ops_per_second)
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(name={self._name}, baseline_ops_per_second={self._baseline_ops_per_second:.1f}, " +
+                f"ops_per_second={self._ops_per_second:.1f}, slowdown={self.slowdown():.1%})")
+
+
+class SolutionTreeStoreBenchmark:
+    """Measure the throughput and latency of the store operations on stores of random trees
+
+    For each store size, a store is filled with that many random trees and then the add, get, key
+    enumeration, index rebuild and merge (i.e. a sync into an empty store) operations are timed on it.
+
+    The migration lives in a script rather than in this package, so it is only timed when migrate_fn is
+    given. It is called with the path of a store in the previous layout holding the same trees, and the
+    path of an empty output directory.
+    """
+
+    OPERATIONS = ('add', 'get', 'enumerate_keys', 'rebuild_index', 'merge', 'migrate')
+    DEFAULT_STORE_SIZES = (10, 100)
+    DEFAULT_TREE_HEIGHT = 2
+    DEFAULT_RANGE_SIZE = 100
+    DEFAULT_NUM_BET_SIZES = 2
+    DEFAULT_NUM_REPEATS = 5
+    DEFAULT_TOLERANCE = 0.2
+
+    @classmethod
+    def create_solver_config_dict(cls, tree_id: int) -> dict:
+        # the store never looks inside a config, so a distinct dict per tree is all that is needed
+        return {'benchmark_tree_id': tree_id, 'solving_time': 0}
+
+    @classmethod
+    def create_old_layout_store(cls, old_store_path: pathlib.Path, solution_trees: typing.Sequence[SolutionTree]):
+        """The layout before the blob store: a directory per solve, with the compressed tree next to a key.json"""
+        for tree_id, solution_tree in enumerate(solution_trees):
+            solve_path = old_store_path / f"solve-{tree_id}"
+            solve_path.mkdir(parents=True)
+            SolutionTreeWriter.write_compressed(solve_path / 'solution_tree.gz', solution_tree)
+            with open(solve_path / 'key.json', 'w') as f:
+                json.dump({ 'solver_type': 'POSTFLOP',
+                            'solve_mode': 'SUBTREE_SOLVE',
+                            'action_sequence': '',
+                            'solver_config': cls.create_solver_config_dict(tree_id)  }, f)
+
+    @classmethod
+    def time_op(cls, fn: typing.Callable[[], typing.Any]) -> float:
+        start_time = time.perf_counter()
+        fn()
+        return time.perf_counter() - start_time
+
+    @classmethod
+    def run_for_store_size(cls, working_path: pathlib.Path, store_size: int, tree_height: int, range_size: int,
+                                                                                                num_bet_sizes: int,
+                                                                                                num_repeats: int,
+                                                                                                migrate_fn: typing.Optional[typing.Callable[[pathlib.Path, pathlib.Path], typing.Any]] = None) -> typing.List[SolutionTreeStoreBenchmarkResult]:
+        solution_trees = [RandomValueFactory.create_solution_tree(  tree_height=tree_height,
+                                                                    range_size=range_size,
+                                                                    num_bet_sizes=num_bet_sizes  ) for _ in range(store_size)]
+        store_path = working_path / f"store-{store_size}"
+        store_path.mkdir()
+        store = SolutionTreeStore.create_empty(store_path=store_path)
+        latencies = {operation: [] for operation in cls.OPERATIONS}
+
+        for tree_id, solution_tree in enumerate(solution_trees):
+            latencies['add'].append(cls.time_op(lambda: store.add_postflop_solution_tree(   solver_config_dict=cls.create_solver_config_dict(tree_id),
+                                                                                            action_sequence=ActionSequence.create_empty(),
+                                                                                            is_path_solve=False,
+                                                                                            solution_tree=solution_tree  )))
+        store.save_index()
+
+        solution_tree_keys = [entry.solution_tree_key() for entry in store.index().gen_entries()]
+        random.shuffle(solution_tree_keys)
+        for solution_tree_key in solution_tree_keys:
+            latencies['get'].append(cls.time_op(lambda: store.get_solution_tree(solution_tree_key)))
+
+        for _ in range(num_repeats):
+            latencies['enumerate_keys'].append(cls.time_op(lambda: sum(1 for _ in BlobStore.gen_blob_keys(store_path, SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX))))
+            latencies['rebuild_index'].append(cls.time_op(store.rebuild_index))
+
+        for repeat in range(num_repeats):
+            dest_store_path = working_path / f"merge-{store_size}-{repeat}"
+            dest_store_path.mkdir()
+            latencies['merge'].append(cls.time_op(lambda: SolutionTreeStoreSync.sync(src_store_path=store_path, dest_store_path=dest_store_path)))
+
+        if migrate_fn is not None:
+            old_store_path = working_path / f"old-{store_size}"
+            cls.create_old_layout_store(old_store_path, solution_trees)
+            for repeat in range(num_repeats):
+                migrated_store_path = working_path / f"migrate-{store_size}-{repeat}"
+                migrated_store_path.mkdir()
+                latencies['migrate'].append(cls.time_op(lambda: migrate_fn(old_store_path, migrated_store_path)))
+        return [SolutionTreeStoreBenchmarkResult.create_from_latencies(operation, store_size, latencies[operation]) for operation in cls.OPERATIONS
+                    if latencies[operation]]
+
+    @classmethod
+    def run(cls, store_sizes: typing.Sequence[int] = DEFAULT_STORE_SIZES, tree_height: int = DEFAULT_TREE_HEIGHT,
+                                                                            range_size: int = DEFAULT_RANGE_SIZE,
+                                                                            num_bet_sizes: int = DEFAULT_NUM_BET_SIZES,
+                                                                            num_repeats: int = DEFAULT_NUM_REPEATS,
+                                                                            migrate_fn: typing.Optional[typing.Callable[[pathlib.Path, pathlib.Path], typing.Any]] = None) -> typing.List[SolutionTreeStoreBenchmarkResult]:
+        if any(store_size < 1 for store_size in store_sizes):
+            raise ValueError(f"{cls.__name__} store sizes must be at least 1 !")
+        results = []
+        with tempfile.TemporaryDirectory() as working_dir:
+            for store_size in store_sizes:
+                logger.info(f"Benchmarking a store of {store_size} trees")
+                results.extend(cls.run_for_store_size(  working_path=pathlib.Path(working_dir),
+                                                        store_size=store_size,
+                                                        tree_height=tree_height,
+                                                        range_size=range_size,
+                                                        num_bet_sizes=num_bet_sizes,
+                                                        num_repeats=num_repeats,
+                                                        migrate_fn=migrate_fn  ))
+        return results
+
+    @classmethod
+    def compare(cls, baseline_results: typing.Iterable[SolutionTreeStoreBenchmarkResult], results: typing.Iterable[SolutionTreeStoreBenchmarkResult],
+                                                                                            tolerance: float = DEFAULT_TOLERANCE) -> typing.List[SolutionTreeStoreBenchmarkRegression]:
+        """The results whose throughput dropped by more than tolerance, results missing from the baseline are ignored"""
+        baseline_lookup = {result.name(): result for result in baseline_results}
+        regressions = []
+        for result in results:
+            baseline_result = baseline_lookup.get(result.name())
+            if baseline_result is None:
+                continue
+            if result.ops_per_second() < (1.0 - tolerance) * baseline_result.ops_per_second():
+                regressions.append(SolutionTreeStoreBenchmarkRegression(name=result.name(),
+                                                                        baseline_ops_per_second=baseline_result.ops_per_second(),
+                                                                        ops_per_second=result.ops_per_second()  ))
+        return regressions
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import typing
+import math
+import logging
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreFields,
+    SolutionTreeStoreIndexEntry,
+    SolutionTreeStoreIndex
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeStoreFieldDistance:
+    """Configurable distance between the fields of two solves, where 0.0 means that they are interchangeable
+
+    Solves for a different solver type, solve mode or number of players are never interchangeable, so
+    their distance is infinite. Each weight is the cost of a single mismatch:
+        - community_card_weight: per community card that is not on both boards
+        - stack_size_weight: per player, scaled by the relative difference of their stack sizes
+        - big_blind_weight: scaled by the relative difference of the big blinds
+        - action_sequence_weight: per action sequence (of the spot or of a street) that differs
+        - player_range_weight: per player whose range differs
+    """
+
+    __slots__ = (   '_community_card_weight',
+                    '_stack_size_weight',
+                    '_big_blind_weight',
+                    '_action_sequence_weight',
+                    '_player_range_weight'  )
+
+    def __init__(self, community_card_weight: float = 100.0,
+                        stack_size_weight: float = 1.0,
+                        big_blind_weight: float = 1.0,
+                        action_sequence_weight: float = 10.0,
+                        player_range_weight: float = 1.0):
+        self._community_card_weight = community_card_weight
+        self._stack_size_weight = stack_size_weight
+        self._big_blind_weight = big_blind_weight
+        self._action_sequence_weight = action_sequence_weight
+        self._player_range_weight = player_range_weight
+
+    def community_card_weight(self) -> float:
+        return self._community_card_weight
+
+    def stack_size_weight(self) -> float:
+        return self._stack_size_weight
+
+    def big_blind_weight(self) -> float:
+        return self._big_blind_weight
+
+    def action_sequence_weight(self) -> float:
+        return self._action_sequence_weight
+
+    def player_range_weight(self) -> float:
+        return self._player_range_weight
+
+    @classmethod
+    def relative_difference(cls, a: int, b: int) -> float:
+        largest = max(abs(a), abs(b))
+        return (abs(a - b) / largest) if largest else 0.0
+
+    def distance(self, fields: SolutionTreeStoreFields, other: SolutionTreeStoreFields) -> float:
+        if ((fields.solver_type() != other.solver_type()) or
+                (fields.solve_mode() != other.solve_mode()) or
+                (len(fields.deal_order_stack_sizes()) != len(other.deal_order_stack_sizes())) or
+                (len(fields.range_fingerprints()) != len(other.range_fingerprints()))):
+            return math.inf
+        num_card_mismatches = len(fields.board().symmetric_difference(other.board()))
+        num_action_sequence_mismatches = sum(1 for a, b in zip( (fields.action_sequence(), *fields.street_action_sequences()),
+                                                                (other.action_sequence(), *other.street_action_sequences())  )
+                                                    if a != b)
+        num_range_mismatches = sum(1 for a, b in zip(fields.range_fingerprints(), other.range_fingerprints()) if a != b)
+        stack_size_difference = sum(self.relative_difference(a, b) for a, b in zip(fields.deal_order_stack_sizes(), other.deal_order_stack_sizes()))
+        return ((self._community_card_weight * num_card_mismatches) +
+                (self._action_sequence_weight * num_action_sequence_mismatches) +
+                (self._player_range_weight * num_range_mismatches) +
+                (self._stack_size_weight * stack_size_difference) +
+                (self._big_blind_weight * self.relative_difference(fields.big_blind_amount(), other.big_blind_amount())))
+
+
+
+class SolutionTreeStoreNearestMatch:
+
+    __slots__ = (   '_index_entry',
+                    '_fields',
+                    '_distance'  )
+
+    def __init__(self, index_entry: SolutionTreeStoreIndexEntry, fields: SolutionTreeStoreFields, distance: float):
+        self._index_entry = index_entry
+        self._fields = fields
+        self._distance = distance
+
+    def index_entry(self) -> SolutionTreeStoreIndexEntry:
+        return self._index_entry
+
+    def fields(self) -> SolutionTreeStoreFields:
+        return self._fields
+
+    def distance(self) -> float:
+        return self._distance
+
+    def solution_tree_key(self) -> str:
+        return self._index_entry.solution_tree_key()
+
+
+
+class SolutionTreeStoreFieldIndex:
+    """Secondary indexes from extracted config fields to the index entries of a store
+
+    The primary index only hits when the whole solver config matches. These indexes answer queries on
+    single fields, and find_nearest ranks the stored solves by a SolutionTreeStoreFieldDistance.
+    """
+
+    BOARD = 'board'
+    DEAL_ORDER_STACK_SIZES = 'deal_order_stack_sizes'
+    ACTION_SEQUENCE = 'action_sequence'
+    STREET_ACTION_SEQUENCES = 'street_action_sequences'
+    BIG_BLIND_AMOUNT = 'big_blind_amount'
+    RANGE_FINGERPRINT = 'range_fingerprint'
+    SOLVER_TYPE = 'solver_type'
+
+    FIELD_NAMES = ( BOARD,
+                    DEAL_ORDER_STACK_SIZES,
+                    ACTION_SEQUENCE,
+                    STREET_ACTION_SEQUENCES,
+                    BIG_BLIND_AMOUNT,
+                    RANGE_FINGERPRINT,
+                    SOLVER_TYPE  )
+
+    __slots__ = (   '_fields_by_entry',
+                    '_entries_by_field_value'  )
+
+    def __init__(self):
+        self._fields_by_entry = {}
+        self._entries_by_field_value = {field_name: {} for field_name in self.FIELD_NAMES}
+
+    @classmethod
+    def field_values(cls, fields: SolutionTreeStoreFields) -> typing.Dict[str, typing.Hashable]:
+        return {
+            cls.BOARD: fields.board(),
+            cls.DEAL_ORDER_STACK_SIZES: fields.deal_order_stack_sizes(),
+            cls.ACTION_SEQUENCE: fields.action_sequence(),
+            cls.STREET_ACTION_SEQUENCES: fields.street_action_sequences(),
+            cls.BIG_BLIND_AMOUNT: fields.big_blind_amount(),
+            cls.RANGE_FINGERPRINT: fields.range_fingerprint(),
+            cls.SOLVER_TYPE: fields.solver_type()
+        }
+
+    def size(self) -> int:
+        return len(self._fields_by_entry)
+
+    def add_entry(self, index_entry: SolutionTreeStoreIndexEntry, fields: SolutionTreeStoreFields):
+        if index_entry in self._fields_by_entry:
+            return
+        self._fields_by_entry[index_entry] = fields
+        for field_name, value in self.field_values(fields).items():
+            try:
+                self._entries_by_field_value[field_name][value].add(index_entry)
+            except KeyError:
+                self._entries_by_field_value[field_name][value] = {index_entry}
+
+    def fields_for_entry(self, index_entry: SolutionTreeStoreIndexEntry) -> SolutionTreeStoreFields:
+        try:
+            return self._fields_by_entry[index_entry]
+        except KeyError:
+            raise ValueError(f"No fields for index entry with solution_tree_key `{index_entry.solution_tree_key()}` !")
+
+    def gen_entries(self) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
+        yield from self._fields_by_entry.keys()
+
+    def find(self, **field_values) -> typing.FrozenSet[SolutionTreeStoreIndexEntry]:
+        """Return the entries that match all the given field values, e.g. find(board=frozenset(('2s', '5d', 'Jh')))"""
+        result = None
+        for field_name, value in field_values.items():
+            if field_name not in self._entries_by_field_value:
+                raise ValueError(f"{type(self).__name__}.find() Unknown field `{field_name}`, expected one of {self.FIELD_NAMES}")
+            matches = self._entries_by_field_value[field_name].get(value, set())
+            result = (set(matches) if (result is None) else (result & matches))
+            if not result:
+                break
+        return frozenset(self._fields_by_entry.keys() if (result is None) else result)
+
+    def find_nearest(self, fields: SolutionTreeStoreFields,
+                            distance: typing.Optional[SolutionTreeStoreFieldDistance] = None,
+                            max_results: int = 10,
+                            same_board_only: bool = True) -> typing.Tuple[SolutionTreeStoreNearestMatch, ...]:
+        """Rank the stored solves by their distance to fields, closest first
+
+        With same_board_only, the candidates are narrowed down by the board index before measuring any distance.
+        """
+        distance = distance if distance else SolutionTreeStoreFieldDistance()
+        if same_board_only:
+            candidates = self.find(board=fields.board(), solver_type=fields.solver_type())
+        else:
+            candidates = self.find(solver_type=fields.solver_type())
+        matches = []
+        for index_entry in candidates:
+            candidate_fields = self._fields_by_entry[index_entry]
+            d = distance.distance(fields, candidate_fields)
+            if d < math.inf:
+                matches.append(SolutionTreeStoreNearestMatch(index_entry=index_entry, fields=candidate_fields, distance=d))
+        matches.sort(key=lambda match: (match.distance(), match.index_entry().serialize_to_tuple()))
+        return tuple(matches[:max_results])
+
+    @classmethod
+    def create_empty(cls) -> SolutionTreeStoreFieldIndex:
+        return cls()
+
+    @classmethod
+    def create_from_index(cls, index: SolutionTreeStoreIndex) -> SolutionTreeStoreFieldIndex:
+        """The fields are saved with the index entries, so no meta or config blob is read
+
+        Entries under fingerprint keys have no fields, they duplicate an entry under the key of the config dict.
+        Entries that were indexed before fields were recorded are left out too, rebuild the index to add them.
+        """
+        result = cls.create_empty()
+        num_entries_without_fields = 0
+        for index_entry in index.gen_entries():
+            if index_entry.fields() is not None:
+                result.add_entry(index_entry=index_entry, fields=index_entry.fields())
+            else:
+                num_entries_without_fields += 1
+        if num_entries_without_fields:
+            logger.info(f"{cls.__name__} left out {num_entries_without_fields} index entries without fields")
+        return result
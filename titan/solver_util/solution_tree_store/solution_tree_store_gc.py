@@ -0,0 +1,188 @@
+from __future__ import annotations
+import typing
+import pathlib
+import logging
+import time
+import concurrent.futures
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreIndex
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+from titan.solver_util.solution_tree_store.store_lock import (
+    StoreLock
+)
+from titan.solver_util.solution_tree_store.solution_tree_hot_tier import (
+    SolutionTreeHotTier
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeStoreGcReport:
+
+    __slots__ = (   '_is_dry_run',
+                    '_num_unreachable_blobs',
+                    '_num_unreachable_bytes',
+                    '_num_blobs_deleted',
+                    '_num_index_blobs_compacted'  )
+
+    def __init__(self, is_dry_run: bool, num_unreachable_blobs: typing.Dict[str, int], num_unreachable_bytes: typing.Dict[str, int],
+                                                                                        num_blobs_deleted: typing.Dict[str, int],
+                                                                                        num_index_blobs_compacted: int):
+        self._is_dry_run = is_dry_run
+        self._num_unreachable_blobs = num_unreachable_blobs
+        self._num_unreachable_bytes = num_unreachable_bytes
+        self._num_blobs_deleted = num_blobs_deleted
+        self._num_index_blobs_compacted = num_index_blobs_compacted
+
+    def is_dry_run(self) -> bool:
+        return self._is_dry_run
+
+    def num_unreachable_blobs(self) -> typing.Dict[str, int]:
+        return self._num_unreachable_blobs
+
+    def num_unreachable_bytes(self) -> typing.Dict[str, int]:
+        return self._num_unreachable_bytes
+
+    def num_blobs_deleted(self) -> typing.Dict[str, int]:
+        return self._num_blobs_deleted
+
+    def num_index_blobs_compacted(self) -> int:
+        """Index blobs merged into the snapshot (or that would be, in a dry run)"""
+        return self._num_index_blobs_compacted
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'is_dry_run': self.is_dry_run(),
+            'num_unreachable_blobs': dict(self.num_unreachable_blobs()),
+            'num_unreachable_bytes': dict(self.num_unreachable_bytes()),
+            'num_blobs_deleted': dict(self.num_blobs_deleted()),
+            'num_index_blobs_compacted': self.num_index_blobs_compacted()
+        }
+
+
+
+class SolutionTreeStoreGc:
+    """Delete the blobs of a store that its live index (index blobs and journals) does not reach
+
+    Writers add blobs before their index entry, so a blob that was written less than min_age_seconds ago
+    is never swept: its entry may still be on its way.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_MIN_AGE_SECONDS = 3600
+
+    # order matters: metas go first, so that a reader never finds a meta whose tree or config is gone
+    SWEPT_BLOB_PREFIXES = ( SolutionTreeStoreImpl.SOLUTION_TREE_META_PREFIX,
+                            SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX,
+                            SolutionTreeStoreImpl.PREFLOP_SOLVER_CONFIG_PREFIX,
+                            SolutionTreeStoreImpl.POSTFLOP_SOLVER_CONFIG_PREFIX  )
+
+    @classmethod
+    def load_live_index(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
+        try:
+            return SolutionTreeStoreImpl.load_and_merge_indexes(store_path)
+        except ValueError:
+            return SolutionTreeStoreIndex.create_empty()
+
+    @classmethod
+    def mark(cls, store_path: pathlib.Path, live_index: SolutionTreeStoreIndex) -> typing.Dict[str, typing.FrozenSet[str]]:
+        """The keys reachable from the live index, for each swept blob prefix"""
+        live_key_pairs = {(entry.solution_tree_key(), entry.solver_config_key()) for entry in live_index.gen_entries()}
+        solver_config_keys = frozenset(solver_config_key for _, solver_config_key in live_key_pairs)
+        live_meta_keys = set()
+        for solution_tree_meta_key in BlobStore.gen_blob_keys(store_path, SolutionTreeStoreImpl.SOLUTION_TREE_META_PREFIX):
+            solution_tree_meta = SolutionTreeStoreImpl.get_solution_tree_meta(store_path, solution_tree_meta_key)
+            if (solution_tree_meta.solution_tree_key(), solution_tree_meta.solver_config_key()) in live_key_pairs:
+                live_meta_keys.add(solution_tree_meta_key)
+        return {
+            SolutionTreeStoreImpl.SOLUTION_TREE_META_PREFIX: frozenset(live_meta_keys),
+            SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX: frozenset(solution_tree_key for solution_tree_key, _ in live_key_pairs),
+            # an entry does not say whether its config is preflop or postflop, a key in either is kept
+            SolutionTreeStoreImpl.PREFLOP_SOLVER_CONFIG_PREFIX: solver_config_keys,
+            SolutionTreeStoreImpl.POSTFLOP_SOLVER_CONFIG_PREFIX: solver_config_keys
+        }
+
+    @classmethod
+    def gen_unreachable_blobs(cls, store_path: pathlib.Path, blob_prefix: str, live_keys: typing.FrozenSet[str],
+                                                                                min_age_seconds: float) -> typing.Iterator[typing.Tuple[str, int]]:
+        """Yield (blob_key, num_bytes) of the unreachable blobs that are old enough to be swept"""
+        max_mtime = time.time() - min_age_seconds
+        for blob_key in BlobStore.gen_blob_keys(store_path, blob_prefix):
+            if blob_key in live_keys:
+                continue
+            try:
+                blob_stat = BlobStore.get_blob_path(store_path, blob_prefix, blob_key).stat()
+            except (ValueError, FileNotFoundError):
+                # deleted in the meantime
+                continue
+            if blob_stat.st_mtime <= max_mtime:
+                yield (blob_key, blob_stat.st_size)
+
+    @classmethod
+    def find_index_keys_covered_by(cls, store_path: pathlib.Path, live_index: SolutionTreeStoreIndex) -> typing.Tuple[str, ...]:
+        """The index blobs whose entries are all in the live index, apart from its own snapshot"""
+        snapshot_key = SolutionTreeStoreImpl.compute_dict_hash(live_index.serialize_to_dict())
+        return tuple(   index_key for index_key in BlobStore.gen_blob_keys(store_path, SolutionTreeStoreImpl.INDEX_PREFIX)
+                        if (index_key != snapshot_key) and
+                            (SolutionTreeStoreIndex.difference( SolutionTreeStoreImpl.get_solution_tree_store_index(store_path, index_key),
+                                                                live_index  ).size() == 0)  )
+
+    @classmethod
+    def compact_indexes(cls, store_path: pathlib.Path, live_index: SolutionTreeStoreIndex,
+                                                        executor: concurrent.futures.Executor) -> int:
+        """Save the live index as a single snapshot blob and delete the index blobs that it covers
+
+        Returns:
+            The number of index blobs deleted
+        """
+        SolutionTreeStoreImpl.add_solution_tree_store_index(store_path=store_path, solution_tree_store_index=live_index)
+        with StoreLock.acquire_exclusive(store_path, SolutionTreeStoreImpl.INDEX_LOCK_NAME):
+            # index blobs saved by writers since the live index was loaded are not covered, so they are kept
+            covered_index_keys = cls.find_index_keys_covered_by(store_path, live_index)
+            return BlobStore.delete_blobs(store_path, SolutionTreeStoreImpl.INDEX_PREFIX, covered_index_keys, executor)
+
+    @classmethod
+    def collect(cls, store_path: pathlib.Path, dry_run: bool = False,
+                                                min_age_seconds: float = DEFAULT_MIN_AGE_SECONDS,
+                                                max_workers: int = DEFAULT_MAX_WORKERS) -> SolutionTreeStoreGcReport:
+        SolutionTreeStoreImpl.ensure_valid_store_path(store_path)
+        live_index = cls.load_live_index(store_path)
+        if (live_index.size() == 0) and (not dry_run):
+            # most likely an index that was never saved, rather than a store where nothing is reachable
+            raise ValueError(f"{cls.__name__} refusing to collect `{store_path}` since it has no index entries, rebuild its index first !")
+        live_keys_by_prefix = cls.mark(store_path, live_index)
+        logger.info(f"Marked the blobs of {live_index.size()} live index entries in `{store_path}`")
+
+        num_unreachable_blobs, num_unreachable_bytes, num_blobs_deleted = {}, {}, {}
+        hot_tier = SolutionTreeHotTier(store_path=store_path, blob_prefix=SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if dry_run:
+                num_index_blobs_compacted = len(cls.find_index_keys_covered_by(store_path, live_index))
+            else:
+                num_index_blobs_compacted = cls.compact_indexes(store_path, live_index, executor)
+            for blob_prefix in cls.SWEPT_BLOB_PREFIXES:
+                if not (store_path / blob_prefix).is_dir():
+                    continue
+                unreachable_blobs = tuple(cls.gen_unreachable_blobs(store_path, blob_prefix, live_keys_by_prefix[blob_prefix], min_age_seconds))
+                num_unreachable_blobs[blob_prefix] = len(unreachable_blobs)
+                num_unreachable_bytes[blob_prefix] = sum(num_bytes for _, num_bytes in unreachable_blobs)
+                logger.info(f"Found {len(unreachable_blobs)} unreachable `{blob_prefix}` blobs ({num_unreachable_bytes[blob_prefix]} bytes)")
+                if dry_run:
+                    continue
+                unreachable_keys = tuple(blob_key for blob_key, _ in unreachable_blobs)
+                num_blobs_deleted[blob_prefix] = BlobStore.delete_blobs(store_path, blob_prefix, unreachable_keys, executor)
+                if blob_prefix == SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX:
+                    for blob_key in unreachable_keys:
+                        hot_tier.demote(blob_key)
+        return SolutionTreeStoreGcReport(   is_dry_run=dry_run,
+                                            num_unreachable_blobs=num_unreachable_blobs,
+                                            num_unreachable_bytes=num_unreachable_bytes,
+                                            num_blobs_deleted=num_blobs_deleted,
+                                            num_index_blobs_compacted=num_index_blobs_compacted  )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+import typing
+import pathlib
+import os
+import json
+import socket
+import uuid
+import logging
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreIndexEntry,
+    SolutionTreeStoreIndex
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeStoreJournal:
+    """Per-writer append-only log of the index entries that a writer added to a store
+
+    Every writer process owns a single journal file, so appends never contend with other writers.
+    Readers merge the entries of all journals with the saved index blobs.
+    """
+
+    JOURNAL_DIR_NAME = '.journal'
+    JOURNAL_SUFFIX = '.jsonl'
+
+    @classmethod
+    def create_writer_id(cls) -> str:
+        return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    @classmethod
+    def journal_dir_path(cls, store_path: pathlib.Path) -> pathlib.Path:
+        return store_path / cls.JOURNAL_DIR_NAME
+
+    @classmethod
+    def journal_path(cls, store_path: pathlib.Path, writer_id: str) -> pathlib.Path:
+        return cls.journal_dir_path(store_path) / f"{writer_id}{cls.JOURNAL_SUFFIX}"
+
+    @classmethod
+    def append_entry(cls, store_path: pathlib.Path, writer_id: str, entry: SolutionTreeStoreIndexEntry):
+        journal_path = cls.journal_path(store_path, writer_id)
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        record = json.dumps({'index_key': entry.index_key(), **entry.serialize_to_dict()})
+        fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, f"{record}\n".encode('ascii'))
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def clear(cls, store_path: pathlib.Path, writer_id: str):
+        """Drop the journal of a writer, once its entries were saved in an index blob"""
+        cls.journal_path(store_path, writer_id).unlink(missing_ok=True)
+
+    @classmethod
+    def gen_journal_paths(cls, store_path: pathlib.Path) -> typing.Iterator[pathlib.Path]:
+        journal_dir_path = cls.journal_dir_path(store_path)
+        if journal_dir_path.is_dir():
+            yield from sorted(journal_dir_path.glob(f"*{cls.JOURNAL_SUFFIX}"))
+
+    @classmethod
+    def gen_entries_from_path(cls, journal_path: pathlib.Path) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
+        try:
+            with open(journal_path, 'rb') as f:
+                journal_bytes = f.read()
+        except FileNotFoundError:
+            # cleared by its writer since it was listed
+            return
+        # ignore a trailing record that is still being written
+        num_complete_bytes = journal_bytes.rfind(b'\n') + 1
+        for record in journal_bytes[:num_complete_bytes].decode('ascii').splitlines():
+            entry_dict = json.loads(record)
+            yield SolutionTreeStoreIndexEntry.create_from_dict(entry_dict['index_key'], entry_dict)
+
+    @classmethod
+    def gen_entries(cls, store_path: pathlib.Path) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
+        for journal_path in cls.gen_journal_paths(store_path):
+            yield from cls.gen_entries_from_path(journal_path)
+
+    @classmethod
+    def load_index(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
+        return SolutionTreeStoreIndex.create_from_entries(cls.gen_entries(store_path))
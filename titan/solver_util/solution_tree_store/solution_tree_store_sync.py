@@ -0,0 +1,160 @@
+from __future__ import annotations
+import typing
+import pathlib
+import logging
+import concurrent.futures
+from titan.solver_util.solution_tree_store.blob_store import (
+    BlobStore
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreIndex
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class BlobKeyManifest:
+    """The set of blob keys that a store holds for a single blob prefix"""
+
+    __slots__ = (   '_blob_prefix',
+                    '_blob_keys'  )
+
+    def __init__(self, blob_prefix: str, blob_keys: typing.FrozenSet[str]):
+        self._blob_prefix = blob_prefix
+        self._blob_keys = blob_keys
+
+    def blob_prefix(self) -> str:
+        return self._blob_prefix
+
+    def blob_keys(self) -> typing.FrozenSet[str]:
+        return self._blob_keys
+
+    def size(self) -> int:
+        return len(self._blob_keys)
+
+    def missing_from(self, other: BlobKeyManifest) -> typing.Tuple[str, ...]:
+        """Return the keys of this manifest that the other manifest does not have"""
+        if self.blob_prefix() != other.blob_prefix():
+            raise ValueError(f"Cannot compare manifests for different blob prefixes `{self.blob_prefix()}` and `{other.blob_prefix()}` !")
+        return tuple(sorted(self._blob_keys - other.blob_keys()))
+
+    @classmethod
+    def create_from_store(cls, store_path: pathlib.Path, blob_prefix: str) -> BlobKeyManifest:
+        return cls( blob_prefix=blob_prefix,
+                    blob_keys=frozenset(BlobStore.gen_blob_keys(store_path, blob_prefix)) )
+
+
+
+class SolutionTreeStoreSyncReport:
+
+    __slots__ = (   '_num_blobs_copied',
+                    '_num_index_entries_merged'  )
+
+    def __init__(self, num_blobs_copied: typing.Dict[str, int], num_index_entries_merged: int):
+        self._num_blobs_copied = num_blobs_copied
+        self._num_index_entries_merged = num_index_entries_merged
+
+    def num_blobs_copied(self) -> typing.Dict[str, int]:
+        return self._num_blobs_copied
+
+    def num_index_entries_merged(self) -> int:
+        return self._num_index_entries_merged
+
+    def is_empty(self) -> bool:
+        return (sum(self._num_blobs_copied.values()) == 0) and (self._num_index_entries_merged == 0)
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'num_blobs_copied': dict(self.num_blobs_copied()),
+            'num_index_entries_merged': self.num_index_entries_merged()
+        }
+
+    @classmethod
+    def merge(cls, *reports: SolutionTreeStoreSyncReport) -> SolutionTreeStoreSyncReport:
+        num_blobs_copied = {}
+        for report in reports:
+            for blob_prefix, count in report.num_blobs_copied().items():
+                num_blobs_copied[blob_prefix] = num_blobs_copied.get(blob_prefix, 0) + count
+        return cls( num_blobs_copied=num_blobs_copied,
+                    num_index_entries_merged=sum(report.num_index_entries_merged() for report in reports) )
+
+
+
+class SolutionTreeStoreSync:
+    """Copy whatever one SolutionTreeStore directory has that another is missing
+
+    Only plain filesystem access is needed, so the stores can live on local disks or network mounts.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+
+    # order matters: a blob is only copied after everything it refers to, so that a
+    # reader of the destination store never finds a dangling key
+    SYNCED_BLOB_PREFIXES = (    SolutionTreeStoreImpl.SOLUTION_TREE_PREFIX,
+                                SolutionTreeStoreImpl.PREFLOP_SOLVER_CONFIG_PREFIX,
+                                SolutionTreeStoreImpl.POSTFLOP_SOLVER_CONFIG_PREFIX,
+                                SolutionTreeStoreImpl.SOLUTION_TREE_META_PREFIX  )
+
+    @classmethod
+    def load_index_or_empty(cls, store_path: pathlib.Path) -> SolutionTreeStoreIndex:
+        try:
+            return SolutionTreeStoreImpl.load_and_merge_indexes(store_path)
+        except ValueError:
+            return SolutionTreeStoreIndex.create_empty()
+
+    @classmethod
+    def sync_blob_prefix(cls, src_store_path: pathlib.Path, dest_store_path: pathlib.Path,
+                                                            blob_prefix: str,
+                                                            executor: concurrent.futures.Executor) -> int:
+        src_manifest = BlobKeyManifest.create_from_store(src_store_path, blob_prefix)
+        dest_manifest = BlobKeyManifest.create_from_store(dest_store_path, blob_prefix)
+        missing_keys = src_manifest.missing_from(dest_manifest)
+        logger.info(f"Copying {len(missing_keys)} of {src_manifest.size()} `{blob_prefix}` blobs from `{src_store_path}` to `{dest_store_path}`")
+        copy_results = executor.map(lambda blob_key: BlobStore.copy_blob_to_store(  store_path=src_store_path,
+                                                                                    blob_prefix=blob_prefix,
+                                                                                    blob_key=blob_key,
+                                                                                    dest_store_path=dest_store_path  ),
+                                    missing_keys)
+        return sum(1 for was_copied in copy_results if was_copied)
+
+    @classmethod
+    def merge_index(cls, src_store_path: pathlib.Path, dest_store_path: pathlib.Path) -> int:
+        """Save the index entries of the source store that the destination is missing as a new index blob"""
+        missing_index = SolutionTreeStoreIndex.difference(  cls.load_index_or_empty(src_store_path),
+                                                            cls.load_index_or_empty(dest_store_path)  )
+        num_missing_entries = missing_index.size()
+        if num_missing_entries > 0:
+            SolutionTreeStoreImpl.add_solution_tree_store_index(store_path=dest_store_path,
+                                                                solution_tree_store_index=missing_index)
+        logger.info(f"Merged {num_missing_entries} index entries from `{src_store_path}` into `{dest_store_path}`")
+        return num_missing_entries
+
+    @classmethod
+    def sync(cls, src_store_path: pathlib.Path, dest_store_path: pathlib.Path,
+                                                max_workers: int = DEFAULT_MAX_WORKERS) -> SolutionTreeStoreSyncReport:
+        if src_store_path.resolve() == dest_store_path.resolve():
+            raise ValueError(f"{cls.__name__}.sync() Cannot sync store `{src_store_path}` with itself !")
+        SolutionTreeStoreImpl.ensure_valid_store_path(src_store_path)
+        SolutionTreeStoreImpl.ensure_valid_store_path(dest_store_path)
+        num_blobs_copied = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for blob_prefix in cls.SYNCED_BLOB_PREFIXES:
+                num_blobs_copied[blob_prefix] = cls.sync_blob_prefix(   src_store_path=src_store_path,
+                                                                        dest_store_path=dest_store_path,
+                                                                        blob_prefix=blob_prefix,
+                                                                        executor=executor  )
+        num_index_entries_merged = cls.merge_index(src_store_path=src_store_path, dest_store_path=dest_store_path)
+        return SolutionTreeStoreSyncReport( num_blobs_copied=num_blobs_copied,
+                                            num_index_entries_merged=num_index_entries_merged )
+
+    @classmethod
+    def sync_many(cls, src_store_paths: typing.Iterable[pathlib.Path], dest_store_path: pathlib.Path,
+                                                                        max_workers: int = DEFAULT_MAX_WORKERS) -> SolutionTreeStoreSyncReport:
+        return SolutionTreeStoreSyncReport.merge(*(cls.sync(src_store_path=src_store_path,
+                                                            dest_store_path=dest_store_path,
+                                                            max_workers=max_workers)
+                                                        for src_store_path in src_store_paths))
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import typing
+import concurrent.futures
+import threading
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree_store.types import (
+    SolutionTreeStoreIndexEntry
+)
+from titan.solver_util.solution_tree_store.solution_tree_writer import (
+    SolutionTreeWriter
+)
+from titan.solver_util.solution_tree_store.solution_tree_store import (
+    SolutionTreeStoreImpl,
+    SolutionTreeStore
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolutionTreeWriteBehindQueue:
+    """Persist solution trees to a SolutionTreeStore in background threads
+
+    Enqueueing returns a future of the index entry straight away, so a solver can be reused while its
+    result is being hashed and compressed. The queued trees are held in memory, serialized, until they are
+    written: once they add up to more than budget_bytes, enqueueing blocks until the workers catch up.
+    """
+
+    DEFAULT_MAX_WORKERS = 2
+    DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+    __slots__ = (   '_store',
+                    '_executor',
+                    '_budget_bytes',
+                    '_queued_bytes',
+                    '_num_pending',
+                    '_is_closed',
+                    '_condition'  )
+
+    def __init__(self, store: SolutionTreeStore, max_workers: int = DEFAULT_MAX_WORKERS,
+                                                    budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        if budget_bytes <= 0:
+            raise ValueError(f"{type(self).__name__} budget_bytes must be positive !")
+        self._store = store
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=type(self).__name__)
+        self._budget_bytes = budget_bytes
+        self._queued_bytes = 0
+        self._num_pending = 0
+        self._is_closed = False
+        self._condition = threading.Condition()
+
+    def store(self) -> SolutionTreeStore:
+        return self._store
+
+    def budget_bytes(self) -> int:
+        return self._budget_bytes
+
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    def num_pending(self) -> int:
+        return self._num_pending
+
+    def is_closed(self) -> bool:
+        return self._is_closed
+
+    def _reserve(self, num_bytes: int, timeout: typing.Optional[float]):
+        with self._condition:
+            # an item over budget on its own is still accepted once the queue is empty
+            has_room = self._condition.wait_for(lambda: (   self._is_closed or
+                                                            self._queued_bytes == 0 or
+                                                            self._queued_bytes + num_bytes <= self._budget_bytes  ), timeout=timeout)
+            if self._is_closed:
+                raise ValueError(f"Cannot enqueue in {type(self).__name__} after it was closed !")
+            if not has_room:
+                raise TimeoutError(f"{type(self).__name__} still had {self._queued_bytes} bytes queued after {timeout} seconds")
+            self._queued_bytes += num_bytes
+            self._num_pending += 1
+
+    def _release(self, num_bytes: int):
+        with self._condition:
+            self._queued_bytes -= num_bytes
+            self._num_pending -= 1
+            self._condition.notify_all()
+
+    def _persist(self, add_fn: typing.Callable[..., SolutionTreeStoreIndexEntry], num_bytes: int, **kwargs) -> SolutionTreeStoreIndexEntry:
+        try:
+            index_entry = add_fn(store_path=self._store.store_path(), **kwargs)
+            self._store.add_index_entries((index_entry, ))
+            return index_entry
+        except Exception as e:
+            logger.error(f"{type(self).__name__} failed to persist a solution tree: {e}")
+            raise
+        finally:
+            self._release(num_bytes)
+
+    def _enqueue(self, add_fn: typing.Callable[..., SolutionTreeStoreIndexEntry], num_bytes: int,
+                                                    timeout: typing.Optional[float], **kwargs) -> concurrent.futures.Future:
+        self._reserve(num_bytes, timeout)
+        try:
+            return self._executor.submit(self._persist, add_fn, num_bytes, **kwargs)
+        except BaseException:
+            self._release(num_bytes)
+            raise
+
+    def enqueue_preflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                        is_path_solve: bool,
+                                                                        solution_tree: SolutionTree,
+                                                                        timeout: typing.Optional[float] = None) -> concurrent.futures.Future:
+        """Enqueue a solution tree
+
+        The tree is serialized before this returns, so the caller can reuse or release it straight away.
+        """
+        solution_tree_bytes = SolutionTreeWriter.write_to_bytes(solution_tree)
+        return self._enqueue(   SolutionTreeStoreImpl.add_preflop_solution_tree_from_buffers,
+                                len(solution_tree_bytes),
+                                timeout,
+                                solver_config_dict=solver_config_dict,
+                                action_sequence=action_sequence,
+                                is_path_solve=is_path_solve,
+                                solution_tree_buffers=(solution_tree_bytes, )  )
+
+    def enqueue_postflop_solution_tree(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                        is_path_solve: bool,
+                                                                        solution_tree: SolutionTree,
+                                                                        timeout: typing.Optional[float] = None) -> concurrent.futures.Future:
+        """Enqueue a solution tree
+
+        The tree is serialized before this returns, so the caller can reuse or release it straight away.
+        """
+        solution_tree_bytes = SolutionTreeWriter.write_to_bytes(solution_tree)
+        return self._enqueue(   SolutionTreeStoreImpl.add_postflop_solution_tree_from_buffers,
+                                len(solution_tree_bytes),
+                                timeout,
+                                solver_config_dict=solver_config_dict,
+                                action_sequence=action_sequence,
+                                is_path_solve=is_path_solve,
+                                solution_tree_buffers=(solution_tree_bytes, )  )
+
+    def enqueue_preflop_solution_tree_buffers(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                is_path_solve: bool,
+                                                                                solution_tree_buffers: typing.Iterable[memoryview],
+                                                                                timeout: typing.Optional[float] = None) -> concurrent.futures.Future:
+        """Enqueue the buffers of a solve, e.g. the message_buf() of its ipc messages
+
+        The buffers are copied, so the caller can release the messages as soon as this returns.
+        """
+        buffer_copies = tuple(bytes(solution_tree_buffer) for solution_tree_buffer in solution_tree_buffers)
+        return self._enqueue(   SolutionTreeStoreImpl.add_preflop_solution_tree_from_buffers,
+                                sum(len(b) for b in buffer_copies),
+                                timeout,
+                                solver_config_dict=solver_config_dict,
+                                action_sequence=action_sequence,
+                                is_path_solve=is_path_solve,
+                                solution_tree_buffers=buffer_copies  )
+
+    def enqueue_postflop_solution_tree_buffers(self, solver_config_dict: dict, action_sequence: ActionSequence,
+                                                                                is_path_solve: bool,
+                                                                                solution_tree_buffers: typing.Iterable[memoryview],
+                                                                                timeout: typing.Optional[float] = None) -> concurrent.futures.Future:
+        """Enqueue the buffers of a solve, e.g. the message_buf() of its ipc messages
+
+        The buffers are copied, so the caller can release the messages as soon as this returns.
+        """
+        buffer_copies = tuple(bytes(solution_tree_buffer) for solution_tree_buffer in solution_tree_buffers)
+        return self._enqueue(   SolutionTreeStoreImpl.add_postflop_solution_tree_from_buffers,
+                                sum(len(b) for b in buffer_copies),
+                                timeout,
+                                solver_config_dict=solver_config_dict,
+                                action_sequence=action_sequence,
+                                is_path_solve=is_path_solve,
+                                solution_tree_buffers=buffer_copies  )
+
+    def flush(self, timeout: typing.Optional[float] = None) -> bool:
+        """Wait until everything enqueued so far was persisted (or failed)
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._num_pending == 0, timeout=timeout)
+
+    def close(self, save_index: bool = True):
+        """Stop accepting trees, drain the queue and optionally save the index of the store"""
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=True)
+        if save_index:
+            self._store.save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
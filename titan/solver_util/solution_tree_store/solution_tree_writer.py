@@ -1,5 +1,6 @@
 from __future__ import annotations
 import gzip
+import io
 import typing
 from titan.solver_util.blob_tree import (
     BlobTreeNode
@@ -61,6 +62,14 @@ class SolutionTreeWriter:
         except IOError as e:
             raise ValueError(f"IO Failure in {cls.__name__}.write() for path `{path}`: {e}")
 
+    @classmethod
+    def write_to_bytes(cls, solution_tree: SolutionTree) -> bytes:
+        """The same bytes that write() puts in a file"""
+        f = io.BytesIO()
+        for blob_tree_node in cls.gen_blob_tree_nodes(solution_tree):
+            cls.write_blob_tree_node(f, blob_tree_node)
+        return f.getvalue()
+
     @classmethod
     def write_compressed(cls, path: str, solution_tree: SolutionTree):
         try:
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import typing
+import pathlib
+import contextlib
+import fcntl
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+
+class StoreLock:
+    """Advisory (flock) locks shared by every process that writes to the same store
+
+    Locks are only advisory: they coordinate writers that use them, they do not stop anything else
+    from touching the files.
+    """
+
+    LOCK_DIR_NAME = '.lock'
+    LOCK_SUFFIX = '.lock'
+
+    @classmethod
+    def lock_path(cls, store_path: pathlib.Path, lock_name: str) -> pathlib.Path:
+        return store_path / cls.LOCK_DIR_NAME / f"{lock_name}{cls.LOCK_SUFFIX}"
+
+    @classmethod
+    @contextlib.contextmanager
+    def acquire(cls, store_path: pathlib.Path, lock_name: str, exclusive: bool = True) -> typing.Iterator[None]:
+        lock_path = cls.lock_path(store_path, lock_name)
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH))
+            yield
+        finally:
+            # closing the file releases the lock
+            os.close(fd)
+
+    @classmethod
+    def acquire_shared(cls, store_path: pathlib.Path, lock_name: str) -> typing.ContextManager[None]:
+        return cls.acquire(store_path, lock_name, exclusive=False)
+
+    @classmethod
+    def acquire_exclusive(cls, store_path: pathlib.Path, lock_name: str) -> typing.ContextManager[None]:
+        return cls.acquire(store_path, lock_name, exclusive=True)
@@ -31,22 +31,104 @@ class SolveMode(enum.Enum):
     SUBTREE = 'SUBTREE'
     
 
+class SolutionTreeStats:
+    """Size and shape of a stored solution tree, known without loading it"""
+
+    __slots__ = (   '_node_count',
+                    '_max_depth',
+                    '_leaf_count',
+                    '_matrix_shapes',
+                    '_raw_size_bytes',
+                    '_compressed_size_bytes',
+                    '_digest'  )
+
+    def __init__(self, node_count: int, max_depth: int, leaf_count: int, matrix_shapes: typing.Tuple[typing.Tuple[int, ...], ...],
+                                                                            raw_size_bytes: int,
+                                                                            compressed_size_bytes: int,
+                                                                            digest: str):
+        self._node_count = node_count
+        self._max_depth = max_depth
+        self._leaf_count = leaf_count
+        self._matrix_shapes = matrix_shapes
+        self._raw_size_bytes = raw_size_bytes
+        self._compressed_size_bytes = compressed_size_bytes
+        self._digest = digest
+
+    def node_count(self) -> int:
+        return self._node_count
+
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    def leaf_count(self) -> int:
+        return self._leaf_count
+
+    def matrix_shapes(self) -> typing.Tuple[typing.Tuple[int, ...], ...]:
+        """The distinct shapes of the strategy and ev matrices of the nodes"""
+        return self._matrix_shapes
+
+    def raw_size_bytes(self) -> int:
+        return self._raw_size_bytes
+
+    def compressed_size_bytes(self) -> int:
+        return self._compressed_size_bytes
+
+    def digest(self) -> str:
+        """sha256 of the compressed blob, to check a copy without decompressing it"""
+        return self._digest
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'node_count': self.node_count(),
+            'max_depth': self.max_depth(),
+            'leaf_count': self.leaf_count(),
+            'matrix_shapes': [list(shape) for shape in self.matrix_shapes()],
+            'raw_size_bytes': self.raw_size_bytes(),
+            'compressed_size_bytes': self.compressed_size_bytes(),
+            'digest': self.digest()
+        }
+
+    def __eq__(self, other):
+        return ((type(self) == type(other)) and
+                (self.serialize_to_dict() == other.serialize_to_dict()))
+
+    @classmethod
+    def create_from_dict(cls, some_dict: dict) -> SolutionTreeStats:
+        try:
+            return cls( node_count=some_dict['node_count'],
+                        max_depth=some_dict['max_depth'],
+                        leaf_count=some_dict['leaf_count'],
+                        matrix_shapes=tuple(tuple(shape) for shape in some_dict['matrix_shapes']),
+                        raw_size_bytes=some_dict['raw_size_bytes'],
+                        compressed_size_bytes=some_dict['compressed_size_bytes'],
+                        digest=some_dict['digest'] )
+        except KeyError as e:
+            raise ValueError(f"Failed to create {cls.__name__} due to a missing field `{e}` in some_dict !")
+
+    @classmethod
+    def create_from_optional_dict(cls, some_dict: typing.Optional[dict]) -> typing.Optional[SolutionTreeStats]:
+        return (cls.create_from_dict(some_dict) if (some_dict is not None) else None)
+
+
 class SolutionTreeMeta:
 
     __slots__ = (   '_solve_mode',
                     '_solver_type',
                     '_action_sequence',
                     '_solver_config_key',
-                    '_solution_tree_key',  )
+                    '_solution_tree_key',
+                    '_stats'  )
 
     def __init__(self, solver_type: SolverType, solve_mode: SolveMode, action_sequence: ActionSequence,
                                                                         solver_config_key: str,
-                                                                        solution_tree_key: str):
+                                                                        solution_tree_key: str,
+                                                                        stats: typing.Optional[SolutionTreeStats] = None):
         self._solver_type = solver_type
         self._solve_mode = solve_mode
         self._action_sequence = action_sequence
         self._solver_config_key = solver_config_key
         self._solution_tree_key = solution_tree_key
+        self._stats = stats
 
     def solver_type(self) -> SolverType:
         return self._solver_type
@@ -63,10 +145,14 @@ class SolutionTreeMeta:
     def solution_tree_key(self) -> str:
         return self._solution_tree_key
 
+    def stats(self) -> typing.Optional[SolutionTreeStats]:
+        """None for trees stored before stats were recorded"""
+        return self._stats
+
     def is_path_solve(self) -> bool:
         return (self.solve_mode() == SolveMode.PATH)
 
-    def serialize_to_dict(self) -> dict:
+    def serialize_identity_to_dict(self) -> dict:
         return {
             'solver_type': self.solver_type().value,
             'solve_mode': self.solve_mode().value,
@@ -75,6 +161,12 @@ class SolutionTreeMeta:
             'solution_tree_key': self.solution_tree_key()
         }
 
+    def serialize_to_dict(self) -> dict:
+        result = self.serialize_identity_to_dict()
+        if self.stats() is not None:
+            result['stats'] = self.stats().serialize_to_dict()
+        return result
+
     def __eq__(self, other):
         return ((type(self) == type(other)) and
                 (self.solver_type() == other.solver_type()) and
@@ -90,48 +182,212 @@ class SolutionTreeMeta:
                         solve_mode=SolveMode(some_dict['solve_mode']),
                         action_sequence=ActionSequence.create_from_string(some_dict['action_sequence']),
                         solver_config_key=some_dict['solver_config_key'],
-                        solution_tree_key=some_dict['solution_tree_key'] )
+                        solution_tree_key=some_dict['solution_tree_key'],
+                        stats=SolutionTreeStats.create_from_optional_dict(some_dict.get('stats')) )
         except KeyError as e:
             raise ValueError(f"Failed to create {cls.__name__} due to a missing field `{e}` in some_dict !")
 
     def hash(self) -> str:
-        return _DictHashHelper.consistent_hash(self.serialize_to_dict())
+        # stats are derived from the tree, so they do not change which meta blob it is
+        return _DictHashHelper.consistent_hash(self.serialize_identity_to_dict())
 
     @classmethod
-    def create(cls, solver_type: SolverType, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str):
+    def create(cls, solver_type: SolverType, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str,
+                                                                                                    stats: typing.Optional[SolutionTreeStats] = None):
         return cls( solver_type=solver_type,
                     solve_mode=(SolveMode.PATH if is_path_solve else SolveMode.SUBTREE),
                     action_sequence=action_sequence,
                     solver_config_key=solver_config_key,
-                    solution_tree_key=solution_tree_key )
+                    solution_tree_key=solution_tree_key,
+                    stats=stats )
 
     @classmethod
-    def create_for_preflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str):
+    def create_for_preflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str,
+                                                                                        stats: typing.Optional[SolutionTreeStats] = None):
         return cls.create(  solver_type=SolverType.PREFLOP,
                             is_path_solve=is_path_solve,
                             action_sequence=action_sequence,
                             solver_config_key=solver_config_key,
-                            solution_tree_key=solution_tree_key  )
+                            solution_tree_key=solution_tree_key,
+                            stats=stats  )
 
     @classmethod
-    def create_for_postflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str):
+    def create_for_postflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_key: str, solution_tree_key: str,
+                                                                                        stats: typing.Optional[SolutionTreeStats] = None):
         return cls.create(  solver_type=SolverType.POSTFLOP,
                             is_path_solve=is_path_solve,
                             action_sequence=action_sequence,
                             solver_config_key=solver_config_key,
-                            solution_tree_key=solution_tree_key  )
+                            solution_tree_key=solution_tree_key,
+                            stats=stats  )
+
+
+class SolutionTreeStoreFields:
+    """The fields of a stored solve that are worth looking it up by, extracted from its meta and solver config dict"""
+
+    __slots__ = (   '_solver_type',
+                    '_solve_mode',
+                    '_action_sequence',
+                    '_community_cards',
+                    '_deal_order_stack_sizes',
+                    '_big_blind_amount',
+                    '_street_action_sequences',
+                    '_range_fingerprints'  )
+
+    def __init__(self, solver_type: SolverType, solve_mode: SolveMode, action_sequence: str,
+                                                                        community_cards: typing.Tuple[str, ...],
+                                                                        deal_order_stack_sizes: typing.Tuple[int, ...],
+                                                                        big_blind_amount: int,
+                                                                        street_action_sequences: typing.Tuple[str, ...],
+                                                                        range_fingerprints: typing.Tuple[str, ...]):
+        self._solver_type = solver_type
+        self._solve_mode = solve_mode
+        self._action_sequence = action_sequence
+        self._community_cards = community_cards
+        self._deal_order_stack_sizes = deal_order_stack_sizes
+        self._big_blind_amount = big_blind_amount
+        self._street_action_sequences = street_action_sequences
+        self._range_fingerprints = range_fingerprints
+
+    def solver_type(self) -> SolverType:
+        return self._solver_type
+
+    def solve_mode(self) -> SolveMode:
+        return self._solve_mode
+
+    def action_sequence(self) -> str:
+        return self._action_sequence
+
+    def community_cards(self) -> typing.Tuple[str, ...]:
+        return self._community_cards
+
+    def board(self) -> typing.FrozenSet[str]:
+        return frozenset(self._community_cards)
+
+    def deal_order_stack_sizes(self) -> typing.Tuple[int, ...]:
+        return self._deal_order_stack_sizes
+
+    def big_blind_amount(self) -> int:
+        return self._big_blind_amount
+
+    def street_action_sequences(self) -> typing.Tuple[str, ...]:
+        """The preflop, flop and turn action sequences that lead to the solved spot (empty for preflop solves)"""
+        return self._street_action_sequences
+
+    def range_fingerprints(self) -> typing.Tuple[str, ...]:
+        return self._range_fingerprints
+
+    def range_fingerprint(self) -> str:
+        """A single fingerprint over the ranges of all the players"""
+        m = hashlib.sha256()
+        for range_fingerprint in self._range_fingerprints:
+            m.update(range_fingerprint.encode('ascii'))
+        return m.hexdigest()
+
+    def __eq__(self, other):
+        return ((type(self) == type(other)) and
+                (self.solver_type() == other.solver_type()) and
+                (self.solve_mode() == other.solve_mode()) and
+                (self.action_sequence() == other.action_sequence()) and
+                (self.community_cards() == other.community_cards()) and
+                (self.deal_order_stack_sizes() == other.deal_order_stack_sizes()) and
+                (self.big_blind_amount() == other.big_blind_amount()) and
+                (self.street_action_sequences() == other.street_action_sequences()) and
+                (self.range_fingerprints() == other.range_fingerprints()))
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'solver_type': self.solver_type().value,
+            'solve_mode': self.solve_mode().value,
+            'action_sequence': self.action_sequence(),
+            'community_cards': list(self.community_cards()),
+            'deal_order_stack_sizes': list(self.deal_order_stack_sizes()),
+            'big_blind_amount': self.big_blind_amount(),
+            'street_action_sequences': list(self.street_action_sequences()),
+            'range_fingerprints': list(self.range_fingerprints())
+        }
+
+    @classmethod
+    def create_from_dict(cls, some_dict: dict) -> SolutionTreeStoreFields:
+        try:
+            return cls( solver_type=SolverType(some_dict['solver_type']),
+                        solve_mode=SolveMode(some_dict['solve_mode']),
+                        action_sequence=some_dict['action_sequence'],
+                        community_cards=tuple(some_dict['community_cards']),
+                        deal_order_stack_sizes=tuple(some_dict['deal_order_stack_sizes']),
+                        big_blind_amount=some_dict['big_blind_amount'],
+                        street_action_sequences=tuple(some_dict['street_action_sequences']),
+                        range_fingerprints=tuple(some_dict['range_fingerprints']) )
+        except KeyError as e:
+            raise ValueError(f"Failed to create {cls.__name__} due to a missing field `{e}` in some_dict !")
+
+    @classmethod
+    def create_from_optional_dict(cls, some_dict: typing.Optional[dict]) -> typing.Optional[SolutionTreeStoreFields]:
+        return (cls.create_from_dict(some_dict) if (some_dict is not None) else None)
+
+    @classmethod
+    def compute_range_fingerprint(cls, player_range_string: str) -> str:
+        m = hashlib.sha256()
+        m.update(player_range_string.encode('ascii'))
+        return m.hexdigest()
+
+    @classmethod
+    def create_for_postflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_dict: dict) -> SolutionTreeStoreFields:
+        try:
+            return cls( solver_type=SolverType.POSTFLOP,
+                        solve_mode=(SolveMode.PATH if is_path_solve else SolveMode.SUBTREE),
+                        action_sequence=str(action_sequence),
+                        community_cards=tuple(str(card) for card in solver_config_dict['community_cards']),
+                        deal_order_stack_sizes=tuple(int(ss) for ss in solver_config_dict['deal_order_stack_sizes']),
+                        big_blind_amount=int(solver_config_dict['big_blind_amount']),
+                        street_action_sequences=(   str(solver_config_dict['preflop_action_sequence']),
+                                                    str(solver_config_dict['flop_action_sequence']),
+                                                    str(solver_config_dict['turn_action_sequence'])  ),
+                        range_fingerprints=tuple(cls.compute_range_fingerprint(pr) for pr in solver_config_dict['player_ranges']) )
+        except KeyError as e:
+            raise ValueError(f"Cannot create {cls.__name__}. Missing field `{e}` in solver_config_dict")
+
+    @classmethod
+    def create_for_preflop(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_dict: dict) -> SolutionTreeStoreFields:
+        try:
+            return cls( solver_type=SolverType.PREFLOP,
+                        solve_mode=(SolveMode.PATH if is_path_solve else SolveMode.SUBTREE),
+                        action_sequence=str(action_sequence),
+                        community_cards=(),
+                        deal_order_stack_sizes=tuple(int(ss) for ss in solver_config_dict['deal_order_stack_sizes']),
+                        big_blind_amount=int(solver_config_dict['big_blind_amount']),
+                        street_action_sequences=(),
+                        range_fingerprints=() )
+        except KeyError as e:
+            raise ValueError(f"Cannot create {cls.__name__}. Missing field `{e}` in solver_config_dict")
+
+    @classmethod
+    def create_optional(cls, solver_type: SolverType, is_path_solve: bool, action_sequence: ActionSequence,
+                                                                            solver_config_dict: dict) -> typing.Optional[SolutionTreeStoreFields]:
+        """None when the fields are missing from solver_config_dict, such solves are left out of the field index"""
+        try:
+            if solver_type == SolverType.PREFLOP:
+                return cls.create_for_preflop(is_path_solve=is_path_solve, action_sequence=action_sequence, solver_config_dict=solver_config_dict)
+            return cls.create_for_postflop(is_path_solve=is_path_solve, action_sequence=action_sequence, solver_config_dict=solver_config_dict)
+        except ValueError:
+            return None
 
 
 class SolutionTreeStoreIndexEntry:
 
     __slots__ = (   '_index_key',
                     '_solver_config_key',
-                    '_solution_tree_key'  )
+                    '_solution_tree_key',
+                    '_stats',
+                    '_fields'  )
 
-    def __init__(self, index_key: str, solver_config_key: str, solution_tree_key: str):
+    def __init__(self, index_key: str, solver_config_key: str, solution_tree_key: str, stats: typing.Optional[SolutionTreeStats] = None,
+                                                                                        fields: typing.Optional[SolutionTreeStoreFields] = None):
         self._index_key = index_key
         self._solver_config_key = solver_config_key
         self._solution_tree_key = solution_tree_key
+        self._stats = stats
+        self._fields = fields
 
     def index_key(self) -> str:
         return self._index_key
@@ -142,19 +398,61 @@ class SolutionTreeStoreIndexEntry:
     def solution_tree_key(self) -> str:
         return self._solution_tree_key
 
+    def stats(self) -> typing.Optional[SolutionTreeStats]:
+        return self._stats
+
+    def fields(self) -> typing.Optional[SolutionTreeStoreFields]:
+        """The fields the SolutionTreeStoreFieldIndex looks the solve up by, None if they were not recorded"""
+        return self._fields
+
+    def merge(self, other: SolutionTreeStoreIndexEntry) -> SolutionTreeStoreIndexEntry:
+        """The same entry, with the stats and fields of other where it has them"""
+        return SolutionTreeStoreIndexEntry( index_key=self.index_key(),
+                                            solver_config_key=self.solver_config_key(),
+                                            solution_tree_key=self.solution_tree_key(),
+                                            stats=(other.stats() if (other.stats() is not None) else self.stats()),
+                                            fields=(other.fields() if (other.fields() is not None) else self.fields()) )
+
+    def serialize_to_dict(self) -> dict:
+        """Everything but the index_key, which the index serialization groups entries by"""
+        result = {'solver_config_key': self.solver_config_key(), 'solution_tree_key': self.solution_tree_key()}
+        if self.stats() is not None:
+            result['stats'] = self.stats().serialize_to_dict()
+        if self.fields() is not None:
+            result['fields'] = self.fields().serialize_to_dict()
+        return result
+
+    @classmethod
+    def create_from_dict(cls, index_key: str, some_dict: dict) -> SolutionTreeStoreIndexEntry:
+        return cls( index_key=index_key,
+                    solver_config_key=some_dict['solver_config_key'],
+                    solution_tree_key=some_dict['solution_tree_key'],
+                    stats=SolutionTreeStats.create_from_optional_dict(some_dict.get('stats')),
+                    fields=SolutionTreeStoreFields.create_from_optional_dict(some_dict.get('fields')) )
+
     def serialize_to_tuple(self):
         return (self.index_key(), self.solver_config_key(), self.solution_tree_key(), )
 
     def __hash__(self):
         return hash(self.serialize_to_tuple())
+
+    def __eq__(self, other):
+        return ((type(self) == type(other)) and
+                (self.serialize_to_tuple() == other.serialize_to_tuple()))
     
 class SolutionTreeStoreIndex:
 
     __slots__ = (   '_index_dict',
+                    '_stats_lookup',
                     '_size'  )
 
     def __init__(self, index_dict: dict):
         self._index_dict = index_dict
+        self._stats_lookup = {}
+        for entries in index_dict.values():
+            for entry in entries:
+                if entry.stats() is not None:
+                    self._stats_lookup[entry.solution_tree_key()] = entry.stats()
 
     def gen_entries(self) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
         for index_key, entries in self._index_dict.items():
@@ -166,23 +464,42 @@ class SolutionTreeStoreIndex:
         except KeyError:
             raise ValueError(f"No entries for index_key `{index_key}` !")
 
+    def has_entry(self, entry: SolutionTreeStoreIndexEntry) -> bool:
+        return entry in self._index_dict.get(entry.index_key(), ())
+
     def size(self) -> int:
         return sum(1 for _ in self.gen_entries())
+
+    def get_stats(self, solution_tree_key: str) -> typing.Optional[SolutionTreeStats]:
+        """Stats of a tree without reading it, None if they were not recorded"""
+        return self._stats_lookup.get(solution_tree_key)
+
+    def gen_entries_within_budget(self, max_raw_size_bytes: int) -> typing.Iterator[SolutionTreeStoreIndexEntry]:
+        """Entries whose trees are known to take at most max_raw_size_bytes once loaded"""
+        for entry in self.gen_entries():
+            stats = self.get_stats(entry.solution_tree_key())
+            if (stats is not None) and (stats.raw_size_bytes() <= max_raw_size_bytes):
+                yield entry
         
     def serialize_to_dict(self) -> dict:
         result = {}
         for entry in sorted(self.gen_entries(), key=lambda entry: entry.serialize_to_tuple()):
             try:
-                result[entry.index_key()].append({'solver_config_key': entry.solver_config_key(), 'solution_tree_key': entry.solution_tree_key()})
+                result[entry.index_key()].append(entry.serialize_to_dict())
             except KeyError:
-                result[entry.index_key()] = [{'solver_config_key': entry.solver_config_key(), 'solution_tree_key': entry.solution_tree_key()}]
+                result[entry.index_key()] = [entry.serialize_to_dict()]
         return result
 
     def add_entry(self, entry: SolutionTreeStoreIndexEntry):
-        try:
-            self._index_dict[entry.index_key()].add(entry)
-        except KeyError:
-            self._index_dict[entry.index_key()] = {entry}
+        entries = self._index_dict.setdefault(entry.index_key(), set())
+        if entry in entries:
+            # keep the stats and fields of either copy
+            existing_entry = next(e for e in entries if e == entry)
+            entries.discard(existing_entry)
+            entry = existing_entry.merge(entry)
+        entries.add(entry)
+        if entry.stats() is not None:
+            self._stats_lookup[entry.solution_tree_key()] = entry.stats()
 
     @classmethod
     def create_preflop_index_key(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_dict: dict) -> str:
@@ -205,6 +522,32 @@ class SolutionTreeStoreIndex:
         }
         return _DictHashHelper.consistent_hash(dict_to_hash)
 
+    @classmethod
+    def create_fingerprint_index_key(cls, solver_type: SolverType, is_path_solve: bool, action_sequence: ActionSequence,
+                                                                                        solver_config_fingerprint: str) -> str:
+        """An index key from the fingerprint() of a solver config, which never clashes with a key made from its dict"""
+        dict_to_hash = {
+            'solver_type': solver_type.value,
+            'solve_mode': (SolveMode.PATH if is_path_solve else SolveMode.SUBTREE).value,
+            'action_sequence': str(action_sequence),
+            'solver_config_fingerprint': solver_config_fingerprint
+        }
+        return _DictHashHelper.consistent_hash(dict_to_hash)
+
+    @classmethod
+    def create_preflop_fingerprint_index_key(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_fingerprint: str) -> str:
+        return cls.create_fingerprint_index_key(solver_type=SolverType.PREFLOP,
+                                                is_path_solve=is_path_solve,
+                                                action_sequence=action_sequence,
+                                                solver_config_fingerprint=solver_config_fingerprint)
+
+    @classmethod
+    def create_postflop_fingerprint_index_key(cls, is_path_solve: bool, action_sequence: ActionSequence, solver_config_fingerprint: str) -> str:
+        return cls.create_fingerprint_index_key(solver_type=SolverType.POSTFLOP,
+                                                is_path_solve=is_path_solve,
+                                                action_sequence=action_sequence,
+                                                solver_config_fingerprint=solver_config_fingerprint)
+
     @classmethod
     def ensure_valid_dict_serialization(cls, some_dict: dict) -> bool:
         try:
@@ -215,6 +558,8 @@ class SolutionTreeStoreIndex:
                     assert type(entry) == dict, f"element `{entry}` has type `{type(entry)}` instead of the expected `dict`"
                     assert type(entry['solution_tree_key']) == str, f"entry['solution_tree_key'] `{entry['solution_tree_key']}` has type `{type(entry['solution_tree_key'])}` instead of the expected `str`"
                     assert type(entry['solver_config_key']) == str, f"entry['solver_config_key'] `{entry['solver_config_key']}` has type `{type(entry['solver_config_key'])}` instead of the expected `str`"
+                    assert type(entry.get('stats', {})) == dict, f"entry['stats'] has type `{type(entry.get('stats'))}` instead of the expected `dict`"
+                    assert type(entry.get('fields', {})) == dict, f"entry['fields'] has type `{type(entry.get('fields'))}` instead of the expected `dict`"
         except KeyError as e:
             raise ValueError(f"Field `{e}` is missing")
         except AssertionError as e:
@@ -237,9 +582,7 @@ class SolutionTreeStoreIndex:
         result = cls.create_empty()
         for index_key, entries in some_dict.items():
             for entry_dict in entries:
-                result.add_entry(SolutionTreeStoreIndexEntry(   index_key=index_key,
-                                                                solver_config_key=entry_dict['solver_config_key'],
-                                                                solution_tree_key=entry_dict['solution_tree_key']  ))
+                result.add_entry(SolutionTreeStoreIndexEntry.create_from_dict(index_key, entry_dict))
         return result
 
 
@@ -250,3 +593,8 @@ class SolutionTreeStoreIndex:
             for entry in index.gen_entries():
                 result.add_entry(entry)
         return result
+
+    @classmethod
+    def difference(cls, index: SolutionTreeStoreIndex, other: SolutionTreeStoreIndex) -> SolutionTreeStoreIndex:
+        """Return an index of the entries in index that are not present in other"""
+        return cls.create_from_entries(entry for entry in index.gen_entries() if not other.has_entry(entry))
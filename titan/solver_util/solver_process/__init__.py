@@ -3,17 +3,32 @@ from titan.solver_util.solver_process.ipc import (
     IpcMessage,
     IpcMessageStore,
     SharedMemoryIpcMessageStore,
-    FileBackedIpcMessageStore
+    SharedMemoryArenaIpcMessageStore,
+    FileBackedIpcMessageStore,
+    IpcMessageLease,
+    IpcMessageLeaseTracker
 )
 from titan.solver_util.solver_process.types import (
     SolverProcessException,
     SolverState,
     SolverConfig,
+    SolverConfigHandle,
+    SolverConfigFingerprint,
+    SolveProgress,
+    SolveRequest,
+    BatchSolveResult,
     CommandId
 )
+from titan.solver_util.solver_process.solver_config_cache import (
+    SolverConfigCache
+)
 from titan.solver_util.solver_process.solver_process_client import (
+    SolutionTreeStreamDecoder,
     SolverProcessClient
 )
+from titan.solver_util.solver_process.pinned_solution_tree import (
+    PinnedSolutionTree
+)
 from titan.solver_util.solver_process.solver_process_daemon import (
     SolverProcessDaemon
 )
@@ -29,4 +44,20 @@ from titan.solver_util.solver_process.solver_process_logging import (
 from titan.solver_util.solver_process.solver_process_client_provider import (
     SolverProcessClientProvider,
     SolverProcessClientProviderException
-)
\ No newline at end of file
+)
+from titan.solver_util.solver_process.solver_process_standby import (
+    SolverProcessStandbyStats,
+    SolverProcessStandby
+)
+from titan.solver_util.solver_process.solver_process_pool import (
+    SolverProcessPoolException,
+    SolverProcessPoolStats,
+    SolverProcessPool
+)
+from titan.solver_util.solver_process.solver_process_scheduler import (
+    SolverSchedulerException,
+    SolverPriority,
+    SolverSchedulerJob,
+    SolverSchedulerStats,
+    SolverProcessScheduler
+)
@@ -5,5 +5,10 @@ from titan.solver_util.solver_process.ipc.types import (
 from titan.solver_util.solver_process.ipc.ipc_message_store import (
     IpcMessageStore,
     SharedMemoryIpcMessageStore,
+    SharedMemoryArenaIpcMessageStore,
     FileBackedIpcMessageStore
+)
+from titan.solver_util.solver_process.ipc.ipc_message_lease import (
+    IpcMessageLease,
+    IpcMessageLeaseTracker
 )
\ No newline at end of file
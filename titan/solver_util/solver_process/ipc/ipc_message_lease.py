@@ -0,0 +1,136 @@
+from __future__ import annotations
+import typing
+import asyncio
+import collections
+import threading
+import logging
+from titan.solver_util.solver_process.ipc.types import (
+    IpcException,
+    IpcMessage
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class IpcMessageLease:
+    """Keeps a set of IPC messages from being destroyed until release() is called"""
+
+    __slots__ = (   '_lease_tracker',
+                    '_message_ids',
+                    '_is_active'  )
+
+    def __init__(self, lease_tracker: IpcMessageLeaseTracker, message_ids: typing.Tuple[str, ...]):
+        self._lease_tracker = lease_tracker
+        self._message_ids = message_ids
+        self._is_active = True
+
+    def message_ids(self) -> typing.Tuple[str, ...]:
+        return self._message_ids
+
+    def is_active(self) -> bool:
+        return self._is_active
+
+    def release(self):
+        if self._is_active:
+            self._is_active = False
+            self._lease_tracker.release(self._message_ids)
+
+
+class IpcMessageLeaseTracker:
+    """Reference counts the leases on the messages of an IpcMessageStore
+
+    A message is destroyed once its last lease is released. Destroying a message fails with a BufferError while
+    something still holds a view of it, e.g. a lease released from a finalizer before the object holding the views
+    is gone, so such messages are retried later.
+
+    Leases may be released from any thread, e.g. by a finalizer that the garbage collector runs on a worker
+    thread. The store is not thread safe, so such releases are handed over to the loop that acquired the leases.
+    """
+
+    __slots__ = (   '_ipc_message_store',
+                    '_refcounts',
+                    '_leased_messages',
+                    '_released_messages',
+                    '_loop',
+                    '_loop_thread_id'  )
+
+    def __init__(self, ipc_message_store):
+        self._ipc_message_store = ipc_message_store
+        self._refcounts = collections.Counter()
+        self._leased_messages = {}
+        self._released_messages = {}
+        self._loop = None
+        self._loop_thread_id = None
+
+    def num_leased_messages(self) -> int:
+        return len(self._leased_messages)
+
+    def num_released_messages(self) -> int:
+        """Messages whose leases were all released, but that could not be destroyed yet"""
+        return len(self._released_messages)
+
+    def is_leased(self, message_id: str) -> bool:
+        return message_id in self._leased_messages
+
+    def acquire(self, ipc_messages: typing.Iterable[IpcMessage]) -> IpcMessageLease:
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+        except RuntimeError:
+            pass
+        self.destroy_released_messages()
+        message_ids = []
+        for ipc_message in ipc_messages:
+            message_id = ipc_message.message_id()
+            self._refcounts[message_id] += 1
+            self._leased_messages[message_id] = ipc_message
+            # leased again before it could be destroyed
+            self._released_messages.pop(message_id, None)
+            message_ids.append(message_id)
+        return IpcMessageLease(self, tuple(message_ids))
+
+    def release(self, message_ids: typing.Iterable[str]):
+        if (self._loop is not None) and (threading.get_ident() != self._loop_thread_id):
+            try:
+                self._loop.call_soon_threadsafe(self._release, tuple(message_ids))
+                return
+            except RuntimeError:
+                # the loop is closed, so nothing else uses the store anymore
+                pass
+        self._release(message_ids)
+
+    def _release(self, message_ids: typing.Iterable[str]):
+        for message_id in message_ids:
+            self._refcounts[message_id] -= 1
+            if self._refcounts[message_id] <= 0:
+                del self._refcounts[message_id]
+                self._released_messages[message_id] = self._leased_messages.pop(message_id)
+        self.destroy_released_messages()
+        if self._released_messages:
+            try:
+                # by the next iteration of the loop the views are usually gone
+                asyncio.get_running_loop().call_soon(self.destroy_released_messages)
+            except RuntimeError:
+                pass
+
+    def destroy_released_messages(self):
+        for message_id, ipc_message in tuple(self._released_messages.items()):
+            try:
+                self._ipc_message_store.destroy_message(ipc_message)
+            except BufferError:
+                continue
+            except IpcException as e:
+                # e.g. it was destroyed already, when the store was closed
+                logger.info(f"{self.__class__.__name__} could not destroy released message `{message_id}` : {e}")
+            del self._released_messages[message_id]
+
+    def destroy_unleased_messages(self):
+        """Destroy every message of the store that has no lease, the leased ones are destroyed on release"""
+        self.destroy_released_messages()
+        if not self._leased_messages and not self._released_messages:
+            self._ipc_message_store.destroy_all_messages()
+            return
+        for ipc_message in self._ipc_message_store.messages():
+            if (ipc_message.message_id() not in self._leased_messages) and (ipc_message.message_id() not in self._released_messages):
+                self._ipc_message_store.destroy_message(ipc_message)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import typing
 import tempfile
+import bisect
 import os
+import mmap
 import multiprocessing
 import multiprocessing.shared_memory
 from titan.solver_util.solver_process.ipc.types import (
@@ -12,10 +14,11 @@ from titan.solver_util.solver_process.ipc.types import (
 
 
 class FileBackedIpcMessageStore:
+    """Each message is a temporary file that both sides mmap, so writes land in the file and reads are zero-copy"""
 
     MESSAGE_NAME_PREFIX = 'msg_'
 
-    __slots__ = (   '_fd_lookup',
+    __slots__ = (   '_mmap_lookup',
                     '_ipc_messages'  )
 
     @classmethod
@@ -23,79 +26,90 @@ class FileBackedIpcMessageStore:
         return True
 
     def __init__(self):
-        self._fd_lookup = {}
+        self._mmap_lookup = {}
         self._ipc_messages = {}
 
-    def create_empty_message(self, size: int) -> IpcMessage:
-        file_obj, file_path = tempfile.mkstemp(prefix=self.MESSAGE_NAME_PREFIX)
-        self._fd_lookup[file_path] = file_obj
-        self._ipc_messages[file_path] = IpcMessage(message_id=file_path, message_buf=memoryview(bytearray(size)))
-        return self._ipc_messages[file_path]
+    @classmethod
+    def map_file(cls, fd: int, size: int) -> typing.Optional[mmap.mmap]:
+        # an empty file cannot be mapped
+        return mmap.mmap(fd, size) if (size > 0) else None
+
+    def add_message(self, message_id: str, file_mmap: typing.Optional[mmap.mmap]) -> IpcMessage:
+        message_buf = memoryview(file_mmap) if (file_mmap is not None) else memoryview(bytearray(0))
+        self._mmap_lookup[message_id] = file_mmap
+        self._ipc_messages[message_id] = IpcMessage(message_id=message_id, message_buf=message_buf)
+        return self._ipc_messages[message_id]
 
-    def load_message(self, message_id: str) -> IpcMessage:     
+    def create_empty_message(self, size: int) -> IpcMessage:
+        fd, file_path = tempfile.mkstemp(prefix=self.MESSAGE_NAME_PREFIX)
         try:
-            # open file if not already
-            if message_id not in self._fd_lookup:
-                self._fd_lookup[message_id] = os.open(message_id, os.O_RDWR)
-            file_size = os.stat(message_id).st_size
-            os.lseek(self._fd_lookup[message_id], 0, os.SEEK_SET)
-            file_buf = os.read(self._fd_lookup[message_id], file_size)
-            self._ipc_messages[message_id] = IpcMessage(message_id=message_id, message_buf=memoryview(file_buf))
+            os.ftruncate(fd, size)
+            # the mapping keeps its own reference to the file
+            file_mmap = self.map_file(fd, size)
+        finally:
+            os.close(fd)
+        return self.add_message(file_path, file_mmap)
+
+    def load_message(self, message_id: str) -> IpcMessage:
+        if message_id in self._ipc_messages:
             return self._ipc_messages[message_id]
-        except KeyError:
-            raise IpcException(f"{self.__class__.__name__}.load_message(...) Failed because file handle for `{message_id}` does not exist !")
+        try:
+            fd = os.open(message_id, os.O_RDWR)
         except FileNotFoundError:
             raise IpcException(f"{self.__class__.__name__}.load_message(...) Failed because file `{message_id}` could not be found !")
+        try:
+            file_mmap = self.map_file(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        return self.add_message(message_id, file_mmap)
 
     def save_message(self, ipc_message: IpcMessage):
-        try:
-            os.lseek(self._fd_lookup[ipc_message.message_id()], 0, os.SEEK_SET)
-            os.write(self._fd_lookup[ipc_message.message_id()], ipc_message.message_buf())
-        except KeyError:
-            raise IpcException(f"{self.__class__.__name__}.save_message(...) Failed because file_obj for message `{ipc_message.message_id()}` could not be found !")
+        # nothing to do, the message buffer is the file
+        if ipc_message.message_id() not in self._ipc_messages:
+            raise IpcException(f"{self.__class__.__name__}.save_message(...) Failed because message `{ipc_message.message_id()}` could not be found !")
+
+    def unmap_message(self, message_id: str):
+        self._ipc_messages[message_id].message_buf().release()
+        # raises BufferError while something still holds a view of the message, which leaves it loaded
+        if self._mmap_lookup[message_id] is not None:
+            self._mmap_lookup[message_id].close()
+        del self._ipc_messages[message_id]
+        del self._mmap_lookup[message_id]
 
     def release_message(self, ipc_message: IpcMessage):
         try:
-            os.close(self._fd_lookup[ipc_message.message_id()])
-            del self._fd_lookup[ipc_message.message_id()]
-            del self._ipc_messages[ipc_message.message_id()]
-            # de-alloc memory
-            ipc_message.message_buf().release()
+            self.unmap_message(ipc_message.message_id())
         except KeyError:
             raise IpcException(f"{self.__class__.__name__}.release_message(...) Failed because file handle for `{ipc_message.message_id()}` does not exist !")
 
     def destroy_message(self, ipc_message: IpcMessage):
         try:
-            os.close(self._fd_lookup[ipc_message.message_id()])
-            del self._fd_lookup[ipc_message.message_id()]
-            del self._ipc_messages[ipc_message.message_id()]
+            self.unmap_message(ipc_message.message_id())
             # delete the file
             os.remove(ipc_message.message_id())
-            # de-alloc memory
-            ipc_message.message_buf().release()
         except KeyError:
             raise IpcException(f"{self.__class__.__name__}.destroy_message(...) Failed because file handle for `{ipc_message.message_id()}` does not exist !")
 
+    def messages(self) -> typing.Tuple[IpcMessage, ...]:
+        """The messages that were created or loaded, and not released or destroyed yet"""
+        return tuple(self._ipc_messages.values())
+
     def memory_usage(self):
         return sum((ipc_message.size() for ipc_message in self._ipc_messages.values()))
 
     def release_all_messages(self):
-        for fd in self._fd_lookup.values():
-            os.close(fd)
-        for ipc_message in self._ipc_messages.values():
-            ipc_message.message_buf().release()
-        self._fd_lookup = {}
-        self._ipc_messages = {}
+        for message_id in tuple(self._ipc_messages.keys()):
+            self.unmap_message(message_id)
 
     def destroy_all_messages(self):
-        for fd in self._fd_lookup.values():
-            os.close(fd)
-        for ipc_message in self._ipc_messages.values():
-            ipc_message.message_buf().release()
+        for message_id in tuple(self._ipc_messages.keys()):
+            self.unmap_message(message_id)
             # delete the file
-            os.remove(ipc_message.message_id())
-        self._fd_lookup = {}
-        self._ipc_messages = {}
+            os.remove(message_id)
+
+    def close(self):
+        """Nothing is shared beyond the messages themselves"""
+        pass
 
 
 
@@ -147,6 +161,8 @@ class SharedMemoryIpcMessageStore:
         return self._ipc_messages[shm.name]
 
     def load_message(self, message_id: str) -> IpcMessage:
+        if message_id in self._ipc_messages:
+            return self._ipc_messages[message_id]
         shm = multiprocessing.shared_memory.SharedMemory(name=message_id)
         self._shm_lookup[shm.name] = shm
         self._ipc_messages[shm.name] = IpcMessage(message_id=shm.name, message_buf=shm.buf)
@@ -173,6 +189,9 @@ class SharedMemoryIpcMessageStore:
         except KeyError as e:
             raise IpcException(f"{self.__class__.__name__}.destroy_message(...) failed because message `{ipc_message.message_id()}` could not be found !")
 
+    def messages(self) -> typing.Tuple[IpcMessage, ...]:
+        return tuple(self._ipc_messages.values())
+
     def memory_usage(self):
         return sum((ipc_message.size() for ipc_message in self._ipc_messages.values()))
 
@@ -189,6 +208,208 @@ class SharedMemoryIpcMessageStore:
         self._shm_lookup = {}
         self._ipc_messages = {}
 
+    def close(self):
+        """Nothing is shared beyond the messages themselves"""
+        pass
+
+
+
+class SharedMemoryArenaIpcMessageStore:
+    """Allocates messages as regions of a few large shared memory segments, instead of one segment per message
+
+    A message id is `<segment name>:<offset>:<size>`. The store that creates a message owns its segment, the
+    store that loads the message attaches to the segment once and slices the region out of it. Every region starts
+    with a small header, which the loading side marks as consumed in destroy_message(); the creating side returns
+    consumed regions to its free list the next time it allocates. Segments are only unlinked by close().
+
+    Each message maps the pages of its own region, so releasing it fails with a BufferError while something still
+    holds a view of it, as it does for the other stores, and a region is never reused under a live view.
+    """
+
+    SEGMENT_SIZE = 16 * 1024 * 1024
+    HEADER_SIZE = 8
+    ALIGNMENT = 8
+    REGION_ALLOCATED = 1
+    REGION_CONSUMED = 2
+
+    __slots__ = (   '_segment_size',
+                    '_segments',
+                    '_owned_segment_names',
+                    '_free_regions',
+                    '_unacknowledged_regions',
+                    '_region_mmaps',
+                    '_ipc_messages'  )
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        return SharedMemoryIpcMessageStore.is_supported()
+
+    def __init__(self, segment_size: int = SEGMENT_SIZE):
+        self._segment_size = segment_size
+        self._segments = {}
+        self._owned_segment_names = []
+        # segment name -> sorted list of free (offset, size) regions, for the segments we own
+        self._free_regions = {}
+        # (segment name, offset, size) of regions handed out and not yet consumed
+        self._unacknowledged_regions = set()
+        # message id -> mmap of the pages of its region
+        self._region_mmaps = {}
+        self._ipc_messages = {}
+
+    @classmethod
+    def create_message_id(cls, segment_name: str, offset: int, size: int) -> str:
+        return f"{segment_name}:{offset}:{size}"
+
+    @classmethod
+    def parse_message_id(cls, message_id: str) -> typing.Tuple[str, int, int]:
+        try:
+            segment_name, offset, size = message_id.rsplit(':', 2)
+            return segment_name, int(offset), int(size)
+        except ValueError:
+            raise IpcException(f"{cls.__name__} cannot parse message id `{message_id}` !")
+
+    @classmethod
+    def region_size(cls, size: int) -> int:
+        return -(-(cls.HEADER_SIZE + size) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    def num_segments(self) -> int:
+        return len(self._segments)
+
+    def segment_names(self) -> typing.Tuple[str, ...]:
+        return tuple(self._segments.keys())
+
+    def num_unacknowledged_regions(self) -> int:
+        return len(self._unacknowledged_regions)
+
+    def set_region_state(self, segment_name: str, offset: int, region_state: int):
+        self._segments[segment_name].buf[offset] = region_state
+
+    def get_region_state(self, segment_name: str, offset: int) -> int:
+        return self._segments[segment_name].buf[offset]
+
+    def create_segment(self, min_size: int) -> str:
+        shm = multiprocessing.shared_memory.SharedMemory(create=True, size=max(self._segment_size, min_size))
+        self._segments[shm.name] = shm
+        self._owned_segment_names.append(shm.name)
+        self._free_regions[shm.name] = [(0, shm.size)]
+        return shm.name
+
+    def free_region(self, segment_name: str, offset: int, size: int):
+        free_regions = self._free_regions[segment_name]
+        index = bisect.bisect(free_regions, (offset, size))
+        free_regions.insert(index, (offset, size))
+        # merge with the neighbouring free regions
+        if (index + 1 < len(free_regions)) and (offset + size == free_regions[index + 1][0]):
+            free_regions[index] = (offset, size + free_regions.pop(index + 1)[1])
+        if (index > 0) and (free_regions[index - 1][0] + free_regions[index - 1][1] == offset):
+            previous_offset, previous_size = free_regions[index - 1]
+            free_regions[index - 1] = (previous_offset, previous_size + free_regions.pop(index)[1])
+
+    def reclaim_consumed_regions(self):
+        consumed_regions = [region for region in self._unacknowledged_regions
+                                        if self.get_region_state(region[0], region[1]) == self.REGION_CONSUMED]
+        for segment_name, offset, size in consumed_regions:
+            self._unacknowledged_regions.remove((segment_name, offset, size))
+            self.free_region(segment_name, offset, size)
+
+    def allocate_region(self, region_size: int) -> typing.Tuple[str, int]:
+        for segment_name in self._owned_segment_names:
+            free_regions = self._free_regions[segment_name]
+            for index, (offset, size) in enumerate(free_regions):
+                if size >= region_size:
+                    if size == region_size:
+                        del free_regions[index]
+                    else:
+                        free_regions[index] = (offset + region_size, size - region_size)
+                    return segment_name, offset
+        segment_name = self.create_segment(region_size)
+        return segment_name, self.allocate_region(region_size)[1]
+
+    def add_message(self, message_id: str, segment_name: str, offset: int, size: int) -> IpcMessage:
+        # an mmap offset has to be a multiple of the allocation granularity
+        map_offset = offset - (offset % mmap.ALLOCATIONGRANULARITY)
+        # SharedMemory does not expose its file descriptor publicly, it is only there on posix
+        region_mmap = mmap.mmap(self._segments[segment_name]._fd, offset + self.region_size(size) - map_offset, offset=map_offset)
+        message_start = offset - map_offset + self.HEADER_SIZE
+        self._region_mmaps[message_id] = region_mmap
+        self._ipc_messages[message_id] = IpcMessage(message_id=message_id, message_buf=memoryview(region_mmap)[message_start : message_start + size])
+        return self._ipc_messages[message_id]
+
+    def create_empty_message(self, size: int) -> IpcMessage:
+        self.reclaim_consumed_regions()
+        region_size = self.region_size(size)
+        segment_name, offset = self.allocate_region(region_size)
+        self.set_region_state(segment_name, offset, self.REGION_ALLOCATED)
+        self._unacknowledged_regions.add((segment_name, offset, region_size))
+        return self.add_message(self.create_message_id(segment_name, offset, size), segment_name, offset, size)
+
+    def load_message(self, message_id: str) -> IpcMessage:
+        if message_id in self._ipc_messages:
+            return self._ipc_messages[message_id]
+        segment_name, offset, size = self.parse_message_id(message_id)
+        if segment_name not in self._segments:
+            try:
+                self._segments[segment_name] = multiprocessing.shared_memory.SharedMemory(name=segment_name)
+            except FileNotFoundError:
+                raise IpcException(f"{self.__class__.__name__}.load_message(...) failed because segment `{segment_name}` could not be found !")
+        return self.add_message(message_id, segment_name, offset, size)
+
+    def save_message(self, ipc_message: IpcMessage):
+        # nothing to do
+        pass
+
+    def release_message(self, ipc_message: IpcMessage):
+        if ipc_message.message_id() not in self._ipc_messages:
+            raise IpcException(f"{self.__class__.__name__}.release_message(...) failed because message `{ipc_message.message_id()}` could not be found !")
+        ipc_message.message_buf().release()
+        # raises BufferError while something still holds a view of the message, which leaves it loaded
+        self._region_mmaps[ipc_message.message_id()].close()
+        del self._region_mmaps[ipc_message.message_id()]
+        del self._ipc_messages[ipc_message.message_id()]
+
+    def destroy_message(self, ipc_message: IpcMessage):
+        segment_name, offset, size = self.parse_message_id(ipc_message.message_id())
+        self.release_message(ipc_message)
+        if segment_name in self._free_regions:
+            # one of ours that was never handed out
+            self._unacknowledged_regions.discard((segment_name, offset, self.region_size(size)))
+            self.free_region(segment_name, offset, self.region_size(size))
+        else:
+            self.set_region_state(segment_name, offset, self.REGION_CONSUMED)
+
+    def messages(self) -> typing.Tuple[IpcMessage, ...]:
+        return tuple(self._ipc_messages.values())
+
+    def memory_usage(self):
+        return sum((ipc_message.size() for ipc_message in self._ipc_messages.values()))
+
+    def release_all_messages(self):
+        for ipc_message in tuple(self._ipc_messages.values()):
+            self.release_message(ipc_message)
+
+    def destroy_all_messages(self):
+        for ipc_message in tuple(self._ipc_messages.values()):
+            self.destroy_message(ipc_message)
+
+    def close(self):
+        """Unlink every segment, once the store on the other side is gone too
+
+        Messages that are still referenced stay readable until they are dropped, since they map their own regions.
+        """
+        for shm in self._segments.values():
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                # the other side got there first
+                pass
+            shm.close()
+        self._segments = {}
+        self._owned_segment_names = []
+        self._free_regions = {}
+        self._unacknowledged_regions = set()
+        self._region_mmaps = {}
+        self._ipc_messages = {}
+
 
 # Decide which implementation to use by default
 if SharedMemoryIpcMessageStore.is_supported():
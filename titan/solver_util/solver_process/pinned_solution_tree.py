@@ -0,0 +1,50 @@
+from __future__ import annotations
+import weakref
+import logging
+from titan.solver_util.solution_tree import (
+    SolutionTree
+)
+from titan.solver_util.solution_tree.types import (
+    SolutionTreeNodeIndex
+)
+from titan.solver_util.solver_process.ipc import (
+    IpcMessageLease
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class PinnedSolutionTree(SolutionTree):
+    """A SolutionTree whose matrices are views on the IPC messages they were deserialized from
+
+    The messages are leased for as long as the tree is alive, so release_shared_memory() does not pull the memory
+    out from under it. The lease is released when the tree is garbage collected, on release(), or on detach()
+    once the matrices were copied out.
+    """
+
+    __slots__ = (   '_ipc_message_lease',
+                    '_finalizer',
+                    '__weakref__'  )
+
+    def __init__(self, solution_tree_node_index: SolutionTreeNodeIndex, ipc_message_lease: IpcMessageLease):
+        super().__init__(solution_tree_node_index)
+        self._ipc_message_lease = ipc_message_lease
+        self._finalizer = weakref.finalize(self, ipc_message_lease.release)
+
+    @classmethod
+    def create(cls, solution_tree: SolutionTree, ipc_message_lease: IpcMessageLease) -> PinnedSolutionTree:
+        return cls(solution_tree._solution_tree_node_index, ipc_message_lease)
+
+    def is_pinned(self) -> bool:
+        return self._finalizer.alive
+
+    def release(self):
+        """Drop the nodes and release the messages, the tree is empty afterwards"""
+        self._solution_tree_node_index = SolutionTreeNodeIndex()
+        self._finalizer()
+
+    def detach(self) -> PinnedSolutionTree:
+        super().detach()
+        self._finalizer()
+        return self
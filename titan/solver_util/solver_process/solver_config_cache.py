@@ -0,0 +1,71 @@
+import collections
+import logging
+from titan.solver_util.solver_process.types import (
+    SolverProcessException,
+    SolverConfig
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+class SolverConfigCache:
+    """A bounded LRU of solver configs keyed by their registration key
+
+    The daemon keeps one to resolve config handles, and the client keeps a mirror of it. Both see the same
+    sequence of add() and get() calls, so they evict the same configs and the client knows which handles the
+    daemon can still resolve.
+    """
+
+    __slots__ = (   '_max_configs',
+                    '_configs',
+                    '_num_hits',
+                    '_num_misses',
+                    '_num_evictions'  )
+
+    def __init__(self, max_configs: int):
+        if max_configs < 1:
+            raise ValueError(f"{self.__class__.__name__} must be able to hold at least one config !")
+        self._max_configs = max_configs
+        self._configs = collections.OrderedDict()
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_evictions = 0
+
+    def max_configs(self) -> int:
+        return self._max_configs
+
+    def num_configs(self) -> int:
+        return len(self._configs)
+
+    def num_hits(self) -> int:
+        return self._num_hits
+
+    def num_misses(self) -> int:
+        return self._num_misses
+
+    def num_evictions(self) -> int:
+        return self._num_evictions
+
+    def has_config(self, registration_key: str) -> bool:
+        return registration_key in self._configs
+
+    def add(self, registration_key: str, config: SolverConfig):
+        self._configs[registration_key] = config
+        self._configs.move_to_end(registration_key)
+        while len(self._configs) > self._max_configs:
+            self._configs.popitem(last=False)
+            self._num_evictions += 1
+
+    def get(self, registration_key: str) -> SolverConfig:
+        try:
+            config = self._configs[registration_key]
+        except KeyError:
+            self._num_misses += 1
+            raise SolverProcessException(f"{self.__class__.__name__} has no config with registration key `{registration_key}` !")
+        self._configs.move_to_end(registration_key)
+        self._num_hits += 1
+        return config
+
+    def clear(self):
+        self._configs.clear()
@@ -7,7 +7,10 @@ import pathlib
 import shutil
 import typing
 import asyncio
+import collections
+import concurrent.futures
 import logging
+import multiprocessing
 from multiprocessing.connection import (
     Connection
 )
@@ -21,14 +24,25 @@ from titan.solver_util.spot_models import (
 from titan.solver_util.solver_process.types import (
     SolverProcessException,
     SolverState,
-    SolverConfig
+    SolverConfig,
+    SolverConfigHandle,
+    SolveProgress,
+    SolveRequest,
+    BatchSolveResult
 )
 from titan.solver_util.solver_process.solver_process_daemon import (
     SolverProcessDaemon
 )
+from titan.solver_util.solver_process.solver_config_cache import (
+    SolverConfigCache
+)
 from titan.solver_util.solver_process.ipc import (
     IpcMessage,
-    IpcMessageStore
+    IpcMessageStore,
+    IpcMessageLeaseTracker
+)
+from titan.solver_util.solver_process.pinned_solution_tree import (
+    PinnedSolutionTree
 )
 from titan.solver_util.solution_tree import (
     SolutionTreeNode,
@@ -126,25 +140,86 @@ class SolverProcessMonitor:
 
 
 
+class SolutionTreeStreamDecoder:
+    """Deserializes the nodes of a solve on a background thread, up to the watermarks the solver reports
+
+    The decoding is queued on a single worker, so the nodes are added in the order they were produced.
+    """
+
+    __slots__ = (   '_build_solution_tree_nodes',
+                    '_builder',
+                    '_executor',
+                    '_decoded_offsets',
+                    '_decode_futures',
+                    '_num_decoded_nodes'  )
+
+    def __init__(self, build_solution_tree_nodes: typing.Callable[[SolutionTreeBuilder, IpcMessage, int, int], typing.Iterator[SolutionTreeNode]]):
+        self._build_solution_tree_nodes = build_solution_tree_nodes
+        self._builder = SolutionTreeBuilder()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        self._decoded_offsets = {}
+        self._decode_futures = collections.deque()
+        self._num_decoded_nodes = 0
+
+    def num_decoded_nodes(self) -> int:
+        return self._num_decoded_nodes
+
+    def decode_nodes(self, ipc_message: IpcMessage, watermark: int):
+        start_offset = self._decoded_offsets.get(ipc_message.message_id(), 0)
+        if watermark <= start_offset:
+            return
+        for _ in self._build_solution_tree_nodes(self._builder, ipc_message, start_offset, watermark):
+            self._num_decoded_nodes += 1
+        self._decoded_offsets[ipc_message.message_id()] = watermark
+
+    def decode_until(self, ipc_message: IpcMessage, watermark: int):
+        """Queue the nodes of ipc_message up to watermark for decoding
+
+        Raises:
+            Any exception from an earlier decode that has already failed
+        """
+        while self._decode_futures and self._decode_futures[0].done():
+            self._decode_futures.popleft().result()
+        self._decode_futures.append(self._executor.submit(self.decode_nodes, ipc_message, watermark))
+
+    async def finish(self) -> SolutionTree:
+        """Wait for the queued decoding and return the SolutionTree"""
+        while self._decode_futures:
+            await asyncio.wrap_future(self._decode_futures.popleft())
+        return self._builder.build_solution_tree()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+
 class SolverProcessClient:
 
     MAX_SOLVE_DEPTH = 1000
     ROOT_NODE_ID = 0
-    RECV_POLL_TIMEOUT = 0.001
-    RECV_WAIT_SLEEP = 0.05
     PROCESS_TERMINATION_NOTICE_PERIOD = 0.05
     PROCESS_KILL_TIMEOUT = 1
-
+    # None uses the platform default. With 'forkserver', PRELOAD_MODULES are imported once in the fork server, so
+    #  every solver process forked from it starts with the solver package and its native libraries already loaded
+    START_METHOD = None
+    PRELOAD_MODULES = ()
+    # must match the store the SolverImplementation creates its messages with
+    IPC_MESSAGE_STORE_CLASS = IpcMessageStore
 
 
     def __init__(self):
         self._solver_process_monitor = SolverProcessMonitor()
-        self._ipc_message_store = IpcMessageStore()
+        self._ipc_message_store = self.IPC_MESSAGE_STORE_CLASS()
+        self._ipc_message_lease_tracker = IpcMessageLeaseTracker(self._ipc_message_store)
+        # mirrors the config cache of the daemon
+        self._config_cache = SolverConfigCache(SolverProcessDaemon.CONFIG_CACHE_SIZE)
         self._config = None
         self._solver_state = SolverState.UNKNOWN
         self._solver_process = None
         self._parent_connection = None
         self._child_connection = None
+        self._spawn_seconds = None
+        self._startup_seconds = None
 
     def state(self) -> SolverState:
         return self._solver_state
@@ -187,6 +262,29 @@ class SolverProcessClient:
     def ipc_message_store(self):
         return self._ipc_message_store
 
+    def config_cache(self) -> SolverConfigCache:
+        return self._config_cache
+
+    def spawn_seconds(self) -> typing.Optional[float]:
+        """How long starting the process took, in the last initialize()"""
+        return self._spawn_seconds
+
+    def startup_seconds(self) -> typing.Optional[float]:
+        """How long the last initialize() took to reach READY, including spawn_seconds()"""
+        return self._startup_seconds
+
+    @classmethod
+    def multiprocessing_context(cls):
+        context = multiprocessing.get_context(cls.START_METHOD)
+        if context.get_start_method() == 'forkserver':
+            # only has an effect before the fork server is started
+            context.set_forkserver_preload(list(cls.PRELOAD_MODULES))
+        return context
+
+    def create_daemon_process(self, target: typing.Callable, args: tuple) -> Process:
+        """Create the process with START_METHOD, the target and args must be picklable unless it is 'fork'"""
+        return self.multiprocessing_context().Process(target=target, args=args)
+
     def create_process(self, parent_connection: Connection, child_connection: Connection, log_directory: str) -> Process:
         raise NotImplementedError
 
@@ -246,25 +344,79 @@ class SolverProcessClient:
                                                                     solve_depth=solve_depth)
         await cls.send_command(daemon_connection, command)
 
+    @classmethod
+    async def send_solve_batch_command(cls, daemon_connection: Connection, config: SolverConfig,
+                                                                    solve_requests: typing.Sequence[SolveRequest]):
+        command = SolverProcessDaemon.create_solve_batch_command(   config=config,
+                                                                    solve_requests=solve_requests  )
+        await cls.send_command(daemon_connection, command)
+
+    @classmethod
+    async def send_register_config_command(cls, daemon_connection: Connection, config: SolverConfig):
+        await cls.send_command(daemon_connection, SolverProcessDaemon.create_register_config_command(config))
+
+    async def register_config(self, config: SolverConfig) -> typing.Union[SolverConfig, SolverConfigHandle]:
+        """Return what a solve command should carry for config
+
+        A config with a registration key is sent to the solver process once and referenced by a SolverConfigHandle
+        after that, for as long as it stays in the daemon's config cache. The registration is not acknowledged,
+        the daemon processes it before the solve command that follows it.
+        """
+        # configs are not required to derive from SolverConfig
+        registration_key = config.registration_key() if isinstance(config, SolverConfig) else None
+        if registration_key is None:
+            return config
+        if self._config_cache.has_config(registration_key):
+            self._config_cache.get(registration_key)
+        else:
+            await self.send_register_config_command(self._parent_connection, config)
+            self._config_cache.add(registration_key, config)
+        return SolverConfigHandle(registration_key)
+
     @classmethod
     async def send_ping(cls, daemon_connection: Connection):
         await cls.send_command(daemon_connection, SolverProcessDaemon.create_ping_command())
 
+    async def wait_until_readable(self, daemon_connection: Connection, timeout: float):
+        """Wait until there is data on daemon_connection or the solver process exits, without polling
+
+        Raises:
+            asyncio.TimeoutError: neither happened within timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        readable_future = loop.create_future()
+        def set_readable():
+            if not readable_future.done():
+                readable_future.set_result(None)
+        # the sentinel of a process becomes readable when it exits
+        watched_fds = (daemon_connection.fileno(), self._solver_process.sentinel)
+        for fd in watched_fds:
+            loop.add_reader(fd, set_readable)
+        try:
+            await asyncio.wait_for(readable_future, timeout=timeout)
+        finally:
+            for fd in watched_fds:
+                loop.remove_reader(fd)
+
     async def recv_notification(self, daemon_connection: Connection, notification_timeout: float):
         try:
             # set timeout timestamp
-            timeout_timestamp = (self.timestamp() + notification_timeout) if (notification_timeout > 0) else sys.maxsize
-            while (self.timestamp() < timeout_timestamp) and (self._solver_process.is_alive()):
-                if not daemon_connection.poll(self.RECV_POLL_TIMEOUT):
-                    await asyncio.sleep(self.RECV_WAIT_SLEEP)
-                else:
+            timeout_timestamp = (self.timestamp() + notification_timeout) if (notification_timeout > 0) else None
+            while True:
+                if daemon_connection.poll():
                     return daemon_connection.recv()
-            if not self._solver_process.is_alive():            
-                raise SolverProcessException((  f"solver subprocess died while waiting on daemon_connection in "+
-                                                f"{self.__class__.__name__}.recv_notification()"))
-            else:
-                raise SolverProcessException((  f"Timeout waiting on daemon_connection in "+
-                                                f"{self.__class__.__name__}.recv_notification()"))
+                if not self._solver_process.is_alive():
+                    raise SolverProcessException((  f"solver subprocess died while waiting on daemon_connection in "+
+                                                    f"{self.__class__.__name__}.recv_notification()"))
+                remaining_timeout = (timeout_timestamp - self.timestamp()) if (timeout_timestamp is not None) else None
+                if (remaining_timeout is not None) and (remaining_timeout <= 0):
+                    raise SolverProcessException((  f"Timeout waiting on daemon_connection in "+
+                                                    f"{self.__class__.__name__}.recv_notification()"))
+                try:
+                    await self.wait_until_readable(daemon_connection, remaining_timeout)
+                except asyncio.TimeoutError:
+                    # the timeout is reported on the next iteration, unless a message arrived just in time
+                    pass
         except EOFError:
             logger.error(f"daemon_connection got an EOF in {self.__class__.__name__}.recv_notification()")
             raise SolverProcessException(f"Got an EOF on daemon_connection !")
@@ -292,11 +444,17 @@ class SolverProcessClient:
 
 
     async def initialize(self, timeout: float = 0, notification_timeout: float = 0):
+        start_timestamp = self.timestamp()
+        self._spawn_seconds = None
+        self._startup_seconds = None
         # setup the monitor
         self._solver_process_monitor.initialize()
+        # a new solver process starts without any registered configs
+        self._config_cache.clear()
         # spawn the process
         self.invalidate_state()
         self.spawn_process()
+        self._spawn_seconds = self.timestamp() - start_timestamp
         # wait until we enter ready state
         notif_gen = self.gen_notifications_until(   daemon_connection=self._parent_connection,
                                                     target_state=SolverState.READY,
@@ -304,6 +462,8 @@ class SolverProcessClient:
                                                     notification_timeout=notification_timeout )
         async for solver_state, _ in notif_gen:
             self.update_state(solver_state)
+        self._startup_seconds = self.timestamp() - start_timestamp
+        logger.info(f"{self.__class__.__name__} started in {self._startup_seconds:.3f}s (spawn {self._spawn_seconds:.3f}s)")
 
 
     def configure(self, config: SolverConfig):
@@ -317,13 +477,24 @@ class SolverProcessClient:
             raise SolverProcessException((  f"Cannot call {self.__class__.__name__}.cancel() " +
                                             f"when solver is not in SOLVING state !"  ))
         self.invalidate_state()
+        await self.send_cancel(self._parent_connection)
         # wait until we enter ready state
         notif_gen = self.gen_notifications_until(   daemon_connection=self._parent_connection,
                                                     target_state=SolverState.READY,
                                                     timeout=timeout,
                                                     notification_timeout=notification_timeout )
-        async for solver_state, _ in notif_gen:
+        unwanted_message_ids = {}
+        async for solver_state, solve_result in notif_gen:
             self.update_state(solver_state)
+            # results that were sent before the solve stopped are not wanted anymore
+            if isinstance(solve_result, BatchSolveResult):
+                solve_result = solve_result.solve_result()
+            if isinstance(solve_result, SolveProgress):
+                unwanted_message_ids[solve_result.message_id()] = None
+            elif solve_result:
+                unwanted_message_ids[solve_result] = None
+        for message_id in unwanted_message_ids:
+            self.ipc_message_store().destroy_message(self.ipc_message_store().load_message(message_id))
 
         
     async def close(self):
@@ -338,6 +509,8 @@ class SolverProcessClient:
                 finally:
                     self.ensure_process_is_closed()
         finally:
+            # the solver process is gone, so nothing else uses what it shared with us
+            self._ipc_message_store.close()
             #cleanup the monitor
             self._solver_process_monitor.finalize()
 
@@ -354,7 +527,7 @@ class SolverProcessClient:
                                             f"when solver has not been configured yet !"  ))
         self.invalidate_state()
         await self.send_solve_subtree_command( daemon_connection=self._parent_connection,
-                                                config=self._config,
+                                                config=await self.register_config(self._config),
                                                 action_sequence=action_sequence,
                                                 solve_depth=solve_depth  )
         # get notifications
@@ -365,6 +538,9 @@ class SolverProcessClient:
         num_messages_yielded = 0
         async for solver_state, solve_result in notif_gen:
             self.update_state(solver_state)
+            # only complete messages are yielded here
+            if isinstance(solve_result, SolveProgress):
+                continue
             # solve result will be a string message id
             if solve_result:
                 ipc_message = self.ipc_message_store().load_message(solve_result)
@@ -385,7 +561,7 @@ class SolverProcessClient:
                                             f"when solver has not been configured yet !"  ))
         self.invalidate_state()
         await self.send_solve_path_command( daemon_connection=self._parent_connection,
-                                            config=self._config,
+                                            config=await self.register_config(self._config),
                                             action_sequence=action_sequence  )
         # get notifications
         notif_gen = self.gen_notifications_until(   daemon_connection=self._parent_connection,
@@ -396,6 +572,9 @@ class SolverProcessClient:
         num_messages_yielded = 0
         async for solver_state, solve_result in notif_gen:
             self.update_state(solver_state)
+            # only complete messages are yielded here
+            if isinstance(solve_result, SolveProgress):
+                continue
             # solve result will be a string message id
             if solve_result:
                 ipc_message = self.ipc_message_store().load_message(solve_result)
@@ -407,19 +586,85 @@ class SolverProcessClient:
 
 
 
+    async def solve_batch_as_ipc_messages(self, solve_requests: typing.Sequence[SolveRequest],
+                                                timeout: float = 0,
+                                                notification_timeout: float = 0) -> typing.AsyncIterator[typing.Tuple[typing.Hashable, IpcMessage]]:
+        """Run many path or subtree solves with a single command, instead of a round trip for each
+
+        Yields:
+            (request_id, ipc_message) for every complete message, in the order the solver produced them
+        """
+        if not self.is_ready():
+            raise SolverProcessException((  f"Cannot call {self.__class__.__name__}.solve_batch_as_ipc_messages() " +
+                                            f"when solver is not in READY state !"  ))
+        elif not self.has_config():
+            raise SolverProcessException((  f"Cannot call {self.__class__.__name__}.solve_batch_as_ipc_messages() " +
+                                            f"when solver has not been configured yet !"  ))
+        elif not solve_requests:
+            raise SolverProcessException(f"Cannot call {self.__class__.__name__}.solve_batch_as_ipc_messages() without any solve requests !")
+        num_messages_yielded = {solve_request.request_id(): 0 for solve_request in solve_requests}
+        if len(num_messages_yielded) != len(solve_requests):
+            raise SolverProcessException(f"The solve requests of a batch must have distinct request ids !")
+        self.invalidate_state()
+        await self.send_solve_batch_command(daemon_connection=self._parent_connection,
+                                            config=await self.register_config(self._config),
+                                            solve_requests=solve_requests  )
+        # get notifications
+        notif_gen = self.gen_notifications_until(   daemon_connection=self._parent_connection,
+                                                    target_state=SolverState.READY,
+                                                    timeout=timeout,
+                                                    notification_timeout=notification_timeout   )
+        async for solver_state, solve_result in notif_gen:
+            self.update_state(solver_state)
+            # only complete messages are yielded here
+            if isinstance(solve_result, BatchSolveResult) and (not isinstance(solve_result.solve_result(), SolveProgress)):
+                yield (solve_result.request_id(), self.ipc_message_store().load_message(solve_result.solve_result()))
+                num_messages_yielded[solve_result.request_id()] += 1
+        # nothing was yielded for a request ? raise an exception
+        empty_request_ids = [request_id for request_id, num_messages in num_messages_yielded.items() if num_messages == 0]
+        if empty_request_ids:
+            raise SolverProcessException(f"Solver did not return any ipc messages for requests {empty_request_ids} of this batch solve !")
+
+    async def solve_batch_as_solution_trees(self, solve_requests: typing.Sequence[SolveRequest],
+                                                    timeout: float = 0,
+                                                    notification_timeout: float = 0) -> typing.Dict[typing.Hashable, SolutionTree]:
+        """Run many path or subtree solves with a single command, and return a SolutionTree per request_id"""
+        builders = {solve_request.request_id(): SolutionTreeBuilder() for solve_request in solve_requests}
+        ipc_message_gen = self.solve_batch_as_ipc_messages( solve_requests=solve_requests,
+                                                            timeout=timeout,
+                                                            notification_timeout=notification_timeout  )
+        async for request_id, ipc_message in ipc_message_gen:
+            for _ in self.build_solution_tree_nodes(builders[request_id], ipc_message):
+                pass
+        solution_trees = {request_id: builder.build_solution_tree() for request_id, builder in builders.items()}
+        # did we get the correct number of nodes for the path solves ?
+        for solve_request in solve_requests:
+            if not solve_request.is_path_request():
+                continue
+            node_count = solution_trees[solve_request.request_id()].node_count()
+            expected_node_count = len(solve_request.action_sequence()) + 1
+            if node_count != expected_node_count:
+                raise SolverProcessException((  f"Solver returned {node_count} nodes for path `{str(solve_request.action_sequence())}` " +
+                                                f"instead of the expected {expected_node_count} !"  ))
+        return solution_trees
+
     @classmethod
-    def gen_blob_tree_nodes(cls, ipc_message: IpcMessage):
-        src_buffer = ipc_message.message_buf()
-        offset = 0
-        while offset < ipc_message.size():
+    def gen_blob_tree_nodes(cls, ipc_message: IpcMessage, start_offset: int = 0,
+                                                            end_offset: typing.Optional[int] = None):
+        end_offset = ipc_message.size() if (end_offset is None) else end_offset
+        src_buffer = ipc_message.message_buf()[:end_offset]
+        offset = start_offset
+        while offset < end_offset:
             node, bytes_read = BlobTreeDeserializer.deserialize_blob_tree_node(src_buffer[offset:])
             offset += bytes_read
             yield node
             
     @classmethod
     def build_solution_tree_nodes(cls, builder: SolutionTreeBuilder,
-                                            ipc_message: IpcMessage) -> typing.Iterator[SolutionTreeNode]:
-        for blob_node in cls.gen_blob_tree_nodes(ipc_message):
+                                            ipc_message: IpcMessage,
+                                            start_offset: int = 0,
+                                            end_offset: typing.Optional[int] = None) -> typing.Iterator[SolutionTreeNode]:
+        for blob_node in cls.gen_blob_tree_nodes(ipc_message, start_offset, end_offset):
             solved_spot, _ = SolutionTreeDeserializer.deserialize_solved_spot(blob_node.blob_bytes())
             # root node ?
             if blob_node.node_id() == cls.ROOT_NODE_ID:
@@ -450,6 +695,66 @@ class SolverProcessClient:
         async for builder, solution_tree_node in self.gen_solution_tree_updates(ipc_message_gen):
             yield (builder, solution_tree_node)
 
+    async def solve_subtree_as_ipc_message_progress(self, action_sequence: ActionSequence,
+                                                            solve_depth: int,
+                                                            timeout: float = 0,
+                                                            notification_timeout: float = 0) -> typing.AsyncIterator[typing.Tuple[IpcMessage, int]]:
+        """Like solve_subtree_as_ipc_messages(), but also yields the messages the solver is still writing
+
+        Yields:
+            (ipc_message, watermark) where the bytes of ipc_message before watermark hold complete nodes. A
+            complete message is yielded with its size as the watermark
+        """
+        if not self.is_ready():
+            raise SolverProcessException((  f"Cannot call {self.__class__.__name__}.solve_subtree_as_ipc_message_progress() " +
+                                            f"when solver is not in READY state !"  ))
+        elif not self.has_config():
+            raise SolverProcessException((  f"Cannot call {self.__class__.__name__}.solve_subtree_as_ipc_message_progress() " +
+                                            f"when solver has not been configured yet !"  ))
+        self.invalidate_state()
+        await self.send_solve_subtree_command( daemon_connection=self._parent_connection,
+                                                config=await self.register_config(self._config),
+                                                action_sequence=action_sequence,
+                                                solve_depth=solve_depth  )
+        # get notifications
+        notif_gen = self.gen_notifications_until(   daemon_connection=self._parent_connection,
+                                                    target_state=SolverState.READY,
+                                                    timeout=timeout,
+                                                    notification_timeout=notification_timeout)
+        num_messages_yielded = 0
+        async for solver_state, solve_result in notif_gen:
+            self.update_state(solver_state)
+            if isinstance(solve_result, SolveProgress):
+                yield (self.ipc_message_store().load_message(solve_result.message_id()), solve_result.watermark())
+            elif solve_result:
+                ipc_message = self.ipc_message_store().load_message(solve_result)
+                yield (ipc_message, ipc_message.size())
+                num_messages_yielded += 1
+        # nothing was yielded ? raise an exception
+        if num_messages_yielded == 0:
+            raise SolverProcessException(f"Solver did not return any ipc messages for this subtree solve !")
+
+    async def solve_subtree_as_streamed_solution_tree(self, action_sequence: ActionSequence,
+                                                            solve_depth: int,
+                                                            timeout: float = 0,
+                                                            notification_timeout: float = 0) -> SolutionTree:
+        """Solve a subtree, deserializing its nodes on a background thread while the solver is producing them
+
+        With a solver that reports SolveProgress the tree is ready soon after the solve ends, instead of
+        after deserializing every message that was received.
+        """
+        solution_tree_stream_decoder = SolutionTreeStreamDecoder(self.build_solution_tree_nodes)
+        try:
+            progress_gen = self.solve_subtree_as_ipc_message_progress(  action_sequence=action_sequence,
+                                                                        solve_depth=solve_depth,
+                                                                        timeout=timeout,
+                                                                        notification_timeout=notification_timeout  )
+            async for ipc_message, watermark in progress_gen:
+                solution_tree_stream_decoder.decode_until(ipc_message, watermark)
+            return await solution_tree_stream_decoder.finish()
+        finally:
+            solution_tree_stream_decoder.close()
+
     async def solve_path_as_solution_tree_updates(self, action_sequence: ActionSequence,
                                                         timeout: float = 0,
                                                         notification_timeout: float = 0) -> typing.AsyncIterator[typing.Tuple[SolutionTreeBuilder, SolutionTreeNode]]:
@@ -466,6 +771,47 @@ class SolverProcessClient:
             raise SolverProcessException((  f"Solver returned {num_nodes_yielded} nodes for path `{str(action_sequence)}` " +
                                             f"instead of the expected {expected_node_count} !"  ))
 
+    async def build_pinned_solution_tree(self, ipc_message_gen: typing.AsyncIterator[IpcMessage]) -> PinnedSolutionTree:
+        """Build a SolutionTree that keeps referencing the ipc messages, rather than copying the matrices out
+
+        The messages are leased by the returned PinnedSolutionTree, so release_shared_memory() leaves them alone
+        until the tree is released, detached or garbage collected.
+        """
+        builder = SolutionTreeBuilder()
+        ipc_messages = []
+        async for ipc_message in ipc_message_gen:
+            ipc_messages.append(ipc_message)
+            for _ in self.build_solution_tree_nodes(builder, ipc_message):
+                pass
+        ipc_message_lease = self._ipc_message_lease_tracker.acquire(ipc_messages)
+        return PinnedSolutionTree.create(builder.build_solution_tree(), ipc_message_lease)
+
+    async def solve_subtree_as_pinned_solution_tree(self, action_sequence: ActionSequence,
+                                                            solve_depth: int,
+                                                            timeout: float = 0,
+                                                            notification_timeout: float = 0) -> PinnedSolutionTree:
+        ipc_message_gen = self.solve_subtree_as_ipc_messages(action_sequence=action_sequence,
+                                                            solve_depth=solve_depth,
+                                                            timeout=timeout,
+                                                            notification_timeout=notification_timeout)
+        return await self.build_pinned_solution_tree(ipc_message_gen)
+
+    async def solve_path_as_pinned_solution_tree(self, action_sequence: ActionSequence,
+                                                        timeout: float = 0,
+                                                        notification_timeout: float = 0) -> PinnedSolutionTree:
+        ipc_message_gen = self.solve_path_as_ipc_messages(   action_sequence=action_sequence,
+                                                            timeout=timeout,
+                                                            notification_timeout=notification_timeout  )
+        solution_tree = await self.build_pinned_solution_tree(ipc_message_gen)
+        # did we get the correct number of nodes ?
+        expected_node_count = len(action_sequence) + 1
+        if solution_tree.node_count() != expected_node_count:
+            node_count = solution_tree.node_count()
+            solution_tree.release()
+            raise SolverProcessException((  f"Solver returned {node_count} nodes for path `{str(action_sequence)}` " +
+                                            f"instead of the expected {expected_node_count} !"  ))
+        return solution_tree
+
     def gen_output_lines(self):
         yield from self._solver_process_monitor.gen_output_lines()
 
@@ -487,9 +833,10 @@ class SolverProcessClient:
         """Release shared ipc messages that were previously created by the solver process
 
         This should be called periodically when the SolutionTrees or IpcMessages are no
-        longer needed
+        longer needed. Messages that are still pinned by a PinnedSolutionTree are kept, and
+        destroyed once the tree lets go of them
         """
-        self._ipc_message_store.destroy_all_messages()
+        self._ipc_message_lease_tracker.destroy_unleased_messages()
 
 
     async def __aenter__(self):
@@ -7,6 +7,10 @@ from titan.solver_util.solver_process.async_task_wrapper import (
 from titan.solver_util.solver_process.solver_process_client import (
     SolverProcessClient  
 )
+from titan.solver_util.solver_process.solver_process_standby import (
+    SolverProcessStandby,
+    SolverProcessStandbyStats
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +20,13 @@ class SolverProcessClientProviderException(Exception):
 
 class SolverProcessClientProvider(AsyncTaskWrapper):
 
-    def __init__(self, solver_process_client_class: typing.Type[SolverProcessClient], initialize_timeout: int):
+    def __init__(self, solver_process_client_class: typing.Type[SolverProcessClient], initialize_timeout: int,
+                                                                                        num_standby: int = 0):
         super().__init__(coro=self.process_provider_loop())
-        self._solver_process_client_class = solver_process_client_class
-        self._initialize_timeout = initialize_timeout
+        # with num_standby > 0 a restart swaps in an already initialized process
+        self._solver_process_standby = SolverProcessStandby(solver_process_client_factory=solver_process_client_class,
+                                                            num_standby=num_standby,
+                                                            initialize_timeout=initialize_timeout  )
         self._solver_fut = None
         self._is_reserved = False
         self._cycle_process_fut = None
@@ -30,6 +37,9 @@ class SolverProcessClientProvider(AsyncTaskWrapper):
                     (not self._solver_fut.cancelled()) and
                     (self._solver_fut.exception() is None)   )
 
+    def standby_stats(self) -> SolverProcessStandbyStats:
+        return self._solver_process_standby.stats()
+
     def is_reserved(self) -> bool:
         return self._is_reserved
 
@@ -88,8 +98,7 @@ class SolverProcessClientProvider(AsyncTaskWrapper):
             while True:
                 logger.info(f"Starting a new solver process")
                 try:
-                    async with self._solver_process_client_class() as solver:
-                        await solver.initialize(timeout=self._initialize_timeout)
+                    async with (await self._solver_process_standby.take()) as solver:
                         self._cycle_process_fut = asyncio.get_running_loop().create_future()
                         self._solver_fut.set_result(solver)
                         logger.info("solver process ready")
@@ -103,9 +112,11 @@ class SolverProcessClientProvider(AsyncTaskWrapper):
 
     async def start(self):
         self._solver_fut = asyncio.get_running_loop().create_future()
+        await self._solver_process_standby.start()
         await super().start()
 
     async def close(self):
         if (self.has_solver()):
             self._cycle_process_fut.cancel()
         await super().close()
+        await self._solver_process_standby.close()
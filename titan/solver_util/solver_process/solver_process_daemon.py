@@ -17,6 +17,9 @@ from titan.solver_util.solver_process.types import (
     SolverProcessException,
     SolverState,
     SolverConfig,
+    SolverConfigHandle,
+    SolveRequest,
+    BatchSolveResult,
     CommandId
 )
 from titan.solver_util.solver_process.ipc import (
@@ -34,6 +37,9 @@ from titan.solver_util.spot_models import (
 from titan.solver_util.solver_process.solver_implementation import (
     SolverImplementation
 )
+from titan.solver_util.solver_process.solver_config_cache import (
+    SolverConfigCache
+)
 from multiprocessing import (
     Process
 )
@@ -60,6 +66,10 @@ class SolverProcessDaemon:
     
     RECV_POLL_TIMEOUT = 0.05
     RECV_POLL_TIMEOUT_IN_SOLVE = 0.001
+    # commands that carry a config, right after the command id
+    SOLVE_COMMAND_IDS = (CommandId.SOLVE_PATH, CommandId.SOLVE_SUBTREE, CommandId.SOLVE_BATCH)
+    # the client mirrors this cache, so it must use the same size
+    CONFIG_CACHE_SIZE = 8
     
     @classmethod
     def create_solve_path_command(cls, config: SolverConfig, action_sequence: ActionSequence) -> tuple:
@@ -70,6 +80,18 @@ class SolverProcessDaemon:
                                             solve_depth: int) -> tuple:
         return (CommandId.SOLVE_SUBTREE, config, action_sequence, solve_depth)
 
+    @classmethod
+    def create_solve_batch_command(cls, config: SolverConfig, solve_requests: typing.Sequence[SolveRequest]) -> tuple:
+        return (CommandId.SOLVE_BATCH, config, tuple(solve_requests))
+
+    @classmethod
+    def create_register_config_command(cls, config: SolverConfig) -> tuple:
+        return (CommandId.REGISTER_CONFIG, config.registration_key(), config)
+
+    @classmethod
+    def is_solve_command(cls, command_tuple: tuple) -> bool:
+        return command_tuple[0] in cls.SOLVE_COMMAND_IDS
+
     @classmethod
     def create_cancel_command(cls):
         return (CommandId.CANCEL, )
@@ -125,7 +147,27 @@ class SolverProcessDaemon:
             raise SolverProcessException(f"Unexpected exception with type `{type(e)}`")
 
     @classmethod
-    def execute_command(cls, command_tuple, solver_state: SolverState, solver: SolverImplementation):
+    def resolve_config_handle(cls, command_tuple: tuple, config_cache: SolverConfigCache) -> tuple:
+        """Replace the config handle of a solve command with the registered config"""
+        if cls.is_solve_command(command_tuple) and isinstance(command_tuple[1], SolverConfigHandle):
+            return (command_tuple[0], config_cache.get(command_tuple[1].registration_key())) + command_tuple[2:]
+        return command_tuple
+
+    @classmethod
+    def gen_batch_solve_results(cls, config: SolverConfig, solve_requests: typing.Sequence[SolveRequest],
+                                                                solver: SolverImplementation):
+        for solve_request in solve_requests:
+            if solve_request.is_path_request():
+                solve_result_gen = solver.solve_path(config, solve_request.action_sequence())
+            else:
+                solve_result_gen = solver.solve_subtree(config, solve_request.action_sequence(), solve_request.solve_depth())
+            for solve_result in solve_result_gen:
+                yield BatchSolveResult(solve_request.request_id(), solve_result)
+
+    @classmethod
+    def execute_command(cls, command_tuple, solver_state: SolverState, solver: SolverImplementation,
+                                                                            config_cache: SolverConfigCache):
+        command_tuple = cls.resolve_config_handle(command_tuple, config_cache)
         if command_tuple[0] == CommandId.SOLVE_PATH:
             # parse command
             _, config, action_sequence = command_tuple
@@ -146,7 +188,21 @@ class SolverProcessDaemon:
             for solve_result in solver.solve_subtree(config, action_sequence, solve_depth):
                 yield (SolverState.SOLVING, solve_result)
             yield (SolverState.READY, None)
+        elif command_tuple[0] == CommandId.SOLVE_BATCH:
+            # parse command
+            _, config, solve_requests = command_tuple
+            # check state is appropriate
+            if solver_state != SolverState.READY:
+                raise SolverProcessException(f"Invalid state for the SOLVE_BATCH command")
+            # one SOLVING to READY transition for the whole batch
+            yield (SolverState.SOLVING, None)
+            for batch_solve_result in cls.gen_batch_solve_results(config, solve_requests, solver):
+                yield (SolverState.SOLVING, batch_solve_result)
+            yield (SolverState.READY, None)
         elif command_tuple[0] == CommandId.CANCEL:
+            # the solve finished before the cancel arrived, the client is already waiting on its READY
+            if solver_state == SolverState.READY:
+                return
             if solver_state != SolverState.SOLVING:
                 raise SolverProcessException(f"Invalid state for the CANCEL command")
             yield (SolverState.CANCELLING, None)
@@ -154,6 +210,12 @@ class SolverProcessDaemon:
             yield (SolverState.READY, None)
         elif command_tuple[0] == CommandId.PING:
             yield (solver_state, None)
+        elif command_tuple[0] == CommandId.REGISTER_CONFIG:
+            # parse command
+            _, registration_key, config = command_tuple
+            # nothing is sent back, the client does not wait on it
+            config_cache.add(registration_key, config)
+            return
         else:
             raise SolverProcessException(f"Invalid command_id `{command_tuple[0]}`")
 
@@ -170,10 +232,12 @@ class SolverProcessDaemon:
     @classmethod
     def _handle_top_level_command(cls, command_tuple, solver_state: SolverState,
                                                             solver: SolverImplementation,
-                                                            child_connection: Connection):
+                                                            child_connection: Connection,
+                                                            config_cache: SolverConfigCache):
         for new_solver_state, solve_result in cls.execute_command(  command_tuple,
                                                                     solver_state,
-                                                                    solver  ):
+                                                                    solver,
+                                                                    config_cache  ):
             solver_state = new_solver_state
             cls.notify_result(child_connection, solver_state, solve_result)
             # check if there is a command waiting            
@@ -182,7 +246,8 @@ class SolverProcessDaemon:
                     command_tuple = child_connection.recv()
                     for new_solver_state, solve_result in cls.execute_command(  command_tuple,
                                                                                 solver_state,
-                                                                                solver ):
+                                                                                solver,
+                                                                                config_cache ):
                         solver_state = new_solver_state
                         cls.notify_result(child_connection, solver_state, solve_result)
                 except EOFError:
@@ -205,11 +270,13 @@ class SolverProcessDaemon:
         for (solver_state, config, action_sequence) in cls.initialize(solver, solver_state):
             cls.notify_state_change(child_connection, solver_state)
         # command recv loop
+        config_cache = SolverConfigCache(cls.CONFIG_CACHE_SIZE)
         for command_tuple in cls.gen_command_tuple_from_connection(child_connection):
             solver_state = cls._handle_top_level_command(   command_tuple=command_tuple,
                                                             solver_state=solver_state,
                                                             solver=solver,
-                                                            child_connection=child_connection  )            
+                                                            child_connection=child_connection,
+                                                            config_cache=config_cache  )
         # close
         solver.close()
 
@@ -235,13 +302,15 @@ class SolverProcessDaemon:
                     logger.error(f"Unexpected exception in {cls.__name__}.initialize(): {e}", exc_info=True)
                     return
             # command recv loop
+            config_cache = SolverConfigCache(cls.CONFIG_CACHE_SIZE)
             for command_tuple in cls.gen_command_tuple_from_connection(child_connection):
                 with SolverProcessDaemonLogging.setup(log_path=log_path, log_name=log_name):
                     try:
                         solver_state = cls._handle_top_level_command(   command_tuple=command_tuple,
                                                                         solver_state=solver_state,
                                                                         solver=solver,
-                                                                        child_connection=child_connection  )
+                                                                        child_connection=child_connection,
+                                                                        config_cache=config_cache  )
                     except Exception as e:
                         # Prevent exception propagating further
                         print(f"Unexpected exception in {cls.__name__}.run(): {traceback.format_exc()}", file=sys.stderr)
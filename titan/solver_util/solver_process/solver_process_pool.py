@@ -0,0 +1,294 @@
+import typing
+import asyncio
+import collections
+import contextlib
+import time
+import logging
+from titan.solver_util.solver_process.async_task_wrapper import (
+    AsyncTaskWrapper
+)
+from titan.solver_util.solver_process.solver_process_client import (
+    SolverProcessClient
+)
+from titan.solver_util.solver_process.solver_process_standby import (
+    SolverProcessStandby,
+    SolverProcessStandbyStats
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SolverProcessPoolException(Exception):
+    pass
+
+
+class SolverProcessPoolStats:
+
+    __slots__ = (   '_num_processes',
+                    '_num_available',
+                    '_num_waiting',
+                    '_num_acquisitions',
+                    '_num_releases',
+                    '_num_restarts',
+                    '_total_wait_seconds',
+                    '_max_wait_seconds',
+                    '_busy_seconds',
+                    '_elapsed_seconds'  )
+
+    def __init__(self, num_processes: int, num_available: int, num_waiting: int, num_acquisitions: int, num_releases: int,
+                                                                                    num_restarts: int,
+                                                                                    total_wait_seconds: float,
+                                                                                    max_wait_seconds: float,
+                                                                                    busy_seconds: float,
+                                                                                    elapsed_seconds: float):
+        self._num_processes = num_processes
+        self._num_available = num_available
+        self._num_waiting = num_waiting
+        self._num_acquisitions = num_acquisitions
+        self._num_releases = num_releases
+        self._num_restarts = num_restarts
+        self._total_wait_seconds = total_wait_seconds
+        self._max_wait_seconds = max_wait_seconds
+        self._busy_seconds = busy_seconds
+        self._elapsed_seconds = elapsed_seconds
+
+    def num_processes(self) -> int:
+        return self._num_processes
+
+    def num_available(self) -> int:
+        return self._num_available
+
+    def num_waiting(self) -> int:
+        return self._num_waiting
+
+    def num_acquisitions(self) -> int:
+        return self._num_acquisitions
+
+    def num_releases(self) -> int:
+        return self._num_releases
+
+    def num_restarts(self) -> int:
+        return self._num_restarts
+
+    def mean_wait_seconds(self) -> float:
+        return (self._total_wait_seconds / self._num_acquisitions) if self._num_acquisitions else 0.0
+
+    def max_wait_seconds(self) -> float:
+        return self._max_wait_seconds
+
+    def utilization(self) -> float:
+        """The fraction of the process time that was reserved, since the pool started"""
+        capacity_seconds = self._num_processes * self._elapsed_seconds
+        return (self._busy_seconds / capacity_seconds) if (capacity_seconds > 0) else 0.0
+
+    def throughput(self) -> float:
+        """Reservations released per second, since the pool started"""
+        return (self._num_releases / self._elapsed_seconds) if (self._elapsed_seconds > 0) else 0.0
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'num_processes': self.num_processes(),
+            'num_available': self.num_available(),
+            'num_waiting': self.num_waiting(),
+            'num_acquisitions': self.num_acquisitions(),
+            'num_releases': self.num_releases(),
+            'num_restarts': self.num_restarts(),
+            'mean_wait_seconds': self.mean_wait_seconds(),
+            'max_wait_seconds': self.max_wait_seconds(),
+            'utilization': self.utilization(),
+            'throughput': self.throughput()
+        }
+
+
+class SolverProcessPool(AsyncTaskWrapper):
+    """Keeps num_processes solver processes running and hands them out one caller at a time
+
+    Callers wait in FIFO order in acquire(). A process that is not READY when it is released, or that dies
+    while idle, is closed and replaced in the background, by one of num_standby pre-initialized processes if
+    there is one.
+    """
+
+    HEALTH_CHECK_INTERVAL = 1.0
+    RESTART_BACKOFF = 1.0
+
+    def __init__(self, solver_process_client_factory: typing.Callable[[], SolverProcessClient], num_processes: int,
+                                                                                                initialize_timeout: float = 0,
+                                                                                                num_standby: int = 0):
+        if num_processes < 1:
+            raise ValueError(f"{self.__class__.__name__} needs at least 1 process !")
+        super().__init__(coro=self.pool_loop())
+        self._solver_process_standby = SolverProcessStandby(solver_process_client_factory=solver_process_client_factory,
+                                                            num_standby=num_standby,
+                                                            initialize_timeout=initialize_timeout  )
+        self._num_processes = num_processes
+        self._idle_clients = collections.deque()
+        self._busy_clients = {}
+        self._waiters = collections.deque()
+        self._restart_queue = None
+        self._member_tasks = set()
+        self._is_closing = False
+        self._start_timestamp = None
+        self._num_acquisitions = 0
+        self._num_releases = 0
+        self._num_restarts = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._busy_seconds = 0.0
+
+    @classmethod
+    def timestamp(cls) -> float:
+        return time.monotonic()
+
+    def num_processes(self) -> int:
+        return self._num_processes
+
+    def num_available(self) -> int:
+        return len(self._idle_clients)
+
+    def num_waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> SolverProcessPoolStats:
+        elapsed_seconds = (self.timestamp() - self._start_timestamp) if (self._start_timestamp is not None) else 0.0
+        # count the reservations still in progress too
+        busy_seconds = self._busy_seconds + sum(self.timestamp() - acquire_timestamp for acquire_timestamp in self._busy_clients.values())
+        return SolverProcessPoolStats(  num_processes=self.num_processes(),
+                                        num_available=self.num_available(),
+                                        num_waiting=self.num_waiting(),
+                                        num_acquisitions=self._num_acquisitions,
+                                        num_releases=self._num_releases,
+                                        num_restarts=self._num_restarts,
+                                        total_wait_seconds=self._total_wait_seconds,
+                                        max_wait_seconds=self._max_wait_seconds,
+                                        busy_seconds=busy_seconds,
+                                        elapsed_seconds=elapsed_seconds  )
+
+    def standby_stats(self) -> SolverProcessStandbyStats:
+        return self._solver_process_standby.stats()
+
+    @classmethod
+    def is_healthy(cls, solver: SolverProcessClient) -> bool:
+        return solver.has_running_process() and solver.is_ready()
+
+    @classmethod
+    async def close_solver(cls, solver: SolverProcessClient):
+        try:
+            solver.release_shared_memory()
+            await solver.close()
+        except Exception as e:
+            logger.info(f"{cls.__name__} is suppressing exception with type `{type(e)}` while closing a solver : {e}")
+
+    def _hand_over(self, solver: SolverProcessClient):
+        """Give a ready solver to the longest waiting caller, or make it available"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(solver)
+                return
+        self._idle_clients.append(solver)
+
+    async def start_member(self):
+        while not self._is_closing:
+            try:
+                solver = await self._solver_process_standby.take()
+            except Exception as e:
+                logger.error(f"{self.__class__.__name__} failed to start a solver process : {e}")
+                await asyncio.sleep(self.RESTART_BACKOFF)
+                continue
+            logger.info(f"{self.__class__.__name__} solver process ready")
+            self._hand_over(solver)
+            return
+
+    def _spawn_member(self):
+        member_task = asyncio.create_task(self.start_member())
+        self._member_tasks.add(member_task)
+        member_task.add_done_callback(self._member_tasks.discard)
+
+    def restart_solver(self, solver: SolverProcessClient):
+        self._num_restarts += 1
+        self._restart_queue.put_nowait(solver)
+
+    async def pool_loop(self):
+        try:
+            for _ in range(self._num_processes):
+                self._spawn_member()
+            while True:
+                try:
+                    solver = await asyncio.wait_for(self._restart_queue.get(), timeout=self.HEALTH_CHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    # idle processes can die too
+                    for solver in [s for s in self._idle_clients if not s.has_running_process()]:
+                        logger.warning(f"{self.__class__.__name__} found a dead idle solver process, restarting it")
+                        self._idle_clients.remove(solver)
+                        self.restart_solver(solver)
+                    continue
+                await self.close_solver(solver)
+                self._spawn_member()
+        finally:
+            logger.info(f"Exiting {self.__class__.__name__}.pool_loop()")
+
+    async def reserve(self) -> SolverProcessClient:
+        if (not self.active()) or self._is_closing:
+            raise SolverProcessPoolException(f"Cannot reserve a solver since {self.__class__.__name__} is not active !")
+        wait_start_timestamp = self.timestamp()
+        if self._idle_clients and (self.num_waiting() == 0):
+            solver = self._idle_clients.popleft()
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                solver = await waiter
+            except asyncio.CancelledError:
+                # we may have been handed a solver just before being cancelled
+                if waiter.done() and (not waiter.cancelled()):
+                    self._hand_over(waiter.result())
+                raise
+        wait_seconds = self.timestamp() - wait_start_timestamp
+        self._num_acquisitions += 1
+        self._total_wait_seconds += wait_seconds
+        self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        self._busy_clients[solver] = self.timestamp()
+        return solver
+
+    def release(self, solver: SolverProcessClient):
+        acquire_timestamp = self._busy_clients.pop(solver)
+        self._busy_seconds += self.timestamp() - acquire_timestamp
+        self._num_releases += 1
+        if self._is_closing:
+            asyncio.get_running_loop().create_task(self.close_solver(solver))
+        elif self.is_healthy(solver):
+            self._hand_over(solver)
+        else:
+            logger.warning((f"{self.__class__.__name__} got back an unhealthy solver (state {solver.state()}, " +
+                            f"running process: {solver.has_running_process()}), restarting it"))
+            self.restart_solver(solver)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> typing.AsyncIterator[SolverProcessClient]:
+        solver = await self.reserve()
+        try:
+            yield solver
+        finally:
+            self.release(solver)
+
+    async def start(self):
+        self._restart_queue = asyncio.Queue()
+        self._start_timestamp = self.timestamp()
+        await self._solver_process_standby.start()
+        await super().start()
+
+    async def close(self):
+        self._is_closing = True
+        await super().close()
+        for member_task in tuple(self._member_tasks):
+            await self.gracefully_cancel_awaitable(member_task)
+        await self._solver_process_standby.close()
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(SolverProcessPoolException(f"{self.__class__.__name__} was closed while waiting for a solver !"))
+        self._waiters.clear()
+        # busy solvers are closed when they are released
+        while self._idle_clients:
+            await self.close_solver(self._idle_clients.popleft())
+        while not self._restart_queue.empty():
+            await self.close_solver(self._restart_queue.get_nowait())
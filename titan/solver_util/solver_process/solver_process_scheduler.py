@@ -0,0 +1,411 @@
+import typing
+import asyncio
+import collections
+import enum
+import time
+import logging
+from titan.solver_util.solver_process.types import (
+    SolverProcessException
+)
+from titan.solver_util.solver_process.async_task_wrapper import (
+    AsyncTaskWrapper
+)
+from titan.solver_util.solver_process.solver_process_client import (
+    SolverProcessClient
+)
+from titan.solver_util.solver_process.solver_process_pool import (
+    SolverProcessPool
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SolverSchedulerException(Exception):
+    pass
+
+
+class SolverPriority(enum.IntEnum):
+    """Lower values are served first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BATCH = 2
+
+
+class SolverSchedulerJob:
+
+    __slots__ = (   '_solve_fn',
+                    '_priority',
+                    '_tenant',
+                    '_is_preemptible',
+                    '_result_future',
+                    '_submit_timestamp',
+                    '_enqueue_timestamp',
+                    '_start_timestamp',
+                    '_task',
+                    '_solver',
+                    '_is_preempted',
+                    '_num_attempts'  )
+
+    def __init__(self, solve_fn: typing.Callable[[SolverProcessClient], typing.Awaitable], priority: SolverPriority,
+                                                                                            tenant: str,
+                                                                                            is_preemptible: bool,
+                                                                                            result_future: asyncio.Future,
+                                                                                            submit_timestamp: float):
+        self._solve_fn = solve_fn
+        self._priority = priority
+        self._tenant = tenant
+        self._is_preemptible = is_preemptible
+        self._result_future = result_future
+        self._submit_timestamp = submit_timestamp
+        self._enqueue_timestamp = submit_timestamp
+        self._start_timestamp = None
+        self._task = None
+        self._solver = None
+        self._is_preempted = False
+        self._num_attempts = 0
+
+    def solve_fn(self) -> typing.Callable[[SolverProcessClient], typing.Awaitable]:
+        return self._solve_fn
+
+    def priority(self) -> SolverPriority:
+        return self._priority
+
+    def tenant(self) -> str:
+        return self._tenant
+
+    def is_preemptible(self) -> bool:
+        return self._is_preemptible
+
+    def result_future(self) -> asyncio.Future:
+        return self._result_future
+
+    def submit_timestamp(self) -> float:
+        return self._submit_timestamp
+
+    def enqueue_timestamp(self) -> float:
+        return self._enqueue_timestamp
+
+    def start_timestamp(self) -> typing.Optional[float]:
+        return self._start_timestamp
+
+    def task(self) -> typing.Optional[asyncio.Task]:
+        return self._task
+
+    def solver(self) -> typing.Optional[SolverProcessClient]:
+        return self._solver
+
+    def is_preempted(self) -> bool:
+        return self._is_preempted
+
+    def num_attempts(self) -> int:
+        return self._num_attempts
+
+    def is_abandoned(self) -> bool:
+        """The caller stopped waiting for the result"""
+        return self._result_future.done()
+
+    def mark_started(self, task: asyncio.Task, timestamp: float, solver: SolverProcessClient):
+        self._task = task
+        self._solver = solver
+        self._start_timestamp = timestamp
+        self._is_preempted = False
+        self._num_attempts += 1
+
+    def mark_preempted(self):
+        self._is_preempted = True
+
+    def mark_requeued(self, timestamp: float):
+        self._task = None
+        self._solver = None
+        self._start_timestamp = None
+        self._enqueue_timestamp = timestamp
+
+
+class SolverSchedulerStats:
+
+    __slots__ = (   '_num_pending',
+                    '_num_running',
+                    '_num_submitted',
+                    '_num_completed',
+                    '_num_failed',
+                    '_num_preemptions',
+                    '_num_started_by_priority',
+                    '_total_wait_seconds_by_priority',
+                    '_max_wait_seconds_by_priority'  )
+
+    def __init__(self, num_pending: int, num_running: int, num_submitted: int, num_completed: int, num_failed: int,
+                                                                                    num_preemptions: int,
+                                                                                    num_started_by_priority: typing.Dict[SolverPriority, int],
+                                                                                    total_wait_seconds_by_priority: typing.Dict[SolverPriority, float],
+                                                                                    max_wait_seconds_by_priority: typing.Dict[SolverPriority, float]):
+        self._num_pending = num_pending
+        self._num_running = num_running
+        self._num_submitted = num_submitted
+        self._num_completed = num_completed
+        self._num_failed = num_failed
+        self._num_preemptions = num_preemptions
+        self._num_started_by_priority = num_started_by_priority
+        self._total_wait_seconds_by_priority = total_wait_seconds_by_priority
+        self._max_wait_seconds_by_priority = max_wait_seconds_by_priority
+
+    def num_pending(self) -> int:
+        return self._num_pending
+
+    def num_running(self) -> int:
+        return self._num_running
+
+    def num_submitted(self) -> int:
+        return self._num_submitted
+
+    def num_completed(self) -> int:
+        return self._num_completed
+
+    def num_failed(self) -> int:
+        return self._num_failed
+
+    def num_preemptions(self) -> int:
+        return self._num_preemptions
+
+    def mean_wait_seconds(self, priority: SolverPriority) -> float:
+        num_started = self._num_started_by_priority.get(priority, 0)
+        return (self._total_wait_seconds_by_priority.get(priority, 0.0) / num_started) if num_started else 0.0
+
+    def max_wait_seconds(self, priority: SolverPriority) -> float:
+        return self._max_wait_seconds_by_priority.get(priority, 0.0)
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'num_pending': self.num_pending(),
+            'num_running': self.num_running(),
+            'num_submitted': self.num_submitted(),
+            'num_completed': self.num_completed(),
+            'num_failed': self.num_failed(),
+            'num_preemptions': self.num_preemptions(),
+            'mean_wait_seconds': {priority.name: self.mean_wait_seconds(priority) for priority in SolverPriority},
+            'max_wait_seconds': {priority.name: self.max_wait_seconds(priority) for priority in SolverPriority}
+        }
+
+
+class SolverProcessScheduler(AsyncTaskWrapper):
+    """Decides which caller gets the next solver of a SolverProcessPool
+
+    Pending solves are served by priority class first, then round robin across the tenants of that class, so one
+    tenant with a big batch cannot starve the others. If preemption_delay is set, a solve that has waited that long
+    cancels a running preemptible solve of a lower priority class, which is put back at the front of its queue and
+    run again from the start later. Preemptible solve functions must therefore be safe to repeat.
+    """
+
+    PREEMPTION_CHECK_INTERVAL = 0.05
+    DEFAULT_TENANT = 'default'
+
+    def __init__(self, solver_process_pool: SolverProcessPool, preemption_delay: typing.Optional[float] = None,
+                                                                cancel_timeout: float = 10.0):
+        super().__init__(coro=self.scheduler_loop())
+        self._solver_process_pool = solver_process_pool
+        self._preemption_delay = preemption_delay
+        self._cancel_timeout = cancel_timeout
+        self._pending_jobs = {priority: collections.OrderedDict() for priority in SolverPriority}
+        self._running_jobs = set()
+        self._has_pending_jobs = None
+        self._is_closing = False
+        self._num_submitted = 0
+        self._num_completed = 0
+        self._num_failed = 0
+        self._num_preemptions = 0
+        self._num_started_by_priority = collections.Counter()
+        self._total_wait_seconds_by_priority = collections.defaultdict(float)
+        self._max_wait_seconds_by_priority = collections.defaultdict(float)
+
+    @classmethod
+    def timestamp(cls) -> float:
+        return time.monotonic()
+
+    def num_pending(self) -> int:
+        return sum( 1   for tenant_queues in self._pending_jobs.values()
+                            for tenant_queue in tenant_queues.values()
+                                for job in tenant_queue if not job.is_abandoned()   )
+
+    def num_running(self) -> int:
+        return len(self._running_jobs)
+
+    def stats(self) -> SolverSchedulerStats:
+        return SolverSchedulerStats(num_pending=self.num_pending(),
+                                    num_running=self.num_running(),
+                                    num_submitted=self._num_submitted,
+                                    num_completed=self._num_completed,
+                                    num_failed=self._num_failed,
+                                    num_preemptions=self._num_preemptions,
+                                    num_started_by_priority=dict(self._num_started_by_priority),
+                                    total_wait_seconds_by_priority=dict(self._total_wait_seconds_by_priority),
+                                    max_wait_seconds_by_priority=dict(self._max_wait_seconds_by_priority)  )
+
+    def enqueue(self, job: SolverSchedulerJob, at_front: bool = False):
+        tenant_queues = self._pending_jobs[job.priority()]
+        tenant_queue = tenant_queues.setdefault(job.tenant(), collections.deque())
+        if at_front:
+            # a preempted solve has already waited its turn once
+            tenant_queue.appendleft(job)
+            tenant_queues.move_to_end(job.tenant(), last=False)
+        else:
+            tenant_queue.append(job)
+        self._has_pending_jobs.set()
+
+    def gen_jobs_in_serving_order(self) -> typing.Iterator[SolverSchedulerJob]:
+        """Pop the first job of the next tenant in the highest priority class that has jobs, until none are left"""
+        for tenant_queues in self._pending_jobs.values():
+            while tenant_queues:
+                tenant, tenant_queue = next(iter(tenant_queues.items()))
+                job = tenant_queue.popleft()
+                if tenant_queue:
+                    tenant_queues.move_to_end(tenant)
+                else:
+                    del tenant_queues[tenant]
+                yield job
+
+    def pop_next_job(self) -> typing.Optional[SolverSchedulerJob]:
+        job = next((job for job in self.gen_jobs_in_serving_order() if not job.is_abandoned()), None)
+        if not any(self._pending_jobs.values()):
+            self._has_pending_jobs.clear()
+        return job
+
+    def gen_overdue_pending_jobs(self) -> typing.Iterator[SolverSchedulerJob]:
+        deadline_timestamp = self.timestamp() - self._preemption_delay
+        for tenant_queues in self._pending_jobs.values():
+            for tenant_queue in tenant_queues.values():
+                for job in tenant_queue:
+                    if (not job.is_abandoned()) and (job.enqueue_timestamp() <= deadline_timestamp):
+                        yield job
+
+    def preempt_if_overdue(self):
+        if (self._preemption_delay is None) or any(job.is_preempted() for job in self._running_jobs):
+            return
+        overdue_job = min(self.gen_overdue_pending_jobs(), key=lambda job: job.priority(), default=None)
+        if overdue_job is None:
+            return
+        # a solve whose first notification was not read yet cannot be cancelled, so it is left for the next check
+        candidate_jobs = [job for job in self._running_jobs if job.is_preemptible() and (job.priority() > overdue_job.priority())
+                                                                and job.solver().has_known_state()]
+        if not candidate_jobs:
+            return
+        # the lowest priority, most recently started solve loses the least work
+        victim_job = max(candidate_jobs, key=lambda job: (job.priority(), job.start_timestamp()))
+        logger.info((   f"{self.__class__.__name__} is preempting a {victim_job.priority().name} solve of tenant `{victim_job.tenant()}` " +
+                        f"for a {overdue_job.priority().name} solve of tenant `{overdue_job.tenant()}`"  ))
+        self._num_preemptions += 1
+        victim_job.mark_preempted()
+        victim_job.task().cancel()
+
+    async def stop_solve(self, solver: SolverProcessClient):
+        """Bring a solver that was interrupted mid solve back to READY, so it can be handed out again"""
+        if not solver.is_solving():
+            return
+        try:
+            await solver.cancel(timeout=self._cancel_timeout)
+        except SolverProcessException as e:
+            # the pool replaces solvers that are not READY when they are released
+            logger.warning(f"{self.__class__.__name__} failed to cancel an interrupted solve : {e}")
+
+    async def run_job(self, job: SolverSchedulerJob, solver: SolverProcessClient):
+        try:
+            try:
+                result = await job.solve_fn()(solver)
+            except asyncio.CancelledError:
+                await self.stop_solve(solver)
+                raise
+            finally:
+                self._solver_process_pool.release(solver)
+        except asyncio.CancelledError:
+            if job.is_preempted() and (not self._is_closing):
+                job.mark_requeued(self.timestamp())
+                self.enqueue(job, at_front=True)
+            elif not job.is_abandoned():
+                job.result_future().set_exception(SolverSchedulerException(f"{self.__class__.__name__} was closed while the solve was running !"))
+        except Exception as e:
+            self._num_failed += 1
+            if not job.is_abandoned():
+                job.result_future().set_exception(e)
+        else:
+            self._num_completed += 1
+            if not job.is_abandoned():
+                job.result_future().set_result(result)
+        finally:
+            self._running_jobs.discard(job)
+
+    def start_job(self, job: SolverSchedulerJob, solver: SolverProcessClient):
+        start_timestamp = self.timestamp()
+        wait_seconds = start_timestamp - job.enqueue_timestamp()
+        self._num_started_by_priority[job.priority()] += 1
+        self._total_wait_seconds_by_priority[job.priority()] += wait_seconds
+        self._max_wait_seconds_by_priority[job.priority()] = max(self._max_wait_seconds_by_priority[job.priority()], wait_seconds)
+        job.mark_started(asyncio.create_task(self.run_job(job, solver)), start_timestamp, solver)
+        self._running_jobs.add(job)
+
+    async def reserve_solver(self) -> SolverProcessClient:
+        reserve_task = asyncio.create_task(self._solver_process_pool.reserve())
+        try:
+            while not reserve_task.done():
+                await asyncio.wait({reserve_task}, timeout=self.PREEMPTION_CHECK_INTERVAL)
+                self.preempt_if_overdue()
+        except asyncio.CancelledError:
+            await self.gracefully_cancel_awaitable(reserve_task)
+            if reserve_task.done() and (not reserve_task.cancelled()) and (reserve_task.exception() is None):
+                self._solver_process_pool.release(reserve_task.result())
+            raise
+        return reserve_task.result()
+
+    async def scheduler_loop(self):
+        try:
+            while True:
+                await self._has_pending_jobs.wait()
+                solver = await self.reserve_solver()
+                job = self.pop_next_job()
+                if job is None:
+                    # every pending caller gave up while we were waiting for a solver
+                    self._solver_process_pool.release(solver)
+                    continue
+                self.start_job(job, solver)
+        finally:
+            logger.info(f"Exiting {self.__class__.__name__}.scheduler_loop()")
+
+    async def run_solve(self, solve_fn: typing.Callable[[SolverProcessClient], typing.Awaitable],
+                                priority: SolverPriority = SolverPriority.NORMAL,
+                                tenant: str = DEFAULT_TENANT,
+                                is_preemptible: bool = True):
+        """Wait for a solver, then return the result of `await solve_fn(solver)`
+
+        The solver goes back to the pool when solve_fn returns, so solve_fn should not keep a reference to it.
+        """
+        if (not self.active()) or self._is_closing:
+            raise SolverSchedulerException(f"Cannot run a solve since {self.__class__.__name__} is not active !")
+        job = SolverSchedulerJob(   solve_fn=solve_fn,
+                                    priority=priority,
+                                    tenant=tenant,
+                                    is_preemptible=is_preemptible,
+                                    result_future=asyncio.get_running_loop().create_future(),
+                                    submit_timestamp=self.timestamp()  )
+        self._num_submitted += 1
+        self.enqueue(job)
+        try:
+            return await job.result_future()
+        except asyncio.CancelledError:
+            # the caller gave up, stop the solve if it is running
+            if job.task() is not None:
+                job.task().cancel()
+            raise
+
+    async def start(self):
+        self._has_pending_jobs = asyncio.Event()
+        await super().start()
+
+    async def close(self):
+        self._is_closing = True
+        await super().close()
+        for job in tuple(self._running_jobs):
+            await self.gracefully_cancel_awaitable(job.task())
+        for tenant_queues in self._pending_jobs.values():
+            for tenant_queue in tenant_queues.values():
+                for job in tenant_queue:
+                    if not job.is_abandoned():
+                        job.result_future().set_exception(SolverSchedulerException(f"{self.__class__.__name__} was closed while waiting for a solver !"))
+            tenant_queues.clear()
+        self._has_pending_jobs.clear()
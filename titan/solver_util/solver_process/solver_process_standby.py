@@ -0,0 +1,182 @@
+import typing
+import asyncio
+import collections
+import time
+import logging
+from titan.solver_util.solver_process.async_task_wrapper import (
+    AsyncTaskWrapper
+)
+from titan.solver_util.solver_process.solver_process_client import (
+    SolverProcessClient
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SolverProcessStandbyStats:
+
+    __slots__ = (   '_num_standby',
+                    '_num_warm',
+                    '_num_warm_takes',
+                    '_num_cold_takes',
+                    '_startup_seconds',
+                    '_take_seconds'  )
+
+    def __init__(self, num_standby: int, num_warm: int, num_warm_takes: int, num_cold_takes: int,
+                                                                startup_seconds: typing.Sequence[float],
+                                                                take_seconds: typing.Sequence[float]):
+        self._num_standby = num_standby
+        self._num_warm = num_warm
+        self._num_warm_takes = num_warm_takes
+        self._num_cold_takes = num_cold_takes
+        self._startup_seconds = tuple(startup_seconds)
+        self._take_seconds = tuple(take_seconds)
+
+    def num_standby(self) -> int:
+        return self._num_standby
+
+    def num_warm(self) -> int:
+        return self._num_warm
+
+    def num_warm_takes(self) -> int:
+        return self._num_warm_takes
+
+    def num_cold_takes(self) -> int:
+        return self._num_cold_takes
+
+    def mean_startup_seconds(self) -> float:
+        """How long a solver process took to become READY"""
+        return (sum(self._startup_seconds) / len(self._startup_seconds)) if self._startup_seconds else 0.0
+
+    def max_startup_seconds(self) -> float:
+        return max(self._startup_seconds, default=0.0)
+
+    def mean_take_seconds(self) -> float:
+        """How long a caller of take() waited for a READY solver process"""
+        return (sum(self._take_seconds) / len(self._take_seconds)) if self._take_seconds else 0.0
+
+    def max_take_seconds(self) -> float:
+        return max(self._take_seconds, default=0.0)
+
+    def serialize_to_dict(self) -> dict:
+        return {
+            'num_standby': self.num_standby(),
+            'num_warm': self.num_warm(),
+            'num_warm_takes': self.num_warm_takes(),
+            'num_cold_takes': self.num_cold_takes(),
+            'mean_startup_seconds': self.mean_startup_seconds(),
+            'max_startup_seconds': self.max_startup_seconds(),
+            'mean_take_seconds': self.mean_take_seconds(),
+            'max_take_seconds': self.max_take_seconds()
+        }
+
+
+class SolverProcessStandby(AsyncTaskWrapper):
+    """Keeps num_standby solver processes initialized in the background, so take() does not wait for a startup
+
+    When no warm process is left take() starts one itself, so with num_standby=0 it is the same as
+    initializing a new client.
+    """
+
+    RESTART_BACKOFF = 1.0
+    MAX_LATENCY_SAMPLES = 1000
+
+    def __init__(self, solver_process_client_factory: typing.Callable[[], SolverProcessClient], num_standby: int,
+                                                                                                initialize_timeout: float = 0):
+        if num_standby < 0:
+            raise ValueError(f"{self.__class__.__name__} cannot keep a negative number of processes !")
+        super().__init__(coro=self.standby_loop())
+        self._solver_process_client_factory = solver_process_client_factory
+        self._num_standby = num_standby
+        self._initialize_timeout = initialize_timeout
+        self._warm_clients = collections.deque()
+        self._needs_refill = None
+        self._num_warm_takes = 0
+        self._num_cold_takes = 0
+        self._startup_seconds = collections.deque(maxlen=self.MAX_LATENCY_SAMPLES)
+        self._take_seconds = collections.deque(maxlen=self.MAX_LATENCY_SAMPLES)
+
+    @classmethod
+    def timestamp(cls) -> float:
+        return time.monotonic()
+
+    @classmethod
+    def is_warm(cls, solver: SolverProcessClient) -> bool:
+        return solver.has_running_process() and solver.is_ready()
+
+    @classmethod
+    async def close_solver(cls, solver: SolverProcessClient):
+        try:
+            solver.release_shared_memory()
+            await solver.close()
+        except Exception as e:
+            logger.info(f"{cls.__name__} is suppressing exception with type `{type(e)}` while closing a solver : {e}")
+
+    def num_standby(self) -> int:
+        return self._num_standby
+
+    def num_warm(self) -> int:
+        return len(self._warm_clients)
+
+    def stats(self) -> SolverProcessStandbyStats:
+        return SolverProcessStandbyStats(   num_standby=self.num_standby(),
+                                            num_warm=self.num_warm(),
+                                            num_warm_takes=self._num_warm_takes,
+                                            num_cold_takes=self._num_cold_takes,
+                                            startup_seconds=self._startup_seconds,
+                                            take_seconds=self._take_seconds  )
+
+    async def initialize_solver(self) -> SolverProcessClient:
+        solver = self._solver_process_client_factory()
+        try:
+            await solver.initialize(timeout=self._initialize_timeout)
+        except BaseException:
+            await self.close_solver(solver)
+            raise
+        self._startup_seconds.append(solver.startup_seconds())
+        return solver
+
+    async def standby_loop(self):
+        try:
+            while True:
+                while len(self._warm_clients) < self._num_standby:
+                    try:
+                        solver = await self.initialize_solver()
+                    except Exception as e:
+                        logger.error(f"{self.__class__.__name__} failed to start a standby solver process : {e}")
+                        await asyncio.sleep(self.RESTART_BACKOFF)
+                        continue
+                    self._warm_clients.append(solver)
+                await self._needs_refill.wait()
+                self._needs_refill.clear()
+        finally:
+            logger.info(f"Exiting {self.__class__.__name__}.standby_loop()")
+
+    async def take(self) -> SolverProcessClient:
+        """Return a READY solver process, which the caller is now responsible for closing"""
+        take_start_timestamp = self.timestamp()
+        solver = None
+        while self._warm_clients and (solver is None):
+            solver = self._warm_clients.popleft()
+            if not self.is_warm(solver):
+                logger.warning(f"{self.__class__.__name__} found a dead standby solver process, discarding it")
+                await self.close_solver(solver)
+                solver = None
+        if self._needs_refill is not None:
+            self._needs_refill.set()
+        if solver is not None:
+            self._num_warm_takes += 1
+        else:
+            solver = await self.initialize_solver()
+            self._num_cold_takes += 1
+        self._take_seconds.append(self.timestamp() - take_start_timestamp)
+        return solver
+
+    async def start(self):
+        self._needs_refill = asyncio.Event()
+        await super().start()
+
+    async def close(self):
+        await super().close()
+        while self._warm_clients:
+            await self.close_solver(self._warm_clients.popleft())
@@ -1,10 +1,17 @@
+from __future__ import annotations
 import enum
+import typing
+import hashlib
+import struct
+import json
 
 class CommandId(enum.Enum):
     SOLVE_PATH = 0
     SOLVE_SUBTREE = 1
     CANCEL = 2
     PING = 3
+    SOLVE_BATCH = 4
+    REGISTER_CONFIG = 5
 
 class SolverState(enum.Enum):
     UNKNOWN = 1
@@ -17,7 +24,154 @@ class SolverState(enum.Enum):
 
 
 class SolverConfig:
-    pass
+
+    def fingerprint(self) -> typing.Optional[str]:
+        return None
+
+    def registration_key(self) -> typing.Optional[str]:
+        """Identifies the config in the config cache of the solver process, so it must cover every field that
+        affects the solve. A config without one cannot be registered, so it is sent along with every solve command
+
+        The fingerprint is enough, unless it leaves out such fields.
+        """
+        return self.fingerprint()
+
+
+class SolverConfigHandle:
+    """Stands in for a config that was sent to the solver process with a REGISTER_CONFIG command"""
+
+    __slots__ = ('_registration_key', )
+
+    def __init__(self, registration_key: str):
+        self._registration_key = registration_key
+
+    def registration_key(self) -> str:
+        return self._registration_key
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(registration_key={repr(self.registration_key())})'
+
+
+class SolveProgress:
+    """A solve result saying the first `watermark` bytes of a message hold complete serialized nodes
+
+    A solver can yield these while it is still writing the message, so the client deserializes the nodes as
+    they are produced. The message id itself is yielded once the message is complete. Every notification
+    costs the solver a poll of its connection, so the watermark should be moved in large steps.
+    """
+
+    __slots__ = (   '_message_id',
+                    '_watermark'  )
+
+    def __init__(self, message_id: str, watermark: int):
+        self._message_id = message_id
+        self._watermark = watermark
+
+    def message_id(self) -> str:
+        return self._message_id
+
+    def watermark(self) -> int:
+        return self._watermark
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(message_id={repr(self.message_id())}, watermark={self.watermark()})'
+
+
+class SolveRequest:
+    """One path or subtree solve of a SOLVE_BATCH command, the request_id tags its results"""
+
+    __slots__ = (   '_request_id',
+                    '_action_sequence',
+                    '_solve_depth'  )
+
+    def __init__(self, request_id: typing.Hashable, action_sequence, solve_depth: typing.Optional[int] = None):
+        self._request_id = request_id
+        self._action_sequence = action_sequence
+        self._solve_depth = solve_depth
+
+    @classmethod
+    def create_path_request(cls, request_id: typing.Hashable, action_sequence) -> SolveRequest:
+        return cls(request_id=request_id, action_sequence=action_sequence)
+
+    @classmethod
+    def create_subtree_request(cls, request_id: typing.Hashable, action_sequence, solve_depth: int) -> SolveRequest:
+        return cls(request_id=request_id, action_sequence=action_sequence, solve_depth=solve_depth)
+
+    def request_id(self) -> typing.Hashable:
+        return self._request_id
+
+    def action_sequence(self):
+        return self._action_sequence
+
+    def solve_depth(self) -> typing.Optional[int]:
+        return self._solve_depth
+
+    def is_path_request(self) -> bool:
+        return self._solve_depth is None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(request_id={repr(self.request_id())}, action_sequence={self.action_sequence()}, solve_depth={self.solve_depth()})'
+
+
+class BatchSolveResult:
+    """A solve result of one request of a SOLVE_BATCH command, tagged so the client can tell the requests apart"""
+
+    __slots__ = (   '_request_id',
+                    '_solve_result'  )
+
+    def __init__(self, request_id: typing.Hashable, solve_result):
+        self._request_id = request_id
+        self._solve_result = solve_result
+
+    def request_id(self) -> typing.Hashable:
+        return self._request_id
+
+    def solve_result(self):
+        return self._solve_result
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(request_id={repr(self.request_id())}, solve_result={repr(self.solve_result())})'
+
+
+class SolverConfigFingerprint:
+    """A sha256 over a compact binary encoding of the fields of a solver config
+
+    Every field is length prefixed, so two different sequences of fields never encode to the same bytes.
+    """
+
+    __slots__ = ('_hash',)
+
+    def __init__(self, tag: str):
+        self._hash = hashlib.sha256()
+        self.add_str(tag)
+
+    def add_int(self, value: int) -> SolverConfigFingerprint:
+        self._hash.update(struct.pack('<q', value))
+        return self
+
+    def add_bytes(self, value: bytes) -> SolverConfigFingerprint:
+        self.add_int(len(value))
+        self._hash.update(value)
+        return self
+
+    def add_str(self, value: str) -> SolverConfigFingerprint:
+        return self.add_bytes(value.encode('utf-8'))
+
+    def add_ints(self, values: typing.Sequence[int]) -> SolverConfigFingerprint:
+        return self.add_bytes(struct.pack(f'<{len(values)}q', *values))
+
+    def add_strs(self, values: typing.Sequence[str]) -> SolverConfigFingerprint:
+        self.add_int(len(values))
+        for value in values:
+            self.add_str(value)
+        return self
+
+    def add_dict(self, value: typing.Optional[dict]) -> SolverConfigFingerprint:
+        """For the nested settings that are small, e.g. bet sizings"""
+        return self.add_str(json.dumps(value, sort_keys=True))
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
 
 class SolverProcessException(Exception):
     pass
\ No newline at end of file